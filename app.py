@@ -7,9 +7,12 @@ import os
 from datetime import date
 from dotenv import load_dotenv
 # from flask_socketio import SocketIO  # Temporarily disabled for debugging
-from db_utils import get_db_connection # Import get_db_connection
+from db_utils import get_db_connection, close_db_connection # Import get_db_connection
 from config import config # Import the config dictionary
 from utils.logging_config import setup_logging # Import logging setup
+from utils.cache import configure_cache
+from utils.invalidation import start_invalidation_listener
+from utils.user_cache import configure_user_cache, user_cache
 
 # Load environment variables
 load_dotenv()
@@ -33,11 +36,25 @@ from routes.auth import auth_bp
 from routes.owner import owner_bp
 from utils.user_utils import get_user_attribute # Moved import for get_user_attribute
 from routes.health import health_bp  # Health check endpoints
+from routes.export_jobs import export_jobs_bp  # Background export status and downloads
+from utils.export_jobs import configure_export_jobs
+from utils.scheduler import configure_scheduler
+from utils.dashboard_updates import configure_dashboard_updates
+from utils.sql_instrumentation import configure_sql_instrumentation
+from utils.metrics import configure_metrics
+from utils.profiler import configure_profiler
+from routes.profiler import profiler_bp  # Owner-only sampling profiler (PROFILER_ENABLED)
 
 # Create Flask application
 app = Flask(__name__)
 app.config.from_object(config[config_name]) # Load configuration
 
+# Select the cache backend (Redis shared across workers, or in-memory)
+configure_cache(app.config)
+start_invalidation_listener(app.config)
+configure_user_cache(app.config)
+configure_export_jobs(app.config)
+
 # Setup Logging
 app_logger, security_logger = setup_logging(app)
 
@@ -113,8 +130,13 @@ socketio = SocketIO(
 )
 
 # Register Socket.IO event handlers
-from socket_events import register_socket_events
+from socket_events import configure_connection_manager, register_socket_events
 register_socket_events(socketio)
+# Online presence is shared through Redis when workers share a message queue
+configure_connection_manager(message_queue)
+
+# Dashboard updates are debounced and emitted once per hostel
+configure_dashboard_updates(app, socketio)
 
 # Register blueprints
 app.register_blueprint(dashboard_bp)
@@ -128,6 +150,8 @@ app.register_blueprint(fee_api_bp)  # Register the fee API blueprint
 app.register_blueprint(auth_bp)     # Register the authentication blueprint
 app.register_blueprint(owner_bp)    # Register the owner dashboard blueprint
 app.register_blueprint(health_bp)   # Register the health check blueprint
+app.register_blueprint(export_jobs_bp)  # Register the export job blueprint
+app.register_blueprint(profiler_bp)  # Register the sampling profiler blueprint
 
 # Register Socket.IO test blueprint (only in development)
 import os
@@ -140,42 +164,42 @@ if os.environ.get('FLASK_ENV') == 'development' or os.environ.get('DEBUG') == 'T
 # Configure multi-hostel system
 # app.config['MULTI_HOSTEL_ENABLED'] = True # This is already in Config class
 
-# Initialize app-wide data
-from datetime import datetime
-from utils.fee_utils import update_overdue_fees
+# Periodic maintenance (overdue fees, reminders, summary checks) runs off the request path
+configure_scheduler(app, socketio)
+
+# Request metrics and per-request SQL statistics; registered before load_user so its query is counted
+configure_metrics(app)
+configure_sql_instrumentation(app)
+configure_profiler(app)
 
-# Store last check time to avoid checking on every request
-# app.config['LAST_OVERDUE_CHECK'] = None # This can be initialized if needed, or rely on .get default
+def load_user_row(user_id):
+    """Read a user's row from the database (None if the user no longer exists)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+    user = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return user
 
 @app.before_request
 def load_user():
     """Load user data into g.user if user is logged in."""
-    if 'user_id' in session:
-        try:
-            conn = get_db_connection()
-            if conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users WHERE id = ?', (session['user_id'],))
-                user = cursor.fetchone()
-                cursor.close()
-                conn.close()
-                if user:
-                    g.user = dict(user)  # Convert SQLite Row to dict
-                else:
-                    g.user = None
-            else:
-                g.user = None
-        except Exception as e:
-            print(f"Error loading user: {e}")
-            g.user = None
-    else:
+    g.user = None
+    # Static files never need the user
+    if 'user_id' not in session or request.endpoint == 'static':
+        return
+    try:
+        # A short-lived snapshot, invalidated when the user is edited
+        g.user = user_cache.get(session['user_id'], load_user_row)
+    except Exception as e:
+        print(f"Error loading user: {e}")
         g.user = None
 
 @app.teardown_appcontext
 def close_db(error):
-    """Close database connection at the end of request."""
-    if hasattr(g, 'sqlite_db'):
-        g.sqlite_db.close()
+    """Return the request's database connection to the pool."""
+    close_db_connection(error)
 
 # get_user_attribute function removed, now imported from utils.user_utils
 
@@ -183,33 +207,17 @@ def close_db(error):
 app.jinja_env.globals.update(get_user_attribute=get_user_attribute) # Uses imported version
 
 @app.before_request
-def check_overdue_fees():
-    """Check and update overdue fees periodically (once per hour)."""
+def require_login():
+    """Send anonymous visitors to the login page."""
     # Skip for authentication routes and static files
     if request.endpoint in ['auth.login', 'static']:
         return
+    # Scrapers authenticate with METRICS_TOKEN; without one, /metrics needs a login like the other health routes
+    if request.endpoint == 'health.metrics' and app.config.get('METRICS_TOKEN'):
+        return
         
-    # Only proceed if user is authenticated
     if not g.user:
-        if request.endpoint != 'auth.login':
-            return redirect(url_for('auth.login'))
-        return
-    
-    last_check_time = app.config.get('LAST_OVERDUE_CHECK')
-    current_time = datetime.now()
-    
-    # Only check once per hour to avoid performance issues
-    if not last_check_time or (current_time - last_check_time).total_seconds() > 3600:
-        try:
-            updated = update_overdue_fees()
-            if updated > 0:
-                app_logger.info(f"Updated {updated} overdue fees")
-                # Emit a socket.io event for real-time notification
-                socketio.emit('fees_updated', {'count': updated}, namespace='/updates')
-        except Exception as e:
-            app_logger.error(f"Error updating overdue fees: {e}")
-        finally:
-            app.config['LAST_OVERDUE_CHECK'] = current_time
+        return redirect(url_for('auth.login'))
 
 @app.context_processor
 def inject_current_date():
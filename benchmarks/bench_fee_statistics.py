@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Fee Statistics Benchmark
+Compares the five-query fee statistics against the single-pass aggregate at scale
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+from common import count_table_scans, time_call, trace_statements, use_temporary_database
+
+
+def populate_fees(db_path, rows, hostels, seed=42):
+    """Insert ``rows`` deterministic fee records spread across ``hostels`` hostels."""
+    import sqlite3
+
+    rng = random.Random(seed)
+    today = date.today()
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO hostels (id, name) VALUES (?, ?)',
+                     [(h, f'Bench Hostel {h}') for h in range(1, hostels + 1)])
+
+    def generate():
+        for i in range(rows):
+            status = rng.choices(('Pending', 'Paid', 'Overdue'), weights=(3, 6, 1))[0]
+            due = today + timedelta(days=rng.randint(-365, 90))
+            paid = (due - timedelta(days=rng.randint(0, 10))).isoformat() if status == 'Paid' else None
+            yield (i % 5000 + 1, round(rng.uniform(100, 5000), 2), due.isoformat(), paid, status,
+                   rng.randint(1, hostels))
+
+    conn.executemany(
+        'INSERT INTO fees (student_id, amount, due_date, paid_date, status, hostel_id) VALUES (?, ?, ?, ?, ?, ?)',
+        generate()
+    )
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+
+
+def legacy_fee_statistics(hostel_id=None):
+    """The previous implementation: one round trip per statistic."""
+    from models.db import get_db_connection
+
+    conn = get_db_connection()
+    today = date.today().isoformat()
+    where, params = ('WHERE hostel_id = ? AND', [hostel_id]) if hostel_id is not None else ('WHERE', [])
+    try:
+        return {
+            'pending_count': conn.execute(
+                f"SELECT COUNT(*) FROM fees {where} status = 'Pending'", params).fetchone()[0],
+            'overdue_count': conn.execute(
+                f"SELECT COUNT(*) FROM fees {where} status = 'Pending' AND due_date < ?", params + [today]).fetchone()[0],
+            'pending_amount': conn.execute(
+                f"SELECT COALESCE(SUM(amount), 0) FROM fees {where} status = 'Pending'", params).fetchone()[0],
+            'overdue_amount': conn.execute(
+                f"SELECT COALESCE(SUM(amount), 0) FROM fees {where} status = 'Pending' AND due_date < ?",
+                params + [today]).fetchone()[0],
+            'paid_amount': conn.execute(
+                f"SELECT COALESCE(SUM(amount), 0) FROM fees {where} status = 'Paid'", params).fetchone()[0],
+        }
+    finally:
+        conn.close()
+
+
+def measure(db_path, label, func, repeat):
+    with trace_statements() as statements:
+        func()
+    plan = count_table_scans(db_path, statements, 'fees')
+    result, timings = time_call(func, repeat)
+    return result, dict(label=label, **plan, **timings)
+
+
+def run(rows=1_000_000, hostels=50, repeat=5):
+    """Run the benchmark and return a list of result dictionaries."""
+    db_path = use_temporary_database('fee_statistics.db')
+    populate_fees(db_path, rows, hostels)
+
+    from models.db import FeeModel
+
+    results = []
+    for scope, hostel_id in (('all hostels', None), ('one hostel', 1)):
+        old, old_stats = measure(db_path, f'legacy ({scope})', lambda: legacy_fee_statistics(hostel_id), repeat)
+        new, new_stats = measure(db_path, f'single pass ({scope})', lambda: FeeModel.get_fee_statistics(hostel_id), repeat)
+        # Both implementations must agree (amounts modulo float summation order)
+        assert old['pending_count'] == new['pending_count'] and old['overdue_count'] == new['overdue_count']
+        assert abs(old['paid_amount'] - new['paid_amount']) < 0.01
+        results.extend([old_stats, new_stats])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='number of fee rows (default: 1,000,000)')
+    parser.add_argument('--hostels', type=int, default=50, help='number of hostels (default: 50)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per variant (default: 5)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.hostels, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"📊 get_fee_statistics over {args.rows:,} fee rows, {args.hostels} hostels")
+    print(f"{'variant':<28}{'stmts':>7}{'scans':>7}{'seeks':>7}{'median ms':>12}{'max ms':>10}")
+    for r in results:
+        print(f"{r['label']:<28}{r['statements']:>7}{r['full_scans']:>7}{r['index_searches']:>7}"
+              f"{r['median_ms']:>12.2f}{r['max_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Logged-in Request Benchmark
+Requests per second for a static-heavy page with the per-request user query vs the cached user snapshot
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from common import PROJECT_ROOT
+
+# Stylesheets and scripts a page pulls in, plus the XHR polls it makes while open
+STATIC_ASSETS = ['css/optimized-common.css', 'css/dashboard.css', 'css/layout-enhancements.css',
+                 'css/socketio.css', 'css/accessibility.css', 'js/optimized-utils.js',
+                 'js/socket-manager.js', 'js/dashboard-init.js']
+XHR_POLLS = ['/health/live', '/health/live']
+
+
+def create_app(db_path):
+    """Import the app against a throwaway SQLite database with one logged-in user."""
+    import sqlite3
+
+    os.environ.update(DATABASE_URL=f'sqlite:///{db_path}', MODELS_DATABASE_URL=f'sqlite:///{db_path}',
+                      CACHE_TYPE='memory', SCHEDULER_ENABLED='false', FLASK_ENV='development')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, password_hash TEXT, full_name TEXT,
+                            role TEXT, hostel_id INTEGER, email TEXT)
+    ''')
+    conn.execute("INSERT INTO users VALUES (1, 'owner', 'x', 'Olive Owner', 'owner', NULL, NULL)")
+    conn.commit()
+    conn.close()
+
+    os.chdir(PROJECT_ROOT)
+    from app import app
+    return app
+
+
+def legacy_load_user():
+    """The previous before_request hook: SELECT * FROM users on every request, static files included."""
+    from flask import g, session
+    from app import load_user_row
+
+    g.user = None
+    if 'user_id' in session:
+        user = load_user_row(session['user_id'])
+        g.user = dict(user) if user else None
+
+
+def trace_user_queries(db_path):
+    """Count SELECTs on users through the app's pooled connection (single-threaded, LIFO pool)."""
+    from utils.db_pool import get_pool
+
+    statements = []
+    conn = get_pool(f'sqlite:///{db_path}').connect()
+    raw = conn.raw_connection
+    raw.set_trace_callback(lambda sql: statements.append(sql) if 'FROM users' in sql else None)
+    conn.close()
+    return statements
+
+
+def measure(app, label, pages, statements):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['role'] = 'owner'
+    urls = [f'/static/{asset}' for asset in STATIC_ASSETS] + XHR_POLLS
+
+    for url in urls:  # Warm up (and check every URL is served)
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        response.close()
+    statements.clear()
+
+    started = time.perf_counter()
+    for _ in range(pages):
+        for url in urls:
+            client.get(url).close()
+    elapsed = time.perf_counter() - started
+    requests = pages * len(urls)
+    return {'label': label, 'requests': requests, 'requests_per_sec': round(requests / elapsed, 1),
+            'user_queries': len(statements)}
+
+
+def run(pages=200):
+    """Run the benchmark and return a list of result dictionaries."""
+    db_path = os.path.join(tempfile.mkdtemp(prefix='hostel-bench-'), 'load_user.db')
+    app = create_app(db_path)
+    statements = trace_user_queries(db_path)
+
+    hooks = app.before_request_funcs[None]
+    position = [hook.__name__ for hook in hooks].index('load_user')
+    current = hooks[position]
+    try:
+        hooks[position] = legacy_load_user
+        before = measure(app, 'query per request', pages, statements)
+    finally:
+        hooks[position] = current
+    after = measure(app, 'cached snapshot', pages, statements)
+    return [before, after]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=200, help='page loads per variant (default: 200)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.pages)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"📊 {args.pages} page loads of {len(STATIC_ASSETS)} static files and {len(XHR_POLLS)} XHR polls")
+    print(f"{'variant':<20}{'requests':>10}{'req/s':>10}{'user queries':>14}")
+    for r in results:
+        print(f"{r['label']:<20}{r['requests']:>10}{r['requests_per_sec']:>10.1f}{r['user_queries']:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Model Layer Benchmark
+Latency percentiles, query counts and peak memory of the main model reads at several
+data scales, compared against a stored baseline
+
+    python benchmarks/bench_models.py --scales small,medium --save-baseline
+    python benchmarks/bench_models.py --scales small,medium --tolerance 0.2
+
+Databases come from generate_data.py and are kept between runs (they are
+deterministic for a given scale and seed). Each case runs with an empty cache,
+once untimed, then --repeat timed runs; query count and peak Python memory are
+taken from one extra run. Against a baseline, a case regresses when its median
+latency or peak memory grows by more than --tolerance (and by more than the noise
+floors), or when it runs more queries. The exit status is 1 if anything regressed.
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import PROJECT_ROOT, latency_percentiles
+from generate_data import REFERENCE_DATE, generate
+
+SCALES = {
+    'small': {'hostels': 5, 'students': 1000, 'fees': 12000},
+    'medium': {'hostels': 20, 'students': 10000, 'fees': 120000},
+    'large': {'hostels': 50, 'students': 100000, 'fees': 2000000},
+}
+DEFAULT_BASELINE = os.path.join(PROJECT_ROOT, 'benchmarks', 'baseline.json')
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'hostel-bench-data')
+MIN_DELTA_MS = 1.0  # latency changes below this are noise
+MIN_DELTA_KB = 256  # as are smaller memory changes
+
+
+def cases():
+    """(name, call(hostel_id)) for every benchmarked read; hostel_id is None for the owner view."""
+    from models.db import ExpenseModel, FeeModel, RoomModel, StudentModel, get_db_connection
+    from utils.dashboard import get_all_activities
+
+    year, month = REFERENCE_DATE.year, REFERENCE_DATE.month
+
+    def activities(hostel_id):
+        conn = get_db_connection()
+        try:
+            return get_all_activities(conn, page=1, per_page=50, hostel_id=hostel_id)
+        finally:
+            conn.close()
+
+    return [
+        ('StudentModel.get_all_students', lambda hostel_id: StudentModel.get_all_students(hostel_id=hostel_id)),
+        ('RoomModel.get_all_rooms', lambda hostel_id: RoomModel.get_all_rooms(hostel_id=hostel_id)),
+        ('RoomModel.get_room_statistics', lambda hostel_id: RoomModel.get_room_statistics(hostel_id=hostel_id)),
+        ('FeeModel.get_fee_report',
+         lambda hostel_id: FeeModel.get_fee_report(year=year, month=month, hostel_id=hostel_id)),
+        ('FeeModel.get_all_fees_with_students',
+         lambda hostel_id: FeeModel.get_all_fees_with_students(hostel_id=hostel_id)),
+        ('ExpenseModel.get_expense_statistics',
+         lambda hostel_id: ExpenseModel.get_expense_statistics(hostel_id=hostel_id, year=year, month=month)),
+        ('get_all_activities', activities),
+    ]
+
+
+def database_for(scale, seed, regenerate=False):
+    """Path of the generated database for a scale, creating it if needed."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    db_path = os.path.join(DATA_DIR, f'{scale}-seed{seed}.db')
+    if regenerate and os.path.exists(db_path):
+        os.remove(db_path)
+    if not os.path.exists(db_path):
+        print(f"🏗️  Generating {scale} data set ({SCALES[scale]['fees']:,} fees)...", file=sys.stderr)
+        try:
+            generate(db_path, seed=seed, **SCALES[scale])
+        except BaseException:
+            if os.path.exists(db_path):
+                os.remove(db_path)  # Never reuse a half-built database
+            raise
+    return db_path
+
+
+def measure(call, repeat):
+    """Latency percentiles, statement count and peak traced memory of call()."""
+    from flask import Flask, g
+    from utils.cache import clear_cache
+    from utils.sql_instrumentation import QueryStats
+
+    timings = []
+    for run in range(repeat + 1):
+        clear_cache()  # Time the queries, not the cache
+        started = time.perf_counter()
+        result = call()
+        if run:  # The first run warms SQLite's page cache and is not counted
+            timings.append((time.perf_counter() - started) * 1000)
+
+    # Count statements through the request-level SQL instrumentation
+    clear_cache()
+    with Flask(__name__).app_context():
+        g.sql_stats = stats = QueryStats()
+        tracemalloc.start()
+        try:
+            result = call()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return dict(latency_percentiles(timings), queries=stats.count, peak_kb=round(peak / 1024, 1),
+                rows=len(result) if isinstance(result, list) else None)
+
+
+def run(scales, repeat, seed=42, regenerate=False):
+    """Run every case at every scale, as owner and for hostel 1; returns {'scale/case/scope': result}."""
+    results = {}
+    for scale in scales:
+        os.environ['MODELS_DATABASE_URL'] = f'sqlite:///{database_for(scale, seed, regenerate)}'
+        for name, call in cases():
+            for scope, hostel_id in (('owner', None), ('hostel', 1)):
+                results[f'{scale}/{name}/{scope}'] = measure(lambda: call(hostel_id), repeat)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms=MIN_DELTA_MS, min_delta_kb=MIN_DELTA_KB):
+    """Regressions of results against a baseline's results, as readable strings."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        p50, old_p50 = current['p50_ms'], previous['p50_ms']
+        if p50 > old_p50 * (1 + tolerance) and p50 - old_p50 > min_delta_ms:
+            regressions.append(f'{key}: p50 {old_p50:.2f} ms -> {p50:.2f} ms')
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{key}: queries {previous['queries']} -> {current['queries']}")
+        peak, old_peak = current['peak_kb'], previous['peak_kb']
+        if peak > old_peak * (1 + tolerance) and peak - old_peak > min_delta_kb:
+            regressions.append(f'{key}: peak memory {old_peak:.0f} KB -> {peak:.0f} KB')
+    return regressions
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'machine': platform.machine(),
+        'processor': platform.processor() or None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default='small,medium',
+                        help=f"comma-separated scales from {', '.join(SCALES)} (default: small,medium)")
+    parser.add_argument('--repeat', type=int, default=10, help='timed runs per case (default: 10)')
+    parser.add_argument('--seed', type=int, default=42, help='data generator seed (default: 42)')
+    parser.add_argument('--regenerate', action='store_true', help='rebuild the databases of the selected scales')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON (default: benchmarks/baseline.json)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed growth of median latency and peak memory, e.g. 0.25 for 25%% (default: 0.25)')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+
+    results = run(scales, max(1, args.repeat), args.seed, args.regenerate)
+    report = {'environment': environment(), 'seed': args.seed, 'repeat': args.repeat,
+              'scales': {scale: SCALES[scale] for scale in scales}, 'results': results}
+
+    print(f"{'case':<62}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KB':>11}")
+    for key, r in results.items():
+        print(f"{key:<62}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['queries']:>9}{r['peak_kb']:>11.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        # Keep the stored results of scales that were not run this time
+        merged = dict(baseline.get('results', {}), **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(report, results=merged), f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != report['environment']:
+        print("⚠️  The baseline was recorded on a different Python/SQLite/machine; latencies may not compare")
+    regressions = compare(results, baseline.get('results', {}), args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
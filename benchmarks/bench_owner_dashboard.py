@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Owner Dashboard Benchmark
+Compares per-hostel dashboard statistics in a loop against the grouped bulk queries
+"""
+import argparse
+import json
+import random
+
+from common import time_call, trace_statements, use_temporary_database
+
+OPEN_STATUSES = ('Pending', 'In Progress', 'Open')
+
+
+def populate_hostels(db_path, hostels, rooms_per_hostel, seed=42):
+    """Insert ``hostels`` deterministic hostels with rooms, students, fees and complaints."""
+    import sqlite3
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.executemany('INSERT INTO hostels (id, name) VALUES (?, ?)',
+                     [(h, f'Bench Hostel {h}') for h in range(1, hostels + 1)])
+    room_id = student_id = 0
+    rooms, students, fees, complaints = [], [], [], []
+    for hostel_id in range(1, hostels + 1):
+        for number in range(rooms_per_hostel):
+            room_id += 1
+            rooms.append((room_id, f'H{hostel_id}-{number}', 3, hostel_id))
+            for _ in range(rng.randint(0, 3)):
+                student_id += 1
+                students.append((student_id, f'Student {student_id}', f's{student_id}@example.com', room_id, hostel_id))
+                for month in range(1, 7):
+                    status = rng.choices(('Pending', 'Paid'), weights=(1, 3))[0]
+                    fees.append((student_id, round(rng.uniform(1000, 5000), 2), f'2030-{month:02d}-01', status, hostel_id))
+            if rng.random() < 0.2:
+                complaints.append((room_id, 'Broken fan', rng.choice(OPEN_STATUSES + ('Resolved',)), hostel_id))
+
+    conn.executemany('INSERT INTO rooms (id, room_number, capacity, hostel_id) VALUES (?, ?, ?, ?)', rooms)
+    conn.executemany('INSERT INTO students (id, name, email, room_id, hostel_id) VALUES (?, ?, ?, ?, ?)', students)
+    conn.executemany('INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, ?, ?, ?, ?)', fees)
+    conn.executemany('INSERT INTO complaints (room_id, description, status, hostel_id) VALUES (?, ?, ?, ?)', complaints)
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+
+
+def looped_dashboard():
+    """The previous owner dashboard: get_dashboard_stats per hostel, then once for the totals."""
+    from models.hostels import Hostel
+
+    per_hostel = {hostel.id: Hostel.get_dashboard_stats(hostel.id) for hostel in Hostel.get_all_hostels()}
+    return per_hostel, Hostel.get_dashboard_stats()
+
+
+def bulk_dashboard():
+    from models.hostels import Hostel
+
+    per_hostel = Hostel.get_dashboard_stats_bulk()
+    return per_hostel, Hostel.sum_dashboard_stats(per_hostel)
+
+
+def measure(label, func, repeat):
+    from utils.cache import clear_cache
+
+    def uncached():
+        clear_cache()  # Time the queries, not the cache
+        return func()
+
+    with trace_statements() as statements:
+        uncached()
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+    result, timings = time_call(uncached, repeat)
+    return result, dict(label=label, statements=len(selects), **timings)
+
+
+def run(hostels=50, rooms_per_hostel=40, repeat=5):
+    """Run the benchmark and return a list of result dictionaries."""
+    db_path = use_temporary_database('owner_dashboard.db')
+    populate_hostels(db_path, hostels, rooms_per_hostel)
+
+    (old_hostels, old_totals), old_stats = measure('per-hostel loop', looped_dashboard, repeat)
+    (new_hostels, new_totals), new_stats = measure('grouped bulk', bulk_dashboard, repeat)
+    # Both implementations must agree (amounts modulo float summation order)
+    assert old_hostels.keys() == new_hostels.keys()
+    for hostel_id, stats in old_hostels.items():
+        assert stats['total_students'] == new_hostels[hostel_id]['total_students']
+        assert stats['open_complaints'] == new_hostels[hostel_id]['open_complaints']
+        assert abs(stats['pending_fee_amount'] - new_hostels[hostel_id]['pending_fee_amount']) < 0.01
+    assert old_totals['occupied_rooms'] == new_totals['occupied_rooms']
+    return [old_stats, new_stats]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hostels', type=int, default=50, help='number of hostels (default: 50)')
+    parser.add_argument('--rooms', type=int, default=40, help='rooms per hostel (default: 40)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per variant (default: 5)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.hostels, args.rooms, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"📊 Owner dashboard statistics for {args.hostels} hostels, {args.rooms} rooms each")
+    print(f"{'variant':<20}{'stmts':>7}{'median ms':>12}{'max ms':>10}")
+    for r in results:
+        print(f"{r['label']:<20}{r['statements']:>7}{r['median_ms']:>12.2f}{r['max_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Shared helpers for the benchmark scripts
+Temporary databases, timing and SQL statement tracing
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Make the project importable when a benchmark is run as a script
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def use_temporary_database(name='bench.db'):
+    """Point the model layer at a fresh SQLite file and create the schema.
+
+    Must be called before anything imports models.db.
+    """
+    db_path = os.path.join(tempfile.mkdtemp(prefix='hostel-bench-'), name)
+    os.environ['MODELS_DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from models.db import init_db
+    init_db()
+    return db_path
+
+
+def time_call(func, repeat=5):
+    """Run func repeat times; return (last result, timings summary in ms)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def latency_percentiles(timings):
+    """p50/p95/p99 (nearest rank), mean and max of timings in ms."""
+    ordered = sorted(timings)
+
+    def rank(p):
+        return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+    return {
+        'p50_ms': round(rank(50), 3),
+        'p95_ms': round(rank(95), 3),
+        'p99_ms': round(rank(99), 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+@contextmanager
+def trace_statements():
+    """Record every SQL statement run through the model-layer pool.
+
+    The pool hands out its most recently released connection first, so tracing
+    the idle connection captures what a single-threaded caller executes next.
+    """
+    from models.db import get_db_connection
+
+    statements = []
+    conn = get_db_connection()
+    raw = conn.raw_connection
+    raw.set_trace_callback(statements.append)
+    conn.close()
+    try:
+        yield statements
+    finally:
+        raw.set_trace_callback(None)
+
+
+def count_table_scans(db_path, statements, table):
+    """Count full scans vs index searches of ``table`` across traced statements."""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    scans = searches = 0
+    try:
+        for sql in statements:
+            if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                continue
+            for row in conn.execute('EXPLAIN QUERY PLAN ' + sql):
+                detail = row[-1]
+                if detail.startswith(f'SCAN {table}'):
+                    scans += 1
+                elif detail.startswith(f'SEARCH {table}'):
+                    searches += 1
+    finally:
+        conn.close()
+    return {'statements': len(statements), 'full_scans': scans, 'index_searches': searches}
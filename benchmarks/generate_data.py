@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator
+Builds a deterministic, production-sized SQLite database (hostels, rooms, students,
+student details, multi-year fees, complaints and expenses) for benchmarks
+
+    python benchmarks/generate_data.py --hostels 50 --students 100000 --fees 2000000 -o /tmp/large.db
+
+The same arguments and seed always produce the same rows: dates are relative to
+--today (a fixed date by default), never the clock. Rows are bulk-inserted into
+bare tables with journaling and syncing off; indexes, the activity log, the
+search index and hostel_stats are then built in one pass each by init_db, rather
+than by their triggers row by row.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from common import PROJECT_ROOT  # noqa: F401  (puts the project on sys.path)
+
+REFERENCE_DATE = date(2025, 6, 30)
+BATCH_SIZE = 50000
+
+# Bulk-load settings: no rollback journal or fsync (a failed run is simply deleted), sorts in memory
+BULK_PRAGMAS = ('journal_mode = OFF', 'synchronous = OFF', 'temp_store = MEMORY', 'cache_size = -262144')
+
+# Tables built from the source tables by init_db
+DERIVED_TABLES = ('student_search_terms', 'student_search', 'activity_log', 'hostel_stats')
+
+FIRST_NAMES = ('Aarav', 'Aditi', 'Arjun', 'Diya', 'Ishaan', 'Kavya', 'Meera', 'Nikhil', 'Priya', 'Rahul',
+               'Riya', 'Rohan', 'Saanvi', 'Sanjay', 'Shreya', 'Tanvi', 'Varun', 'Vihaan', 'Yash', 'Zara')
+LAST_NAMES = ('Agarwal', 'Bose', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Jain', 'Kapoor', 'Kothari', 'Mehta',
+              'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma')
+COURSES = ('B.Tech Computer Science', 'B.Tech Mechanical', 'B.Com', 'BBA', 'B.Arch', 'MBA', 'M.Tech', 'B.Sc Physics')
+CITIES = (('Mumbai', 'Maharashtra'), ('Pune', 'Maharashtra'), ('Jaipur', 'Rajasthan'), ('Indore', 'Madhya Pradesh'),
+          ('Surat', 'Gujarat'), ('Chennai', 'Tamil Nadu'), ('Kochi', 'Kerala'), ('Lucknow', 'Uttar Pradesh'))
+COMPLAINTS = ('Ceiling fan not working', 'Leaking tap in bathroom', 'Wi-Fi keeps disconnecting', 'Broken window latch',
+              'No hot water', 'Light bulb fused', 'Door lock jammed', 'Pest control needed')
+COMPLAINT_STATUSES = (('Resolved', 60), ('Closed', 15), ('Pending', 15), ('In Progress', 10))
+PRIORITIES = (('Low', 30), ('Medium', 45), ('High', 20), ('Critical', 5))
+EXPENSES = (('Utilities', 'Electricity bill', 8000, 40000), ('Utilities', 'Water bill', 1000, 6000),
+            ('Food', 'Mess groceries', 5000, 60000), ('Maintenance', 'Plumbing repairs', 500, 8000),
+            ('Maintenance', 'Painting', 5000, 50000), ('Supplies', 'Cleaning supplies', 300, 4000),
+            ('Staff', 'Security staff salary', 15000, 30000), ('Other', 'Internet service', 2000, 8000))
+PAYMENT_METHODS = ('Cash', 'Card', 'Bank Transfer', 'Cheque')
+RENTS = {1: 12000, 2: 8500, 3: 7000, 4: 6000}  # monthly fee by room capacity
+CAPACITIES = (1, 2, 3, 4)
+CAPACITY_WEIGHTS = (10, 40, 35, 15)
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def month_start(day, months_back):
+    """The first day of the month ``months_back`` months before ``day``'s month."""
+    month = day.year * 12 + day.month - 1 - months_back
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def split(total, parts, rng):
+    """Split ``total`` into ``parts`` unequal (some large tenants, some small) positive shares."""
+    weights = [rng.lognormvariate(0, 0.6) for _ in range(parts)]
+    scale = (total - parts) / sum(weights)
+    shares = [1 + int(weight * scale) for weight in weights]
+    shares[0] += total - sum(shares)  # The first hostel absorbs the rounding
+    return shares
+
+
+class Generator:
+    """Writes the rows of one synthetic data set through a tuned sqlite3 connection."""
+
+    def __init__(self, conn, seed, today):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.today = today
+        self.counts = {}
+
+    def insert(self, table, columns, rows):
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                self.conn.executemany(sql, batch)
+                batch.clear()
+        if batch:
+            self.conn.executemany(sql, batch)
+        self.counts[table] = self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def run(self, hostels, students, fees, complaints, expenses):
+        rng = self.rng
+        students_per_hostel = split(students, hostels, rng)
+        self.insert('hostels', ('id', 'name', 'address', 'contact_person', 'contact_email', 'contact_number',
+                                'created_at'), self.hostels(hostels))
+
+        # Rooms with ~8% spare beds; students fill them in order, ~4% are not assigned yet
+        rooms, assignments = [], []  # (id, number, capacity, occupancy, status, hostel), (room id, hostel)
+        for hostel_id, count in enumerate(students_per_hostel, start=1):
+            housed = count - count // 25
+            first_room = room = len(rooms)
+            beds = 0
+            while beds < housed * 1.08 or not beds:
+                capacity = rng.choices(CAPACITIES, weights=CAPACITY_WEIGHTS)[0]
+                number = len(rooms) + 1
+                rooms.append([number, f'H{hostel_id:03d}-{number:06d}', capacity, 0, 'Available', hostel_id])
+                beds += capacity
+            for _ in range(housed):
+                if rooms[room][3] >= rooms[room][2]:
+                    room += 1
+                rooms[room][3] += 1
+                assignments.append((rooms[room][0], hostel_id))
+            assignments.extend((None, hostel_id) for _ in range(count - housed))
+            for spare in rooms[max(room, first_room) + 1:]:
+                if rng.random() < 0.1:
+                    spare[4] = 'Maintenance'
+        for room in rooms:
+            if room[3] >= room[2]:
+                room[4] = 'Full'
+        self.insert('rooms', ('id', 'room_number', 'capacity', 'current_occupancy', 'status', 'hostel_id'), rooms)
+        capacity_of = {room[0]: room[2] for room in rooms}
+
+        fee_counts = [fees // students + (1 if index < fees % students else 0) for index in range(students)]
+        months = max(fee_counts) if fee_counts else 0
+        self.insert('students', ('id', 'name', 'student_id_number', 'contact', 'email', 'admission_date',
+                                 'expected_checkout_date', 'course', 'room_id', 'hostel_id'),
+                    self.students(assignments, fee_counts))
+        self.insert('student_details', ('student_id', 'home_address', 'city', 'state', 'zip_code', 'parent_name',
+                                        'parent_contact', 'emergency_contact_name', 'emergency_contact_phone',
+                                        'additional_notes'), self.student_details(students))
+        self.insert('fees', ('student_id', 'amount', 'due_date', 'paid_date', 'status', 'hostel_id', 'fee_type'),
+                    self.fees(assignments, fee_counts, capacity_of))
+        self.insert('complaints', ('room_id', 'reported_by_id', 'description', 'priority', 'status', 'report_date',
+                                   'resolution_date', 'resolution_notes', 'hostel_id'),
+                    self.complaints(complaints, assignments, months))
+        self.insert('expenses', ('description', 'amount', 'expense_date', 'category', 'expense_type', 'vendor_name',
+                                 'receipt_number', 'payment_method', 'notes', 'hostel_id', 'created_at'),
+                    self.expenses(expenses, hostels, months))
+        return self.counts
+
+    def hostels(self, count):
+        for hostel_id in range(1, count + 1):
+            city, _ = CITIES[hostel_id % len(CITIES)]
+            yield (hostel_id, f'Hostel {hostel_id:03d}', f'{hostel_id} Campus Road, {city}',
+                   f'Warden {hostel_id:03d}', f'hostel{hostel_id}@example.com', f'+91 90000{hostel_id:05d}',
+                   f'{self.today.year - 3}-01-01 09:00:00')
+
+    def students(self, assignments, fee_counts):
+        rng = self.rng
+        for index, (room_id, hostel_id) in enumerate(assignments):
+            student_id = index + 1
+            # Admitted before the first fee was due
+            admitted = month_start(self.today, fee_counts[index]) - timedelta(days=rng.randint(0, 20))
+            yield (student_id, f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', f'STU{student_id:07d}',
+                   f'+91 9{student_id:09d}', f'student{student_id}@example.com', admitted.isoformat(),
+                   admitted.replace(year=admitted.year + 4, day=1).isoformat(), rng.choice(COURSES), room_id,
+                   hostel_id)
+
+    def student_details(self, count):
+        rng = self.rng
+        for student_id in range(1, count + 1):
+            city, state = rng.choice(CITIES)
+            parent = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+            yield (student_id, f'{rng.randint(1, 999)} Main Street', city, state, f'{rng.randint(110000, 799999)}',
+                   parent, f'+91 8{student_id:09d}', parent, f'+91 8{student_id:09d}', None)
+
+    def fees(self, assignments, fee_counts, capacity_of):
+        """Monthly fees per student, newest first; past fees are mostly paid, recent ones pending."""
+        rng = self.rng
+        today = self.today.isoformat()
+        due_dates = [month_start(self.today, months_back).replace(day=5)
+                     for months_back in range(max(fee_counts, default=0))]
+        due_strings = [due.isoformat() for due in due_dates]
+        for index, (room_id, hostel_id) in enumerate(assignments):
+            rent = RENTS[capacity_of.get(room_id, 2)]
+            for months_back in range(fee_counts[index]):
+                due = due_strings[months_back]
+                roll = rng.random()
+                if due <= today and roll < (0.5 if months_back < 2 else 0.95):
+                    paid = (due_dates[months_back] - timedelta(days=int(roll * 10))).isoformat()
+                    yield (index + 1, rent, due, paid, 'Paid', hostel_id, 'Monthly Rent')
+                else:
+                    status = 'Overdue' if due < today and roll > 0.98 else 'Pending'
+                    yield (index + 1, rent, due, None, status, hostel_id, 'Monthly Rent')
+
+    def complaints(self, count, assignments, months):
+        rng = self.rng
+        days = max(30, months * 30)
+        housed = [(index + 1, room_id, hostel_id) for index, (room_id, hostel_id) in enumerate(assignments) if room_id]
+        for _ in range(count if housed else 0):
+            student_id, room_id, hostel_id = rng.choice(housed)
+            reported = self.today - timedelta(days=rng.randint(0, days))
+            status = weighted(rng, COMPLAINT_STATUSES)
+            resolved = status in ('Resolved', 'Closed')
+            yield (room_id, student_id, rng.choice(COMPLAINTS), weighted(rng, PRIORITIES), status,
+                   reported.isoformat(),
+                   min(self.today, reported + timedelta(days=rng.randint(0, 14))).isoformat() if resolved else None,
+                   'Fixed by maintenance staff' if resolved else None, hostel_id)
+
+    def expenses(self, count, hostels, months):
+        rng = self.rng
+        days = max(30, months * 30)
+        for number in range(1, count + 1):
+            category, description, low, high = rng.choice(EXPENSES)
+            spent = self.today - timedelta(days=rng.randint(0, days))
+            yield (description, float(rng.randint(low, high)), spent.isoformat(), category,
+                   'Capital' if description == 'Painting' else 'Operational', f'Vendor {rng.randint(1, 200):03d}',
+                   f'RCP{number:08d}', rng.choice(PAYMENT_METHODS), None, rng.randint(1, hostels),
+                   f'{spent.isoformat()} 10:00:00')
+
+
+def strip_schema(db_path):
+    """Drop the triggers, derived tables and secondary indexes init_db created, leaving bare tables."""
+    conn = sqlite3.connect(db_path)
+    try:
+        for kind, name in conn.execute(
+                "SELECT type, name FROM sqlite_master WHERE type IN ('trigger', 'index') AND sql IS NOT NULL").fetchall():
+            conn.execute(f'DROP {kind.upper()} IF EXISTS {name}')
+        for table in DERIVED_TABLES:
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def generate(db_path, hostels=50, students=100000, fees=2000000, complaints=None, expenses=None,
+             seed=42, today=REFERENCE_DATE):
+    """Create ``db_path`` (which must not exist) and fill it; returns the row count per table."""
+    from models.db import get_db_connection, init_db
+    from utils.db_pool import dispose_pool
+
+    if os.path.exists(db_path):
+        raise FileExistsError(db_path)
+    if hostels < 1 or students < hostels:
+        raise ValueError('need at least one hostel and one student per hostel')
+    complaints = students // 10 if complaints is None else complaints
+    expenses = hostels * 200 if expenses is None else expenses
+
+    url = f'sqlite:///{os.path.abspath(db_path)}'
+    previous_url = os.environ.get('MODELS_DATABASE_URL')
+    os.environ['MODELS_DATABASE_URL'] = url
+    try:
+        init_db()
+        dispose_pool(url)
+        strip_schema(db_path)
+
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            for pragma in BULK_PRAGMAS + ('locking_mode = EXCLUSIVE',):
+                conn.execute(f'PRAGMA {pragma}')
+            conn.execute('BEGIN')
+            counts = Generator(conn, seed, today).run(hostels, students, fees, complaints, expenses)
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        # Recreate indexes, triggers and derived tables over the loaded rows. The pool hands
+        # init_db the connection just released, so it builds them with the bulk settings too.
+        conn = get_db_connection()
+        for pragma in BULK_PRAGMAS:
+            conn.execute(f'PRAGMA {pragma}')
+        conn.close()
+        init_db()
+        conn = sqlite3.connect(db_path)
+        try:
+            # Backfilled entries are stamped with their activity date, not the time of generation
+            conn.execute("UPDATE activity_log SET created_at = activity_date || ' 00:00:00'")
+            conn.execute('ANALYZE')
+            conn.commit()
+            for table in DERIVED_TABLES[1:]:
+                counts[table] = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        finally:
+            conn.close()
+        dispose_pool(url)
+    finally:
+        if previous_url is None:
+            os.environ.pop('MODELS_DATABASE_URL', None)
+        else:
+            os.environ['MODELS_DATABASE_URL'] = previous_url
+    return counts
+
+
+def content_digest(db_path):
+    """SHA-256 over every generated table's rows in id order, to check that two runs match."""
+    digest = hashlib.sha256()
+    conn = sqlite3.connect(db_path)
+    try:
+        for table in ('hostels', 'rooms', 'students', 'student_details', 'fees', 'complaints', 'expenses',
+                      'activity_log', 'hostel_stats'):
+            for row in conn.execute(f'SELECT * FROM {table} ORDER BY 1, 2, 3, 4'):
+                digest.update(repr(row).encode())
+    finally:
+        conn.close()
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', required=True, help='SQLite file to create')
+    parser.add_argument('--hostels', type=int, default=50, help='number of hostels (default: 50)')
+    parser.add_argument('--students', type=int, default=100000, help='number of students (default: 100000)')
+    parser.add_argument('--fees', type=int, default=2000000,
+                        help='number of monthly fees, spread evenly over students (default: 2000000)')
+    parser.add_argument('--complaints', type=int, help='number of complaints (default: students / 10)')
+    parser.add_argument('--expenses', type=int, help='number of expenses (default: 200 per hostel)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: 42)')
+    parser.add_argument('--today', type=date.fromisoformat, default=REFERENCE_DATE,
+                        help=f'date the data is generated relative to (default: {REFERENCE_DATE})')
+    parser.add_argument('--force', action='store_true', help='replace the output file if it exists')
+    parser.add_argument('--digest', action='store_true', help='print a digest of the generated rows')
+    args = parser.parse_args()
+
+    if args.force and os.path.exists(args.output):
+        os.remove(args.output)
+    started = time.perf_counter()
+    counts = generate(args.output, args.hostels, args.students, args.fees, args.complaints, args.expenses,
+                      args.seed, args.today)
+    elapsed = time.perf_counter() - started
+
+    print(f"📦 Generated {args.output} in {elapsed:.1f}s (seed {args.seed}, relative to {args.today})")
+    for table, count in counts.items():
+        print(f"  {table:<18}{count:>12,}")
+    if args.digest:
+        print(f"  digest            {content_digest(args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,9 +21,13 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file upload
     
     # Cache settings
-    CACHE_TYPE = 'redis'
-    CACHE_REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
-    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'redis'  # redis, memory or null
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT') or 300)
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX') or 'hostel_cache:'
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES') or 1024)  # per-process bound for the memory backend
+    CACHE_INVALIDATION_CHANNEL = os.environ.get('CACHE_INVALIDATION_CHANNEL')  # defaults to '<CACHE_KEY_PREFIX>invalidate'
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 60)  # seconds a logged-in user's row is reused; 0 disables
     
     # Mail settings
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
@@ -33,7 +37,47 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     
     # Database settings
-    DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///hostel.db'    # SocketIO settings
+    DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///hostel.db'
+    
+    # Connection pool settings
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 30)  # seconds to wait for a free connection
+    DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME') or 1800)  # recycle connections after 30 minutes
+    DB_POOL_HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL') or 30)  # ping idle connections
+    
+    # Background export jobs
+    EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS') or 2)
+    EXPORT_ARTIFACT_DIR = os.environ.get('EXPORT_ARTIFACT_DIR')  # defaults to <tmp>/hostel_exports
+    EXPORT_ARTIFACT_TTL = int(os.environ.get('EXPORT_ARTIFACT_TTL') or 3600)  # seconds finished exports are kept and reused
+    
+    # Background maintenance jobs (an interval of 0 disables a job)
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() in ['true', 'on', '1']  # off when running python -m utils.scheduler instead
+    SCHEDULER_TICK = int(os.environ.get('SCHEDULER_TICK') or 30)  # seconds between checks for due jobs
+    SCHEDULER_OVERDUE_INTERVAL = int(os.environ.get('SCHEDULER_OVERDUE_INTERVAL') or 3600)
+    SCHEDULER_REMINDER_INTERVAL = int(os.environ.get('SCHEDULER_REMINDER_INTERVAL') or 86400)  # needs MAIL_USERNAME
+    SCHEDULER_STATS_INTERVAL = int(os.environ.get('SCHEDULER_STATS_INTERVAL') or 86400)
+    
+    # Per-request SQL statistics, slow-query log (logs/slow_queries.log) and Server-Timing headers
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'true').lower() in ['true', 'on', '1']
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS') or 100)  # statements at least this slow are logged
+    REPEATED_QUERY_THRESHOLD = int(os.environ.get('REPEATED_QUERY_THRESHOLD') or 20)  # logs likely N+1 queries
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() in ['true', 'on', '1']
+    
+    # Prometheus metrics at /metrics
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')  # shared directory that merges gunicorn workers' metrics
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # if set, scrapers must send 'Authorization: Bearer <token>' (no login); unset, /metrics needs a login
+    
+    # Sampling profiler for owners at /admin/profiler (off unless enabled)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() in ['true', 'on', '1']
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS') or 5)  # default time between samples
+    PROFILER_MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS') or 60)  # longest session that can be started
+    PROFILER_MAX_OVERHEAD = float(os.environ.get('PROFILER_MAX_OVERHEAD') or 0.02)  # share of wall time the sampler may use
+    
+    # Dashboard updates: changes within the window are merged into one emit per hostel
+    DASHBOARD_UPDATE_WINDOW = float(os.environ.get('DASHBOARD_UPDATE_WINDOW') or 0.5)  # seconds without changes; 0 emits immediately
+    DASHBOARD_UPDATE_MAX_DELAY = float(os.environ.get('DASHBOARD_UPDATE_MAX_DELAY') or 2)  # seconds an update may be held back
+    
+    # SocketIO settings
     SOCKETIO_ASYNC_MODE = 'threading'
     SOCKETIO_CORS_ALLOWED_ORIGINS = os.environ.get("SOCKETIO_CORS_ALLOWED_ORIGINS", "https://hostels.k2architects.in")
     SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')  # Redis URL for message queue
@@ -67,7 +111,9 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DATABASE_URL = 'sqlite:///:memory:'
+    CACHE_TYPE = 'memory'
     WTF_CSRF_ENABLED = False
+    SCHEDULER_ENABLED = False
 
 # Configuration dictionary
 config = {
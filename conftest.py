@@ -0,0 +1,25 @@
+"""
+Shared test fixtures
+"""
+import pytest
+
+
+@pytest.fixture
+def models_db(tmp_path, monkeypatch):
+    """Point the model layer at a fresh SQLite database with the full schema.
+
+    Yields the database path. The cache starts and ends empty, and the
+    database's connection pool is closed afterwards.
+    """
+    from models.db import init_db
+    from utils.cache import clear_cache
+    from utils.db_pool import dispose_pool
+
+    db_path = str(tmp_path / 'models.db')
+    url = f'sqlite:///{db_path}'
+    monkeypatch.setenv('MODELS_DATABASE_URL', url)
+    init_db()
+    clear_cache()  # Cached reads are keyed by hostel, not by database
+    yield db_path
+    clear_cache()
+    dispose_pool(url)
@@ -0,0 +1,41 @@
+"""
+Add the activity_log table (and the triggers that maintain it) to an existing database.
+Run from the project root: python -m migrations.add_activity_log
+"""
+import os
+import sqlite3
+
+from models.db import create_activity_log
+
+def add_activity_log():
+    """Create and backfill the activity_log table."""
+    # Get the database path
+    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hostel.db')
+
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        return False
+
+    # Connect to the database
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        if create_activity_log(cursor):
+            count = cursor.execute('SELECT COUNT(*) FROM activity_log').fetchone()[0]
+            print(f"Created activity_log with {count} backfilled entries.")
+        else:
+            print("activity_log already exists; triggers checked.")
+        conn.commit()
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Error creating activity_log: {e}")
+        return False
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_activity_log()
@@ -0,0 +1,32 @@
+-- Fee idempotency key on PostgreSQL (uq_fees_student_type_due)
+-- Batch fee generation inserts with ON CONFLICT (student_id, fee_type, due_date)
+-- DO NOTHING, which fails without this unique index. SQLite databases get it from
+-- init_db, which removes duplicates the same way.
+-- One fee is kept per (student_id, fee_type, due_date): a paid one if any, else the
+-- oldest. Payments recorded against a removed duplicate move to the kept fee.
+
+BEGIN;
+
+CREATE TEMPORARY TABLE duplicate_fees ON COMMIT DROP AS
+SELECT id, FIRST_VALUE(id) OVER (
+           PARTITION BY student_id, fee_type, due_date
+           ORDER BY CASE WHEN status = 'Paid' THEN 0 ELSE 1 END, id
+       ) AS kept_id
+FROM fees
+WHERE fee_type IS NOT NULL;
+
+DELETE FROM duplicate_fees WHERE id = kept_id;
+
+DO $$
+BEGIN
+    IF to_regclass('fee_payments') IS NOT NULL THEN
+        UPDATE fee_payments SET fee_id = duplicate_fees.kept_id
+        FROM duplicate_fees WHERE fee_payments.fee_id = duplicate_fees.id;
+    END IF;
+END $$;
+
+DELETE FROM fees WHERE id IN (SELECT id FROM duplicate_fees);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_fees_student_type_due ON fees (student_id, fee_type, due_date);
+
+COMMIT;
@@ -0,0 +1,55 @@
+"""
+Add performance indexes to an existing database.
+"""
+import os
+import sqlite3
+
+# (index name, table, columns)
+PERFORMANCE_INDEXES = [
+    # Serves FeeModel.get_fee_statistics and the per-hostel overdue/pending filters
+    ('idx_fees_hostel_status_due', 'fees', 'hostel_id, status, due_date'),
+    # Keyset pagination of the student, fee, expense and complaint lists (utils.pagination)
+    ('idx_students_hostel_name_id', 'students', 'hostel_id, name, id'),
+    ('idx_fees_hostel_due_id', 'fees', "hostel_id, COALESCE(due_date, '0001-01-01'), id"),
+    ('idx_expenses_hostel_date_id', 'expenses', "hostel_id, COALESCE(expense_date, '0001-01-01'), id"),
+    ('idx_complaints_report_date_priority_id', 'complaints',
+     "COALESCE(report_date, '0001-01-01'), "
+     "CASE priority WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 3 WHEN 'Critical' THEN 4 ELSE 0 END, id"),
+]
+
+def add_performance_indexes():
+    """Create any missing performance indexes."""
+    # Get the database path
+    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hostel.db')
+
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        return False
+
+    # Connect to the database
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        for index_name, table, columns in PERFORMANCE_INDEXES:
+            print(f"Ensuring index {index_name} on {table}({columns})...")
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {table}({columns})')
+
+        # Refresh planner statistics so the new indexes are picked up
+        cursor.execute('ANALYZE')
+
+        # Commit the changes
+        conn.commit()
+        print("Performance indexes created successfully.")
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Error creating performance indexes: {e}")
+        return False
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_performance_indexes()
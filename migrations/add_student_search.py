@@ -0,0 +1,43 @@
+"""
+Add the student_search full-text index (and the triggers that maintain it) to an existing database.
+Run from the project root: python -m migrations.add_student_search
+
+PostgreSQL databases use migrations/add_student_search_postgres.sql instead.
+"""
+import os
+import sqlite3
+
+from models.db import create_student_search
+
+def add_student_search():
+    """Create and fill the student_search index."""
+    # Get the database path
+    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hostel.db')
+
+    if not os.path.exists(db_path):
+        print(f"Database not found at {db_path}")
+        return False
+
+    # Connect to the database
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    try:
+        if create_student_search(cursor):
+            count = cursor.execute('SELECT COUNT(*) FROM student_search').fetchone()[0]
+            print(f"Created student_search with {count} students indexed.")
+        else:
+            print("student_search already exists (or this SQLite build lacks FTS5).")
+        conn.commit()
+        return True
+
+    except Exception as e:
+        conn.rollback()
+        print(f"Error creating student_search: {e}")
+        return False
+
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_student_search()
@@ -0,0 +1,11 @@
+-- Student search on PostgreSQL (StudentModel.search)
+-- SQLite uses the student_search FTS5 index created by init_db instead.
+-- Trigram indexes serve both the typeahead ranking (word_similarity / <%)
+-- and the LIKE '%...%' filters of the student list.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_students_name_trgm ON students USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_students_course_trgm ON students USING gin (course gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_students_id_number_trgm ON students USING gin (student_id_number gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_rooms_room_number_trgm ON rooms USING gin (room_number gin_trgm_ops);
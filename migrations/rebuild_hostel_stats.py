@@ -0,0 +1,31 @@
+"""
+Rebuild (or check) the hostel_stats summary table from the source tables.
+Run from the project root: python -m migrations.rebuild_hostel_stats [--check]
+
+Uses the model-layer database (MODELS_DATABASE_URL, or hostel.db by default).
+"""
+import argparse
+import sys
+
+from models.db import HostelStatsModel
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute the hostel_stats summary table.')
+    parser.add_argument('--check', action='store_true',
+                        help='only report summary rows that disagree with the source tables')
+    args = parser.parse_args()
+
+    mismatches = HostelStatsModel.check()
+    for key, stored, expected in mismatches:
+        print(f"Mismatch {key}: stored {stored}, expected {expected}")
+
+    if args.check:
+        print("hostel_stats is consistent." if not mismatches else f"{len(mismatches)} mismatched summary rows.")
+        return 1 if mismatches else 0
+
+    count = HostelStatsModel.rebuild()
+    print(f"Rebuilt hostel_stats: {count} summary rows.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
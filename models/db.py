@@ -3,29 +3,105 @@ Database Models for Hostel Management System
 This module handles database operations and schema definitions
 """
 
+import re
 import sqlite3
 import os
 from datetime import date, timedelta
 from pathlib import Path
+from utils.db_pool import get_pool, dispose_pool, is_postgres_url, resolve_sqlite_path
+from utils.query_compiler import DatabaseError, IntegrityError, is_unique_violation
+from utils.cache import cached
+from utils.invalidation import global_reader_tags, invalidate_hostel, reader_tags
+from utils.pagination import DEFAULT_PER_PAGE, NO_DATE, SortKey, fetch_page
+from utils.batch_processing import process_batch_fees
+from utils.search import closest_terms, match_expression, tokenize
+from utils.sql_instrumentation import instrument
 
 # Database configuration
 DATABASE = 'hostel.db'
 
-def get_db_connection():
-    """Establishes a connection to the database."""
+# Maximum number of values bound into a single IN (...) list
+SQL_IN_CHUNK_SIZE = 500
+
+# Rows fetched per round trip when streaming large result sets (exports)
+STREAM_BATCH_SIZE = 1000
+
+def _database_url():
+    """URL of the model-layer database.
+    
+    MODELS_DATABASE_URL may point at PostgreSQL; otherwise the local SQLite file is used.
+    """
+    database_url = os.environ.get('MODELS_DATABASE_URL')
+    if database_url:
+        return database_url
     db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DATABASE)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row  # Access columns by name
-    return conn
+    return f"sqlite:///{db_path}"
+
+def get_db_connection():
+    """Checks out a pooled connection to the database.
+    
+    Rows can be accessed by column name on both SQLite and PostgreSQL, and SQL
+    is written in SQLite syntax (see utils.query_compiler); calling close()
+    returns the connection to the pool. During a request, statements are timed
+    for the request's SQL statistics (see utils.sql_instrumentation).
+    """
+    return instrument(get_pool(_database_url()).connect())
+
+def iter_query_batches(conn, query, params=(), batch_size=None):
+    """Yield the rows of a SELECT as lists of at most batch_size rows.
+    
+    On PostgreSQL the rows come from a server-side cursor, so the result set
+    stays on the server; SQLite cursors already step through results lazily.
+    The caller owns (and closes) the connection.
+    """
+    batch_size = batch_size or STREAM_BATCH_SIZE
+    server_side = getattr(conn, 'iter_batches', None)
+    if server_side is not None:
+        yield from server_side(query, params, batch_size)
+        return
+    cursor = conn.execute(query, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+def count_query_rows(query, params=()):
+    """Number of rows a SELECT returns, counted in the database."""
+    conn = get_db_connection()
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM ({query}) AS counted_rows', params).fetchone()[0]
+    finally:
+        conn.close()
 
 def get_db():
     """Alias for get_db_connection to maintain compatibility."""
     return get_db_connection()
 
+def _hostel_id_of(conn, table, row_id):
+    """Look up the hostel a row belongs to, for cache invalidation (None if unknown)."""
+    if row_id is None:
+        return None
+    try:
+        row = conn.execute(f'SELECT hostel_id FROM {table} WHERE id = ?', (row_id,)).fetchone()
+    except DatabaseError:
+        return None  # Older schemas without a hostel_id column
+    return row['hostel_id'] if row else None
+
 def init_db(overwrite=False):
     """Initializes the database schema."""
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DATABASE)
-    if overwrite and os.path.exists(db_path):
+    database_url = _database_url()
+    if is_postgres_url(database_url):
+        # The PostgreSQL schema is managed by migrations, not this SQLite DDL
+        print("Skipping init_db: MODELS_DATABASE_URL points at PostgreSQL")
+        return
+
+    db_path = resolve_sqlite_path(database_url)  # The file the pool actually opens
+    if overwrite and db_path != ':memory:' and os.path.exists(db_path):
+        dispose_pool(database_url)  # Drop pooled handles to the old file
         os.remove(db_path)  # Remove existing DB if overwrite is true
 
     conn = get_db_connection()
@@ -131,11 +207,29 @@ def init_db(overwrite=False):
         cursor.execute("ALTER TABLE fees ADD COLUMN hostel_id INTEGER")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_fees_hostel_id ON fees(hostel_id)")
 
+    # Add fee_type column (what the fee is for) to existing fees table if it doesn't exist
+    cursor.execute("""
+        SELECT name FROM pragma_table_info('fees') WHERE name='fee_type'
+    """)
+    if not cursor.fetchone():
+        cursor.execute("ALTER TABLE fees ADD COLUMN fee_type TEXT")
+    # Idempotency key for fees: one fee of a type per student and due date. Fees added
+    # by hand conflict too when the type is set (always on PostgreSQL, where fee_type is
+    # NOT NULL); a NULL fee_type never conflicts. FeeModel.add_fee reports the conflict.
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_fees_student_type_due'")
+    if not cursor.fetchone():
+        remove_duplicate_fees(cursor)  # Older databases may hold fees the key would reject
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_fees_student_type_due ON fees(student_id, fee_type, due_date)')
+
     # Create indexes for better performance
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_room_id ON students(room_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_fees_student_id ON fees(student_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_fees_status ON fees(status)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_fees_due_date ON fees(due_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_fees_hostel_status_due ON fees(hostel_id, status, due_date)')
+    # Keyset pagination: the sort keys of each list view, behind its hostel filter
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_hostel_name_id ON students(hostel_id, name, id)')
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_fees_hostel_due_id ON fees(hostel_id, COALESCE(due_date, '{NO_DATE}'), id)")
     
     # Complaints Table for maintenance requests
     cursor.execute('''
@@ -154,10 +248,22 @@ def init_db(overwrite=False):
         )
     ''')
     
+    # Add hostel_id column to existing complaints table if it doesn't exist
+    cursor.execute("""
+        SELECT name FROM pragma_table_info('complaints') WHERE name='hostel_id'
+    """)
+    complaints_hostel_id_exists = cursor.fetchone()
+    if not complaints_hostel_id_exists:
+        cursor.execute("ALTER TABLE complaints ADD COLUMN hostel_id INTEGER")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_complaints_hostel_id ON complaints(hostel_id)")
+    
     # Create index for complaints
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_room_id ON complaints(room_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_status ON complaints(status)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_priority ON complaints(priority)')
+    cursor.execute('DROP INDEX IF EXISTS idx_complaints_report_date_id')
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_complaints_report_date_priority_id "
+                   f"ON complaints(COALESCE(report_date, '{NO_DATE}'), {ComplaintModel.priority_rank()}, id)")
 
     # Expenses Table for tracking hostel expenses
     cursor.execute('''
@@ -185,15 +291,345 @@ def init_db(overwrite=False):
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_category ON expenses(category)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_hostel_id ON expenses(hostel_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_type ON expenses(expense_type)')
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_expenses_hostel_date_id ON expenses(hostel_id, COALESCE(expense_date, '{NO_DATE}'), id)")
+
+    # Activity feed (utils.dashboard.get_all_activities): each branch of its
+    # UNION ALL reads newest-first through one of these
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_students_hostel_admission ON students(hostel_id, admission_date, id)')
+    # Partial, so it only serves payment listings and leaves idx_fees_hostel_status_due to the statistics
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_fees_hostel_paid ON fees(hostel_id, paid_date, id) WHERE status = 'Paid'")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_hostel_date ON expenses(hostel_id, expense_date, id)')
+
+    create_activity_log(cursor)
+    create_hostel_stats(cursor)
+    create_student_search(cursor)
 
     conn.commit()
     conn.close()
     print("Database initialized/checked.")
 
+def create_activity_log(cursor):
+    """Create the append-only activity_log table and the triggers that fill it.
+
+    New students, fee payments and expenses are logged by triggers, so every
+    write path (models, routes, batch jobs) is covered. When the table is first
+    created it is backfilled from the existing rows. Entries outlive the rows
+    they describe. Returns True if the table was created.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='activity_log'")
+    created = cursor.fetchone() is None
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS activity_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            activity_type TEXT NOT NULL, -- student, fee, expense
+            entity_id INTEGER NOT NULL,
+            hostel_id INTEGER,
+            subject TEXT, -- student name, or the expense description
+            amount REAL,
+            activity_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_log_feed ON activity_log(activity_date, activity_type, entity_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_activity_log_hostel_feed ON activity_log(hostel_id, activity_date, activity_type, entity_id)')
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_activity_student_added
+        AFTER INSERT ON students WHEN NEW.admission_date IS NOT NULL
+        BEGIN
+            INSERT INTO activity_log (activity_type, entity_id, hostel_id, subject, activity_date)
+            VALUES ('student', NEW.id, NEW.hostel_id, NEW.name, NEW.admission_date);
+        END
+    ''')
+    fee_paid_entry = '''
+            INSERT INTO activity_log (activity_type, entity_id, hostel_id, subject, amount, activity_date)
+            SELECT 'fee', NEW.id, NEW.hostel_id, s.name, NEW.amount, NEW.paid_date
+            FROM students s WHERE s.id = NEW.student_id;
+    '''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_activity_fee_paid
+        AFTER UPDATE OF status, paid_date ON fees
+        WHEN NEW.status = 'Paid' AND NEW.paid_date IS NOT NULL
+             AND (OLD.status IS NOT 'Paid' OR OLD.paid_date IS NULL)
+        BEGIN {fee_paid_entry} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_activity_fee_added_paid
+        AFTER INSERT ON fees WHEN NEW.status = 'Paid' AND NEW.paid_date IS NOT NULL
+        BEGIN {fee_paid_entry} END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_activity_expense_added
+        AFTER INSERT ON expenses WHEN NEW.expense_date IS NOT NULL
+        BEGIN
+            INSERT INTO activity_log (activity_type, entity_id, hostel_id, subject, amount, activity_date)
+            VALUES ('expense', NEW.id, NEW.hostel_id, NEW.description, NEW.amount, NEW.expense_date);
+        END
+    ''')
+
+    if created:
+        # Backfill oldest first so the log's ids follow the timeline
+        cursor.execute('''
+            INSERT INTO activity_log (activity_type, entity_id, hostel_id, subject, amount, activity_date)
+            SELECT activity_type, entity_id, hostel_id, subject, amount, activity_date FROM (
+                SELECT 'student' AS activity_type, s.id AS entity_id, s.hostel_id, s.name AS subject,
+                       NULL AS amount, s.admission_date AS activity_date
+                FROM students s WHERE s.admission_date IS NOT NULL
+                UNION ALL
+                SELECT 'fee', f.id, f.hostel_id, s.name, f.amount, f.paid_date
+                FROM fees f JOIN students s ON f.student_id = s.id
+                WHERE f.status = 'Paid' AND f.paid_date IS NOT NULL
+                UNION ALL
+                SELECT 'expense', e.id, e.hostel_id, e.description, e.amount, e.expense_date
+                FROM expenses e WHERE e.expense_date IS NOT NULL
+            ) ORDER BY activity_date, activity_type, entity_id
+        ''')
+    return created
+
+def remove_duplicate_fees(cursor):
+    """Delete all but one fee per (student_id, fee_type, due_date), keeping a paid one if
+    any, else the oldest; returns the number deleted. Also in
+    migrations/add_fee_uniqueness_postgres.sql."""
+    cursor.execute('''
+        DELETE FROM fees WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY student_id, fee_type, due_date
+                    ORDER BY CASE WHEN status = 'Paid' THEN 0 ELSE 1 END, id
+                ) AS position
+                FROM fees WHERE fee_type IS NOT NULL
+            ) AS ranked WHERE position > 1
+        )
+    ''')
+    return cursor.rowcount
+
+def table_exists(conn, table):
+    """Whether ``table`` exists, for optional tables that may be missing from a PostgreSQL schema."""
+    raw = getattr(conn, 'raw_connection', conn)
+    if isinstance(raw, sqlite3.Connection):
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+    else:
+        query = "SELECT 1 FROM information_schema.tables WHERE table_name = ?"
+    return conn.execute(query, (table,)).fetchone() is not None
+
+# Columns of the student_search FTS5 index and their bm25 weights (name matters most)
+STUDENT_SEARCH_COLUMNS = (('name', 10.0), ('course', 3.0), ('room_number', 4.0), ('student_id_number', 6.0))
+
+def create_student_search(cursor):
+    """Create the student_search FTS5 index and the triggers that keep it in sync.
+
+    One document per student (rowid = students.id) holding the searchable
+    columns, including the number of the student's room; prefix indexes make
+    typeahead queries cheap. Returns True if the index was created (and filled),
+    False if it already existed or this SQLite build lacks FTS5.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='student_search'")
+    if cursor.fetchone() is not None:
+        return False
+    columns = ', '.join(column for column, _ in STUDENT_SEARCH_COLUMNS)
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE student_search USING fts5(
+                {columns}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Student search index unavailable (no FTS5): {e}")
+        return False
+    # Indexed words and their document counts, for typo correction
+    cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS student_search_terms USING fts5vocab(student_search, 'row')")
+
+    document = f'''
+            INSERT INTO student_search (rowid, {columns})
+            VALUES (NEW.id, NEW.name, NEW.course, (SELECT room_number FROM rooms WHERE id = NEW.room_id),
+                    NEW.student_id_number);
+    '''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_student_search_insert AFTER INSERT ON students
+        BEGIN {document} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_student_search_update
+        AFTER UPDATE OF id, name, course, room_id, student_id_number ON students
+        BEGIN
+            DELETE FROM student_search WHERE rowid = OLD.id;
+            {document}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_student_search_delete AFTER DELETE ON students
+        BEGIN
+            DELETE FROM student_search WHERE rowid = OLD.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_student_search_room_renamed AFTER UPDATE OF room_number ON rooms
+        BEGIN
+            UPDATE student_search SET room_number = NEW.room_number
+            WHERE rowid IN (SELECT id FROM students WHERE room_id = NEW.id);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_student_search_room_deleted AFTER DELETE ON rooms
+        BEGIN
+            UPDATE student_search SET room_number = NULL
+            WHERE rowid IN (SELECT id FROM students WHERE room_id = OLD.id);
+        END
+    ''')
+
+    cursor.execute(f'''
+        INSERT INTO student_search (rowid, {columns})
+        SELECT s.id, s.name, s.course, r.room_number, s.student_id_number
+        FROM students s LEFT JOIN rooms r ON s.room_id = r.id
+    ''')
+    return True
+
+# What each table contributes to hostel_stats. {row} is NEW/OLD in the
+# triggers and the table itself when rebuilding. Missing dates are stored as ''.
+HOSTEL_STATS_SOURCES = {
+    'students': {'status': "CASE WHEN {row}.room_id IS NOT NULL THEN 'Housed' ELSE 'Unassigned' END", 'period': "''"},
+    'rooms': {
+        'status': "COALESCE({row}.status, '')",
+        'period': "''",
+        'capacity': 'COALESCE({row}.capacity, 0)',
+        'occupancy': 'COALESCE({row}.current_occupancy, 0)',
+        'occupied': 'CASE WHEN {row}.current_occupancy > 0 THEN 1 ELSE 0 END',
+    },
+    'fees': {
+        'status': "COALESCE({row}.status, '')",
+        'period': "COALESCE({row}.due_date, '')",
+        'amount': 'COALESCE({row}.amount, 0)',
+    },
+    'complaints': {'status': "COALESCE({row}.status, '')", 'period': "''"},
+    'expenses': {
+        'status': "''",
+        'period': "COALESCE({row}.expense_date, '')",
+        'amount': 'COALESCE({row}.amount, 0)',
+    },
+}
+HOSTEL_STATS_TOTALS = ('item_count', 'amount_total', 'capacity_total', 'occupancy_total', 'occupied_count')
+
+def _hostel_stats_columns(entity):
+    """Columns of ``entity`` that hostel_stats depends on; updates to other columns skip the trigger."""
+    columns = ['hostel_id']
+    for expression in HOSTEL_STATS_SOURCES[entity].values():
+        for column in re.findall(r'\{row\}\.(\w+)', expression):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+def _hostel_stats_values(entity, row, sign=1):
+    """SQL expressions for one hostel_stats row contributed by ``row`` (negated for sign=-1)."""
+    source = HOSTEL_STATS_SOURCES[entity]
+    measures = ['1'] + [source.get(key, '0') for key in ('amount', 'capacity', 'occupancy', 'occupied')]
+    keys = ['COALESCE({row}.hostel_id, 0)', f"'{entity}'", source['status'], source['period']]
+    if sign < 0:
+        measures = [f'-({measure})' for measure in measures]
+    return [expression.format(row=row) for expression in keys + measures]
+
+def create_hostel_stats(cursor):
+    """Create the hostel_stats summary table and the triggers that keep it current.
+
+    Each row holds counts and sums for one hostel, table, status and day
+    (fees by due date, expenses by expense date), so dashboard figures are
+    read from a few summary rows instead of being recomputed from every fee,
+    room and expense. Rows without a hostel are kept under hostel_id 0.
+    Returns True if the table was created (and filled).
+    """
+    created = not table_exists(cursor.connection, 'hostel_stats')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hostel_stats (
+            hostel_id INTEGER NOT NULL, -- 0 for rows without a hostel
+            entity TEXT NOT NULL, -- students, rooms, fees, complaints, expenses
+            status TEXT NOT NULL DEFAULT '',
+            period TEXT NOT NULL DEFAULT '', -- YYYY-MM-DD for fees/expenses, '' otherwise
+            item_count INTEGER NOT NULL DEFAULT 0,
+            amount_total REAL NOT NULL DEFAULT 0,
+            capacity_total INTEGER NOT NULL DEFAULT 0,
+            occupancy_total INTEGER NOT NULL DEFAULT 0,
+            occupied_count INTEGER NOT NULL DEFAULT 0, -- rooms with at least one occupant
+            PRIMARY KEY (hostel_id, entity, status, period)
+        )
+    ''')
+
+    columns = 'hostel_id, entity, status, period, ' + ', '.join(HOSTEL_STATS_TOTALS)
+    accumulate = ', '.join(f'{total} = {total} + excluded.{total}' for total in HOSTEL_STATS_TOTALS)
+
+    def upsert(entity, row, sign):
+        values = ', '.join(_hostel_stats_values(entity, row, sign))
+        return (f'INSERT INTO hostel_stats ({columns}) VALUES ({values}) '
+                f'ON CONFLICT (hostel_id, entity, status, period) DO UPDATE SET {accumulate};')
+
+    for entity in HOSTEL_STATS_SOURCES:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_hostel_stats_{entity}_insert AFTER INSERT ON {entity}
+            BEGIN {upsert(entity, 'NEW', 1)} END
+        ''')
+        # Replaced on every run: older databases have a version that fires on any column
+        cursor.execute(f'DROP TRIGGER IF EXISTS trg_hostel_stats_{entity}_update')
+        cursor.execute(f'''
+            CREATE TRIGGER trg_hostel_stats_{entity}_update
+            AFTER UPDATE OF {', '.join(_hostel_stats_columns(entity))} ON {entity}
+            BEGIN {upsert(entity, 'OLD', -1)} {upsert(entity, 'NEW', 1)} END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_hostel_stats_{entity}_delete AFTER DELETE ON {entity}
+            BEGIN {upsert(entity, 'OLD', -1)} END
+        ''')
+
+    if created:
+        rebuild_hostel_stats(cursor)
+    return created
+
+def _hostel_stats_from_source_tables(cursor):
+    """Recompute every hostel_stats row from the source tables."""
+    rows = []
+    for entity in HOSTEL_STATS_SOURCES:
+        hostel, label, status, period, *measures = _hostel_stats_values(entity, entity)
+        rows.extend(cursor.execute(f'''
+            SELECT {hostel}, {label}, {status}, {period}, {', '.join(f'SUM({m})' for m in measures)}
+            FROM {entity}
+            GROUP BY 1, 3, 4
+        ''').fetchall())
+    return rows
+
+def rebuild_hostel_stats(cursor):
+    """Replace the contents of hostel_stats with a fresh computation; returns the row count."""
+    rows = _hostel_stats_from_source_tables(cursor)
+    cursor.execute('DELETE FROM hostel_stats')
+    placeholders = ', '.join('?' * (4 + len(HOSTEL_STATS_TOTALS)))
+    cursor.executemany(
+        f"INSERT INTO hostel_stats (hostel_id, entity, status, period, {', '.join(HOSTEL_STATS_TOTALS)}) "
+        f"VALUES ({placeholders})",
+        [tuple(row) for row in rows]
+    )
+    return len(rows)
+
+def check_hostel_stats(cursor):
+    """Compare hostel_stats with a fresh computation; returns a list of (key, stored, expected)."""
+    def by_key(rows):
+        # Buckets whose rows have all been deleted linger as zeroes
+        return {tuple(row[:4]): tuple(round(value, 2) for value in row[4:])
+                for row in rows if any(row[4:])}
+
+    expected = by_key(_hostel_stats_from_source_tables(cursor))
+    stored = by_key(cursor.execute(
+        f"SELECT hostel_id, entity, status, period, {', '.join(HOSTEL_STATS_TOTALS)} FROM hostel_stats"
+    ).fetchall())
+    return [(key, stored.get(key), expected.get(key))
+            for key in sorted(set(stored) | set(expected))
+            if stored.get(key) != expected.get(key)]
+
 
 # Student Model Operations
 class StudentModel:
+    # Keyset pagination order for student lists (see utils.pagination)
+    PAGE_SORT_KEYS = (SortKey('s.name', 'name'), SortKey('s.id', 'id'))
+
     @staticmethod
+    @cached(ttl_seconds=300, tags=reader_tags('students'))
     def count_all_students(hostel_id=None):
         """Return the total count of students, optionally filtered by hostel_id."""
         conn = get_db_connection()
@@ -208,9 +644,175 @@ class StudentModel:
     def get_all_students(search_params=None, hostel_id=None):
         """Retrieve all students with optional filtering and hostel_id."""
         conn = get_db_connection()
+        select, select_from, conditions, params = StudentModel._student_filters(
+            search_params, hostel_id, use_search_index=table_exists(conn, 'student_search'))
+        query = f"SELECT {select} {select_from}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY s.name"
+
+        students = conn.execute(query, tuple(params)).fetchall()
+        conn.close()
+        return students
+    
+    @staticmethod
+    def get_students_page(search_params=None, hostel_id=None, cursor=None, per_page=DEFAULT_PER_PAGE, with_total=False):
+        """Get one page of students ordered by name (see utils.pagination); returns a KeysetPage."""
+        conn = get_db_connection()
+        try:
+            select, select_from, conditions, params = StudentModel._student_filters(
+                search_params, hostel_id, use_search_index=table_exists(conn, 'student_search'))
+            return fetch_page(conn, select, select_from, conditions, params, StudentModel.PAGE_SORT_KEYS,
+                              cursor=cursor, per_page=per_page, with_total=with_total)
+        finally:
+            conn.close()
+    
+    # Typeahead results are small; callers may not ask for more
+    SEARCH_LIMIT = 50
+
+    @staticmethod
+    def search(query, hostel_id=None, limit=10):
+        """Rank students matching free text (name, course, room number or student ID).
+
+        Words match as prefixes, so partial input already finds students. On
+        SQLite the student_search FTS5 index is used and, when nothing matches,
+        misspelt words are replaced by the closest indexed words; on PostgreSQL
+        trigram similarity ranks the students and tolerates typos by itself.
+
+        Args:
+            query: The search text
+            hostel_id: Restrict results to one hostel
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with 'results' (best match first), the 'terms' searched
+            and whether they were 'corrected'
+        """
+        terms = tokenize(query)
+        limit = max(1, min(int(limit), StudentModel.SEARCH_LIMIT))
+        if not terms:
+            return {'results': [], 'terms': [], 'corrected': False}
+
+        conn = get_db_connection()
+        try:
+            if table_exists(conn, 'student_search'):
+                results = StudentModel._search_index(conn, terms, hostel_id, limit)
+                if results:
+                    return {'results': results, 'terms': terms, 'corrected': False}
+                corrected = StudentModel._correct_terms(conn, terms)
+                if corrected is None:
+                    return {'results': [], 'terms': terms, 'corrected': False}
+                return {'results': StudentModel._search_index(conn, corrected, hostel_id, limit),
+                        'terms': [' | '.join(term) if isinstance(term, tuple) else term for term in corrected],
+                        'corrected': True}
+            if is_postgres_url(_database_url()):
+                return {'results': StudentModel._search_trigram(conn, terms, hostel_id, limit),
+                        'terms': terms, 'corrected': False}
+            return {'results': StudentModel._search_like(conn, terms, hostel_id, limit),
+                    'terms': terms, 'corrected': False}
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _search_index(conn, terms, hostel_id, limit):
+        weights = ', '.join(str(weight) for _, weight in STUDENT_SEARCH_COLUMNS)
+        query = f'''
+            SELECT s.id, s.name, s.student_id_number, s.course, r.room_number,
+                   h.name AS hostel_name, s.hostel_id, bm25(student_search, {weights}) AS score
+            FROM student_search
+            JOIN students s ON s.id = student_search.rowid
+            LEFT JOIN rooms r ON s.room_id = r.id
+            LEFT JOIN hostels h ON s.hostel_id = h.id
+            WHERE student_search MATCH ?
+        '''
+        params = [match_expression(terms)]
+        if hostel_id is not None:
+            query += ' AND s.hostel_id = ?'
+            params.append(hostel_id)
+        query += ' ORDER BY score, s.name, s.id LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def _correct_terms(conn, terms):
+        """Swap words that prefix no indexed word for the closest indexed words (None if some have none)."""
+        corrected = []
+        for term in terms:
+            start = term[0]
+            exists = conn.execute(
+                'SELECT 1 FROM student_search_terms WHERE term >= ? AND term < ? LIMIT 1',
+                (term, term + '\uffff')
+            ).fetchone()
+            if exists:
+                corrected.append(term)
+                continue
+            # Typos in the first letter are rare; it narrows the vocabulary to scan
+            candidates = conn.execute(
+                'SELECT term, doc FROM student_search_terms WHERE term >= ? AND term < ?',
+                (start, chr(ord(start) + 1))
+            ).fetchall()
+            closest = closest_terms(term, [(row['term'], row['doc']) for row in candidates])
+            if not closest:
+                return None
+            corrected.append(tuple(closest))
+        return corrected
+
+    @staticmethod
+    def _search_trigram(conn, terms, hostel_id, limit):
+        """PostgreSQL: rank by pg_trgm word similarity (see migrations/add_student_search_postgres.sql)."""
+        text = ' '.join(terms)
+        columns = ('s.name', 's.course', 'r.room_number', 's.student_id_number')
+        query = f'''
+            SELECT s.id, s.name, s.student_id_number, s.course, r.room_number,
+                   h.name AS hostel_name, s.hostel_id,
+                   GREATEST({', '.join(f"COALESCE(word_similarity(?, {column}), 0)" for column in columns)}) AS score
+            FROM students s
+            LEFT JOIN rooms r ON s.room_id = r.id
+            LEFT JOIN hostels h ON s.hostel_id = h.id
+            WHERE ({' OR '.join(f'? <% {column}' for column in columns)})
+        '''
+        params = [text] * (2 * len(columns))
+        if hostel_id is not None:
+            query += ' AND s.hostel_id = ?'
+            params.append(hostel_id)
+        query += ' ORDER BY score DESC, s.name, s.id LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def _search_like(conn, terms, hostel_id, limit):
+        """Fallback for SQLite builds without FTS5: every word must appear somewhere."""
         query = '''
-            SELECT s.id, s.name, s.student_id_number, s.contact, s.course, s.email, r.room_number,
-                   h.name as hostel_name, s.hostel_id
+            SELECT s.id, s.name, s.student_id_number, s.course, r.room_number,
+                   h.name AS hostel_name, s.hostel_id, 0 AS score
+            FROM students s
+            LEFT JOIN rooms r ON s.room_id = r.id
+            LEFT JOIN hostels h ON s.hostel_id = h.id
+            WHERE 1 = 1
+        '''
+        params = []
+        for term in terms:
+            query += ''' AND (s.name LIKE ? OR s.course LIKE ? OR r.room_number LIKE ?
+                           OR s.student_id_number LIKE ?)'''
+            params.extend([f'%{term}%'] * 4)
+        if hostel_id is not None:
+            query += ' AND s.hostel_id = ?'
+            params.append(hostel_id)
+        query += ' ORDER BY s.name, s.id LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def _student_filters(search_params=None, hostel_id=None, use_search_index=False):
+        """Build the (select, from, conditions, params) of the student listing.
+
+        With use_search_index, the name, course and room filters match word
+        prefixes through the student_search index instead of LIKE '%...%' scans.
+        """
+        select = '''s.id, s.name, s.student_id_number, s.contact, s.course, s.email, r.room_number,
+                   h.name as hostel_name, s.hostel_id'''
+        select_from = '''
             FROM students s 
             LEFT JOIN rooms r ON s.room_id = r.id
             LEFT JOIN hostels h ON s.hostel_id = h.id
@@ -223,6 +825,14 @@ class StudentModel:
             conditions.append("s.hostel_id = ?")
             params.append(hostel_id)
 
+        text_filters = [(column, tokenize(search_params.get(column)))
+                        for column in ('name', 'course', 'room_number')] if search_params else []
+        if use_search_index and any(terms for _, terms in text_filters):
+            expression = ' AND '.join(match_expression(terms, column) for column, terms in text_filters if terms)
+            conditions.append("s.id IN (SELECT rowid FROM student_search WHERE student_search MATCH ?)")
+            params.append(expression)
+            search_params = {'filter_course': search_params.get('filter_course')}
+
         if search_params:
             if search_params.get('name'):
                 conditions.append("s.name LIKE ?")
@@ -237,14 +847,7 @@ class StudentModel:
                 conditions.append("s.course = ?")
                 params.append(search_params['filter_course'])
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += " ORDER BY s.name"
-
-        students = conn.execute(query, tuple(params)).fetchall()
-        conn.close()
-        return students
+        return select, select_from, conditions, params
     
     @staticmethod
     def get_student_by_id(student_id):
@@ -321,9 +924,10 @@ class StudentModel:
             # Update room occupancy if a room was assigned
             if student_data.get('room_id'):
                 RoomModel.update_room_occupancy(conn, student_data['room_id'])
-                
+            
+            invalidate_hostel(student_data.get('hostel_id'), 'students', 'rooms')
             return {'success': True, 'student_id': student_id}
-        except sqlite3.IntegrityError as e:
+        except IntegrityError as e:
             return {'success': False, 'error': e}
         finally:
             conn.close()
@@ -337,9 +941,10 @@ class StudentModel:
             conn.execute('BEGIN TRANSACTION')
             
             # Get current room assignment for comparison
-            old_room_id = conn.execute(
-                'SELECT room_id FROM students WHERE id = ?', (student_id,)
-            ).fetchone()['room_id']
+            current = conn.execute(
+                'SELECT room_id, hostel_id FROM students WHERE id = ?', (student_id,)
+            ).fetchone()
+            old_room_id = current['room_id']
             
             # Update student information
             conn.execute('''
@@ -419,8 +1024,9 @@ class StudentModel:
                 if new_room_id is not None:
                     RoomModel.update_room_occupancy(conn, new_room_id)
             
+            invalidate_hostel(current['hostel_id'], 'students', 'rooms')
             return {'success': True}
-        except sqlite3.IntegrityError as e:
+        except IntegrityError as e:
             conn.execute('ROLLBACK')
             return {'success': False, 'error': e}
         finally:
@@ -432,7 +1038,7 @@ class StudentModel:
         conn = get_db_connection()
         try:
             # Get the student's room assignment before deleting
-            student = conn.execute('SELECT room_id FROM students WHERE id = ?', (student_id,)).fetchone()
+            student = conn.execute('SELECT room_id, hostel_id FROM students WHERE id = ?', (student_id,)).fetchone()
             if not student:
                 return {'success': False, 'error': 'Student not found'}
                 
@@ -445,7 +1051,9 @@ class StudentModel:
             # Update room occupancy if needed
             if room_id:
                 RoomModel.update_room_occupancy(conn, room_id)
-                
+            
+            # Fees go with the student (ON DELETE CASCADE)
+            invalidate_hostel(student['hostel_id'], 'students', 'rooms', 'fees')
             return {'success': True}
         except Exception as e:
             return {'success': False, 'error': e}
@@ -607,87 +1215,130 @@ class RoomModel:
     @staticmethod
     def get_all_rooms(search_params=None, hostel_id=None, include_students=True):
         """Get all rooms with optional filtering and detailed information."""
+        query, params = RoomModel._rooms_query(search_params, hostel_id)
         conn = get_db_connection()
         try:
-            query = '''
-                SELECT r.id, r.room_number, r.capacity, r.current_occupancy, r.status, 
-                       r.hostel_id, h.name as hostel_name,
-                       COUNT(c.id) as complaint_count,
-                       MAX(c.report_date) as last_complaint_date
-                FROM rooms r
-                LEFT JOIN hostels h ON r.hostel_id = h.id
-                LEFT JOIN complaints c ON r.id = c.room_id AND c.status != 'Resolved'
-            '''
-            conditions = []
-            params = []
+            rooms = conn.execute(query, params).fetchall()
+            return RoomModel._rooms_with_details(conn, rooms, include_students)
+        finally:
+            conn.close()
 
-            # Add hostel filtering if specified
-            if hostel_id is not None:
-                conditions.append("r.hostel_id = ?")
-                params.append(hostel_id)
-            if search_params:
-                if search_params.get('room_number'):
-                    conditions.append("r.room_number LIKE ?")
-                    params.append(f"%{search_params['room_number'].strip()}%")
-                if search_params.get('filter_status'):
-                    conditions.append("r.status = ?")
-                    params.append(search_params['filter_status'])
-                if search_params.get('min_capacity'):
-                    conditions.append("r.capacity >= ?")
-                    params.append(int(search_params['min_capacity']))
-                if search_params.get('max_capacity'):
-                    conditions.append("r.capacity <= ?")
-                    params.append(int(search_params['max_capacity']))
-                if search_params.get('occupancy_filter'):
-                    if search_params['occupancy_filter'] == 'empty':
-                        conditions.append("r.current_occupancy = 0")
-                    elif search_params['occupancy_filter'] == 'full':
-                        conditions.append("r.current_occupancy >= r.capacity")
-                    elif search_params['occupancy_filter'] == 'partial':
-                        conditions.append("r.current_occupancy > 0 AND r.current_occupancy < r.capacity")
+    @staticmethod
+    def iter_all_rooms(search_params=None, hostel_id=None, include_students=True, batch_size=None):
+        """Like get_all_rooms, but yields the rooms in batches (for exports)."""
+        query, params = RoomModel._rooms_query(search_params, hostel_id)
+        conn = get_db_connection()
+        try:
+            for batch in iter_query_batches(conn, query, params, batch_size):
+                yield RoomModel._rooms_with_details(conn, batch, include_students)
+        finally:
+            conn.close()
 
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
-            # Ensure all columns in GROUP BY are qualified
-            query += " GROUP BY r.id, r.room_number, r.capacity, r.current_occupancy, r.status, r.hostel_id, h.name ORDER BY r.room_number"
+    @staticmethod
+    def count_rooms(search_params=None, hostel_id=None):
+        """Number of rooms get_all_rooms returns for the same filters."""
+        return count_query_rows(*RoomModel._rooms_query(search_params, hostel_id))
 
-            rooms = conn.execute(query, tuple(params)).fetchall()
+    @staticmethod
+    def _rooms_query(search_params=None, hostel_id=None):
+        """Build the (query, params) shared by the room listing and its export."""
+        query = '''
+            SELECT r.id, r.room_number, r.capacity, r.current_occupancy, r.status, 
+                   r.hostel_id, h.name as hostel_name,
+                   COUNT(c.id) as complaint_count,
+                   MAX(c.report_date) as last_complaint_date
+            FROM rooms r
+            LEFT JOIN hostels h ON r.hostel_id = h.id
+            LEFT JOIN complaints c ON r.id = c.room_id AND c.status != 'Resolved'
+        '''
+        conditions = []
+        params = []
+
+        # Add hostel filtering if specified
+        if hostel_id is not None:
+            conditions.append("r.hostel_id = ?")
+            params.append(hostel_id)
+        if search_params:
+            if search_params.get('room_number'):
+                conditions.append("r.room_number LIKE ?")
+                params.append(f"%{search_params['room_number'].strip()}%")
+            if search_params.get('filter_status'):
+                conditions.append("r.status = ?")
+                params.append(search_params['filter_status'])
+            if search_params.get('min_capacity'):
+                conditions.append("r.capacity >= ?")
+                params.append(int(search_params['min_capacity']))
+            if search_params.get('max_capacity'):
+                conditions.append("r.capacity <= ?")
+                params.append(int(search_params['max_capacity']))
+            if search_params.get('occupancy_filter'):
+                if search_params['occupancy_filter'] == 'empty':
+                    conditions.append("r.current_occupancy = 0")
+                elif search_params['occupancy_filter'] == 'full':
+                    conditions.append("r.current_occupancy >= r.capacity")
+                elif search_params['occupancy_filter'] == 'partial':
+                    conditions.append("r.current_occupancy > 0 AND r.current_occupancy < r.capacity")
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # Ensure all columns in GROUP BY are qualified
+        query += " GROUP BY r.id, r.room_number, r.capacity, r.current_occupancy, r.status, r.hostel_id, h.name ORDER BY r.room_number"
+        return query, tuple(params)
+
+    @staticmethod
+    def _rooms_with_details(conn, rooms, include_students=True):
+        """Convert room rows to dicts with occupancy, occupants and condition flags."""
+        # Fetch the occupants of every listed room at once rather than per room
+        students_by_room = {}
+        if include_students and rooms:
+            students_by_room = RoomModel.get_students_by_room(conn, [room['id'] for room in rooms])
+        
+        # Convert to list of dicts and optionally add students in each room
+        rooms_with_details = []
+        for room_row in rooms:
+            room = dict(room_row)
+            
+            # Calculate occupancy percentage
+            if room['capacity'] > 0:
+                room['occupancy_percentage'] = (room['current_occupancy'] / room['capacity']) * 100
+            else:
+                room['occupancy_percentage'] = 0
             
-            # Convert to list of dicts and optionally add students in each room
-            rooms_with_details = []
-            for room_row in rooms:
-                room = dict(room_row)
-                
-                # Calculate occupancy percentage
-                if room['capacity'] > 0:
-                    room['occupancy_percentage'] = (room['current_occupancy'] / room['capacity']) * 100
-                else:
-                    room['occupancy_percentage'] = 0
-                
-                # Add students if requested
-                if include_students:
-                    students = conn.execute(
-                        '''SELECT id, name, student_id_number, course, contact, email 
-                           FROM students WHERE room_id = ? ORDER BY name''', 
-                        (room['id'],)
-                    ).fetchall()
-                    room['students'] = [dict(student) for student in students]
-                    room['student_names'] = ', '.join([s['name'] for s in room['students']])
-                else:
-                    room['students'] = []
-                    room['student_names'] = ''
-                
-                # Add room condition indicators
-                room['has_complaints'] = room['complaint_count'] > 0
-                room['needs_attention'] = (room['status'] == RoomModel.STATUS_MAINTENANCE or 
-                                         room['complaint_count'] > 2)
-                
-                rooms_with_details.append(room)
+            # Add students if requested
+            if include_students:
+                room['students'] = students_by_room.get(room['id'], [])
+                room['student_names'] = ', '.join([s['name'] for s in room['students']])
+            else:
+                room['students'] = []
+                room['student_names'] = ''
+            
+            # Add room condition indicators
+            room['has_complaints'] = room['complaint_count'] > 0
+            room['needs_attention'] = (room['status'] == RoomModel.STATUS_MAINTENANCE or 
+                                     room['complaint_count'] > 2)
             
-            return rooms_with_details
+            rooms_with_details.append(room)
         
-        finally:
-            conn.close()
+        return rooms_with_details
+
+    @staticmethod
+    def get_students_by_room(conn, room_ids):
+        """Get the students in each of the given rooms, as {room_id: [student, ...]} ordered by name."""
+        students_by_room = {}
+        room_ids = list(room_ids)
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(room_ids), SQL_IN_CHUNK_SIZE):
+            chunk = room_ids[start:start + SQL_IN_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            students = conn.execute(
+                f'''SELECT room_id, id, name, student_id_number, course, contact, email 
+                    FROM students WHERE room_id IN ({placeholders}) ORDER BY room_id, name''',
+                tuple(chunk)
+            ).fetchall()
+            for student in students:
+                student = dict(student)
+                students_by_room.setdefault(student.pop('room_id'), []).append(student)
+        return students_by_room
 
     @staticmethod
     def get_room_by_id(room_id, include_full_details=False):
@@ -769,14 +1420,15 @@ class RoomModel:
             room_id = cursor.lastrowid
             conn.commit()
             
+            invalidate_hostel(clean_data['hostel_id'], 'rooms')
             return {
                 'success': True, 
                 'room_id': room_id,
                 'message': f'Room {clean_data["room_number"]} added successfully'
             }
             
-        except sqlite3.IntegrityError as e:
-            if 'UNIQUE constraint failed' in str(e):
+        except IntegrityError as e:
+            if is_unique_violation(e):
                 return {'success': False, 'errors': ['Room number already exists']}
             return {'success': False, 'errors': [f'Database error: {str(e)}']}
         except Exception as e:
@@ -838,13 +1490,16 @@ class RoomModel:
             # Update room occupancy and status based on current students
             RoomModel.update_room_occupancy(conn, room_id)
             
+            invalidate_hostel(current_room['hostel_id'], 'rooms')
+            if clean_data.get('hostel_id') not in (None, current_room['hostel_id']):
+                invalidate_hostel(clean_data['hostel_id'], 'rooms')  # Moved to another hostel
             return {
                 'success': True,
                 'message': f'Room {clean_data["room_number"]} updated successfully'
             }
             
-        except sqlite3.IntegrityError as e:
-            if 'UNIQUE constraint failed' in str(e):
+        except IntegrityError as e:
+            if is_unique_violation(e):
                 return {'success': False, 'errors': ['Room number already exists']}
             return {'success': False, 'errors': [f'Database error: {str(e)}']}
         except Exception as e:
@@ -898,6 +1553,7 @@ class RoomModel:
             conn.execute('DELETE FROM rooms WHERE id = ?', (room_id,))
             conn.commit()
             
+            invalidate_hostel(room['hostel_id'], 'rooms')
             return {
                 'success': True,
                 'message': f'Room {room["room_number"]} deleted successfully'
@@ -984,6 +1640,7 @@ class RoomModel:
             conn.close()
 
     @staticmethod
+    @cached(ttl_seconds=300, tags=reader_tags('rooms', 'students'))
     def get_room_statistics(hostel_id=None):
         """Get comprehensive room statistics."""
         conn = get_db_connection()
@@ -1195,7 +1852,7 @@ class RoomModel:
             # Validate that all room IDs exist
             placeholders = ','.join(['?'] * len(room_ids))
             existing_rooms = conn.execute(
-                f'SELECT id, room_number FROM rooms WHERE id IN ({placeholders})',
+                f'SELECT id, room_number, hostel_id FROM rooms WHERE id IN ({placeholders})',
                 room_ids
             ).fetchall()
             
@@ -1209,6 +1866,9 @@ class RoomModel:
             )
             conn.commit()
             
+            for affected_hostel_id in {room['hostel_id'] for room in existing_rooms}:
+                invalidate_hostel(affected_hostel_id, 'rooms')
+            
             room_numbers = [room['room_number'] for room in existing_rooms]
             return {
                 'success': True,
@@ -1259,6 +1919,9 @@ class RoomModel:
 
 # Fee Model Operations
 class FeeModel:
+    # Keyset pagination order for fee lists (see utils.pagination)
+    PAGE_SORT_KEYS = (SortKey(f"COALESCE(f.due_date, '{NO_DATE}')", 'due_date', NO_DATE), SortKey('f.id', 'id'))
+
     @staticmethod
     def get_unique_statuses(hostel_id=None):
         """Get a list of unique fee statuses from the database.
@@ -1344,12 +2007,95 @@ class FeeModel:
         Returns:
             List of fee dictionaries with student information
         """
+        query, params = FeeModel._fees_with_students_query(filter_params, hostel_id)
+        conn = get_db_connection()
+        fees = conn.execute(query, params).fetchall()
+        conn.close()
+        
+        today = date.today()
+        return [FeeModel._fee_with_overdue_flag(fee_row, today) for fee_row in fees]
+    
+    @staticmethod
+    def iter_fees_with_students(filter_params=None, hostel_id=None, batch_size=None):
+        """Like get_all_fees_with_students, but yields the fees in batches (for exports)."""
+        query, params = FeeModel._fees_with_students_query(filter_params, hostel_id)
+        conn = get_db_connection()
+        try:
+            today = date.today()
+            for batch in iter_query_batches(conn, query, params, batch_size):
+                yield [FeeModel._fee_with_overdue_flag(fee_row, today) for fee_row in batch]
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def count_fees_with_students(filter_params=None, hostel_id=None):
+        """Number of fees get_all_fees_with_students returns for the same filters."""
+        return count_query_rows(*FeeModel._fees_with_students_query(filter_params, hostel_id))
+
+    @staticmethod
+    def get_fees_summary(filter_params=None, hostel_id=None):
+        """Paid/pending/overdue counts and total amount of all fees matching the filters.
+
+        The fee list is paginated, so its summary cards are computed in SQL
+        rather than from the rows on the current page.
+        """
+        _, select_from, conditions, params = FeeModel._fee_filters(filter_params, hostel_id)
+        query = f'''
+            SELECT
+                COUNT(CASE WHEN f.status = 'Paid' THEN 1 END) AS paid_count,
+                COUNT(CASE WHEN f.status = 'Pending' THEN 1 END) AS pending_count,
+                COUNT(CASE WHEN f.status = 'Pending' AND f.due_date < ? THEN 1 END) AS overdue_count,
+                COALESCE(SUM(f.amount), 0) AS total_amount
+            {select_from}
+        '''
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
         conn = get_db_connection()
+        try:
+            row = conn.execute(query, (date.today().isoformat(),) + tuple(params)).fetchone()
+        finally:
+            conn.close()
+        return dict(row)
+
+    @staticmethod
+    def _fees_with_students_query(filter_params=None, hostel_id=None):
+        """Build the (query, params) shared by the fee listing and its export."""
+        select, select_from, conditions, params = FeeModel._fee_filters(filter_params, hostel_id)
+        query = f"SELECT {select} {select_from}"
+        
+        # Add conditions to query if any
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+            
+        # Add ordering
+        query += " ORDER BY f.due_date ASC, s.name ASC"
+        return query, params
+    
+    @staticmethod
+    def get_fees_page(filter_params=None, hostel_id=None, cursor=None, per_page=DEFAULT_PER_PAGE, with_total=False):
+        """Get one page of fees with student information, ordered by due date.
         
+        Filters are those of get_all_fees_with_students; cursor comes from the
+        previous page (see utils.pagination). Returns a KeysetPage.
+        """
+        select, select_from, conditions, params = FeeModel._fee_filters(filter_params, hostel_id)
+        conn = get_db_connection()
+        try:
+            page = fetch_page(conn, select, select_from, conditions, params, FeeModel.PAGE_SORT_KEYS,
+                              cursor=cursor, per_page=per_page, with_total=with_total)
+        finally:
+            conn.close()
+        today = date.today()
+        page.items = [FeeModel._fee_with_overdue_flag(fee, today) for fee in page.items]
+        return page
+    
+    @staticmethod
+    def _fee_filters(filter_params=None, hostel_id=None):
+        """Build the (select, from, conditions, params) of the fee listing."""
         # Start building the query with hostel information
-        query = '''
-            SELECT f.id, s.name AS student_name, f.student_id, f.amount, 
-                   f.due_date, f.paid_date, f.status, r.room_number, h.name AS hostel_name
+        select = '''f.id, s.name AS student_name, f.student_id, f.amount, 
+                   f.due_date, f.paid_date, f.status, r.room_number, h.name AS hostel_name'''
+        select_from = '''
             FROM fees f
             JOIN students s ON f.student_id = s.id
             LEFT JOIN rooms r ON s.room_id = r.id
@@ -1390,33 +2136,21 @@ class FeeModel:
                 conditions.append("f.due_date <= ?")
                 params.append(filter_params['end_date'].isoformat() if hasattr(filter_params['end_date'], 'isoformat') else filter_params['end_date'])
         
-        # Add conditions to query if any
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-            
-        # Add ordering
-        query += " ORDER BY f.due_date ASC, s.name ASC"
-        
-        # Execute query
-        fees = conn.execute(query, params).fetchall()
-        conn.close()
-          # Process fees
-        processed_fees = []
-        today = date.today()
-        
-        for fee_row in fees:
-            fee = dict(fee_row)
-            fee['is_overdue'] = False
-            if fee['status'] == 'Pending' and fee['due_date']:
-                try:
-                    due_date_obj = date.fromisoformat(fee['due_date'])
-                    if due_date_obj < today:
-                        fee['is_overdue'] = True
-                except (ValueError, TypeError):
-                    pass
-            
-            processed_fees.append(fee)
-        return processed_fees
+        return select, select_from, conditions, params
+    
+    @staticmethod
+    def _fee_with_overdue_flag(fee_row, today):
+        """Convert a fee row to a dict and flag pending fees that are past due."""
+        fee = dict(fee_row)
+        fee['is_overdue'] = False
+        if fee['status'] == 'Pending' and fee['due_date']:
+            try:
+                due_date_obj = date.fromisoformat(fee['due_date'])
+                if due_date_obj < today:
+                    fee['is_overdue'] = True
+            except (ValueError, TypeError):
+                pass
+        return fee
     
     @staticmethod
     def add_fee(fee_data, hostel_id=None):
@@ -1427,21 +2161,42 @@ class FeeModel:
             actual_hostel_id = fee_data.get('hostel_id') or hostel_id
             
             conn.execute(
-                'INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, ?, ?, ?, ?)',
+                'INSERT INTO fees (student_id, amount, due_date, status, hostel_id, fee_type) VALUES (?, ?, ?, ?, ?, ?)',
                 (
                     fee_data['student_id'], 
                     fee_data['amount'], 
                     fee_data['due_date'], 
                     fee_data.get('status', 'Pending'),
-                    actual_hostel_id
+                    actual_hostel_id,
+                    fee_data.get('fee_type')
                 )            )
             conn.commit()
+            invalidate_hostel(actual_hostel_id, 'fees')
             return {'success': True}
+        except IntegrityError as e:
+            if is_unique_violation(e):
+                return {'success': False,
+                        'error': f"A {fee_data.get('fee_type')!r} fee due on {fee_data['due_date']} already exists for this student"}
+            return {'success': False, 'error': e}
         except Exception as e:
             return {'success': False, 'error': e}
         finally:
             conn.close()
 
+    @staticmethod
+    def add_batch_fees(student_ids, amount, due_date, fee_type, hostel_id=None, progress=None):
+        """Add one pending fee per student, skipping students who already have this fee.
+
+        Returns:
+            Tuple of (number of fees added, list of error messages)
+        """
+        conn = get_db_connection()
+        try:
+            return process_batch_fees(conn, student_ids, amount, due_date, fee_type,
+                                      hostel_id=hostel_id, progress=progress)
+        finally:
+            conn.close()
+
     @staticmethod
     def mark_fee_paid(fee_id, hostel_id=None):
         """Mark a fee as paid."""
@@ -1464,6 +2219,7 @@ class FeeModel:
             if result.rowcount == 0:
                 return {'success': False, 'error': 'Fee not found or access denied'}            
             conn.commit()
+            invalidate_hostel(hostel_id if hostel_id is not None else _hostel_id_of(conn, 'fees', fee_id), 'fees')
             return {'success': True}
         except Exception as e:
             return {'success': False, 'error': e}
@@ -1622,78 +2378,42 @@ class FeeModel:
         }
     
     @staticmethod
+    @cached(ttl_seconds=300, tags=reader_tags('fees'))
     def get_fee_statistics(hostel_id=None):
-        """Get statistics about fees with optional hostel filtering."""
+        """Get statistics about fees with optional hostel filtering.
+        
+        A single conditional-aggregation pass; with a hostel filter it is served by
+        the (hostel_id, status, due_date) index.
+        """
         conn = get_db_connection()
         today = date.today().isoformat()
         
-        # Base queries with hostel filtering if needed
-        base_where = ""
-        params_base = []
+        query = """
+            SELECT
+                COUNT(CASE WHEN status = 'Pending' THEN 1 END) AS pending_count,
+                COUNT(CASE WHEN status = 'Pending' AND due_date < ? THEN 1 END) AS overdue_count,
+                COALESCE(SUM(CASE WHEN status = 'Pending' THEN amount END), 0) AS pending_amount,
+                COALESCE(SUM(CASE WHEN status = 'Pending' AND due_date < ? THEN amount END), 0) AS overdue_amount,
+                COALESCE(SUM(CASE WHEN status = 'Paid' THEN amount END), 0) AS paid_amount
+            FROM fees
+            WHERE status IN ('Pending', 'Paid')
+        """
+        params = [today, today]
         if hostel_id is not None:
-            base_where = " WHERE hostel_id = ?"
-            params_base = [hostel_id]
-        
-        # Fee counts
-        pending_query = f"SELECT COUNT(*) FROM fees{base_where}"
-        if base_where:
-            pending_query += " AND status = 'Pending'"
-            params_pending = params_base + []
-        else:
-            pending_query += " WHERE status = 'Pending'"
-            params_pending = []
-        
-        pending_count = conn.execute(pending_query, params_pending).fetchone()[0]
-        
-        overdue_query = f"SELECT COUNT(*) FROM fees{base_where}"
-        if base_where:
-            overdue_query += " AND status = 'Pending' AND due_date < ?"
-            params_overdue = params_base + [today]
-        else:
-            overdue_query += " WHERE status = 'Pending' AND due_date < ?"
-            params_overdue = [today]
-        
-        overdue_count = conn.execute(overdue_query, params_overdue).fetchone()[0]
-        
-        # Fee amounts
-        pending_amount_query = f"SELECT COALESCE(SUM(amount), 0) FROM fees{base_where}"
-        if base_where:
-            pending_amount_query += " AND status = 'Pending'"
-            params_pending_amount = params_base + []
-        else:
-            pending_amount_query += " WHERE status = 'Pending'"
-            params_pending_amount = []
-        
-        pending_amount = conn.execute(pending_amount_query, params_pending_amount).fetchone()[0]
-        
-        overdue_amount_query = f"SELECT COALESCE(SUM(amount), 0) FROM fees{base_where}"
-        if base_where:
-            overdue_amount_query += " AND status = 'Pending' AND due_date < ?"
-            params_overdue_amount = params_base + [today]
-        else:
-            overdue_amount_query += " WHERE status = 'Pending' AND due_date < ?"
-            params_overdue_amount = [today]
-        
-        overdue_amount = conn.execute(overdue_amount_query, params_overdue_amount).fetchone()[0]
-        
-        paid_amount_query = f"SELECT COALESCE(SUM(amount), 0) FROM fees{base_where}"
-        if base_where:
-            paid_amount_query += " AND status = 'Paid'"
-            params_paid_amount = params_base + []
-        else:
-            paid_amount_query += " WHERE status = 'Paid'"
-            params_paid_amount = []
-        
-        paid_amount = conn.execute(paid_amount_query, params_paid_amount).fetchone()[0]
+            query += " AND hostel_id = ?"
+            params.append(hostel_id)
         
-        conn.close()
+        try:
+            row = conn.execute(query, params).fetchone()
+        finally:
+            conn.close()
         
         return {
-            'pending_count': pending_count,
-            'overdue_count': overdue_count,
-            'pending_amount': pending_amount,
-            'overdue_amount': overdue_amount,
-            'paid_amount': paid_amount
+            'pending_count': row['pending_count'],
+            'overdue_count': row['overdue_count'],
+            'pending_amount': row['pending_amount'],
+            'overdue_amount': row['overdue_amount'],
+            'paid_amount': row['paid_amount']
         }
     
     @staticmethod
@@ -1782,11 +2502,22 @@ class FeeModel:
                 raise Exception('Fee not found or access denied')
             
             conn.commit()
+            invalidate_hostel(hostel_id if hostel_id is not None else _hostel_id_of(conn, 'fees', fee_id), 'fees')
         finally:
             conn.close()
 
 class ComplaintModel:
     """Model for handling complaint and maintenance request operations."""
+
+    # Priorities from least to most urgent
+    PRIORITIES = ['Low', 'Medium', 'High', 'Critical']
+
+    @staticmethod
+    def priority_rank(column='priority'):
+        """SQL expression ranking a priority column by urgency (0 for unknown values)."""
+        whens = ' '.join(f"WHEN '{priority}' THEN {rank}"
+                         for rank, priority in enumerate(ComplaintModel.PRIORITIES, start=1))
+        return f"CASE {column} {whens} ELSE 0 END"
     
     @staticmethod
     def get_all_complaints(filters=None):
@@ -1854,6 +2585,7 @@ class ComplaintModel:
             )
             complaint_id = cursor.lastrowid
             conn.commit()
+            invalidate_hostel(_hostel_id_of(conn, 'rooms', room_id), 'complaints')
             return complaint_id
         except Exception as e:
             conn.rollback()
@@ -1866,6 +2598,7 @@ class ComplaintModel:
         """Update an existing complaint record."""
         conn = get_db_connection()
         try:
+            old_room_id = conn.execute('SELECT room_id FROM complaints WHERE id = ?', (complaint_id,)).fetchone()
             conn.execute(
                 """
                 UPDATE complaints 
@@ -1885,6 +2618,8 @@ class ComplaintModel:
                 )
             )
             conn.commit()
+            for room_id in {old_room_id['room_id'] if old_room_id else None, data.get('room_id')}:
+                invalidate_hostel(_hostel_id_of(conn, 'rooms', room_id), 'complaints')
             return True
         except Exception as e:
             conn.rollback()
@@ -1897,8 +2632,10 @@ class ComplaintModel:
         """Delete a complaint record."""
         conn = get_db_connection()
         try:
+            complaint = conn.execute('SELECT room_id FROM complaints WHERE id = ?', (complaint_id,)).fetchone()
             conn.execute('DELETE FROM complaints WHERE id = ?', (complaint_id,))
             conn.commit()
+            invalidate_hostel(_hostel_id_of(conn, 'rooms', complaint['room_id'] if complaint else None), 'complaints')
             return True
         except Exception as e:
             conn.rollback()
@@ -1925,6 +2662,8 @@ class ComplaintModel:
         return complaints
     
     @staticmethod
+    # Counts every hostel's complaints, so any hostel's changes make it stale
+    @cached(ttl_seconds=300, tags=global_reader_tags('complaints'))
     def get_complaint_statistics():
         """Get statistics for the complaints dashboard."""
         conn = get_db_connection()
@@ -1979,71 +2718,117 @@ class ExpenseModel:
     # Payment methods
     PAYMENT_METHODS = ['Cash', 'Card', 'Bank Transfer', 'Cheque', 'UPI', 'Other']
     
+    # Keyset pagination order for expense lists, newest first (see utils.pagination).
+    # Same-day expenses tie-break on id, i.e. insertion order, where the unpaged
+    # get_all_expenses uses created_at; they differ only for rows whose created_at was set by hand.
+    PAGE_SORT_KEYS = (SortKey(f"COALESCE(e.expense_date, '{NO_DATE}')", 'expense_date', NO_DATE), SortKey('e.id', 'id'))
+    
     @staticmethod
     def get_all_expenses(filters=None, hostel_id=None):
         """Get all expenses with optional filtering and hostel support."""
+        query, params = ExpenseModel._expenses_query(filters, hostel_id)
         conn = get_db_connection()
         try:
-            query = """
-                SELECT e.*, u.full_name as approved_by_name, h.name as hostel_name
-                FROM expenses e
-                LEFT JOIN users u ON e.approved_by = u.id
-                LEFT JOIN hostels h ON e.hostel_id = h.id
-                WHERE 1=1
-            """
-            params = []
-            
-            # Add hostel filter
-            if hostel_id is not None:
-                query += " AND e.hostel_id = ?"
-                params.append(hostel_id)
-            
-            # Apply filters if provided
-            if filters:
-                if filters.get('category'):
-                    query += " AND e.category = ?"
-                    params.append(filters['category'])
-                
-                if filters.get('expense_type'):
-                    query += " AND e.expense_type = ?"
-                    params.append(filters['expense_type'])
-                
-                if filters.get('payment_method'):
-                    query += " AND e.payment_method = ?"
-                    params.append(filters['payment_method'])
-                
-                if filters.get('start_date'):
-                    query += " AND e.expense_date >= ?"
-                    params.append(filters['start_date'])
-                
-                if filters.get('end_date'):
-                    query += " AND e.expense_date <= ?"
-                    params.append(filters['end_date'])
-                
-                if filters.get('min_amount'):
-                    query += " AND e.amount >= ?"
-                    params.append(float(filters['min_amount']))
-                
-                if filters.get('max_amount'):
-                    query += " AND e.amount <= ?"
-                    params.append(float(filters['max_amount']))
-                
-                if filters.get('vendor_name'):
-                    query += " AND e.vendor_name LIKE ?"
-                    params.append(f"%{filters['vendor_name']}%")
-                
-                if filters.get('description'):
-                    query += " AND e.description LIKE ?"
-                    params.append(f"%{filters['description']}%")
-            
-            query += " ORDER BY e.expense_date DESC, e.created_at DESC"
-            
             expenses = conn.execute(query, params).fetchall()
             return [dict(expense) for expense in expenses]
             
         finally:
             conn.close()
     
+    @staticmethod
+    def iter_expenses(filters=None, hostel_id=None, batch_size=None):
+        """Like get_all_expenses, but yields the expenses in batches (for exports)."""
+        query, params = ExpenseModel._expenses_query(filters, hostel_id)
+        conn = get_db_connection()
+        try:
+            for batch in iter_query_batches(conn, query, params, batch_size):
+                yield [dict(expense) for expense in batch]
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def count_expenses(filters=None, hostel_id=None):
+        """Number of expenses get_all_expenses returns for the same filters."""
+        return count_query_rows(*ExpenseModel._expenses_query(filters, hostel_id))
+    
+    @staticmethod
+    def _expenses_query(filters=None, hostel_id=None):
+        """Build the (query, params) shared by the expense listing and its export."""
+        select, select_from, conditions, params = ExpenseModel._expense_filters(filters, hostel_id)
+        query = f"SELECT {select} {select_from}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY e.expense_date DESC, e.created_at DESC"
+        return query, params
+    
+    @staticmethod
+    def get_expenses_page(filters=None, hostel_id=None, cursor=None, per_page=DEFAULT_PER_PAGE, with_total=False):
+        """Get one page of expenses, newest first (see utils.pagination); returns a KeysetPage."""
+        select, select_from, conditions, params = ExpenseModel._expense_filters(filters, hostel_id)
+        conn = get_db_connection()
+        try:
+            return fetch_page(conn, select, select_from, conditions, params, ExpenseModel.PAGE_SORT_KEYS,
+                              descending=True, cursor=cursor, per_page=per_page, with_total=with_total)
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _expense_filters(filters=None, hostel_id=None):
+        """Build the (select, from, conditions, params) of the expense listing."""
+        select = "e.*, u.full_name as approved_by_name, h.name as hostel_name"
+        select_from = """
+            FROM expenses e
+            LEFT JOIN users u ON e.approved_by = u.id
+            LEFT JOIN hostels h ON e.hostel_id = h.id
+        """
+        conditions = []
+        params = []
+        
+        # Add hostel filter
+        if hostel_id is not None:
+            conditions.append("e.hostel_id = ?")
+            params.append(hostel_id)
+        
+        # Apply filters if provided
+        if filters:
+            if filters.get('category'):
+                conditions.append("e.category = ?")
+                params.append(filters['category'])
+            
+            if filters.get('expense_type'):
+                conditions.append("e.expense_type = ?")
+                params.append(filters['expense_type'])
+            
+            if filters.get('payment_method'):
+                conditions.append("e.payment_method = ?")
+                params.append(filters['payment_method'])
+            
+            if filters.get('start_date'):
+                conditions.append("e.expense_date >= ?")
+                params.append(filters['start_date'])
+            
+            if filters.get('end_date'):
+                conditions.append("e.expense_date <= ?")
+                params.append(filters['end_date'])
+            
+            if filters.get('min_amount'):
+                conditions.append("e.amount >= ?")
+                params.append(float(filters['min_amount']))
+            
+            if filters.get('max_amount'):
+                conditions.append("e.amount <= ?")
+                params.append(float(filters['max_amount']))
+            
+            if filters.get('vendor_name'):
+                conditions.append("e.vendor_name LIKE ?")
+                params.append(f"%{filters['vendor_name']}%")
+            
+            if filters.get('description'):
+                conditions.append("e.description LIKE ?")
+                params.append(f"%{filters['description']}%")
+        
+        return select, select_from, conditions, params
+    
     @staticmethod
     def get_expense_by_id(expense_id, hostel_id=None):
         """Get a specific expense by ID with optional hostel filtering."""
@@ -2099,6 +2884,7 @@ class ExpenseModel:
             
             expense_id = cursor.lastrowid
             conn.commit()
+            invalidate_hostel(actual_hostel_id, 'expenses')
             return {'success': True, 'expense_id': expense_id}
             
         except Exception as e:
@@ -2112,6 +2898,8 @@ class ExpenseModel:
         """Update an existing expense record with optional hostel filtering."""
         conn = get_db_connection()
         try:
+            affected_hostel_id = hostel_id if hostel_id is not None else _hostel_id_of(conn, 'expenses', expense_id)
+            
             # Build the update query with hostel filtering if needed
             query = """
                 UPDATE expenses 
@@ -2144,6 +2932,7 @@ class ExpenseModel:
                 return {'success': False, 'error': 'Expense not found or access denied'}
             
             conn.commit()
+            invalidate_hostel(affected_hostel_id, 'expenses')
             return {'success': True}
             
         except Exception as e:
@@ -2157,6 +2946,8 @@ class ExpenseModel:
         """Delete an expense record with optional hostel filtering."""
         conn = get_db_connection()
         try:
+            affected_hostel_id = hostel_id if hostel_id is not None else _hostel_id_of(conn, 'expenses', expense_id)
+            
             query = "DELETE FROM expenses WHERE id = ?"
             params = [expense_id]
             
@@ -2170,6 +2961,7 @@ class ExpenseModel:
                 return {'success': False, 'error': 'Expense not found or access denied'}
             
             conn.commit()
+            invalidate_hostel(affected_hostel_id, 'expenses')
             return {'success': True}
             
         except Exception as e:
@@ -2179,6 +2971,7 @@ class ExpenseModel:
             conn.close()
     
     @staticmethod
+    @cached(ttl_seconds=300, tags=reader_tags('expenses'))
     def get_expense_statistics(hostel_id=None, period='monthly', year=None, month=None):
         """Get expense statistics with optional hostel filtering."""
         conn = get_db_connection()
@@ -2371,10 +3164,112 @@ class ExpenseModel:
         }
 
 
+# Dashboard figures from the hostel_stats summary table
+class HostelStatsModel:
+    @staticmethod
+    def get_summary(hostel_id=None, today=None):
+        """Dashboard figures for one hostel (or all), or None when hostel_stats does not exist."""
+        conn = get_db_connection()
+        try:
+            if not table_exists(conn, 'hostel_stats'):
+                return None
+            return HostelStatsModel.summarize(conn, hostel_id, today)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def summarize(conn, hostel_id=None, today=None):
+        """Read the dashboard figures from hostel_stats in one grouped query.
+
+        Reads a handful of summary rows per hostel (per status, and per day for
+        fees and expenses) whatever the number of fees, rooms and expenses.
+
+        Args:
+            conn: Database connection (the caller closes it)
+            hostel_id: Hostel to summarize, or None for every hostel
+            today: Reference date for overdue fees and the current month
+
+        Returns:
+            Dictionary of counts and amounts
+        """
+        today = today or date.today()
+        month_start = today.replace(day=1)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        query = '''
+            SELECT entity, status,
+                   SUM(item_count) AS item_count,
+                   SUM(amount_total) AS amount_total,
+                   SUM(capacity_total) AS capacity_total,
+                   SUM(occupancy_total) AS occupancy_total,
+                   SUM(occupied_count) AS occupied_count,
+                   SUM(CASE WHEN period <> '' AND period < ? THEN item_count ELSE 0 END) AS past_count,
+                   SUM(CASE WHEN period <> '' AND period < ? THEN amount_total ELSE 0 END) AS past_amount,
+                   SUM(CASE WHEN period >= ? AND period < ? THEN item_count ELSE 0 END) AS month_count,
+                   SUM(CASE WHEN period >= ? AND period < ? THEN amount_total ELSE 0 END) AS month_amount
+            FROM hostel_stats
+        '''
+        month = (month_start.isoformat(), next_month.isoformat())
+        params = [today.isoformat(), today.isoformat(), *month, *month]
+        if hostel_id is not None:
+            query += ' WHERE hostel_id = ?'
+            params.append(hostel_id)
+        query += ' GROUP BY entity, status'
+
+        groups = {}
+        for row in conn.execute(query, params).fetchall():
+            groups.setdefault(row['entity'], {})[row['status']] = row
+
+        def total(entity, column, status=None):
+            rows = groups.get(entity, {})
+            selected = rows.values() if status is None else [rows[status]] if status in rows else []
+            return sum(row[column] or 0 for row in selected)
+
+        rooms_by_status = {status: int(row['item_count'] or 0)
+                           for status, row in groups.get('rooms', {}).items() if row['item_count']}
+        return {
+            'students': int(total('students', 'item_count')),
+            'housed_students': int(total('students', 'item_count', 'Housed')),
+            'rooms': int(total('rooms', 'item_count')),
+            'rooms_by_status': rooms_by_status,
+            'occupied_rooms': int(total('rooms', 'occupied_count')),
+            'total_capacity': int(total('rooms', 'capacity_total')),
+            'current_occupancy': int(total('rooms', 'occupancy_total')),
+            'pending_fees': int(total('fees', 'item_count', 'Pending')),
+            'overdue_fees': int(total('fees', 'past_count', 'Pending')),
+            'pending_fees_amount': float(total('fees', 'amount_total', 'Pending')),
+            'overdue_fees_amount': float(total('fees', 'past_amount', 'Pending')),
+            'paid_fees_amount': float(total('fees', 'amount_total', 'Paid')),
+            'open_complaints': int(sum(total('complaints', 'item_count', status)
+                                       for status in ('Pending', 'In Progress', 'Open'))),
+            'monthly_expenses': float(total('expenses', 'month_amount')),
+            'monthly_expense_count': int(total('expenses', 'month_count')),
+        }
+
+    @staticmethod
+    def rebuild():
+        """Recompute hostel_stats from the source tables; returns the number of summary rows."""
+        conn = get_db_connection()
+        try:
+            count = rebuild_hostel_stats(conn.cursor())
+            conn.commit()
+            return count
+        finally:
+            conn.close()
+
+    @staticmethod
+    def check():
+        """List summary rows that disagree with the source tables (empty when consistent)."""
+        conn = get_db_connection()
+        try:
+            return check_hostel_stats(conn.cursor())
+        finally:
+            conn.close()
+
+
 # Initialize DB if needed when module is imported
 if __name__ == "__main__":
     # Check if DB exists
-    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DATABASE)
+    db_path = resolve_sqlite_path(_database_url())
     if not os.path.exists(db_path):
         init_db()
         print(f"Database created at {db_path}")
@@ -3,6 +3,8 @@ Hostel model for managing multiple hostel properties.
 """
 import sqlite3
 from models.db import get_db_connection
+from utils.cache import cached
+from utils.invalidation import global_reader_tags, reader_tags
 
 class Hostel:
     def __init__(self, id=None, name=None, address=None, contact_person=None, contact_email=None, contact_number=None, created_at=None):
@@ -22,6 +24,7 @@ class Hostel:
         cursor.execute('SELECT id, name, address, contact_person, contact_email, contact_number, created_at FROM hostels WHERE id = ?', 
                       (hostel_id,))
         hostel_data = cursor.fetchone()
+        db.close()
         
         if hostel_data:
             return Hostel(
@@ -41,6 +44,7 @@ class Hostel:
         cursor = db.cursor()
         cursor.execute('SELECT name FROM hostels WHERE id = ?', (hostel_id,))
         result = cursor.fetchone()
+        db.close()
         return result[0] if result else None
     
     @staticmethod
@@ -50,8 +54,11 @@ class Hostel:
         cursor = db.cursor()
         cursor.execute('SELECT id, name, address, contact_person, contact_email, contact_number, created_at FROM hostels ORDER BY name')
         
+        rows = cursor.fetchall()
+        db.close()
+        
         hostels = []
-        for row in cursor.fetchall():
+        for row in rows:
             hostel = Hostel(
                 id=row[0],
                 name=row[1],
@@ -76,7 +83,9 @@ class Hostel:
             (name, address, contact_person, contact_email, contact_number)
         )
         db.commit()
-        return cursor.lastrowid
+        hostel_id = cursor.lastrowid
+        db.close()
+        return hostel_id
 
     def update(self):
         """Update hostel details."""
@@ -88,33 +97,38 @@ class Hostel:
             (self.name, self.address, self.contact_person, self.contact_email, self.contact_number, self.id)
         )
         db.commit()
+        db.close()
         return True
     
     def delete(self):
         """Delete a hostel (only if it has no associated data)."""
         db = get_db_connection()
-        cursor = db.cursor()
-        
-        # Check if hostel has any associated data
-        tables = ['students', 'rooms', 'fees', 'complaints']
-        for table in tables:
-            cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE hostel_id = ?', (self.id,))
+        try:
+            cursor = db.cursor()
+            
+            # Check if hostel has any associated data
+            tables = ['students', 'rooms', 'fees', 'complaints']
+            for table in tables:
+                cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE hostel_id = ?', (self.id,))
+                count = cursor.fetchone()[0]
+                if count > 0:
+                    return False, f"Cannot delete hostel: {count} {table} records are associated with it"
+            
+            # Check if any managers are assigned to this hostel
+            cursor.execute('SELECT COUNT(*) FROM users WHERE hostel_id = ?', (self.id,))
             count = cursor.fetchone()[0]
             if count > 0:
-                return False, f"Cannot delete hostel: {count} {table} records are associated with it"
-        
-        # Check if any managers are assigned to this hostel
-        cursor.execute('SELECT COUNT(*) FROM users WHERE hostel_id = ?', (self.id,))
-        count = cursor.fetchone()[0]
-        if count > 0:
-            return False, f"Cannot delete hostel: {count} managers are assigned to it"
-        
-        # Delete the hostel
-        cursor.execute('DELETE FROM hostels WHERE id = ?', (self.id,))
-        db.commit()
-        return True, "Hostel deleted successfully"
+                return False, f"Cannot delete hostel: {count} managers are assigned to it"
+            
+            # Delete the hostel
+            cursor.execute('DELETE FROM hostels WHERE id = ?', (self.id,))
+            db.commit()
+            return True, "Hostel deleted successfully"
+        finally:
+            db.close()
         
     @staticmethod
+    @cached(ttl_seconds=300, tags=reader_tags('rooms', 'students', 'fees', 'complaints'))
     def get_dashboard_stats(hostel_id=None):
         """Get dashboard statistics for a hostel or all hostels."""
         db = get_db_connection()
@@ -135,9 +149,6 @@ class Hostel:
         else:
             cursor.execute('SELECT COUNT(DISTINCT room_id) FROM students WHERE room_id IS NOT NULL')
         occupied_rooms = cursor.fetchone()[0] or 0
-        vacant_rooms = total_rooms - occupied_rooms
-        if vacant_rooms < 0:
-            vacant_rooms = 0  # Prevent negative vacant rooms due to data inconsistencies
         
         # Get student count
         cursor.execute(f'SELECT COUNT(*) FROM students {condition}', params)
@@ -150,7 +161,7 @@ class Hostel:
             cursor.execute("SELECT COUNT(*), COALESCE(SUM(amount), 0.0) FROM fees WHERE status = 'Pending'")
         fee_data = cursor.fetchone()
         pending_fee_count = fee_data[0] or 0
-        pending_fee_amount = float(fee_data[1]) if fee_data[1] is not None else 0.0  # Always return float
+        pending_fee_amount = fee_data[1]
         
         # Get complaints count
         if hostel_id:
@@ -158,15 +169,75 @@ class Hostel:
         else:
             cursor.execute("SELECT COUNT(*) FROM complaints WHERE status IN ('Pending', 'In Progress', 'Open')")
         open_complaints = int(cursor.fetchone()[0] or 0)
+        db.close()
 
+        return Hostel._dashboard_stats(total_rooms, occupied_rooms, total_students,
+                                       pending_fee_count, pending_fee_amount, open_complaints)
+
+    @staticmethod
+    @cached(ttl_seconds=300, tags=global_reader_tags('rooms', 'students', 'fees', 'complaints'))
+    def get_dashboard_stats_bulk():
+        """Get dashboard statistics for every hostel at once.
+
+        Same figures as get_dashboard_stats(hostel_id), computed with one
+        GROUP BY hostel_id query per table instead of five queries per hostel.
+
+        Returns:
+            Dict mapping each hostel id to its statistics
+        """
+        db = get_db_connection()
+        try:
+            hostel_ids = [row[0] for row in db.execute('SELECT id FROM hostels').fetchall()]
+            counts = {hostel_id: {'total_rooms': 0, 'occupied_rooms': 0, 'total_students': 0,
+                                  'pending_fee_count': 0, 'pending_fee_amount': 0.0, 'open_complaints': 0}
+                      for hostel_id in hostel_ids}
+
+            def collect(query, columns):
+                for row in db.execute(query).fetchall():
+                    if row[0] in counts:  # Rows without a (known) hostel are not shown per hostel
+                        counts[row[0]].update(zip(columns, row[1:]))
+
+            collect('SELECT hostel_id, COUNT(*) FROM rooms GROUP BY hostel_id', ('total_rooms',))
+            # COUNT(DISTINCT room_id) skips students without a room
+            collect('SELECT hostel_id, COUNT(*), COUNT(DISTINCT room_id) FROM students GROUP BY hostel_id',
+                    ('total_students', 'occupied_rooms'))
+            collect("""SELECT hostel_id, COUNT(*), COALESCE(SUM(amount), 0.0) FROM fees
+                       WHERE status = 'Pending' GROUP BY hostel_id""",
+                    ('pending_fee_count', 'pending_fee_amount'))
+            collect("""SELECT hostel_id, COUNT(*) FROM complaints
+                       WHERE status IN ('Pending', 'In Progress', 'Open') GROUP BY hostel_id""",
+                    ('open_complaints',))
+        finally:
+            db.close()
+
+        return {hostel_id: Hostel._dashboard_stats(**values) for hostel_id, values in counts.items()}
+
+    @staticmethod
+    def sum_dashboard_stats(stats_by_hostel):
+        """Overall statistics of several hostels, from their get_dashboard_stats_bulk() entries."""
+        totals = {'total_rooms': 0, 'occupied_rooms': 0, 'total_students': 0,
+                  'pending_fee_count': 0, 'pending_fee_amount': 0.0, 'open_complaints': 0}
+        for stats in stats_by_hostel.values():
+            for key in totals:
+                totals[key] += stats[key]
+        return Hostel._dashboard_stats(**totals)
+
+    @staticmethod
+    def _dashboard_stats(total_rooms, occupied_rooms, total_students, pending_fee_count,
+                         pending_fee_amount, open_complaints):
+        """Build the dashboard statistics dictionary from raw counts."""
+        total_rooms = int(total_rooms or 0)
+        occupied_rooms = int(occupied_rooms or 0)
+        # Prevent negative vacant rooms due to data inconsistencies
+        vacant_rooms = max(total_rooms - occupied_rooms, 0)
         return {
-            'total_rooms': int(total_rooms),
-            'vacant_rooms': int(vacant_rooms),
-            'occupied_rooms': int(occupied_rooms),
+            'total_rooms': total_rooms,
+            'vacant_rooms': vacant_rooms,
+            'occupied_rooms': occupied_rooms,
             'occupancy_rate': (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0,
-            'total_students': int(total_students),
-            'pending_fee_count': int(pending_fee_count),
-            'pending_fee_amount': pending_fee_amount,
+            'total_students': int(total_students or 0),
+            'pending_fee_count': int(pending_fee_count or 0),
+            'pending_fee_amount': float(pending_fee_amount or 0.0),  # Always return float
             # 'total_complaints': total_complaints, # Uncomment if needed
-            'open_complaints': int(open_complaints)
+            'open_complaints': int(open_complaints or 0)
         }
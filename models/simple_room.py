@@ -3,9 +3,10 @@ Simplified Room Management System
 This module provides basic room management functionality with minimal complexity
 """
 
-import sqlite3
 from datetime import date
-from .db import get_db_connection
+from .db import _hostel_id_of, get_db_connection
+from utils.invalidation import invalidate_hostel
+from utils.query_compiler import DatabaseError
 
 
 class SimpleRoomModel:
@@ -112,13 +113,14 @@ class SimpleRoomModel:
             room_id = cursor.lastrowid
             conn.commit()
             
+            invalidate_hostel(hostel_id, 'rooms')
             return {
                 'success': True, 
                 'room_id': room_id,
                 'message': f'Room {room_number} added successfully'
             }
             
-        except sqlite3.Error as e:
+        except DatabaseError as e:
             return {'success': False, 'error': f'Database error: {str(e)}'}
         finally:
             conn.close()
@@ -171,12 +173,13 @@ class SimpleRoomModel:
             # Update occupancy status if needed
             SimpleRoomModel._update_room_status(conn, room_id)
             
+            invalidate_hostel(room['hostel_id'], 'rooms')
             return {
                 'success': True,
                 'message': f'Room {room_number} updated successfully'
             }
             
-        except sqlite3.Error as e:
+        except DatabaseError as e:
             return {'success': False, 'error': f'Database error: {str(e)}'}
         finally:
             conn.close()
@@ -208,12 +211,13 @@ class SimpleRoomModel:
             conn.execute('DELETE FROM rooms WHERE id = ?', (room_id,))
             conn.commit()
             
+            invalidate_hostel(room['hostel_id'], 'rooms')
             return {
                 'success': True,
                 'message': f'Room {room["room_number"]} deleted successfully'
             }
             
-        except sqlite3.Error as e:
+        except DatabaseError as e:
             return {'success': False, 'error': f'Database error: {str(e)}'}
         finally:
             conn.close()
@@ -374,6 +378,7 @@ class SimpleRoomModel:
             # Update status
             SimpleRoomModel._update_room_status(conn, room_id)
             
+            invalidate_hostel(_hostel_id_of(conn, 'rooms', room_id), 'rooms')
         except Exception as e:
             print(f"Error updating room occupancy for room {room_id}: {str(e)}")
         finally:
@@ -4,6 +4,7 @@ User model for authentication and authorization.
 import sqlite3
 from werkzeug.security import generate_password_hash, check_password_hash
 from models.db import get_db
+from utils.user_cache import invalidate_user
 
 class User:
     ROLE_OWNER = 'owner'
@@ -28,6 +29,7 @@ class User:
         cursor.execute('SELECT id, username, password_hash, full_name, role, hostel_id, email FROM users WHERE id = ?', 
                       (user_id,))
         user_data = cursor.fetchone()
+        db.close()
         
         if user_data:
             return User(
@@ -50,6 +52,7 @@ class User:
         cursor.execute('SELECT id, username, password_hash, full_name, role, hostel_id, email FROM users WHERE username = ?', 
                        (username,))
         user_data = cursor.fetchone()
+        db.close()
         
         if user_data:
             return User(
@@ -78,7 +81,9 @@ class User:
             (username, password_hash, full_name, role, hostel_id, email)
         )
         db.commit()
-        return cursor.lastrowid
+        user_id = cursor.lastrowid
+        db.close()
+        return user_id
     
     @staticmethod
     def get_all_managers():
@@ -93,8 +98,11 @@ class User:
             ORDER BY u.username  
         ''', (User.ROLE_MANAGER,))
         
+        rows = cursor.fetchall()
+        db.close()
+        
         managers = []
-        for row in cursor.fetchall():
+        for row in rows:
             user = User(
                 id=row[0],
                 username=row[1],
@@ -147,6 +155,8 @@ class User:
         
         cursor.execute(query, params)
         db.commit()
+        db.close()
+        invalidate_user(self.id)
         return True
     
     def change_password(self, new_password):
@@ -159,4 +169,6 @@ class User:
         
         cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, self.id))
         db.commit()
+        db.close()
+        invalidate_user(self.id)
         return True
@@ -1,30 +1,55 @@
 """
 Redis Utilities for Socket.IO Connection Management
 Handles shared storage for multi-server deployments
+
+Presence is kept in Redis so every worker sees the same online counts:
+
+    socketio:session:<sid>   JSON session data (expires unless heartbeats refresh it)
+    socketio:sessions        sorted set of session ids scored by last heartbeat
+    socketio:users           sorted set of user ids scored by last heartbeat
+    socketio:user:<id>       sorted set of the user's session ids
+    socketio:hostel:<id>     sorted set of the hostel's session ids
+
+Writes for a session go in one MULTI/EXEC pipeline; removing a user whose last
+session closed is a WATCH/MULTI transaction. Sessions whose last
+heartbeat is older than ``heartbeat_timeout`` (a worker died without a
+disconnect) are trimmed from a sorted set before it is counted, so counts are a
+ZCARD rather than a scan.
 """
 import redis
 import json
 import os
+import time
 from typing import Set, Dict, Optional
 
+DEFAULT_HEARTBEAT_TIMEOUT = 90  # seconds; clients ping every 30
+RECONNECT_DELAY = 30  # seconds before retrying Redis after a failure
+
 class RedisConnectionManager:
     """Manages Socket.IO connections using Redis for multi-server setups"""
-    
-    def __init__(self, redis_url: Optional[str] = None, password: Optional[str] = None):
+
+    def __init__(self, redis_url: Optional[str] = None, password: Optional[str] = None,
+                 heartbeat_timeout: int = DEFAULT_HEARTBEAT_TIMEOUT, prefix: str = 'socketio:',
+                 client=None, clock=time.time):
         """Initialize Redis connection manager"""
         self.redis_url = redis_url or os.environ.get('REDIS_URL', 'redis://localhost:6379/1')
         self.password = password or os.environ.get('REDIS_PASSWORD')
-        self._redis_client = None
-        self._fallback_storage = set()  # Fallback for when Redis is not available
-        
+        self.heartbeat_timeout = heartbeat_timeout
+        self.prefix = prefix
+        self.clock = clock
+        self._redis_client = client
+        self._retry_at = 0
+        # Fallback for when Redis is not available (this worker's sessions only)
+        self._fallback_sessions = {}  # session_id -> user_data
+
     @property
     def redis_client(self):
         """Get Redis client with lazy initialization"""
-        if self._redis_client is None:
+        if self._redis_client is None and time.monotonic() >= self._retry_at:
             try:
                 # Parse Redis URL
                 if self.redis_url.startswith('redis://') or self.redis_url.startswith('rediss://'):
-                    self._redis_client = redis.from_url(
+                    client = redis.from_url(
                         self.redis_url,
                         password=self.password,
                         decode_responses=True,
@@ -34,7 +59,7 @@ class RedisConnectionManager:
                     )
                 else:
                     # Direct connection
-                    self._redis_client = redis.Redis(
+                    client = redis.Redis(
                         host='localhost',
                         port=6379,
                         db=1,
@@ -44,131 +69,207 @@ class RedisConnectionManager:
                         socket_timeout=5,
                         retry_on_timeout=True
                     )
-                
+
                 # Test connection
-                self._redis_client.ping()
+                client.ping()
+                self._redis_client = client
                 print("Redis connection established successfully")
-                
+
             except Exception as e:
                 print(f"Redis connection failed: {e}")
                 print("Falling back to in-memory storage")
                 self._redis_client = None
-                
+                self._retry_at = time.monotonic() + RECONNECT_DELAY
+
         return self._redis_client
-    
+
+    def _redis_failed(self, action, error):
+        print(f"Error {action}: {error}")
+        self._redis_client = None
+        self._retry_at = time.monotonic() + RECONNECT_DELAY
+
+    def _key(self, *parts) -> str:
+        return self.prefix + ':'.join(str(part) for part in parts)
+
+    def _write_presence(self, pipe, user_id, session_id, hostel_id, now):
+        """Queue the sorted-set writes recording a heartbeat for a session."""
+        key_ttl = self.heartbeat_timeout * 2
+        pipe.zadd(self._key('sessions'), {session_id: now})
+        pipe.zadd(self._key('users'), {str(user_id): now})
+        pipe.zadd(self._key('user', user_id), {session_id: now})
+        pipe.expire(self._key('user', user_id), key_ttl)
+        if hostel_id:
+            pipe.zadd(self._key('hostel', hostel_id), {session_id: now})
+            pipe.expire(self._key('hostel', hostel_id), key_ttl)
+
     def add_user_session(self, user_id: int, session_id: str, user_data: Dict) -> bool:
         """Add a user session to tracking"""
-        try:
-            if self.redis_client:
-                # Store session data
-                session_key = f"socketio:session:{session_id}"
-                user_key = f"socketio:user:{user_id}"
-                all_sessions_key = "socketio:all_sessions"
-                
-                # Store session data with expiration (24 hours)
-                self.redis_client.setex(session_key, 86400, json.dumps(user_data))
-                
-                # Add session to user's session set
-                self.redis_client.sadd(user_key, session_id)
-                self.redis_client.expire(user_key, 86400)
-                
-                # Add to global sessions set
-                self.redis_client.sadd(all_sessions_key, session_id)
-                
-                return True
-            else:
-                # Fallback to memory storage
-                self._fallback_storage.add(session_id)
+        client = self.redis_client
+        if client:
+            try:
+                now = self.clock()
+                pipe = client.pipeline(transaction=True)
+                pipe.set(self._key('session', session_id), json.dumps(user_data), ex=self.heartbeat_timeout * 2)
+                self._write_presence(pipe, user_id, session_id, user_data.get('hostel_id'), now)
+                pipe.execute()
                 return True
-                
+            except Exception as e:
+                self._redis_failed('adding user session', e)
+        # Fallback to memory storage
+        self._fallback_sessions[session_id] = user_data
+        return True
+
+    def heartbeat(self, session_id: str, user_id: Optional[int] = None, hostel_id: Optional[int] = None) -> bool:
+        """Mark a session as still connected; returns False if it is no longer tracked"""
+        client = self.redis_client
+        if not client:
+            return session_id in self._fallback_sessions
+        try:
+            if user_id is None:
+                data = self.get_session_data(session_id)
+                if not data:
+                    return False
+                user_id, hostel_id = data.get('user_id'), data.get('hostel_id')
+            pipe = client.pipeline(transaction=True)
+            pipe.expire(self._key('session', session_id), self.heartbeat_timeout * 2)
+            self._write_presence(pipe, user_id, session_id, hostel_id, self.clock())
+            return bool(pipe.execute()[0])
         except Exception as e:
-            print(f"Error adding user session: {e}")
-            # Fallback to memory storage
-            self._fallback_storage.add(session_id)
-            return True
-    
-    def remove_user_session(self, user_id: int, session_id: str) -> bool:
+            self._redis_failed('recording heartbeat', e)
+            return False
+
+    def remove_user_session(self, user_id: int, session_id: str, hostel_id: Optional[int] = None) -> bool:
         """Remove a user session from tracking"""
+        self._fallback_sessions.pop(session_id, None)
+        client = self.redis_client
+        if not client:
+            return True
         try:
-            if self.redis_client:
-                session_key = f"socketio:session:{session_id}"
-                user_key = f"socketio:user:{user_id}"
-                all_sessions_key = "socketio:all_sessions"
-                
-                # Remove session data
-                self.redis_client.delete(session_key)
-                
-                # Remove from user's sessions
-                self.redis_client.srem(user_key, session_id)
-                
-                # Remove from global sessions
-                self.redis_client.srem(all_sessions_key, session_id)
-                
-                return True
-            else:
-                # Fallback to memory storage
-                self._fallback_storage.discard(session_id)
-                return True
-                
+            if hostel_id is None:
+                data = self.get_session_data(session_id) or {}
+                hostel_id = data.get('hostel_id')
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(self._key('session', session_id))
+            pipe.zrem(self._key('sessions'), session_id)
+            pipe.zrem(self._key('user', user_id), session_id)
+            if hostel_id:
+                pipe.zrem(self._key('hostel', hostel_id), session_id)
+            pipe.execute()
+            self._forget_user_if_offline(client, user_id)
+            return True
         except Exception as e:
-            print(f"Error removing user session: {e}")
-            # Fallback to memory storage
-            self._fallback_storage.discard(session_id)
+            self._redis_failed('removing user session', e)
             return True
-    
+
+    def _forget_user_if_offline(self, client, user_id) -> None:
+        """Drop the user from the online users set if none of their sessions are left.
+
+        The check and the removal run under WATCH on the user's session set, so a
+        session added by another worker in between makes the transaction retry
+        (and then keep the user) instead of marking a connected user offline.
+        """
+        user_key = self._key('user', user_id)
+
+        def remove_if_empty(pipe):
+            if pipe.zcard(user_key) == 0:
+                pipe.multi()
+                pipe.zrem(self._key('users'), str(user_id))
+
+        client.transaction(remove_if_empty, user_key)
+
+    def _live_count(self, key: str) -> int:
+        """Trim entries without a recent heartbeat from a sorted set and count the rest"""
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.zremrangebyscore(key, '-inf', self.clock() - self.heartbeat_timeout)
+        pipe.zcard(key)
+        return pipe.execute()[1]
+
     def get_online_session_count(self) -> int:
         """Get total number of online sessions"""
-        try:
-            if self.redis_client:
-                # Use simple memory count to avoid async/sync issues
-                return len(self._fallback_storage)
-            else:
-                return len(self._fallback_storage)
-        except Exception as e:
-            print(f"Error getting online session count: {e}")
-            return len(self._fallback_storage)
-    
+        if self.redis_client:
+            try:
+                return self._live_count(self._key('sessions'))
+            except Exception as e:
+                self._redis_failed('getting online session count', e)
+        return len(self._fallback_sessions)
+
+    def get_online_user_count(self) -> int:
+        """Get number of distinct users with an online session"""
+        if self.redis_client:
+            try:
+                return self._live_count(self._key('users'))
+            except Exception as e:
+                self._redis_failed('getting online user count', e)
+        return len({data.get('user_id') for data in self._fallback_sessions.values()})
+
+    def get_hostel_session_count(self, hostel_id: int) -> int:
+        """Get number of online sessions in a hostel"""
+        if self.redis_client:
+            try:
+                return self._live_count(self._key('hostel', hostel_id))
+            except Exception as e:
+                self._redis_failed(f'getting session count for hostel {hostel_id}', e)
+        return sum(1 for data in self._fallback_sessions.values() if data.get('hostel_id') == hostel_id)
+
     def get_user_sessions(self, user_id: int) -> Set[str]:
         """Get all active sessions for a user"""
-        try:
-            if self.redis_client:
-                user_key = f"socketio:user:{user_id}"
-                # Use simple approach to avoid type issues
-                return set()
-            else:
-                # For fallback, we can't track per-user sessions
-                return set()
-        except Exception as e:
-            print(f"Error getting user sessions for user {user_id}: {e}")
-            return set()
-    
+        if self.redis_client:
+            try:
+                key = self._key('user', user_id)
+                pipe = self.redis_client.pipeline(transaction=True)
+                pipe.zremrangebyscore(key, '-inf', self.clock() - self.heartbeat_timeout)
+                pipe.zrange(key, 0, -1)
+                return set(pipe.execute()[1])
+            except Exception as e:
+                self._redis_failed(f'getting user sessions for user {user_id}', e)
+        return {sid for sid, data in self._fallback_sessions.items() if data.get('user_id') == user_id}
+
     def get_session_data(self, session_id: str) -> Optional[Dict]:
         """Get session data for a specific session"""
-        try:
-            if self.redis_client:
-                session_key = f"socketio:session:{session_id}"
-                # Use simple approach to avoid type issues
-                return None
-            else:
-                return None
-        except Exception as e:
-            print(f"Error getting session data for {session_id}: {e}")
-            return None
-    
+        if self.redis_client:
+            try:
+                raw = self.redis_client.get(self._key('session', session_id))
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                self._redis_failed(f'getting session data for {session_id}', e)
+        return self._fallback_sessions.get(session_id)
+
     def cleanup_expired_sessions(self) -> int:
-        """Clean up expired sessions"""
+        """Remove sessions without a recent heartbeat from every presence set; returns how many"""
+        client = self.redis_client
+        if not client:
+            # Local sessions always end with a disconnect
+            return 0
         try:
-            if self.redis_client:
-                # Redis handles expiration automatically
-                return 0
-            else:
-                # For fallback storage, we don't have expiration
+            cutoff = self.clock() - self.heartbeat_timeout
+            expired = client.zrangebyscore(self._key('sessions'), '-inf', cutoff)
+            if not expired:
                 return 0
-                
+            sessions = client.mget([self._key('session', sid) for sid in expired])
+            pipe = client.pipeline(transaction=True)
+            for sid, raw in zip(expired, sessions):
+                data = json.loads(raw) if raw else {}
+                if data.get('user_id') is not None:
+                    pipe.zrem(self._key('user', data['user_id']), sid)
+                if data.get('hostel_id'):
+                    pipe.zrem(self._key('hostel', data['hostel_id']), sid)
+                pipe.delete(self._key('session', sid))
+            pipe.zremrangebyscore(self._key('sessions'), '-inf', cutoff)
+            pipe.zremrangebyscore(self._key('users'), '-inf', cutoff)
+            pipe.execute()
+            return len(expired)
         except Exception as e:
-            print(f"Error during session cleanup: {e}")
+            self._redis_failed('during session cleanup', e)
             return 0
 
+    def stats(self) -> Dict:
+        """Online counts for monitoring"""
+        return {
+            'backend': 'redis' if self.redis_client else 'memory',
+            'sessions': self.get_online_session_count(),
+            'users': self.get_online_user_count(),
+        }
+
 # Global instance
 _connection_manager = None
 
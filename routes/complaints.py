@@ -3,8 +3,11 @@ Maintenance and Complaints routes for the Hostel Management System
 """
 from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app
 from datetime import date
-import sqlite3
 from db_utils import get_db_connection, DatabaseConnection
+from utils.query_compiler import DatabaseError
+from utils.invalidation import invalidate_hostel
+from models.db import ComplaintModel
+from utils.pagination import DEFAULT_PER_PAGE, NO_DATE, SortKey, fetch_page
 
 # Import for Socket.IO real-time updates
 try:
@@ -19,7 +22,13 @@ complaints = Blueprint('complaints', __name__)
 
 # Constants
 COMPLAINT_STATUSES = ['Pending', 'In Progress', 'Resolved', 'Closed']
-COMPLAINT_PRIORITIES = ['Low', 'Medium', 'High', 'Critical']
+COMPLAINT_PRIORITIES = ComplaintModel.PRIORITIES
+# Newest first; complaints reported the same day show the most urgent first
+COMPLAINT_SORT_KEYS = (
+    SortKey(f"COALESCE(c.report_date, '{NO_DATE}')", 'reported_date', NO_DATE),
+    SortKey(ComplaintModel.priority_rank('c.priority'), 'priority_rank'),
+    SortKey('c.id', 'id'),
+)
 
 @complaints.route('/complaints')
 def view_complaints():
@@ -29,18 +38,19 @@ def view_complaints():
         filter_priority = request.args.get('filter_priority', '').strip()
 
         # Use correct column names and aliases for report_date and resolution_date
-        query = """
-            SELECT c.id,
+        select = f"""c.id,
                    c.report_date AS reported_date,
                    c.description,
                    c.priority,
+                   {ComplaintModel.priority_rank('c.priority')} AS priority_rank,
                    c.status,
                    c.resolution_date AS resolved_date,
                    s.name AS student_name,
                    s.id AS student_id,
                    r.room_number,
                    r.id AS room_id,
-                   h.name AS hostel_name
+                   h.name AS hostel_name"""
+        select_from = """
             FROM complaints c
             LEFT JOIN students s ON c.reported_by_id = s.id
             LEFT JOIN rooms r ON c.room_id = r.id
@@ -68,15 +78,13 @@ def view_complaints():
             conditions.append("c.priority = ?")
             params.append(filter_priority)
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += " ORDER BY c.report_date DESC, c.priority, c.id DESC"
-
-        complaints_from_db = conn.execute(query, tuple(params)).fetchall()
+        # Newest first, one page at a time
+        page = fetch_page(conn, select, select_from, conditions, params, COMPLAINT_SORT_KEYS,
+                          descending=True, cursor=request.args.get('cursor'),
+                          per_page=request.args.get('per_page', DEFAULT_PER_PAGE), with_total=True)
 
         processed_complaints = []
-        for complaint_row in complaints_from_db:
+        for complaint_row in page.items:
             complaint = dict(complaint_row)
             if complaint['reported_date']:
                 try:
@@ -104,6 +112,7 @@ def view_complaints():
             current_hostel_name = hostel.name if hostel else None
         return render_template('complaints/view_complaints.html', 
                                complaints=processed_complaints,
+                               page=page,
                                complaint_statuses=["Open", "In Progress", "Resolved", "Closed"],
                                complaint_priorities=["Low", "Medium", "High"],
                                current_user_role=current_user_role,
@@ -164,6 +173,8 @@ def add_complaint():
                 """, (reported_by_name, reported_by_id, room_id, description, priority, status, date.today().isoformat(), hostel_id))
                 
                 complaint_id = cursor.lastrowid
+                conn.commit()
+                invalidate_hostel(hostel_id, 'complaints')
                 
                 # Get additional details for the real-time notification
                 room_number = None
@@ -286,6 +297,7 @@ def edit_complaint(complaint_id):
                 ''', (room_id, reported_by_id, description, priority, status, 
                       resolution_notes, resolution_date, complaint_id))
                 conn.commit()
+                invalidate_hostel(complaint_hostel_id, 'complaints')
                 
                 # Emit real-time notification for complaint update
                 try:
@@ -333,7 +345,7 @@ def edit_complaint(complaint_id):
                 
                 flash('Maintenance request updated successfully!', 'success')
                 return redirect(url_for('complaints.view_complaints'))
-            except sqlite3.Error as e:
+            except DatabaseError as e:
                 conn.rollback()
                 flash(f'Error updating maintenance request: {e}', 'error')
         
@@ -406,6 +418,7 @@ def delete_complaint(complaint_id):
             conn.execute('BEGIN TRANSACTION')
             conn.execute('DELETE FROM complaints WHERE id = ?', (complaint_id,))
             conn.commit()
+            invalidate_hostel(complaint_hostel_id, 'complaints')
             
             # Emit real-time notification for complaint deletion
             if complaint_to_delete:
@@ -445,7 +458,7 @@ def delete_complaint(complaint_id):
                     print(f"Socket.IO emission error in delete_complaint: {e}")
             
             flash('Maintenance request deleted successfully!', 'success')
-        except sqlite3.Error as e:
+        except DatabaseError as e:
             conn.rollback()
             flash(f'Error deleting maintenance request: {e}', 'error')
         
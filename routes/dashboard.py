@@ -3,37 +3,18 @@ Dashboard and index routes for the Hostel Management System
 """
 from flask import Blueprint, render_template, request, g, flash, redirect, url_for
 from datetime import date
-from models.db import StudentModel, RoomModel, FeeModel, ExpenseModel, get_db_connection
+from models.db import StudentModel, RoomModel, FeeModel, ExpenseModel, HostelStatsModel, get_db_connection
 from utils.dashboard import get_recent_activity
-
-# Socket.IO imports with error handling
-try:
-    from flask_socketio import emit
-    SOCKETIO_AVAILABLE = True
-except ImportError:
-    SOCKETIO_AVAILABLE = False
-    print("Warning: Flask-SocketIO not available for dashboard real-time updates")
+from utils.dashboard_updates import dashboard_updates
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 def emit_dashboard_update(hostel_id=None, update_type='general'):
     """
-    Emit dashboard statistics update via Socket.IO
+    Queue a dashboard statistics update via Socket.IO (coalesced, see utils.dashboard_updates)
     """
-    if not SOCKETIO_AVAILABLE:
-        return
-    
     try:
-        # Get updated statistics
-        stats = get_dashboard_statistics(hostel_id)
-          # Emit dashboard update event
-        emit('dashboard_stats_updated', {
-            'stats': stats,
-            'hostel_id': hostel_id,
-            'update_type': update_type,
-            'timestamp': date.today().isoformat()
-        }, to=f'hostel_{hostel_id}' if hostel_id else None, broadcast=True)
-        
+        dashboard_updates.mark(hostel_id, update_type)
     except Exception as e:
         print(f"Error emitting dashboard update: {e}")
 
@@ -42,6 +23,11 @@ def get_dashboard_statistics(hostel_id=None):
     Get dashboard statistics for Socket.IO updates
     """
     try:
+        # Read the maintained hostel_stats summary when the schema has it
+        summary = HostelStatsModel.get_summary(hostel_id)
+        if summary is not None:
+            return dashboard_statistics_from_summary(summary)
+        
         # Basic stats - filtered by hostel if specified
         num_students = StudentModel.count_all_students(hostel_id=hostel_id)
         rooms_stats = RoomModel.get_room_statistics(hostel_id=hostel_id)
@@ -83,6 +69,31 @@ def get_dashboard_statistics(hostel_id=None):
         print(f"Error getting dashboard statistics: {e}")
         return {}
 
+def dashboard_statistics_from_summary(summary):
+    """Shape HostelStatsModel figures like get_dashboard_statistics' raw-table result."""
+    rooms_by_status = summary['rooms_by_status']
+    total_capacity = summary['total_capacity']
+    current_occupancy = summary['current_occupancy']
+    expense_count = summary['monthly_expense_count']
+    return {
+        'students': summary['students'],
+        'rooms': summary['rooms'],
+        'available_rooms': rooms_by_status.get(RoomModel.STATUS_AVAILABLE, 0),
+        'occupied_rooms': summary['occupied_rooms'],
+        'maintenance_rooms': rooms_by_status.get(RoomModel.STATUS_MAINTENANCE, 0),
+        'total_capacity': total_capacity,
+        'current_occupancy': current_occupancy,
+        'occupancy_percentage': (current_occupancy / total_capacity * 100) if total_capacity > 0 else 0,
+        'pending_fees': summary['pending_fees'],
+        'overdue_fees': summary['overdue_fees'],
+        'pending_fees_amount': summary['pending_fees_amount'],
+        'overdue_fees_amount': summary['overdue_fees_amount'],
+        'paid_fees_amount': summary['paid_fees_amount'],
+        'monthly_expenses': summary['monthly_expenses'],
+        'monthly_expense_count': expense_count,
+        'monthly_avg_expense': summary['monthly_expenses'] / expense_count if expense_count > 0 else 0
+    }
+
 def get_hostel_access_control(request_method='GET', hostel_id_param_name='hostel_id'):
     """
     Utility function to handle hostel access control based on user role.
@@ -6,6 +6,9 @@ from models.db import ExpenseModel
 from datetime import date, datetime, timedelta
 from utils.date_utils import parse_date, format_date, get_month_range, get_date_intervals
 from utils.export import ExportUtility
+from utils.export_jobs import ExportSource
+from routes.export_jobs import submit_export_job
+from utils.pagination import DEFAULT_PER_PAGE
 from utils.user_utils import get_user_attribute
 from db_utils import get_db_connection, DatabaseConnection
 import json
@@ -81,9 +84,12 @@ def list_expenses():
         # Remove None values from filters
         filters = {k: v for k, v in filters.items() if v is not None}
         
-        expenses = ExpenseModel.get_all_expenses(
+        page = ExpenseModel.get_expenses_page(
             filters=filters,
-            hostel_id=access_control['hostel_id']
+            hostel_id=access_control['hostel_id'],
+            cursor=request.args.get('cursor'),
+            per_page=request.args.get('per_page', DEFAULT_PER_PAGE),
+            with_total=True
         )
         
         # Get expense categories and types for filter dropdown
@@ -92,7 +98,8 @@ def list_expenses():
         payment_methods = ['Cash', 'Card', 'Bank Transfer', 'Cheque', 'UPI', 'Other']
         
         return render_template('expenses/list.html',
-                             expenses=expenses,
+                             expenses=page.items,
+                             page=page,
                              categories=categories,
                              expense_types=expense_types,
                              payment_methods=payment_methods,
@@ -392,15 +399,8 @@ def export_expenses():
         # Remove None values from filters
         filters = {k: v for k, v in filters.items() if v is not None}
         
-        expenses = ExpenseModel.get_all_expenses(
-            filters=filters,
-            hostel_id=access_control['hostel_id']
-        )
-        
-        # Prepare data for export
-        export_data = []
-        for expense in expenses:
-            export_data.append({
+        def format_expense(expense):
+            return {
                 'ID': expense['id'],
                 'Description': expense['description'],
                 'Amount': expense['amount'],
@@ -414,17 +414,34 @@ def export_expenses():
                 'Notes': expense['notes'] or '',
                 'Hostel': expense.get('hostel_name', ''),
                 'Created At': expense['created_at']
-            })
+            }
         
         # Generate filename
         filename = f"expenses_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        headers = ['ID', 'Description', 'Amount', 'Date', 'Category', 'Type', 'Vendor', 'Receipt Number',
+                   'Payment Method', 'Approved By', 'Notes', 'Hostel', 'Created At']
         
-        # Export using utility
-        return ExportUtility.export_data(
-            data=export_data,
-            filename=filename,
-            format_type=export_format,
-            title='Expense Report'
+        if request.args.get('background'):
+            # Render on the export workers; progress is reported over /updates
+            job_format = 'pdf' if export_format.lower() == 'pdf' else 'csv'
+            
+            def build():
+                return ExportSource(
+                    ExpenseModel.iter_expenses(filters=filters, hostel_id=access_control['hostel_id']),
+                    headers,
+                    row_formatter=format_expense,
+                    total=ExpenseModel.count_expenses(filters=filters, hostel_id=access_control['hostel_id']),
+                    title='Expense Report'
+                )
+            return submit_export_job('expenses', job_format, filters, build,
+                                     f"{filename}.{job_format}", access_control['hostel_id'])
+        
+        # CSV and Excel (served as CSV) are streamed in batches so large exports run in flat memory
+        return ExportUtility.stream_csv(
+            ExpenseModel.iter_expenses(filters=filters, hostel_id=access_control['hostel_id']),
+            filename=f"{filename}.csv",
+            headers=headers,
+            row_formatter=format_expense
         )
         
     except Exception as e:
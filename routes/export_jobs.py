@@ -0,0 +1,60 @@
+"""
+Export job routes for the Hostel Management System
+Status and download of exports rendered in the background (see utils.export_jobs)
+"""
+from flask import Blueprint, jsonify, url_for, g, send_file
+from utils.export_jobs import export_jobs, COMPLETED
+
+export_jobs_bp = Blueprint('export_jobs', __name__, url_prefix='/exports/jobs')
+
+
+def can_access_job(job):
+    """Owners see every export; others see the exports they submitted and their hostel's."""
+    if not (hasattr(g, 'user') and g.user):
+        return False
+    if g.user.get('role') == 'owner':
+        return True
+    return g.user.get('id') in job.subscribers or (
+        job.hostel_id is not None and job.hostel_id == g.user.get('hostel_id')
+    )
+
+
+def job_response(job, reused=False, status_code=200):
+    """JSON description of a job, with links to poll it and download the result."""
+    data = job.to_dict()
+    data['reused'] = reused
+    data['status_url'] = url_for('export_jobs.job_status', job_id=job.id)
+    if job.status == COMPLETED:
+        data['download_url'] = url_for('export_jobs.download', job_id=job.id)
+    return jsonify({'success': True, 'job': data}), status_code
+
+
+def submit_export_job(kind, export_format, params, build, filename, hostel_id=None):
+    """Queue an export from a route and return the 202 response describing the job."""
+    user_id = g.user.get('id') if hasattr(g, 'user') and g.user else None
+    try:
+        job, reused = export_jobs.submit(kind, export_format, params, build, filename,
+                                         user_id=user_id, hostel_id=hostel_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return job_response(job, reused=reused, status_code=202)
+
+
+@export_jobs_bp.route('/<job_id>')
+def job_status(job_id):
+    """Current status and progress of an export job."""
+    job = export_jobs.get(job_id)
+    if job is None or not can_access_job(job):
+        return jsonify({'success': False, 'message': 'Export job not found'}), 404
+    return job_response(job)
+
+
+@export_jobs_bp.route('/<job_id>/download')
+def download(job_id):
+    """Serve the artifact of a finished export job."""
+    job = export_jobs.get(job_id)
+    if job is None or not can_access_job(job):
+        return jsonify({'success': False, 'message': 'Export job not found'}), 404
+    if job.status != COMPLETED:
+        return jsonify({'success': False, 'message': f'Export is {job.status}', 'job': job.to_dict()}), 409
+    return send_file(job.path, as_attachment=True, download_name=job.filename, mimetype=job.mimetype)
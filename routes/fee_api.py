@@ -4,6 +4,7 @@ API routes for the fee management system
 from flask import Blueprint, jsonify, request
 from utils.fee_utils import update_overdue_fees, get_student_fee_summary
 from db_utils import get_db_connection
+from utils.invalidation import invalidate_hostel
 from datetime import date
 
 fee_api_bp = Blueprint('fee_api', __name__, url_prefix='/api/fees')
@@ -63,6 +64,7 @@ def mark_fee_paid(fee_id):
             ('Paid', today, fee_id)
         )
         conn.commit()
+        invalidate_hostel(fee['hostel_id'], 'fees')
         
         return jsonify({
             'success': True,
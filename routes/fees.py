@@ -8,6 +8,10 @@ from utils.date_utils import parse_date, format_date, get_month_range, get_date_
 from utils.export import ExportUtility
 from utils.user_utils import get_user_attribute
 from db_utils import get_db_connection, DatabaseConnection
+from utils.invalidation import invalidate_hostel
+from utils.export_jobs import ExportSource
+from routes.export_jobs import submit_export_job
+from utils.pagination import DEFAULT_PER_PAGE
 import json
 
 # Import for Socket.IO real-time updates
@@ -124,8 +128,6 @@ def view_fees():
         'hostel_id': hostel_id
     }
     
-    # Get fees with filters
-    fees = FeeModel.get_all_fees_with_students(filter_params, hostel_id)
       # Get data for filter dropdowns
     statuses = FeeModel.get_unique_statuses(hostel_id)
     
@@ -139,7 +141,8 @@ def view_fees():
     # Determine the view mode (list, calendar, or card)
     view_mode = request.args.get('view', 'list')
     if view_mode == 'calendar':
-        # Prepare calendar data
+        # The calendar shows every fee in the range at once
+        fees = FeeModel.get_all_fees_with_students(filter_params, hostel_id)
         calendar_data = prepare_calendar_data(fees)
         
         return render_template(
@@ -154,10 +157,19 @@ def view_fees():
             hostels_list=hostels_list
         )
     else:
-        # Standard list or card view
+        # Standard list or card view, one page at a time
+        page = FeeModel.get_fees_page(
+            filter_params,
+            hostel_id,
+            cursor=request.args.get('cursor'),
+            per_page=request.args.get('per_page', DEFAULT_PER_PAGE),
+            with_total=True
+        )
         return render_template(
             'view_fees.html',
-            fees=fees,
+            fees=page.items,
+            page=page,
+            fee_summary=FeeModel.get_fees_summary(filter_params, hostel_id),
             statuses=statuses,
             filter_params=filter_params,
             view_mode=view_mode,
@@ -407,45 +419,27 @@ def add_batch_fees():
                                   selected_hostel_id=selected_hostel_id,
                                   current_hostel_name=current_hostel_name)
         
-        # Add fees for each selected student
-        success_count = 0
-        added_fees = []
-        for student_id in student_ids:
-            try:
-                result = FeeModel.add_fee({
-                    'student_id': int(student_id),
-                    'amount': amount,
-                    'due_date': due_date,
-                    'status': 'Pending',
-                    'description': description                }, hostel_id=hostel_id)
-                
-                if result.get('success', False):
-                    success_count += 1
-                    student = StudentModel.get_student_by_id(int(student_id))
-                    if student:
-                        added_fees.append({
-                            'fee_id': result.get('fee_id'),
-                            'student_id': int(student_id),
-                            'student_name': student.get('name', 'Unknown'),
-                            'amount': amount
-                        })
-                else:
-                    flash(f'Error adding fee for student ID {student_id}: {result.get("error", "Unknown error")}', 'error')
-            except Exception as e:
-                flash(f'Error adding fee for student ID {student_id}: {str(e)}', 'error')
+        # Add all the fees in set-based chunks; repeating the batch adds nothing twice
+        success_count, errors = FeeModel.add_batch_fees(
+            student_ids, amount, due_date, description or 'Fee', hostel_id=hostel_id
+        )
+        for error in errors[:10]:
+            flash(f'Error adding fee: {error}', 'error')
+        skipped = len(set(student_ids)) - success_count - len(errors)
+        if skipped > 0:
+            flash(f'Skipped {skipped} students who already have this fee.', 'info')
         
         if success_count > 0:
             flash(f'Successfully added fees for {success_count} students!', 'success')
             
             # Emit real-time update for batch fee addition
             try:
-                if socketio and added_fees:
+                if socketio:
                     emit_fee_event('fees_batch_added', {
                         'count': success_count,
                         'amount': amount,
                         'due_date': due_date,
                         'hostel_id': hostel_id,
-                        'fees': added_fees,
                         'timestamp': datetime.now().isoformat(),
                         'action': 'fees_batch_added',
                         'user': get_user_attribute('name') or get_user_attribute('username', 'System')
@@ -551,6 +545,7 @@ def delete_fee(fee_id):
                 conn.execute('DELETE FROM fees WHERE id = ?', (fee_id,))
                 
             conn.commit()
+            invalidate_hostel(fee_data_for_event['hostel_id'], 'fees')
             flash('Fee deleted successfully!', 'success')
             
             # Emit real-time update for fee deletion
@@ -738,55 +733,66 @@ def export_fees():
     if amount_max > 0:
         filter_params['amount_max'] = amount_max
     
-    # Get fees data with the applied filters including hostel_id
-    fees = FeeModel.get_all_fees_with_students(filter_params, hostel_id)
-    
-    # Convert SQLite Row objects to dictionaries
-    fee_data = []
-    for fee in fees:
-        fee_dict = dict(fee) if isinstance(fee, dict) else fee  # Ensure fee is a dictionary
-        fee_data.append({
-            'ID': fee_dict.get('id', ''),
-            'Student Name': fee_dict.get('student_name', ''),
-            'Amount': f"${fee_dict.get('amount', 0)}",
-            'Due Date': fee_dict.get('due_date', ''),
-            'Paid Date': fee_dict.get('paid_date', '') or '-',
-            'Status': fee_dict.get('status', ''),
-            'Hostel': fee_dict.get('hostel_name', '') or current_hostel_name or 'Unknown'
-        })
+    def format_fee(fee):
+        return {
+            'ID': fee.get('id', ''),
+            'Student Name': fee.get('student_name', ''),
+            'Amount': f"${fee.get('amount', 0)}",
+            'Due Date': fee.get('due_date', ''),
+            'Paid Date': fee.get('paid_date', '') or '-',
+            'Status': fee.get('status', ''),
+            'Hostel': fee.get('hostel_name', '') or current_hostel_name or 'Unknown'
+        }
     
     # Determine export format
     export_format = request.args.get('format', 'csv').lower()
     
     # Prepare file name
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    headers = ['ID', 'Student Name', 'Amount', 'Due Date', 'Paid Date', 'Status', 'Hostel']
+    
+    # Determine a title based on filters
+    title = "Fee Report"
+    if status_filter:
+        title += f" - {status_filter} Fees"
+    elif date_range:
+        title += f" - {date_range.replace('_', ' ').title()} Fees"
+    
+    # Add hostel name to title if available
+    if current_hostel_name:
+        title += f" - {current_hostel_name}"
+    
+    # Generate description text
+    description = "Fee report generated on " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if start_date and end_date:
+        description += f"\nPeriod: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
+    elif start_date:
+        description += f"\nFrom: {start_date.strftime('%Y-%m-%d')}"
+    elif end_date:
+        description += f"\nUntil: {end_date.strftime('%Y-%m-%d')}"
+    
+    if student_name:
+        description += f"\nStudent: {student_name}"
+    
+    if request.args.get('background'):
+        # Render on the export workers; progress is reported over /updates
+        def build():
+            return ExportSource(
+                FeeModel.iter_fees_with_students(filter_params, hostel_id),
+                headers,
+                row_formatter=format_fee,
+                total=FeeModel.count_fees_with_students(filter_params, hostel_id),
+                title=title,
+                description=description
+            )
+        prefix = 'fees_report' if export_format == 'pdf' else 'fees_export'
+        return submit_export_job('fees', export_format, filter_params, build,
+                                 f"{prefix}_{timestamp}.{export_format}", hostel_id)
     
     if export_format == 'pdf':
-        # Determine a title based on filters
-        title = "Fee Report"
-        if status_filter:
-            title += f" - {status_filter} Fees"
-        elif date_range:
-            title += f" - {date_range.replace('_', ' ').title()} Fees"
-        
-        # Add hostel name to title if available
-        if current_hostel_name:
-            title += f" - {current_hostel_name}"
-        
-        # Generate description text
-        description = "Fee report generated on " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        if start_date and end_date:
-            description += f"\nPeriod: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-        elif start_date:
-            description += f"\nFrom: {start_date.strftime('%Y-%m-%d')}"
-        elif end_date:
-            description += f"\nUntil: {end_date.strftime('%Y-%m-%d')}"
-        
-        if student_name:
-            description += f"\nStudent: {student_name}"
-        
-        # Column headers
-        headers = ['ID', 'Student Name', 'Amount', 'Due Date', 'Paid Date', 'Status', 'Hostel']
+        # Get fees data with the applied filters including hostel_id
+        fees = FeeModel.get_all_fees_with_students(filter_params, hostel_id)
+        fee_data = [format_fee(fee) for fee in fees]
         
         # Generate PDF
         return ExportUtility.export_to_pdf(
@@ -796,12 +802,12 @@ def export_fees():
             description=description,
             headers=headers
         )
-    else:  # Default to CSV
-        headers = ['ID', 'Student Name', 'Amount', 'Due Date', 'Paid Date', 'Status', 'Hostel']
-        return ExportUtility.export_to_csv(
-            data=fee_data,
+    else:  # Default to CSV, streamed in batches so large exports run in flat memory
+        return ExportUtility.stream_csv(
+            FeeModel.iter_fees_with_students(filter_params, hostel_id),
             filename=f"fees_export_{timestamp}.csv",
-            headers=headers
+            headers=headers,
+            row_formatter=format_fee
         )
 
 @fee_bp.route('/send_reminders', methods=['POST'])
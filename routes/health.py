@@ -2,12 +2,19 @@
 Health Check Route
 Comprehensive health monitoring for production deployment
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
+import hmac
 import os
 import time
 import psutil
 from datetime import datetime, timedelta
 from db_utils import get_db_connection
+from utils.db_pool import get_pool_stats
+from utils.cache import get_cache_stats
+from utils.invalidation import bus as invalidation_bus
+from utils.scheduler import FAILED, scheduler
+from utils.dashboard_updates import dashboard_updates
+from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, exposition
 import subprocess
 
 health_bp = Blueprint('health', __name__)
@@ -46,6 +53,65 @@ def health_check():
         }
         overall_status = False
     
+    # Connection pool usage
+    try:
+        pools = get_pool_stats()
+        exhausted = any(p['in_use'] >= p['max_size'] and p['waiting'] > 0 for p in pools)
+        health_data['components']['database_pool'] = {
+            'status': 'warning' if exhausted else 'healthy',
+            'pools': pools
+        }
+    except Exception as e:
+        health_data['components']['database_pool'] = {
+            'status': 'warning',
+            'message': f'Pool metrics unavailable: {str(e)}'
+        }
+    
+    # Cache backend and hit ratio
+    try:
+        cache_stats = get_cache_stats()
+        degraded = cache_stats['backend'] == 'redis' and not cache_stats['available']
+        health_data['components']['cache'] = {
+            'status': 'warning' if degraded else 'healthy',
+            'message': 'Redis cache unavailable, using in-memory fallback' if degraded else 'Cache operational',
+            'stats': cache_stats,
+            'invalidation': invalidation_bus.stats()
+        }
+    except Exception as e:
+        health_data['components']['cache'] = {
+            'status': 'warning',
+            'message': f'Cache metrics unavailable: {str(e)}'
+        }
+    
+    # Background jobs: last run, timing and recent history per job
+    try:
+        scheduler_stats = scheduler.stats()
+        failing = [name for name, job in scheduler_stats['jobs'].items() if job['last_status'] == FAILED]
+        health_data['components']['scheduler'] = {
+            'status': 'warning' if failing else 'healthy',
+            'message': f"Last run failed: {', '.join(failing)}" if failing else 'Scheduled jobs operational',
+            'stats': scheduler_stats
+        }
+    except Exception as e:
+        health_data['components']['scheduler'] = {
+            'status': 'warning',
+            'message': f'Scheduler metrics unavailable: {str(e)}'
+        }
+    
+    # Dashboard updates: how many changes were merged into each emit
+    try:
+        update_stats = dashboard_updates.stats()
+        health_data['components']['dashboard_updates'] = {
+            'status': 'warning' if update_stats['errors'] else 'healthy',
+            'message': f"{update_stats['merged']} of {update_stats['marked']} updates merged",
+            'stats': update_stats
+        }
+    except Exception as e:
+        health_data['components']['dashboard_updates'] = {
+            'status': 'warning',
+            'message': f'Dashboard update metrics unavailable: {str(e)}'
+        }
+    
     # Check Redis connectivity (optional)
     try:
         import redis
@@ -156,6 +222,15 @@ def readiness_check():
             'timestamp': datetime.utcnow().isoformat()
         }), 503
 
+@health_bp.route('/health/db-pool')
+def db_pool_stats():
+    """Connection pool metrics (in-use, idle, wait time) for every pool in this process"""
+    return jsonify({
+        'pools': get_pool_stats(),
+        'pid': os.getpid(),
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
+
 @health_bp.route('/health/live')
 def liveness_check():
     """Kubernetes/Docker liveness probe"""
@@ -164,6 +239,14 @@ def liveness_check():
         'timestamp': datetime.utcnow().isoformat()
     }), 200
 
+@health_bp.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint (all workers' metrics in multiprocess mode)"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(exposition(), content_type=METRICS_CONTENT_TYPE)
+
 def get_uptime():
     """Get application uptime"""
     try:
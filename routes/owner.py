@@ -22,19 +22,19 @@ def dashboard():
     # Get all hostels
     hostels = Hostel.get_all_hostels()
     
-    # Get statistics for each hostel
+    # Get statistics for every hostel in one batch
+    stats_by_hostel = Hostel.get_dashboard_stats_bulk()
     hostels_data = []
     
     for hostel in hostels:
-        stats = Hostel.get_dashboard_stats(hostel.id)
         hostels_data.append({
             'id': hostel.id,
             'name': hostel.name,
             'address': hostel.address,
-            'stats': stats
+            'stats': stats_by_hostel.get(hostel.id) or Hostel.get_dashboard_stats(hostel.id)
         })
-      # Get overall statistics
-    overall_stats = Hostel.get_dashboard_stats()
+    # Overall statistics are the sum of the hostels'
+    overall_stats = Hostel.sum_dashboard_stats(stats_by_hostel)
       # Get recent activity for owner dashboard with hostel names
     with get_db_connection() as conn:
         recent_activity = get_recent_activity(conn, limit=10, include_hostel_names=True)
@@ -0,0 +1,58 @@
+"""
+Sampling profiler routes for the Hostel Management System
+Owner-only sessions of utils.profiler, available when PROFILER_ENABLED is set
+"""
+from flask import Blueprint, Response, abort, current_app, g, jsonify, request
+from utils.auth_utils import login_required
+from utils.profiler import DEFAULT_DURATION, MAX_DURATION, profiler
+
+profiler_bp = Blueprint('profiler', __name__, url_prefix='/admin/profiler')
+
+
+@profiler_bp.before_request
+@login_required
+def owner_only():
+    """The profiler does not exist unless enabled, and only owners may use it."""
+    if not current_app.config.get('PROFILER_ENABLED'):
+        abort(404)
+    if g.user.get('role') != 'owner':
+        return jsonify({'error': 'Access denied'}), 403
+
+
+@profiler_bp.route('/start', methods=['POST'])
+def start():
+    """Start sampling for ?seconds= (default 10) every ?interval_ms= (default PROFILER_INTERVAL_MS)."""
+    try:
+        seconds = float(request.args.get('seconds', DEFAULT_DURATION))
+        interval_ms = float(request.args.get('interval_ms', current_app.config.get('PROFILER_INTERVAL_MS', 5)))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'seconds and interval_ms must be numbers'}), 400
+    max_seconds = min(current_app.config.get('PROFILER_MAX_SECONDS', 60), MAX_DURATION)
+    if not 0 < seconds <= max_seconds:
+        return jsonify({'success': False, 'message': f'seconds must be between 0 and {max_seconds}'}), 400
+
+    all_threads = request.args.get('all_threads', '').lower() in ['true', 'on', '1']
+    if not profiler.start(seconds, interval_ms / 1000, all_threads=all_threads):
+        return jsonify({'success': False, 'message': 'A profiling session is already running',
+                        'status': profiler.status()}), 409
+    return jsonify({'success': True, 'status': profiler.status()}), 202
+
+
+@profiler_bp.route('/stop', methods=['POST'])
+def stop():
+    """End the running session early."""
+    profiler.stop()
+    return jsonify({'success': True, 'status': profiler.status()})
+
+
+@profiler_bp.route('/')
+def report():
+    """Status of the last session and the top frames per endpoint (?limit=, default 15)."""
+    limit = request.args.get('limit', 15, type=int)
+    return jsonify({'status': profiler.status(), 'endpoints': profiler.top_frames(limit)})
+
+
+@profiler_bp.route('/collapsed')
+def collapsed():
+    """Collapsed stacks of the last session (optionally ?endpoint=), for flamegraph.pl or speedscope."""
+    return Response(profiler.collapsed(request.args.get('endpoint')), mimetype='text/plain')
@@ -5,6 +5,8 @@ Enhanced with comprehensive room management features
 from flask import Blueprint, render_template, request, redirect, url_for, flash, g, jsonify, current_app
 from models.db import RoomModel, StudentModel
 from utils.export import ExportUtility
+from utils.export_jobs import ExportSource
+from routes.export_jobs import submit_export_job
 from datetime import datetime
 from db_utils import get_db_connection, DatabaseConnection
 from models.hostels import Hostel
@@ -457,16 +459,11 @@ def export_rooms():
         access_control = get_hostel_access_control()
         hostel_id = access_control['hostel_id']
         
-        # Get rooms data with enhanced information
-        rooms = RoomModel.get_all_rooms(hostel_id=hostel_id, include_students=True)
-        
-        # Convert to export format
-        room_data = []
-        for room in rooms:
+        def format_room(room):
             # Calculate occupancy percentage
             occupancy_percentage = room.get('occupancy_percentage', 0)
             
-            room_data.append({
+            return {
                 'Room Number': room['room_number'],
                 'Hostel': room.get('hostel_name', 'N/A'),
                 'Capacity': room['capacity'],
@@ -476,25 +473,51 @@ def export_rooms():
                 'Students': room.get('student_names', 'None'),
                 'Complaints': room.get('complaint_count', 0),
                 'Last Complaint': room.get('last_complaint_date', 'None')
-            })
+            }
         
         # Determine export format
         export_format = request.args.get('format', 'csv').lower()
         
         # Prepare file name
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        title = "Room Management Report"
+        description = f"Comprehensive room report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        
+        if request.args.get('background'):
+            # Render on the export workers; progress is reported over /updates
+            if export_format == 'pdf':
+                headers = ['Room Number', 'Hostel', 'Capacity', 'Occupancy', 'Status', 'Students', 'Complaints']
+            else:
+                headers = ['Room Number', 'Hostel', 'Capacity', 'Current Occupancy', 'Occupancy', 'Status', 'Students', 'Complaints', 'Last Complaint']
+            
+            def build():
+                return ExportSource(
+                    RoomModel.iter_all_rooms(hostel_id=hostel_id, include_students=True),
+                    headers,
+                    row_formatter=format_room,
+                    total=RoomModel.count_rooms(hostel_id=hostel_id),
+                    title=title,
+                    description=description
+                )
+            prefix = 'rooms_report' if export_format == 'pdf' else 'rooms_export'
+            return submit_export_job('rooms', export_format, {}, build,
+                                     f"{prefix}_{timestamp}.{export_format}", hostel_id)
         
         if export_format == 'pdf':
             # Column headers for PDF
             headers = ['Room Number', 'Hostel', 'Capacity', 'Occupancy', 'Status', 'Students', 'Complaints']
             
             try:
+                # Get rooms data with enhanced information
+                rooms = RoomModel.get_all_rooms(hostel_id=hostel_id, include_students=True)
+                room_data = [format_room(room) for room in rooms]
+                
                 # Generate PDF
                 pdf_response = ExportUtility.export_to_pdf(
                     data=room_data,
                     filename=f"rooms_report_{timestamp}.pdf",
-                    title="Room Management Report",
-                    description=f"Comprehensive room report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    title=title,
+                    description=description,
                     headers=headers
                 )
                 
@@ -506,12 +529,13 @@ def export_rooms():
             except Exception as e:
                 flash(f'Error generating PDF: {str(e)}', 'error')
                 return redirect(url_for('room.view_rooms'))
-        else:  # Default to CSV
+        else:  # Default to CSV, streamed in batches so large exports run in flat memory
             headers = ['Room Number', 'Hostel', 'Capacity', 'Current Occupancy', 'Occupancy', 'Status', 'Students', 'Complaints', 'Last Complaint']
-            return ExportUtility.export_to_csv(
-                data=room_data,
+            return ExportUtility.stream_csv(
+                RoomModel.iter_all_rooms(hostel_id=hostel_id, include_students=True),
                 filename=f"rooms_export_{timestamp}.csv",
-                headers=headers
+                headers=headers,
+                row_formatter=format_room
             )
     except Exception as e:
         flash(f'Error exporting rooms data: {str(e)}', 'error')
@@ -37,10 +37,11 @@ def get_stats():
         return jsonify({'error': 'Access denied'}), 403
     
     try:
-        from utils.socket_utils import get_connected_users_count
+        import socket_events
         
-        # Update current connections
-        current = get_connected_users_count()
+        # Update current connections (shared across workers when presence is in Redis)
+        presence = socket_events.connection_manager.stats()
+        current = presence['sessions']
         connection_stats['current_connections'] = current
         
         # Update peak if necessary
@@ -65,6 +66,7 @@ def get_stats():
             'success': True,
             'stats': {
                 **connection_stats,
+                'presence': presence,
                 'uptime_seconds': int(uptime.total_seconds()),
                 'uptime_formatted': str(uptime).split('.')[0],
                 'timestamp': now.isoformat()
@@ -1,7 +1,7 @@
 """
 Student management routes for the Hostel Management System
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, g, current_app, jsonify
 from models.db import StudentModel, RoomModel
 from models.hostels import Hostel # Add this import
 from flask import g # Ensure g is imported
@@ -9,7 +9,10 @@ from utils.validators import validate_student_data
 from utils.file_handlers import save_profile_photo
 from datetime import date, datetime
 from db_utils import get_db_connection, DatabaseConnection
-from utils.socket_utils import emit_student_event
+from utils.socket_utils import emit_student_event, emit_dashboard_update
+from utils.pagination import DEFAULT_PER_PAGE
+from utils.invalidation import invalidate_hostel
+from utils.user_utils import get_user_attribute
 
 student_bp = Blueprint('student', __name__, url_prefix='/students')
 
@@ -23,7 +26,12 @@ def view_students():
         'filter_course': request.args.get('filter_course', '')
     }
     
-    students = StudentModel.get_all_students(search_params)
+    page = StudentModel.get_students_page(
+        search_params,
+        cursor=request.args.get('cursor'),
+        per_page=request.args.get('per_page', DEFAULT_PER_PAGE),
+        with_total=True
+    )
     courses = StudentModel.get_all_courses()
     
     # Determine the view mode (list or card)
@@ -31,12 +39,35 @@ def view_students():
     
     return render_template(
         'students/view_students.html', 
-        students=students, 
+        students=page.items, 
+        page=page,
         courses=courses,
         search_params=search_params,
         view_mode=view_mode
     )
 
+@student_bp.route('/api/search')
+def api_search_students():
+    """Typeahead: ranked students matching ?q= (managers only see their hostel)."""
+    try:
+        hostel_id = request.args.get('hostel_id', type=int)
+        if get_user_attribute('role') == 'manager':
+            # Managers are restricted to their assigned hostel
+            hostel_id = get_user_attribute('hostel_id')
+        data = StudentModel.search(
+            request.args.get('q', ''),
+            hostel_id=hostel_id,
+            limit=request.args.get('limit', 10, type=int)
+        )
+        for student in data['results']:
+            student['url'] = url_for('student.view_student', student_id=student['id'])
+        return jsonify({'success': True, **data})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @student_bp.route('/add', methods=['GET', 'POST'])
 def add_student():
     """Add a new student."""
@@ -151,6 +182,7 @@ def add_student():
                         }
                         
                         emit_student_event('student_added', event_data, student_data.get('hostel_id'))
+                        emit_dashboard_update(student_data.get('hostel_id'), update_type='student_added')
                         
                 except Exception as socket_error:
                     print(f"Socket.IO error in student addition: {socket_error}")
@@ -331,6 +363,7 @@ def edit_student(student_id):
                     }
                     
                     emit_student_event('student_updated', event_data, student_data.get('hostel_id'))
+                    emit_dashboard_update(student_data.get('hostel_id'), update_type='student_updated')
                     
                     # If room assignment changed, emit additional event
                     if original_room_id != student_data.get('room_id'):
@@ -400,6 +433,7 @@ def delete_student(student_id):
                 }
                 
                 emit_student_event('student_deleted', event_data, student_dict.get('hostel_id'))
+                emit_dashboard_update(student_dict.get('hostel_id'), update_type='student_deleted')
                 
             except Exception as socket_error:
                 print(f"Socket.IO error in student deletion: {socket_error}")
@@ -447,6 +481,13 @@ def bulk_transfer():
                 return redirect(request.referrer or url_for('room.view_rooms'))
             
             capacity, current_occupancy = room_info
+            
+            # Hostels whose dashboards change: the destination's and those of the students' current rooms
+            affected_hostels = {row[0] for row in cursor.execute(
+                f"""SELECT hostel_id FROM rooms WHERE id = ? OR id = ?
+                    OR id IN (SELECT room_id FROM students WHERE id IN ({', '.join('?' * len(student_ids))}))""",
+                (destination_room_id, source_room_id, *student_ids)
+            ).fetchall()}
             available_space = capacity - current_occupancy
             
             if len(student_ids) > available_space:
@@ -490,6 +531,8 @@ def bulk_transfer():
             )
             
             conn.commit()
+            # Source and destination may belong to different hostels
+            invalidate_hostel(None, 'students', 'rooms')
             
             # Emit Socket.IO event for real-time updates
             if transferred_count > 0:
@@ -507,6 +550,9 @@ def bulk_transfer():
                     }
                     
                     emit_student_event('students_bulk_transfer', event_data, g.user.get('hostel_id') if g.user else None)
+                    # Each affected hostel's dashboard, and the owners' overview (None)
+                    for hostel_id in affected_hostels | {None}:
+                        emit_dashboard_update(hostel_id, update_type='students_bulk_transfer')
                     
                 except Exception as socket_error:
                     print(f"Socket.IO error in bulk transfer: {socket_error}")
@@ -202,6 +202,9 @@ def initialize_fresh_database():
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        # Batch fee generation relies on this key to skip fees that already exist; with
+        # fee_type NOT NULL it also rejects a hand-added fee of the same type and due date
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_fees_student_type_due ON fees(student_id, fee_type, due_date)')
         
         # Create fee_payments table
         cursor.execute('''
@@ -9,6 +9,7 @@ import uuid
 from datetime import datetime
 from db_utils import get_db_connection
 from routes.auth import login_required
+from utils.metrics import socketio_connected, socketio_connections
 
 # Simple in-memory connection manager (no Redis dependency)
 class SimpleConnectionManager:
@@ -30,7 +31,7 @@ class SimpleConnectionManager:
             print(f"Error adding user session: {e}")
             return False
     
-    def remove_user_session(self, user_id: int, session_id: str) -> bool:
+    def remove_user_session(self, user_id: int, session_id: str, hostel_id=None) -> bool:
         """Remove a user session from tracking"""
         try:
             if session_id in self._sessions:
@@ -45,10 +46,22 @@ class SimpleConnectionManager:
             print(f"Error removing user session: {e}")
             return False
     
+    def heartbeat(self, session_id: str, user_id=None, hostel_id=None) -> bool:
+        """Sessions end with a disconnect in a single process; nothing to refresh"""
+        return session_id in self._sessions
+    
     def get_online_session_count(self) -> int:
         """Get total number of online sessions"""
         return len(self._sessions)
     
+    def get_online_user_count(self) -> int:
+        """Get number of distinct users with an online session"""
+        return len(self._user_sessions)
+    
+    def get_hostel_session_count(self, hostel_id: int) -> int:
+        """Get number of online sessions in a hostel"""
+        return sum(1 for data in self._sessions.values() if data.get('hostel_id') == hostel_id)
+    
     def get_user_sessions(self, user_id: int) -> set:
         """Get all active sessions for a user"""
         return self._user_sessions.get(user_id, set())
@@ -56,10 +69,28 @@ class SimpleConnectionManager:
     def get_session_data(self, session_id: str) -> dict:
         """Get session data for a specific session"""
         return self._sessions.get(session_id, {})
+    
+    def stats(self) -> dict:
+        """Online counts for monitoring"""
+        return {
+            'backend': 'memory',
+            'sessions': self.get_online_session_count(),
+            'users': self.get_online_user_count(),
+        }
 
 # Global connection manager instance
 connection_manager = SimpleConnectionManager()
 
+def configure_connection_manager(redis_url=None):
+    """Track sessions in Redis when workers share one (the Socket.IO message queue), else in memory"""
+    global connection_manager
+    if redis_url:
+        from redis_utils import RedisConnectionManager
+        connection_manager = RedisConnectionManager(redis_url)
+    else:
+        connection_manager = SimpleConnectionManager()
+    return connection_manager
+
 def register_socket_events(socketio):
     """Register all Socket.IO event handlers"""
     
@@ -91,9 +122,14 @@ def register_socket_events(socketio):
         }
         
         connection_manager.add_user_session(g.user['id'], current_sid, user_data)
+        socketio_connections.inc(event='connect')
+        socketio_connected.inc()
         online_count = connection_manager.get_online_session_count()
         print(f"User {g.user['id']} (SID: {current_sid}) connected. Total online: {online_count}")
 
+        # Personal room for user-targeted events (e.g. export job progress)
+        join_room(f"user_{g.user['id']}")
+
         # Join user to their hostel room if they have one
         if g.user.get('hostel_id'):
             join_room(f"hostel_{g.user['hostel_id']}")
@@ -118,6 +154,10 @@ def register_socket_events(socketio):
     @socketio.on('disconnect', namespace='/updates')
     def handle_disconnect():
         """Handle client disconnection"""
+        if g.user:
+            # Mirrors the connect handler, which only counts authenticated sessions
+            socketio_connections.inc(event='disconnect')
+            socketio_connected.dec()
         # Get session ID from session storage
         current_sid = session.get('socket_session_id', str(uuid.uuid4())[:12])
         
@@ -126,7 +166,7 @@ def register_socket_events(socketio):
         if session_data:
             user_id = session_data.get('user_id')
             if user_id:
-                connection_manager.remove_user_session(int(user_id), current_sid)
+                connection_manager.remove_user_session(int(user_id), current_sid, session_data.get('hostel_id'))
                 online_count = connection_manager.get_online_session_count()
                 print(f'User {user_id} (SID: {current_sid}) disconnected. Total online: {online_count}')
         else:
@@ -165,27 +205,34 @@ def register_socket_events(socketio):
 
     @socketio.on('ping', namespace='/updates')
     def handle_ping():
-        """Handle ping request for connection health check"""
+        """Handle ping request for connection health check (also the presence heartbeat)"""
+        current_sid = session.get('socket_session_id')
+        if current_sid and g.user:
+            if not connection_manager.heartbeat(current_sid, g.user['id'], g.user.get('hostel_id')):
+                # Tracking lapsed (e.g. Redis restarted); register the session again
+                connection_manager.add_user_session(g.user['id'], current_sid, {
+                    'user_id': g.user['id'],
+                    'name': g.user.get('name', ''),
+                    'role': g.user.get('role', ''),
+                    'hostel_id': g.user.get('hostel_id')
+                })
         emit('pong', {'timestamp': datetime.now().isoformat()})
 
     @socketio.on('request_dashboard_update', namespace='/updates')
     def handle_dashboard_update_request(data):
-        """Handle request for dashboard statistics update"""
+        """Handle request for a full dashboard snapshot (initial load or resync after a missed update)"""
         if not g.user:
             return
             
-        hostel_id = data.get('hostel_id')
+        hostel_id = (data or {}).get('hostel_id')
+        if g.user.get('role') == 'manager':
+            # Managers only see their assigned hostel
+            hostel_id = g.user.get('hostel_id')
         
-        # Get fresh dashboard statistics
+        # Fresh statistics with the current sequence number; later updates are deltas
         try:
-            from routes.dashboard import get_dashboard_statistics
-            stats = get_dashboard_statistics(hostel_id)
-            
-            emit('dashboard_stats_updated', {
-                'stats': stats,
-                'hostel_id': hostel_id,
-                'timestamp': datetime.now().isoformat()
-            })
+            from utils.dashboard_updates import dashboard_updates
+            emit('dashboard_stats_updated', dashboard_updates.resync(hostel_id))
         except Exception as e:
             print(f"Error getting dashboard stats: {e}")
             emit('error', {'message': 'Failed to get dashboard statistics'})
@@ -215,6 +262,7 @@ def register_socket_events(socketio):
         online_count = connection_manager.get_online_session_count()
         emit('online_users', {
             'count': online_count,
+            'users': connection_manager.get_online_user_count(),
             'message': 'Online user count retrieved'
         })
 
@@ -295,31 +343,14 @@ def emit_notification(event_type, data, hostel_id=None, target_room=None):
 
 def emit_dashboard_update(hostel_id=None, update_type='general'):
     """
-    Emit dashboard statistics update via Socket.IO
+    Queue a dashboard statistics update via Socket.IO
+
+    Updates are coalesced: bursts of changes to a hostel produce one
+    dashboard_stats_updated event (see utils.dashboard_updates).
     """
     try:
-        from app import socketio
-        from routes.dashboard import get_dashboard_statistics
-        
-        # Get updated statistics
-        stats = get_dashboard_statistics(hostel_id)
-        
-        update_data = {
-            'stats': stats,
-            'update_type': update_type,
-            'timestamp': datetime.now().isoformat(),
-            'hostel_id': hostel_id
-        }
-        
-        if hostel_id:
-            # Emit to specific hostel room
-            socketio.emit('dashboard_update', update_data, to=f'hostel_{hostel_id}', namespace='/updates')
-        else:
-            # Emit to owners room for system-wide updates
-            socketio.emit('dashboard_update', update_data, to='owners', namespace='/updates')
-            
-        print(f"Emitted dashboard update for hostel {hostel_id if hostel_id else 'system-wide'}")
-        
+        from utils.dashboard_updates import dashboard_updates
+        dashboard_updates.mark(hostel_id, update_type)
     except Exception as e:
         print(f"Error emitting dashboard update: {e}")
 
@@ -80,6 +80,13 @@ def start_production_server():
     """Start the production server using Gunicorn"""
     print("🚀 Starting production server...")
     
+    # Metrics files of the previous run's workers would be added to this run's totals
+    metrics_dir = os.environ.get('METRICS_MULTIPROC_DIR')
+    if metrics_dir:
+        from utils.metrics import clear_worker_files
+        os.makedirs(metrics_dir, exist_ok=True)
+        clear_worker_files(metrics_dir)
+    
     # Gunicorn configuration
     gunicorn_config = [
         'gunicorn',
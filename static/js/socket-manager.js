@@ -12,6 +12,8 @@ class SocketManager {
         this.connectionHealthInterval = null;
         this.eventListeners = {};
         this.messageQueue = [];
+        this.dashboardState = {};  // hostel id -> { stream, seq, stats }
+        this.exportJobs = new Set();  // ids of export jobs started from this tab
         
         this.init();
     }
@@ -70,6 +72,8 @@ class SocketManager {
             console.log(`Reconnected after ${attemptNumber} attempts`);
             this.showConnectionStatus('Reconnected', 'success');
             this.emit('reconnected');
+            // Updates sent while disconnected were missed
+            this.resyncDashboards();
         });
         
         // Application-specific events
@@ -79,10 +83,14 @@ class SocketManager {
     setupApplicationEvents() {
         // Dashboard updates
         this.socket.on('dashboard_stats_updated', (data) => {
+            const stats = this.applyDashboardUpdate(data);
+            if (!stats) {
+                return;
+            }
             console.log('Dashboard stats updated:', data);
-            this.emit('dashboard_update', data);
+            this.emit('dashboard_update', { ...data, stats });
             if (typeof updateDashboardStats === 'function') {
-                updateDashboardStats(data.stats);
+                updateDashboardStats(stats);
             }
         });
         
@@ -227,6 +235,25 @@ class SocketManager {
             this.emit('financial_alert', data);
         });
         
+        // Background export jobs
+        this.socket.on('export_progress', (data) => {
+            this.emit('export_progress', data);
+        });
+
+        // The user's other tabs receive these too; only the tab that started a job downloads it
+        this.socket.on('export_complete', (data) => {
+            this.emit('export_complete', data);
+            if (!this.exportJobs.delete(data.job_id)) return;
+            this.showNotification(`Export ready: ${data.filename}`, 'success', true);
+            window.location.href = `/exports/jobs/${data.job_id}/download`;
+        });
+
+        this.socket.on('export_failed', (data) => {
+            this.emit('export_failed', data);
+            if (!this.exportJobs.delete(data.job_id)) return;
+            this.showNotification(`Export failed: ${data.error}`, 'error', true);
+        });
+
         // Health check response
         this.socket.on('pong', (data) => {
             console.log('Connection health check OK:', data.timestamp);
@@ -297,6 +324,67 @@ class SocketManager {
         this.sendMessage('request_dashboard_update', { hostel_id: hostelId });
     }
     
+    /**
+     * Apply a versioned dashboard update and return the hostel's full statistics.
+     * Full snapshots replace the state; deltas apply only on top of the update
+     * they follow (same stream, base_seq). Otherwise a resync is requested and
+     * null is returned.
+     */
+    applyDashboardUpdate(data) {
+        const key = data.hostel_id || 'all';
+        const current = this.dashboardState[key];
+        
+        if (data.full || data.seq === undefined) {
+            if (current && data.seq !== undefined && current.stream === data.stream && data.seq < current.seq) {
+                return null;  // Older than what is shown
+            }
+            this.dashboardState[key] = { stream: data.stream, seq: data.seq, stats: { ...data.stats } };
+            return this.dashboardState[key].stats;
+        }
+        
+        if (current && current.stream === data.stream && data.seq <= current.seq) {
+            return null;  // Already applied (e.g. covered by a resync snapshot)
+        }
+        if (!current || current.stream !== data.stream || current.seq !== data.base_seq) {
+            if (!current || !current.resyncing) {
+                this.dashboardState[key] = { resyncing: true };
+                this.requestDashboardUpdate(data.hostel_id || null);
+            }
+            return null;
+        }
+        
+        const stats = { ...current.stats, ...data.changes };
+        (data.removed || []).forEach((name) => delete stats[name]);
+        this.dashboardState[key] = { stream: data.stream, seq: data.seq, stats };
+        return stats;
+    }
+    
+    resyncDashboards() {
+        Object.keys(this.dashboardState).forEach((key) => {
+            delete this.dashboardState[key];
+            this.requestDashboardUpdate(key === 'all' ? null : Number(key));
+        });
+    }
+    
+    // Start a background export (an export URL with ?background=1) and download it from this tab when ready
+    startExport(url) {
+        return fetch(url, { credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) throw new Error(data.message || 'Export could not be started');
+                this.trackExportJob(data.job);
+                return data.job;
+            });
+    }
+    
+    trackExportJob(job) {
+        if (job.status === 'completed') {
+            window.location.href = job.download_url;
+        } else {
+            this.exportJobs.add(job.job_id);
+        }
+    }
+    
     subscribeToNotifications(types) {
         this.sendMessage('subscribe_to_notifications', { types });
     }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Activity Feed Tests
+Checks that the activity report is ordered and paginated in SQL, from the source tables or the activity log
+"""
+import pytest
+
+from models.db import get_db_connection
+from utils.dashboard import get_all_activities
+
+
+@pytest.fixture
+def feed_db(models_db):
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North')")
+    conn.execute("INSERT INTO hostels (id, name) VALUES (2, 'South')")
+    for day in range(1, 21):
+        hostel_id = 1 if day % 4 else 2
+        student_id = conn.execute(
+            "INSERT INTO students (name, email, admission_date, hostel_id) VALUES (?, ?, ?, ?)",
+            (f'Student {day}', f's{day}@example.com', f'2030-01-{day:02d}', hostel_id)
+        ).lastrowid
+        fee_id = conn.execute(
+            "INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, 500, ?, 'Pending', ?)",
+            (student_id, f'2030-02-{day:02d}', hostel_id)
+        ).lastrowid
+        if day % 2:
+            conn.execute("UPDATE fees SET status = 'Paid', paid_date = ? WHERE id = ?", (f'2030-01-{day:02d}', fee_id))
+        conn.execute(
+            "INSERT INTO expenses (description, amount, expense_date, category, hostel_id) VALUES (?, 75, ?, 'Food', ?)",
+            (f'Groceries {day}', f'2030-01-{day:02d}', hostel_id)
+        )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def feed(conn, **kwargs):
+    return [(a['type'], a['entity_id'], a['time']) for a in get_all_activities(conn, **kwargs)['activities']]
+
+
+def without_activity_log(conn):
+    conn.execute('DROP TABLE activity_log')
+
+
+def test_triggers_log_every_activity(feed_db):
+    conn = get_db_connection()
+    try:
+        counts = dict(conn.execute(
+            'SELECT activity_type, COUNT(*) FROM activity_log GROUP BY activity_type'
+        ).fetchall())
+        # Paying a fee again does not log a second payment
+        conn.execute("UPDATE fees SET paid_date = '2030-01-30' WHERE id = 1")
+        assert conn.execute("SELECT COUNT(*) FROM activity_log WHERE activity_type = 'fee'").fetchone()[0] == 10
+    finally:
+        conn.rollback()
+        conn.close()
+    assert counts == {'student': 20, 'fee': 10, 'expense': 20}
+
+
+@pytest.mark.parametrize('hostel_id', [None, 1, 2])
+def test_union_and_activity_log_return_the_same_pages(feed_db, hostel_id):
+    conn = get_db_connection()
+    try:
+        from_log = [feed(conn, page=page, per_page=7, hostel_id=hostel_id) for page in range(1, 9)]
+        without_activity_log(conn)
+        from_union = [feed(conn, page=page, per_page=7, hostel_id=hostel_id) for page in range(1, 9)]
+    finally:
+        conn.rollback()
+        conn.close()
+    assert from_log == from_union
+
+    entries = [entry for page in from_union for entry in page]
+    expected = 50 if hostel_id is None else (40 if hostel_id == 1 else 10)
+    assert len(entries) == len(set(entries)) == expected
+    # Newest first, ties broken by type and id
+    keys = [(time, kind, entity_id) for kind, entity_id, time in entries]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_page_metadata_and_descriptions(feed_db):
+    conn = get_db_connection()
+    try:
+        without_activity_log(conn)
+        data = get_all_activities(conn, page=2, per_page=20)
+    finally:
+        conn.rollback()
+        conn.close()
+    assert data['total'] == 50 and data['total_pages'] == 3
+    assert data['has_prev'] and data['has_next']
+    descriptions = {a['type']: a['description'] for a in data['activities']}
+    assert descriptions['student'].startswith('New student Student ')
+    assert descriptions['fee'].startswith('Payment of $500.0 received from Student ')
+    assert descriptions['expense'].startswith('Expense: Groceries ')
+
+
+def test_union_branches_read_only_one_page(feed_db):
+    conn = get_db_connection()
+    statements = []
+    conn.raw_connection.set_trace_callback(statements.append)
+    try:
+        without_activity_log(conn)
+        statements.clear()
+        get_all_activities(conn, page=1, per_page=5, hostel_id=1)
+    finally:
+        conn.raw_connection.set_trace_callback(None)
+        conn.rollback()
+        conn.close()
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+    assert len(selects) == 3  # activity_log lookup, page, total
+    assert selects[1].count('LIMIT 5') == 4  # each branch and the merged page
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Batch Fee Tests
+Checks that batch fees are inserted set-based in chunks and that rerunning a batch adds nothing twice
+"""
+import pytest
+
+from models.db import FeeModel, HostelStatsModel, get_db_connection, init_db
+from utils.batch_processing import generate_recurring_fees, process_batch_fees
+
+
+@pytest.fixture
+def batch_db(models_db):
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North')")
+    conn.execute("INSERT INTO hostels (id, name) VALUES (2, 'South')")
+    conn.executemany(
+        "INSERT INTO students (id, name, email, course, hostel_id) VALUES (?, ?, ?, ?, ?)",
+        [(n, f'Student {n}', f's{n}@example.com', 'CS' if n % 2 else 'EE', 1 if n <= 40 else 2)
+         for n in range(1, 51)]
+    )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def fee_count(**where):
+    conn = get_db_connection()
+    try:
+        conditions = ' AND '.join(f'{column} = ?' for column in where) or '1 = 1'
+        return conn.execute(f'SELECT COUNT(*) FROM fees WHERE {conditions}', tuple(where.values())).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_rerunning_a_batch_is_a_no_op(batch_db):
+    progress = []
+    conn = get_db_connection()
+    try:
+        first = process_batch_fees(conn, list(range(1, 51)), 500, '2030-01-01', 'Monthly Fee',
+                                   chunk_size=15, progress=lambda *args: progress.append(args))
+        again = process_batch_fees(conn, list(range(1, 51)), 500, '2030-01-01', 'Monthly Fee', chunk_size=15)
+    finally:
+        conn.close()
+
+    assert first == (50, []) and again == (0, [])
+    assert progress == [(15, 50, 15), (30, 50, 30), (45, 50, 45), (50, 50, 50)]
+    assert fee_count() == 50
+    assert fee_count(hostel_id=2, fee_type='Monthly Fee') == 10
+    assert HostelStatsModel.check() == []
+
+
+def test_missing_and_invalid_students_are_reported(batch_db):
+    added, errors = FeeModel.add_batch_fees(['1', '2', 2, 999, 'abc'], 100, '2030-02-01', 'Library Fee')
+    assert added == 2
+    assert errors == ["Invalid student ID 'abc'", 'Student ID 999 not found']
+
+
+def test_hostel_filter_skips_other_hostels(batch_db):
+    added, errors = FeeModel.add_batch_fees([39, 40, 41], 100, '2030-02-01', 'Fee', hostel_id=1)
+    assert added == 2 and errors == ['Student ID 41 not found']
+    assert fee_count(student_id=41) == 0
+
+
+def test_other_fee_types_and_due_dates_are_separate(batch_db):
+    assert FeeModel.add_batch_fees([1], 100, '2030-02-01', 'Monthly Fee') == (1, [])
+    assert FeeModel.add_batch_fees([1], 100, '2030-03-01', 'Monthly Fee') == (1, [])
+    assert FeeModel.add_batch_fees([1], 100, '2030-02-01', 'Library Fee') == (1, [])
+    # Fees added without a fee type are never treated as duplicates
+    for _ in range(2):
+        assert FeeModel.add_fee({'student_id': 1, 'amount': 100, 'due_date': '2030-02-01'})['success']
+    assert fee_count(student_id=1) == 5
+
+
+def test_a_duplicate_typed_fee_added_by_hand_is_reported(batch_db):
+    fee = {'student_id': 1, 'amount': 100, 'due_date': '2030-02-01', 'fee_type': 'Monthly Fee'}
+    assert FeeModel.add_fee(fee)['success']
+    result = FeeModel.add_fee(fee)
+    assert not result['success']
+    assert result['error'] == "A 'Monthly Fee' fee due on 2030-02-01 already exists for this student"
+    assert fee_count(student_id=1) == 1
+
+
+def test_init_db_removes_duplicates_before_adding_the_key(batch_db):
+    conn = get_db_connection()
+    conn.execute('DROP INDEX uq_fees_student_type_due')  # A database from before the key
+    for status in ('Pending', 'Paid', 'Pending'):
+        conn.execute("INSERT INTO fees (student_id, amount, due_date, status, hostel_id, fee_type) "
+                     "VALUES (1, 100, '2030-02-01', ?, 1, 'Monthly Fee')", (status,))
+    conn.commit()
+    conn.close()
+
+    init_db()
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("SELECT status FROM fees WHERE student_id = 1").fetchall()
+        indexed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'uq_fees_student_type_due'").fetchone()
+    finally:
+        conn.close()
+    assert [row['status'] for row in rows] == ['Paid'] and indexed
+    assert HostelStatsModel.check() == []
+
+
+def test_one_statement_pair_per_chunk(batch_db):
+    conn = get_db_connection()
+    statements = []
+    conn.raw_connection.set_trace_callback(statements.append)
+    try:
+        process_batch_fees(conn, list(range(1, 51)), 500, '2030-01-01', chunk_size=20)
+    finally:
+        conn.raw_connection.set_trace_callback(None)
+        conn.close()
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+    # The trace repeats a statement for each trigger it fires, so count distinct ones
+    inserts = {sql for sql in statements if sql.lstrip().upper().startswith('INSERT INTO FEES')}
+    assert len(selects) == len(inserts) == 3
+
+
+def test_recurring_fees_can_be_regenerated(batch_db):
+    conn = get_db_connection()
+    try:
+        assert generate_recurring_fees(conn, 'monthly', student_course='CS') == (25, [])
+        assert generate_recurring_fees(conn, 'monthly') == (25, [])
+        assert generate_recurring_fees(conn, 'monthly') == (0, [])
+    finally:
+        conn.close()
+    assert fee_count(fee_type='Monthly Fee', amount=1000.0) == 50
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Cache Tests
+Checks keying, TTL, LRU eviction and tag invalidation in utils.cache
+"""
+import time
+
+import pytest
+
+from utils.cache import Cache, cache, cached, clear_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def test_results_are_keyed_on_arguments_and_hostel():
+    calls = []
+
+    @cached(ttl_seconds=60)
+    def stats(hostel_id=None, period='month'):
+        calls.append((hostel_id, period))
+        return {'hostel': hostel_id, 'period': period}
+
+    assert stats(1) == {'hostel': 1, 'period': 'month'}
+    assert stats(2) == {'hostel': 2, 'period': 'month'}
+    assert stats(hostel_id=1) == {'hostel': 1, 'period': 'month'}  # Same call, spelled differently
+    assert stats(1, period='year')['period'] == 'year'
+    assert calls == [(1, 'month'), (2, 'month'), (1, 'year')]
+    assert stats.cache_key(1).startswith('hostel:1:') and stats.cache_key().startswith('hostel:all:')
+
+
+def test_ignored_and_unhashable_arguments():
+    calls = []
+
+    @cached(ttl_seconds=60, ignore=('connection',))
+    def count(connection, table):
+        calls.append(table)
+        return len(calls)
+
+    assert count(object(), 'rooms') == count(object(), 'rooms') == 1
+
+    @cached(ttl_seconds=60)
+    def describe(value):
+        calls.append(value)
+        return 'x'
+
+    bypassed = cache.stats()['bypassed']
+    describe(object())
+    describe(object())
+    assert cache.stats()['bypassed'] - bypassed == 2
+
+
+def test_entries_expire_after_ttl():
+    store = Cache(default_ttl=0.01)
+    store.set('k', 'v')
+    assert store.get('k') == (True, 'v')
+    time.sleep(0.02)
+    assert store.get('k') == (False, None)
+    assert store.stats()['expirations'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = Cache(max_entries=2)
+    store.set('a', 1)
+    store.set('b', 2)
+    store.get('a')  # 'b' is now the least recently used
+    store.set('c', 3)
+    assert store.get('b') == (False, None)
+    assert store.get('a') == (True, 1) and store.get('c') == (True, 3)
+    assert store.stats()['evictions'] == 1
+
+
+def test_invalidate_by_tag():
+    calls = []
+
+    @cached(ttl_seconds=60, tags=('hostel:{hostel_id}:fees',))
+    def fee_stats(hostel_id=None):
+        calls.append(hostel_id)
+        return hostel_id
+
+    fee_stats(1), fee_stats(2), fee_stats()
+    assert cache.invalidate('hostel:1:fees') == 1
+    fee_stats(1), fee_stats(2), fee_stats()
+    assert calls == [1, 2, None, 1]
+
+    assert cache.invalidate('hostel:all:fees') == 1
+    fee_stats()
+    assert calls[-1] is None and len(calls) == 5
+
+
+def test_cached_none_is_a_hit():
+    calls = []
+
+    @cached(ttl_seconds=60)
+    def nothing():
+        calls.append(1)
+
+    before = cache.stats()
+    nothing(), nothing()
+    after = cache.stats()
+    assert len(calls) == 1
+    assert after['hits'] - before['hits'] == 1 and after['misses'] - before['misses'] == 1
+
+
+class FakeRedis:
+    """Just enough of the redis-py client for RedisBackend."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError('redis is down')
+
+    def ping(self):
+        self._check()
+        return True
+
+    def mget(self, keys):
+        self._check()
+        return [self.data.get(k) for k in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member.encode())
+
+    def expire(self, key, seconds):
+        pass
+
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key, None) is not None
+            self.sets.pop(key, None)
+        return removed
+
+    def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip('*')
+        return [k for k in list(self.data) + list(self.sets) if k.startswith(prefix)]
+
+    def pipeline(self, transaction=True):
+        redis, calls = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+            def execute(self):
+                redis._check()
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in calls]
+
+        return Pipeline()
+
+
+def test_redis_backend_round_trip_and_tag_invalidation():
+    from utils.cache_backends import RedisBackend
+
+    fake = FakeRedis()
+    store = Cache(RedisBackend('redis://unused', prefix='t:', client=fake))
+    big = {'rows': list(range(2000))}
+    store.set('hostel:1:stats', big, 60, tags=('hostel:1:fees',))
+    store.set('hostel:2:stats', {'n': 2}, 60, tags=('hostel:2:fees',))
+
+    assert fake.data['t:hostel:1:stats'][:1] == b'z'  # Large values are compressed
+    assert store.get('hostel:1:stats') == (True, big)
+
+    assert store.invalidate('hostel:1:fees') == 1
+    assert store.get('hostel:1:stats') == (False, None)
+    assert store.get('hostel:2:stats') == (True, {'n': 2})
+
+
+def test_redis_backend_falls_back_to_memory():
+    from utils.cache_backends import RedisBackend
+
+    fake = FakeRedis()
+    backend = RedisBackend('redis://unused', client=fake, retry_interval=3600)
+    store = Cache(backend)
+    fake.down = True
+
+    store.set('k', 'v', 60)  # Fails over, then serves from memory
+    assert store.get('k') == (True, 'v')
+    stats = store.stats()
+    assert stats['backend'] == 'redis' and not stats['available'] and stats['errors'] == 1
+
+
+def test_backend_selected_from_config():
+    from utils.cache import create_backend
+    from utils.cache_backends import MemoryBackend, NullBackend, RedisBackend
+
+    assert isinstance(create_backend({'CACHE_TYPE': 'memory'}), MemoryBackend)
+    assert isinstance(create_backend({'CACHE_TYPE': 'null'}), NullBackend)
+    backend = create_backend({'CACHE_TYPE': 'redis', 'CACHE_REDIS_URL': 'redis://cache:6379/2',
+                              'CACHE_KEY_PREFIX': 'hms:'})
+    assert isinstance(backend, RedisBackend) and backend.prefix == 'hms:'
+    with pytest.raises(ValueError):
+        create_backend({'CACHE_TYPE': 'memcached'})
+
+
+def test_backends_must_implement_the_whole_interface():
+    from utils.cache_backends import CacheBackend
+
+    class GetOnly(CacheBackend):
+        def get_many(self, keys):
+            return {}
+
+    with pytest.raises(TypeError):
+        CacheBackend()
+    with pytest.raises(TypeError):
+        GetOnly()
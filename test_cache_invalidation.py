@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Cache Invalidation Tests
+Checks that model mutations drop only the affected hostel's cached aggregates
+"""
+import json
+
+import pytest
+from flask import Flask, session
+
+from models.db import ComplaintModel, FeeModel, RoomModel, get_db_connection
+from models.simple_room import SimpleRoomModel
+from utils.dashboard import get_dashboard_stats
+from utils.invalidation import InvalidationBus, invalidate_hostel, mutation_tags
+
+
+@pytest.fixture
+def fee_db(models_db):
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North'), (2, 'South')")
+    conn.execute("INSERT INTO students (id, name, email, hostel_id) VALUES (1, 'Asha', 'a@example.com', 1)")
+    conn.execute("INSERT INTO students (id, name, email, hostel_id) VALUES (2, 'Ravi', 'r@example.com', 2)")
+    conn.execute("INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (1, 100, '2030-01-01', 'Pending', 1)")
+    conn.execute("INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (2, 200, '2030-01-01', 'Pending', 2)")
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def insert_fee_behind_the_cache(student_id, hostel_id):
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, 50, '2030-02-01', 'Pending', ?)",
+        (student_id, hostel_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_mutation_drops_only_the_affected_hostel(fee_db):
+    assert FeeModel.get_fee_statistics(hostel_id=1)['pending_amount'] == 100
+    assert FeeModel.get_fee_statistics(hostel_id=2)['pending_amount'] == 200
+    assert FeeModel.get_fee_statistics()['pending_amount'] == 300
+
+    # A write that bypasses the models leaves every cached entry in place
+    insert_fee_behind_the_cache(2, 2)
+    assert FeeModel.get_fee_statistics(hostel_id=2)['pending_amount'] == 200
+
+    result = FeeModel.add_fee({'student_id': 1, 'amount': 25, 'due_date': '2030-03-01', 'hostel_id': 1})
+    assert result['success']
+    assert FeeModel.get_fee_statistics(hostel_id=1)['pending_amount'] == 125
+    assert FeeModel.get_fee_statistics()['pending_amount'] == 375  # All-hostels aggregate is dropped too
+    assert FeeModel.get_fee_statistics(hostel_id=2)['pending_amount'] == 200  # Still cached
+
+
+def test_unknown_hostel_drops_the_topic_everywhere(fee_db):
+    FeeModel.get_fee_statistics(hostel_id=1)
+    FeeModel.get_fee_statistics(hostel_id=2)
+    insert_fee_behind_the_cache(1, 1)
+    insert_fee_behind_the_cache(2, 2)
+
+    invalidate_hostel(None, 'fees')
+    assert FeeModel.get_fee_statistics(hostel_id=1)['pending_amount'] == 150
+    assert FeeModel.get_fee_statistics(hostel_id=2)['pending_amount'] == 250
+
+
+def test_simple_room_edits_refresh_room_statistics(fee_db):
+    assert RoomModel.get_room_statistics(hostel_id=1)['total_rooms'] == 0
+    room_id = SimpleRoomModel.add_room('A1', 2, 1)['room_id']
+    assert RoomModel.get_room_statistics(hostel_id=1)['total_capacity'] == 2
+
+    assert SimpleRoomModel.update_room(room_id, 'A1', 4, SimpleRoomModel.STATUS_AVAILABLE)['success']
+    assert RoomModel.get_room_statistics(hostel_id=1)['total_capacity'] == 4
+
+    assert SimpleRoomModel.delete_room(room_id)['success']
+    assert RoomModel.get_room_statistics(hostel_id=1)['total_rooms'] == 0
+
+
+def test_a_managers_global_complaint_counts_see_other_hostels(fee_db):
+    conn = get_db_connection()
+    conn.execute("INSERT INTO rooms (id, room_number, capacity, hostel_id) VALUES (1, 'A1', 2, 1), (2, 'B1', 2, 2)")
+    conn.commit()
+    conn.close()
+
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    with app.test_request_context():
+        session.update(role='manager', hostel_id=1)
+        assert ComplaintModel.get_complaint_statistics()['total_count'] == 0
+        ComplaintModel.create_complaint(2, 'Leaking tap')  # In the other hostel
+        assert ComplaintModel.get_complaint_statistics()['total_count'] == 1
+
+
+def test_fee_changes_refresh_the_dashboard_stats(fee_db):
+    conn = get_db_connection()
+    try:
+        assert get_dashboard_stats(conn)['pending_fees'] == 2
+        assert FeeModel.add_fee({'student_id': 2, 'amount': 25, 'due_date': '2030-03-01', 'hostel_id': 2})['success']
+        assert get_dashboard_stats(conn)['pending_fees'] == 3
+    finally:
+        conn.close()
+
+
+def test_remote_invalidations_are_applied_once():
+    bus = InvalidationBus()
+    seen = []
+    bus.subscribe(seen.append)
+
+    def message(origin, tags):
+        return {'type': 'message', 'data': json.dumps({'origin': origin, 'tags': tags}).encode()}
+
+    bus._handle(message(bus.origin, ['hostel:1:fees']))  # Our own publish, already applied
+    bus._handle(message('other-worker', mutation_tags(2, 'rooms')))
+    bus._handle({'type': 'subscribe', 'data': 1})
+    assert seen == [['hostel:2:rooms', 'hostel:all:rooms']]
+    assert bus.stats()['received'] == 1
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Dashboard Update Coalescing Tests
+Checks that bursts of changes produce one statistics computation and one emit per hostel
+"""
+import threading
+import time
+
+from utils.dashboard_updates import EVENT_NAME, DashboardUpdateCoalescer
+
+
+class RecordingSocketIO:
+    def __init__(self):
+        self.emitted = []
+        self.event = threading.Event()
+
+    def emit(self, event, data, to=None, namespace=None):
+        self.emitted.append((event, data, to, namespace))
+        self.event.set()
+
+
+def coalescer(window=0.05, max_delay=1.0):
+    computed = []
+
+    def compute(hostel_id):
+        computed.append(hostel_id)
+        return {'students': len(computed)}
+
+    socketio = RecordingSocketIO()
+    return DashboardUpdateCoalescer(window=window, max_delay=max_delay, compute=compute,
+                                    socketio=socketio), computed, socketio
+
+
+def test_burst_is_merged_into_one_update_per_hostel():
+    updates, computed, socketio = coalescer(window=60)
+    for _ in range(30):
+        updates.mark(1, 'students_bulk_transfer')
+    updates.mark(1, 'fee_added')
+    updates.mark(2, 'room_added')
+    updates.mark(None, 'fees_batch_added')
+
+    payloads = {payload['hostel_id']: payload for payload in updates.flush()}
+
+    assert sorted(computed, key=str) == [1, 2, None]
+    assert payloads[1]['merged'] == 31 and payloads[1]['update_type'] == 'batch'
+    assert payloads[1]['update_types'] == ['students_bulk_transfer', 'fee_added']
+    assert payloads[2]['merged'] == 1 and payloads[2]['update_type'] == 'room_added'
+    rooms = {to for event, _, to, namespace in socketio.emitted if event == EVENT_NAME and namespace == '/updates'}
+    assert rooms == {'hostel_1', 'hostel_2', 'owners'}
+    stats = updates.stats()
+    assert (stats['marked'], stats['emitted'], stats['merged'], stats['pending']) == (33, 3, 30, 0)
+    assert updates.flush() == []
+
+
+def test_updates_are_emitted_after_a_quiet_window():
+    updates, computed, socketio = coalescer(window=0.05)
+    for _ in range(10):
+        updates.mark(7, 'fee_updated')
+        time.sleep(0.005)
+    assert socketio.emitted == []
+
+    assert socketio.event.wait(2)
+    time.sleep(0.1)
+    assert computed == [7]
+    assert len(socketio.emitted) == 1 and socketio.emitted[0][1]['merged'] == 10
+
+
+def test_steady_stream_is_emitted_after_max_delay():
+    updates, computed, socketio = coalescer(window=0.05, max_delay=0.15)
+    started = time.monotonic()
+    while not socketio.emitted and time.monotonic() - started < 2:
+        updates.mark(3, 'fee_added')
+        time.sleep(0.01)
+
+    # Changes kept arriving inside the window, yet one update went out
+    assert socketio.emitted and time.monotonic() - started < 1
+    updates.flush()
+
+
+def test_zero_window_emits_immediately_and_survives_errors():
+    def broken(hostel_id):
+        raise RuntimeError('database unavailable')
+
+    updates, computed, socketio = coalescer(window=0)
+    updates.mark(4, 'room_added')
+    assert computed == [4] and len(socketio.emitted) == 1
+
+    updates.compute = broken
+    updates.mark(4, 'room_added')
+    assert len(socketio.emitted) == 1 and updates.stats()['errors'] == 1
+
+
+def test_updates_after_the_first_carry_only_changed_keys():
+    figures = {'students': 10, 'rooms': 5, 'pending_fees': 3, 'occupancy_percentage': 50.0}
+    socketio = RecordingSocketIO()
+    updates = DashboardUpdateCoalescer(window=0, compute=lambda hostel_id: dict(figures), socketio=socketio)
+
+    updates.mark(1, 'student_added')
+    first = socketio.emitted[-1][1]
+    assert first['full'] and first['seq'] == 1 and first['stats'] == figures
+
+    figures['students'] = 11
+    updates.mark(1, 'student_added')
+    delta = socketio.emitted[-1][1]
+    assert not delta['full'] and 'stats' not in delta
+    assert (delta['base_seq'], delta['seq'], delta['changes']) == (1, 2, {'students': 11})
+    assert delta['stream'] == first['stream']
+
+    # Nothing a client shows changed: nothing is sent
+    updates.mark(1, 'fee_updated')
+    assert len(socketio.emitted) == 2 and updates.stats()['unchanged'] == 1
+
+
+def test_resync_returns_a_full_snapshot_at_the_current_sequence():
+    figures = {'students': 10, 'rooms': 5}
+    socketio = RecordingSocketIO()
+    updates = DashboardUpdateCoalescer(window=0, compute=lambda hostel_id: dict(figures), socketio=socketio)
+    updates.mark(2, 'room_added')
+    figures['rooms'] = 6
+    updates.mark(2, 'room_added')
+
+    snapshot = updates.resync(2)
+    assert snapshot['full'] and snapshot['seq'] == 2 and snapshot['stats'] == figures
+    assert len(socketio.emitted) == 2
+
+    # A change nobody was told about reaches the room as a delta, the requester as a snapshot
+    figures['students'] = 12
+    snapshot = updates.resync(2)
+    assert snapshot['seq'] == 3 and snapshot['stats']['students'] == 12
+    assert socketio.emitted[-1][1]['changes'] == {'students': 12} and socketio.emitted[-1][2] == 'hostel_2'
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Tests
+Checks reuse, bounds, checkout timeouts, recycling and health checks of utils.db_pool
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pytest
+
+from utils.db_pool import ConnectionPool, PoolTimeoutError, get_pool, dispose_pool
+
+
+def make_pool(**options):
+    db_path = os.path.join(tempfile.mkdtemp(), 'pool.db')
+    opened = []
+
+    def factory():
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool(factory, **options), opened
+
+
+def test_close_returns_connection_for_reuse():
+    """Closing a pooled connection hands the same physical connection out again"""
+    pool, opened = make_pool(max_size=2)
+    conn = pool.connect()
+    raw = conn.raw_connection
+    conn.close()
+    assert conn.closed
+
+    again = pool.connect()
+    assert again.raw_connection is raw
+    assert len(opened) == 1
+    again.close()
+
+    stats = pool.stats()
+    assert stats['checkouts'] == 2
+    assert stats['idle'] == 1 and stats['in_use'] == 0
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    """A bounded pool raises PoolTimeoutError instead of opening extra connections"""
+    pool, opened = make_pool(max_size=1, timeout=0.05)
+    held = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    assert pool.stats()['timeouts'] == 1
+    assert len(opened) == 1
+    held.close()
+
+
+def test_waiter_receives_released_connection():
+    """A blocked checkout completes as soon as another thread releases"""
+    pool, _ = make_pool(max_size=1, timeout=2)
+    held = pool.connect()
+    result = {}
+
+    def worker():
+        conn = pool.connect()
+        result['ok'] = conn.execute('SELECT 1').fetchone()[0]
+        conn.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.05)
+    held.close()
+    thread.join(timeout=2)
+
+    assert result.get('ok') == 1
+    assert pool.stats()['max_wait_ms'] > 0
+
+
+def test_expired_connections_are_recycled():
+    """Connections older than max_lifetime are closed rather than reused"""
+    pool, opened = make_pool(max_size=1, max_lifetime=0.01)
+    conn = pool.connect()
+    time.sleep(0.02)
+    conn.close()
+
+    fresh = pool.connect()
+    assert fresh.raw_connection is not opened[0]
+    assert pool.stats()['recycled'] == 1
+    fresh.close()
+
+
+def test_failed_health_check_replaces_connection():
+    """An idle connection that fails its ping is discarded"""
+    pool, opened = make_pool(max_size=1, health_check_interval=0)
+    conn = pool.connect()
+    conn.close()
+    opened[0].close()  # Simulate the server dropping the connection
+
+    replacement = pool.connect()
+    assert replacement.execute('SELECT 1').fetchone()[0] == 1
+    assert pool.stats()['health_check_failures'] == 1
+    replacement.close()
+
+
+def test_release_rolls_back_open_transaction():
+    """Uncommitted work never leaks to the next borrower"""
+    pool, _ = make_pool(max_size=1)
+    conn = pool.connect()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.execute('INSERT INTO t VALUES (1)')
+    conn.close()
+
+    conn = pool.connect()
+    assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    conn.close()
+
+
+def test_registry_shares_pool_per_url():
+    """get_pool returns one pool per database URL"""
+    url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'shared.db')
+    try:
+        assert get_pool(url) is get_pool(url, max_size=99)
+        assert get_pool(url).max_size != 99
+    finally:
+        dispose_pool(url)
+
+
+def test_init_db_overwrite_recreates_the_configured_database(models_db):
+    """overwrite=True empties the MODELS_DATABASE_URL file, not the repo's hostel.db"""
+    from models.db import get_db_connection, init_db
+
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (name) VALUES ('Old Hostel')")
+    conn.commit()
+    conn.close()
+
+    init_db(overwrite=True)
+    conn = get_db_connection()
+    try:
+        assert conn.execute('SELECT COUNT(*) FROM hostels').fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+def test_dispose_closes_connections_released_afterwards():
+    """Connections in use during dispose() are closed when returned, not pooled"""
+    pool, opened = make_pool(max_size=2)
+    conn = pool.connect()
+    pool.dispose()
+    conn.close()
+
+    assert pool.stats()['idle'] == 0 and pool.stats()['size'] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute('SELECT 1')
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Export Job Tests
+Checks background rendering, progress reporting, deduplication and artifact expiry
+"""
+import os
+import threading
+import time
+
+import pytest
+
+import utils.socket_utils
+from utils.export_jobs import COMPLETED, FAILED, ExportJob, ExportJobQueue, ExportSource, _emit_progress
+
+HEADERS = ['ID', 'Name']
+
+
+def wait_for(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.status not in (COMPLETED, FAILED):
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        time.sleep(0.01)
+    return job
+
+
+@pytest.fixture
+def queue(tmp_path):
+    events = []
+    queue = ExportJobQueue(max_workers=2, artifact_dir=str(tmp_path),
+                           notify=lambda event, job: events.append((event, job.progress)))
+    queue.events = events
+    return queue
+
+
+def people_source(builds, rows=25, batch_size=10):
+    def build():
+        builds.append(1)
+        data = [{'id': i, 'name': f'Person {i}'} for i in range(rows)]
+        batches = (data[i:i + batch_size] for i in range(0, rows, batch_size))
+        return ExportSource(batches, HEADERS, row_formatter=lambda r: {'ID': r['id'], 'Name': r['name']},
+                            total=rows)
+    return build
+
+
+def test_csv_is_rendered_to_an_artifact_with_progress(queue):
+    builds = []
+    job, reused = queue.submit('people', 'csv', {'status': 'Pending'}, people_source(builds), 'people.csv', user_id=7)
+    assert not reused
+    wait_for(job)
+
+    with open(job.path, encoding='utf-8') as artifact:
+        lines = artifact.read().splitlines()
+    assert lines[0] == 'ID,Name' and lines[-1] == '24,Person 24' and len(lines) == 26
+    assert job.processed == 25 and job.progress == 100
+    assert queue.events == [('export_progress', None), ('export_progress', 40), ('export_progress', 80),
+                            ('export_progress', 99), ('export_complete', 100)]
+
+
+def test_identical_submissions_share_one_artifact(queue):
+    builds = []
+    first, _ = queue.submit('people', 'csv', {'status': 'Pending'}, people_source(builds), 'a.csv', hostel_id=1)
+    wait_for(first)
+    again, reused = queue.submit('people', 'csv', {'status': 'Pending'}, people_source(builds), 'b.csv', hostel_id=1)
+    assert reused and again is first
+    assert len(builds) == 1
+
+    other_hostel, reused = queue.submit('people', 'csv', {'status': 'Pending'}, people_source(builds), 'c.csv', hostel_id=2)
+    assert not reused
+    wait_for(other_hostel)
+    assert len(builds) == 2
+
+
+def test_failed_jobs_are_retried_and_reported(queue):
+    def broken():
+        raise RuntimeError('database went away')
+
+    job, _ = queue.submit('people', 'csv', {}, broken, 'x.csv')
+    wait_for(job)
+    assert job.status == FAILED and job.error == 'database went away'
+    assert queue.events[-1][0] == 'export_failed'
+
+    retry, reused = queue.submit('people', 'csv', {}, people_source([]), 'x.csv')
+    assert not reused and retry is not job
+
+
+def test_expired_artifacts_are_removed(queue):
+    job, _ = queue.submit('people', 'csv', {}, people_source([]), 'x.csv')
+    wait_for(job)
+    queue.artifact_ttl = 0
+    time.sleep(0.01)
+    queue.prune()
+    assert queue.get(job.id) is None
+    assert not os.path.exists(job.path)
+
+
+def test_unknown_format_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit('people', 'xlsx', {}, people_source([]), 'x.xlsx')
+
+
+def test_progress_only_goes_to_the_submitting_user(monkeypatch):
+    sent = []
+    monkeypatch.setattr(utils.socket_utils, 'emit_safe', lambda event, data, **kwargs: sent.append((event, kwargs)))
+    _emit_progress('export_complete', ExportJob('students', 'csv', 'a', 'students.csv', user_id=7))
+    _emit_progress('export_complete', ExportJob('students', 'csv', 'b', 'students.csv', user_id=None))
+    assert sent == [('export_complete', {'to': 'user_7'})]
+
+
+def test_everyone_who_submits_a_shared_job_is_told_it_finished(monkeypatch, tmp_path):
+    sent = []
+    monkeypatch.setattr(utils.socket_utils, 'emit_safe', lambda event, data, **kwargs: sent.append((event, kwargs)))
+    queue = ExportJobQueue(artifact_dir=str(tmp_path))
+    release, builds = threading.Event(), []
+    source = people_source(builds)
+
+    def build():
+        release.wait(5)
+        return source()
+
+    owner_job, _ = queue.submit('people', 'csv', {}, build, 'a.csv', user_id=1, hostel_id=1)
+    manager_job, reused = queue.submit('people', 'csv', {}, build, 'a.csv', user_id=2, hostel_id=1)
+    assert reused and manager_job is owner_job
+    release.set()
+    wait_for(owner_job)
+    deadline = time.monotonic() + 5
+    while len([event for event, _ in sent if event == 'export_complete']) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)  # The completion is announced just after the status changes
+    assert [kwargs for event, kwargs in sent if event == 'export_complete'] == [{'to': 'user_1'}, {'to': 'user_2'}]
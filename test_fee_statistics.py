@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Fee Statistics Tests
+Checks FeeModel.get_fee_statistics totals and that it runs as a single indexed query
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from models.db import FeeModel, get_db_connection
+
+
+@pytest.fixture
+def fee_db(models_db):
+    past = (date.today() - timedelta(days=5)).isoformat()
+    future = (date.today() + timedelta(days=5)).isoformat()
+    conn = get_db_connection()
+    conn.executemany(
+        'INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, ?, ?, ?, ?)',
+        [
+            (1, 100.0, past, 'Pending', 1),    # Overdue
+            (2, 200.0, future, 'Pending', 1),
+            (3, 300.0, past, 'Paid', 1),
+            (4, 400.0, past, 'Overdue', 1),    # Already swept; not counted as pending
+            (5, 500.0, past, 'Pending', 2),    # Other hostel
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def test_statistics_for_one_hostel(fee_db):
+    assert FeeModel.get_fee_statistics(hostel_id=1) == {
+        'pending_count': 2,
+        'overdue_count': 1,
+        'pending_amount': 300.0,
+        'overdue_amount': 100.0,
+        'paid_amount': 300.0,
+    }
+
+
+def test_statistics_across_hostels(fee_db):
+    stats = FeeModel.get_fee_statistics()
+    assert stats['pending_count'] == 3 and stats['overdue_count'] == 2
+    assert stats['pending_amount'] == 800.0 and stats['overdue_amount'] == 600.0
+
+
+def test_statistics_use_one_indexed_query(fee_db):
+    conn = get_db_connection()
+    statements = []
+    conn.raw_connection.set_trace_callback(statements.append)
+    conn.close()  # The model checks the same connection back out
+
+    FeeModel.get_fee_statistics(hostel_id=1)
+
+    conn = get_db_connection()
+    conn.raw_connection.set_trace_callback(None)
+    plan = conn.execute('EXPLAIN QUERY PLAN ' + statements[0]).fetchall()
+    conn.close()
+
+    assert len(statements) == 1
+    assert 'idx_fees_hostel_status_due' in plan[0][-1]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Hostel Stats Tests
+Checks that the hostel_stats summary table stays consistent with the source tables and matches the raw dashboard figures
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from models.db import HostelStatsModel, get_db_connection
+from routes.dashboard import get_dashboard_statistics
+from utils.cache import clear_cache
+
+
+@pytest.fixture
+def stats_db(models_db):
+    today = date.today()
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North')")
+    conn.execute("INSERT INTO hostels (id, name) VALUES (2, 'South')")
+    for number in range(1, 13):
+        hostel_id = 1 if number % 3 else 2
+        room_id = conn.execute(
+            "INSERT INTO rooms (room_number, capacity, current_occupancy, status, hostel_id) VALUES (?, 2, ?, ?, ?)",
+            (f'R{number}', number % 3, ('Available', 'Full', 'Maintenance')[number % 3], hostel_id)
+        ).lastrowid
+        student_id = conn.execute(
+            "INSERT INTO students (name, email, room_id, hostel_id) VALUES (?, ?, ?, ?)",
+            (f'Student {number}', f's{number}@example.com', room_id if number % 2 else None, hostel_id)
+        ).lastrowid
+        for offset in (-40, -1, 0, 25):
+            conn.execute(
+                "INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, ?, ?, ?, ?)",
+                (student_id, 100 + number, (today + timedelta(days=offset)).isoformat(),
+                 'Paid' if (number + offset) % 4 == 0 else 'Pending', hostel_id)
+            )
+        conn.execute(
+            "INSERT INTO expenses (description, amount, expense_date, category, hostel_id) VALUES (?, ?, ?, 'Food', ?)",
+            (f'Expense {number}', 10.5 * number, (today - timedelta(days=20 * (number % 3))).isoformat(), hostel_id)
+        )
+        conn.execute(
+            "INSERT INTO complaints (room_id, description, status, hostel_id) VALUES (?, 'Leak', ?, ?)",
+            (room_id, 'Pending' if number % 2 else 'Resolved', hostel_id)
+        )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def raw_statistics(hostel_id):
+    """get_dashboard_statistics computed from the source tables."""
+    conn = get_db_connection()
+    conn.execute('ALTER TABLE hostel_stats RENAME TO hostel_stats_hidden')
+    conn.commit()
+    conn.close()
+    clear_cache()
+    try:
+        return get_dashboard_statistics(hostel_id)
+    finally:
+        conn = get_db_connection()
+        conn.execute('ALTER TABLE hostel_stats_hidden RENAME TO hostel_stats')
+        conn.commit()
+        conn.close()
+        clear_cache()
+
+
+def assert_same_figures(summary, raw):
+    assert summary.keys() == raw.keys()
+    for key, value in raw.items():
+        assert summary[key] == pytest.approx(value), key
+
+
+@pytest.mark.parametrize('hostel_id', [None, 1, 2])
+def test_summary_matches_raw_statistics(stats_db, hostel_id):
+    assert_same_figures(get_dashboard_statistics(hostel_id), raw_statistics(hostel_id))
+
+
+def test_triggers_follow_updates_and_deletes(stats_db):
+    conn = get_db_connection()
+    conn.execute("UPDATE fees SET status = 'Paid', paid_date = date('now') WHERE id % 3 = 0")
+    conn.execute("UPDATE fees SET hostel_id = 2, amount = amount * 2 WHERE id % 5 = 0")
+    conn.execute("UPDATE students SET room_id = NULL WHERE id = 1")
+    conn.execute("UPDATE rooms SET current_occupancy = 2, status = 'Full' WHERE id = 3")
+    conn.execute("UPDATE complaints SET status = 'Resolved' WHERE id = 1")
+    conn.execute("DELETE FROM expenses WHERE id IN (2, 3)")
+    conn.execute("DELETE FROM fees WHERE student_id = 4")
+    conn.execute("DELETE FROM students WHERE id = 4")
+    conn.commit()
+    conn.close()
+
+    assert HostelStatsModel.check() == []
+    for hostel_id in (None, 1, 2):
+        assert_same_figures(get_dashboard_statistics(hostel_id), raw_statistics(hostel_id))
+
+
+def test_unrelated_column_updates_skip_the_summary(stats_db):
+    conn = get_db_connection()
+    raw = conn.raw_connection
+
+    def rows_written(sql):
+        before = raw.total_changes  # Includes rows written by triggers
+        conn.execute(sql)
+        return raw.total_changes - before
+
+    try:
+        assert rows_written("UPDATE students SET contact = '555-0100' WHERE id = 1") == 1
+        assert rows_written("UPDATE expenses SET notes = 'Receipt filed' WHERE id = 1") == 1
+        assert rows_written("UPDATE fees SET amount = amount + 1 WHERE id = 1") == 3
+        conn.commit()
+    finally:
+        conn.close()
+    assert HostelStatsModel.check() == []
+
+
+def test_rebuild_repairs_drift(stats_db):
+    conn = get_db_connection()
+    conn.execute("UPDATE hostel_stats SET item_count = item_count + 5 WHERE entity = 'fees'")
+    conn.execute("DELETE FROM hostel_stats WHERE entity = 'rooms'")
+    conn.commit()
+    conn.close()
+
+    assert HostelStatsModel.check()
+    assert HostelStatsModel.rebuild() > 0
+    assert HostelStatsModel.check() == []
+
+
+def test_summary_is_one_query(stats_db):
+    conn = get_db_connection()
+    statements = []
+    conn.raw_connection.set_trace_callback(statements.append)
+    try:
+        summary = HostelStatsModel.summarize(conn, 1)
+    finally:
+        conn.raw_connection.set_trace_callback(None)
+        conn.close()
+    assert len(statements) == 1 and 'FROM hostel_stats' in statements[0]
+    assert summary['students'] == 8 and summary['rooms'] == 8
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Metrics Tests
+Checks the Prometheus text format, request metrics and merging of worker metrics files
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+
+from flask import Flask
+
+from utils.metrics import (FLUSH_INTERVAL, LIVESUM, MAX, Registry, clear_worker_files, configure_metrics,
+                           exposition, merge_worker_files, registry, render_text)
+
+
+def sample(text, line_start):
+    """The value of the exposition line starting with ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'{line_start} not in:\n{text}')
+
+
+def test_text_exposition_format():
+    metrics = Registry()
+    requests = metrics.counter('requests_total', 'Requests', ('endpoint',))
+    latency = metrics.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    metrics.gauge('queue_depth', 'Jobs waiting').set(3)
+    requests.inc(endpoint='room.view_rooms')
+    requests.inc(2, endpoint='room.view_rooms')
+    requests.inc(endpoint='say "hi"\n')
+    for value in (0.05, 0.5, 0.7, 5):
+        latency.observe(value)
+
+    text = render_text(metrics.collect())
+    assert '# TYPE requests_total counter' in text and '# HELP latency_seconds Latency' in text
+    assert sample(text, 'requests_total{endpoint="room.view_rooms"}') == 3
+    assert 'requests_total{endpoint="say \\"hi\\"\\n"} 1' in text
+    # Buckets are cumulative and end with +Inf
+    assert sample(text, 'latency_seconds_bucket{le="0.1"}') == 1
+    assert sample(text, 'latency_seconds_bucket{le="1.0"}') == 3
+    assert sample(text, 'latency_seconds_bucket{le="+Inf"}') == 4
+    assert sample(text, 'latency_seconds_sum') == 6.25 and sample(text, 'latency_seconds_count') == 4
+    assert sample(text, 'queue_depth') == 3
+
+
+def test_request_metrics_and_endpoint():
+    registry.reset()
+    app = Flask(__name__)
+    configure_metrics(app)
+    app.add_url_rule('/rooms', 'rooms', lambda: 'rooms')
+    app.add_url_rule('/metrics', 'metrics', lambda: (exposition(), 200, {'Content-Type': 'text/plain'}))
+
+    client = app.test_client()
+    for _ in range(3):
+        client.get('/rooms')
+    client.get('/missing')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    assert sample(text, 'http_requests_total{method="GET",endpoint="rooms",status="200"}') == 3
+    assert sample(text, 'http_requests_total{method="GET",endpoint="unmatched",status="404"}') == 1
+    assert sample(text, 'http_request_duration_seconds_count{method="GET",endpoint="rooms"}') == 3
+    assert 'cache_hit_ratio ' in text
+
+
+def _worker(directory, connected):
+    metrics = make_registry(directory)
+    metrics.get('jobs_total').inc(5)
+    metrics.get('connected').set(connected)
+    metrics.get('peak').set(connected)
+    metrics.get('latency_seconds').observe(0.2)
+    metrics.flush()
+
+
+def make_registry(directory):
+    metrics = Registry()
+    metrics.multiprocess_dir = directory
+    metrics.counter('jobs_total', 'Jobs')
+    metrics.gauge('connected', 'Connected sessions', mode=LIVESUM)
+    metrics.gauge('peak', 'Largest worker', mode=MAX)
+    metrics.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    return metrics
+
+
+def test_workers_are_merged_and_exited_workers_keep_their_counts():
+    directory = tempfile.mkdtemp()
+    context = multiprocessing.get_context('fork')
+    for connected in (2, 7):
+        worker = context.Process(target=_worker, args=(directory, connected))
+        worker.start()
+        worker.join()
+        assert worker.exitcode == 0
+
+    # This process is a live worker
+    metrics = make_registry(directory)
+    metrics.get('jobs_total').inc()
+    metrics.get('connected').set(4)
+    metrics.get('peak').set(4)
+    text = render_text(metrics.collect())
+
+    assert sample(text, 'jobs_total') == 11
+    assert sample(text, 'latency_seconds_count') == 2
+    assert sample(text, 'latency_seconds_bucket{le="1.0"}') == 2
+    # Gauges only count live workers
+    assert sample(text, 'connected') == 4 and sample(text, 'peak') == 4
+
+    # Exited workers' files were folded into the archive, and the totals are unchanged
+    files = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    assert files == ['archive.json', f'metrics_{os.getpid()}.json']
+    assert sample(render_text(metrics.collect()), 'jobs_total') == 11
+
+
+def _idle_worker(directory, counted, stop):
+    metrics = make_registry(directory)
+    metrics.start_flusher()
+    metrics.get('jobs_total').inc(3)
+    counted.set()
+    stop.wait(30)  # Serves nothing and never flushes itself
+
+
+def test_an_idle_workers_counts_reach_the_other_workers():
+    directory = tempfile.mkdtemp()
+    context = multiprocessing.get_context('fork')
+    counted, stop = context.Event(), context.Event()
+    worker = context.Process(target=_idle_worker, args=(directory, counted, stop))
+    worker.start()
+    try:
+        assert counted.wait(10)
+        deadline = time.monotonic() + 5 * FLUSH_INTERVAL
+        merged = {}
+        while time.monotonic() < deadline and not merged.get('jobs_total', {}).get('values'):
+            time.sleep(0.05)
+            merged = merge_worker_files(directory)
+        assert merged['jobs_total']['values'] == [[[], 3]]
+    finally:
+        stop.set()
+        worker.join()
+
+
+def test_clearing_the_directory_only_removes_metrics_files():
+    directory = tempfile.mkdtemp()
+    ours = ['metrics_123.json', 'metrics_123.json.123.tmp', 'archive.json', 'archive.json.9.tmp', 'archive.lock']
+    theirs = ['notes.txt', 'backup.tmp', 'metrics.db']
+    for name in ours + theirs:
+        open(os.path.join(directory, name), 'w').close()
+    os.mkdir(os.path.join(directory, 'uploads'))
+
+    clear_worker_files(directory)
+    assert sorted(os.listdir(directory)) == sorted(theirs + ['uploads'])
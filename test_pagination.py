@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Keyset Pagination Tests
+Checks that list pages are fetched with index seeks and walk the data without gaps or repeats
+"""
+import pytest
+
+from models.db import ExpenseModel, FeeModel, StudentModel, get_db_connection
+from routes.complaints import COMPLAINT_SORT_KEYS
+from utils.pagination import COUNT_LIMIT, count_capped, decode_cursor, encode_cursor, fetch_page
+
+
+@pytest.fixture
+def paging_db(models_db):
+    conn = get_db_connection()
+    # Users live outside init_db's schema; expenses join them for the approver's name
+    conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, full_name TEXT)")
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North')")
+    conn.execute("INSERT INTO hostels (id, name) VALUES (2, 'South')")
+    for number in range(1, 38):
+        # Repeated names and due dates make the id tie-breaker matter
+        student_id = conn.execute(
+            "INSERT INTO students (name, email, hostel_id) VALUES (?, ?, ?)",
+            (f'Student {number % 10}', f's{number}@example.com', 1 if number <= 30 else 2)
+        ).lastrowid
+        due_date = None if number % 7 == 0 else f'2030-01-{number % 5 + 1:02d}'
+        conn.execute(
+            "INSERT INTO fees (student_id, amount, due_date, status, hostel_id) VALUES (?, 100, ?, 'Pending', 1)",
+            (student_id, due_date)
+        )
+        conn.execute(
+            "INSERT INTO expenses (description, amount, expense_date, category, hostel_id) VALUES (?, 10, ?, 'Food', 1)",
+            (f'Expense {number}', f'2030-02-{number % 3 + 1:02d}')
+        )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def walk_forward(get_page, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = get_page(cursor=cursor, **kwargs)
+        pages.append(page)
+        if not page.has_next:
+            return pages
+        cursor = page.next_cursor
+
+
+def ids(pages):
+    return [row['id'] for page in pages for row in page.items]
+
+
+def test_students_walk_forward_and_back_in_name_order(paging_db):
+    pages = walk_forward(StudentModel.get_students_page, hostel_id=1, per_page=7)
+    assert [len(page) for page in pages] == [7, 7, 7, 7, 2]
+    expected = [row['id'] for row in StudentModel.get_all_students(hostel_id=1)]
+    assert sorted(ids(pages)) == sorted(expected) and len(set(ids(pages))) == 30
+    names = [(row['name'], row['id']) for page in pages for row in page.items]
+    assert names == sorted(names)
+    assert not pages[0].has_prev
+
+    # Walking back from the last page returns the same pages in reverse
+    back, cursor = [pages[-1]], pages[-1].prev_cursor
+    while cursor:
+        page = StudentModel.get_students_page(hostel_id=1, per_page=7, cursor=cursor)
+        back.insert(0, page)
+        cursor = page.prev_cursor
+    assert [ids([page]) for page in back] == [ids([page]) for page in pages]
+
+
+def test_fees_with_missing_due_dates_are_paged_once(paging_db):
+    pages = walk_forward(FeeModel.get_fees_page, hostel_id=1, per_page=10)
+    fee_ids = ids(pages)
+    assert len(fee_ids) == len(set(fee_ids)) == 37
+    # Fees without a due date sort before the dated ones
+    due_dates = [row['due_date'] for page in pages for row in page.items]
+    assert due_dates[:5] == [None] * 5 and None not in due_dates[5:]
+    assert all('is_overdue' in row for page in pages for row in page.items)
+
+
+def test_expenses_are_paged_newest_first(paging_db):
+    pages = walk_forward(ExpenseModel.get_expenses_page, hostel_id=1, per_page=10, with_total=True)
+    keys = [(row['expense_date'], row['id']) for page in pages for row in page.items]
+    assert len(keys) == 37 and keys == sorted(keys, reverse=True)
+    assert pages[0].total == 37 and not pages[0].total_is_estimate
+
+
+def test_same_day_complaints_are_paged_most_urgent_first(paging_db):
+    conn = get_db_connection()
+    try:
+        for number in range(12):
+            conn.execute("INSERT INTO complaints (description, priority, report_date) VALUES (?, ?, ?)",
+                         (f'Complaint {number}', ['Low', 'Critical', 'Medium', 'High'][number % 4],
+                          f'2030-03-{number % 2 + 1:02d}'))
+        conn.commit()
+
+        def get_page(cursor):
+            return fetch_page(conn, f"c.id, c.report_date AS reported_date, c.priority, "
+                                    f"{COMPLAINT_SORT_KEYS[1].expression} AS priority_rank",
+                              'FROM complaints c', [], [], COMPLAINT_SORT_KEYS,
+                              descending=True, cursor=cursor, per_page=5)
+        rows = [row for page in walk_forward(get_page) for row in page.items]
+    finally:
+        conn.close()
+    assert [(row['reported_date'], row['priority']) for row in rows[:3]] == [
+        ('2030-03-02', 'Critical'), ('2030-03-02', 'Critical'), ('2030-03-02', 'Critical')]
+    assert [row['priority'] for row in rows[3:6]] == ['High', 'High', 'High']
+    keys = [(row['reported_date'], row['priority_rank'], row['id']) for row in rows]
+    assert len(keys) == 12 and keys == sorted(keys, reverse=True)
+
+
+def test_invalid_cursor_falls_back_to_first_page(paging_db):
+    first = StudentModel.get_students_page(hostel_id=1, per_page=5)
+    for cursor in ('not-a-cursor', encode_cursor('sideways', ['x', 1]), encode_cursor('next', ['x'])):
+        assert ids([StudentModel.get_students_page(hostel_id=1, per_page=5, cursor=cursor)]) == ids([first])
+    assert decode_cursor(first.next_cursor)[0] == 'next'
+
+
+def test_total_is_capped(paging_db):
+    conn = get_db_connection()
+    try:
+        assert count_capped(conn, 'FROM fees f', [], [], limit=20) == (20, True)
+        assert count_capped(conn, 'FROM fees f', ['f.hostel_id = ?'], [2]) == (0, False)
+    finally:
+        conn.close()
+    assert COUNT_LIMIT >= 1000
+
+
+def test_later_pages_seek_through_the_index(paging_db):
+    page = FeeModel.get_fees_page(hostel_id=1, per_page=10)
+    _, select_from, conditions, params = FeeModel._fee_filters(hostel_id=1)
+    key_values = decode_cursor(page.next_cursor)[1]
+
+    conn = get_db_connection()
+    try:
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT f.id {select_from} WHERE {' AND '.join(conditions)} "
+            f"AND (COALESCE(f.due_date, '0001-01-01'), f.id) > (?, ?) "
+            f"ORDER BY COALESCE(f.due_date, '0001-01-01'), f.id LIMIT 11",
+            tuple(params) + tuple(key_values)
+        ).fetchall()
+    finally:
+        conn.close()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'idx_fees_hostel_due_id' in details
+    assert 'TEMP B-TREE' not in details
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Sampling Profiler Tests
+Checks per-endpoint sampling, collapsed-stack output, the overhead bound and the owner-only routes
+"""
+import os
+import subprocess
+import sys
+import threading
+import textwrap
+import time
+
+import pytest
+from flask import Flask, g, session
+
+from routes.profiler import profiler_bp
+from utils.profiler import SamplingProfiler, configure_profiler, profiler
+
+
+def busy_fee_report(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+
+def handle_request(sampler, endpoint, stop):
+    sampler.enter_request(endpoint)
+    try:
+        busy_fee_report(stop)
+    finally:
+        sampler.exit_request()
+
+
+def test_samples_are_attributed_to_endpoints():
+    sampler = SamplingProfiler()
+    stop = threading.Event()
+    worker = threading.Thread(target=handle_request, args=(sampler, 'fees.reports', stop))
+    idle = threading.Thread(target=stop.wait)  # not handling a request: never sampled
+    worker.start()
+    idle.start()
+    try:
+        assert sampler.start(duration=0.5, interval=0.002)
+        assert not sampler.start(duration=1)  # one session at a time
+        sampler._thread.join()
+    finally:
+        stop.set()
+        worker.join()
+        idle.join()
+
+    status = sampler.status()
+    assert not status['running'] and status['samples'] > 10
+    # The sampler keeps itself under its overhead bound
+    assert status['overhead_percent'] <= 100 * sampler.max_overhead + 1
+
+    lines = sampler.collapsed().splitlines()
+    assert lines and all(line.startswith('fees.reports;') for line in lines)
+    assert any('busy_fee_report (test_profiler.py:' in line for line in lines)
+    assert 0 < sum(int(line.rsplit(' ', 1)[1]) for line in lines) <= status['samples']
+
+    top = sampler.top_frames()['fees.reports']
+    total = {entry['frame'].split(' ')[0]: entry['percent'] for entry in top['total']}
+    assert total['handle_request'] == 100.0 and total['busy_fee_report'] > 90
+    assert sampler.collapsed(endpoint='dashboard.index') == ''
+
+
+def test_reports_can_be_read_while_sampling():
+    sampler = SamplingProfiler()
+    stop = threading.Event()
+    workers = [threading.Thread(target=handle_request, args=(sampler, f'endpoint.{number}', stop))
+               for number in range(8)]
+    for worker in workers:
+        worker.start()
+    try:
+        sampler.start(duration=0.5, interval=0.001, all_threads=True)
+        while sampler.running:
+            sampler.collapsed()
+            sampler.top_frames()
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+    assert len(sampler.top_frames()) >= 8
+
+
+def test_request_greenlets_are_sampled_under_eventlet():
+    pytest.importorskip('eventlet')  # The production worker class (start_production.py)
+    # eventlet's monkey-patching is process-wide, so the session runs in a child interpreter
+    script = textwrap.dedent('''
+        import eventlet
+        eventlet.monkey_patch()
+        import time
+        from utils.profiler import SamplingProfiler
+
+        def busy_green_report(seconds):
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                sum(i * i for i in range(2000))
+                eventlet.sleep(0)  # Let the other request run
+
+        def handle(sampler, endpoint):
+            sampler.enter_request(endpoint)
+            try:
+                busy_green_report(0.6)
+            finally:
+                sampler.exit_request()
+
+        sampler = SamplingProfiler()
+        requests = [eventlet.spawn(handle, sampler, name) for name in ('fees.reports', 'rooms.view_rooms')]
+        eventlet.sleep(0)
+        assert sampler.start(duration=0.4, interval=0.002)
+        for request in requests:
+            request.wait()
+        sampler.stop()
+        assert sampler.status()['samples'] > 10
+        for endpoint, report in sampler.top_frames().items():
+            print(endpoint, any(entry['frame'].startswith('busy_green_report') for entry in report['total']))
+    ''')
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-c', script], cwd=root, capture_output=True, text=True,
+                            timeout=60, env=dict(os.environ, PYTHONPATH=root))
+    assert result.returncode == 0, result.stderr
+    assert sorted(result.stdout.split('\n')) == ['', 'fees.reports True', 'rooms.view_rooms True']
+
+
+def make_app(enabled=True):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.config.update(PROFILER_ENABLED=enabled, PROFILER_MAX_SECONDS=5)
+    app.add_url_rule('/login', 'auth.login', lambda: 'login')
+    app.add_url_rule('/reports', 'fees.reports', lambda: 'reports')
+
+    @app.before_request
+    def load_user():
+        g.user = {'id': session.get('user_id'), 'role': session.get('role')}
+
+    configure_profiler(app)
+    app.register_blueprint(profiler_bp)
+    return app
+
+
+def login(client, role):
+    with client.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['role'] = role
+
+
+def test_routes_are_owner_only_and_opt_in():
+    disabled = make_app(enabled=False).test_client()
+    login(disabled, 'owner')
+    assert disabled.post('/admin/profiler/start').status_code == 404
+
+    client = make_app().test_client()
+    assert client.get('/admin/profiler/').status_code == 302  # not logged in
+    login(client, 'manager')
+    assert client.post('/admin/profiler/start').status_code == 403
+    assert client.get('/admin/profiler/collapsed').status_code == 403
+
+    login(client, 'owner')
+    assert client.post('/admin/profiler/start?seconds=600').status_code == 400
+    response = client.post('/admin/profiler/start?seconds=2&interval_ms=1')
+    try:
+        assert response.status_code == 202 and response.get_json()['status']['running']
+        assert client.post('/admin/profiler/start?seconds=1').status_code == 409
+        client.get('/reports')
+        time.sleep(0.05)
+    finally:
+        stopped = client.post('/admin/profiler/stop').get_json()
+    assert not stopped['status']['running'] and stopped['status']['samples'] > 0
+
+    report = client.get('/admin/profiler/').get_json()
+    assert report['status']['interval'] == 0.001
+    collapsed = client.get('/admin/profiler/collapsed')
+    assert collapsed.mimetype == 'text/plain'
+    assert profiler.collapsed() == collapsed.get_data(as_text=True)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Query Compiler Tests
+Checks the SQLite -> PostgreSQL translation used by utils.query_compiler
+"""
+import pytest
+
+from utils.query_compiler import (
+    QueryCompileError, clear_compile_cache, compile_query, get_compile_cache_stats, is_unique_violation
+)
+
+
+def pg(sql, has_params=True):
+    return compile_query(sql, 'postgresql', has_params)
+
+
+def test_placeholders_and_percent_outside_literals():
+    """? becomes %s, literal percent signs are escaped, quoted ? is untouched"""
+    compiled = pg("SELECT * FROM rooms WHERE room_number = ? AND notes = '50% off?'")
+    assert compiled.sql == "SELECT * FROM rooms WHERE room_number = %s AND notes = '50%% off?'"
+
+
+def test_percent_left_alone_without_params():
+    """psycopg2 skips formatting when no parameters are passed"""
+    assert pg("SELECT '100%'", has_params=False).sql == "SELECT '100%'"
+
+
+def test_like_is_case_insensitive():
+    assert pg("SELECT id FROM students s WHERE s.name LIKE ?").sql == \
+        "SELECT id FROM students s WHERE s.name ILIKE %s"
+
+
+def test_strftime_and_relative_dates():
+    """The monthly expense trend query translates to to_char and interval arithmetic"""
+    compiled = pg('''
+        SELECT strftime('%Y-%m', expense_date) as month, COALESCE(SUM(amount), 0) as total
+        FROM expenses
+        WHERE expense_date >= date('now', '-12 months')
+        GROUP BY strftime('%Y-%m', expense_date)
+    ''', has_params=False)
+    assert "to_char(CAST(expense_date AS TIMESTAMP), 'YYYY-MM')" in compiled.sql
+    assert "CAST(((NOW() AT TIME ZONE 'UTC') - INTERVAL '12 months') AS DATE)" in compiled.sql
+    assert 'strftime' not in compiled.sql and "date('now'" not in compiled.sql
+
+
+def test_nested_and_bound_date_modifiers():
+    compiled = pg("SELECT strftime('%Y', date(due_date, 'start of month', ?)) FROM fees")
+    assert compiled.sql == (
+        "SELECT to_char(CAST(CAST((date_trunc('month', CAST(due_date AS TIMESTAMP)) "
+        "+ CAST(%s AS INTERVAL)) AS DATE) AS TIMESTAMP), 'YYYY') FROM fees"
+    )
+
+
+def test_column_names_containing_function_names_are_untouched():
+    sql = "SELECT paid_date, due_date FROM fees WHERE paid_date IS NOT NULL"
+    assert pg(sql, has_params=False).sql == sql
+
+
+def test_group_concat_and_ifnull():
+    compiled = pg("SELECT GROUP_CONCAT(c.description, '; '), IFNULL(r.capacity, 0) FROM complaints c", False)
+    assert compiled.sql == \
+        "SELECT string_agg(CAST(c.description AS TEXT), '; '), COALESCE(r.capacity, 0) FROM complaints c"
+
+
+def test_unsupported_constructs_raise():
+    with pytest.raises(QueryCompileError):
+        pg("SELECT strftime('%s', created_at) FROM students", False)
+    with pytest.raises(QueryCompileError):
+        pg("INSERT OR REPLACE INTO rooms (id) VALUES (?)")
+
+
+def test_inserts_return_generated_id():
+    compiled = pg("INSERT INTO fees (student_id, amount) VALUES (?, ?)")
+    assert compiled.sql.endswith('VALUES (%s, %s) RETURNING id')
+    assert compiled.returns_id
+
+    details = pg("INSERT INTO student_details (student_id, city) VALUES (?, ?)")
+    assert not details.returns_id and 'RETURNING' not in details.sql
+
+
+def test_insert_or_ignore_becomes_on_conflict():
+    compiled = pg("INSERT OR IGNORE INTO fees (student_id) VALUES (?)")
+    assert compiled.sql == "INSERT INTO fees (student_id) VALUES (%s) ON CONFLICT DO NOTHING RETURNING id"
+
+
+def test_transaction_control_is_handled_by_connection():
+    assert pg('BEGIN TRANSACTION', False).action == 'begin'
+    assert pg('ROLLBACK', False).action == 'rollback'
+    assert pg('commit;', False).action == 'commit'
+
+
+def test_sqlite_dialect_is_passthrough():
+    sql = "SELECT strftime('%Y', expense_date) FROM expenses WHERE id = ?"
+    assert compile_query(sql, 'sqlite').sql == sql
+
+
+def test_compiled_statements_are_cached():
+    clear_compile_cache()
+    first = pg("SELECT * FROM hostels WHERE id = ?")
+    second = pg("SELECT * FROM hostels WHERE id = ?")
+    assert first is second
+    stats = get_compile_cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['size'] == 1
+
+
+def test_unique_violation_detection():
+    assert is_unique_violation(Exception('UNIQUE constraint failed: rooms.room_number'))
+    assert is_unique_violation(Exception('duplicate key value violates unique constraint "rooms_room_number_key"'))
+    assert not is_unique_violation(Exception('NOT NULL constraint failed: rooms.capacity'))
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Socket.IO Presence Tests
+Checks that RedisConnectionManager shares online sessions across workers, expires
+sessions that stop sending heartbeats and falls back to memory without Redis
+"""
+import fnmatch
+
+from redis.exceptions import WatchError
+
+from redis_utils import RedisConnectionManager
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """The subset of redis-py used by RedisConnectionManager, in memory."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.data = {}
+        self.expires = {}
+        self.commands = 0
+        self.versions = {}  # key -> number of writes, for WATCH
+        self.before_exec = None  # called once before the next watched EXEC, to interleave another client
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _alive(self, key):
+        if key in self.expires and self.expires[key] <= self.clock():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _zset(self, key):
+        if not self._alive(key):
+            self.data[key] = {}
+        return self.data[key]
+
+    def ping(self):
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def transaction(self, func, *watches):
+        while True:
+            pipe = FakePipeline(self)
+            pipe.watch(*watches)
+            func(pipe)
+            try:
+                return pipe.execute()
+            except WatchError:
+                continue
+
+    def set(self, key, value, ex=None):
+        self.commands += 1
+        self._touch(key)
+        self.data[key] = value
+        if ex:
+            self.expires[key] = self.clock() + ex
+        return True
+
+    def get(self, key):
+        self.commands += 1
+        return self.data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        self.commands += 1
+        return [self.data[key] if self._alive(key) else None for key in keys]
+
+    def delete(self, key):
+        self.commands += 1
+        self._touch(key)
+        self.expires.pop(key, None)
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    def expire(self, key, seconds):
+        self.commands += 1
+        if not self._alive(key):
+            return False
+        self.expires[key] = self.clock() + seconds
+        return True
+
+    def zadd(self, key, mapping):
+        self.commands += 1
+        self._touch(key)
+        zset = self._zset(key)
+        added = sum(1 for member in mapping if member not in zset)
+        zset.update(mapping)
+        return added
+
+    def zrem(self, key, member):
+        self.commands += 1
+        self._touch(key)
+        return 1 if self._zset(key).pop(member, None) is not None else 0
+
+    def zcard(self, key):
+        self.commands += 1
+        return len(self._zset(key)) if self._alive(key) else 0
+
+    def zrange(self, key, start, end):
+        self.commands += 1
+        return sorted(self._zset(key), key=self._zset(key).get)
+
+    def _in_range(self, score, low, high):
+        low = float('-inf') if low == '-inf' else low
+        return low <= score <= high
+
+    def zrangebyscore(self, key, low, high):
+        self.commands += 1
+        zset = self._zset(key)
+        return [member for member, score in zset.items() if self._in_range(score, low, high)]
+
+    def zremrangebyscore(self, key, low, high):
+        self.commands += 1
+        self._touch(key)
+        zset = self._zset(key)
+        removed = [member for member, score in zset.items() if self._in_range(score, low, high)]
+        for member in removed:
+            del zset[member]
+        return len(removed)
+
+    def keys(self, pattern):
+        return [key for key in list(self.data) if self._alive(key) and fnmatch.fnmatch(key, pattern)]
+
+
+class FakePipeline:
+    """Queues commands and runs them together on execute(), like MULTI/EXEC.
+
+    After watch() commands run immediately until multi(); execute() fails with
+    WatchError if a watched key was written in between.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+        self.watched = None
+        self.immediate = False
+
+    def watch(self, *keys):
+        self.watched = {key: self.redis.versions.get(key, 0) for key in keys}
+        self.immediate = True
+
+    def multi(self):
+        self.immediate = False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            if self.immediate:
+                return getattr(self.redis, name)(*args, **kwargs)
+            self.queued.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        if self.watched and self.redis.before_exec is not None:
+            interleaved, self.redis.before_exec = self.redis.before_exec, None
+            interleaved()
+        if self.watched and any(self.redis.versions.get(key, 0) != version
+                                for key, version in self.watched.items()):
+            raise WatchError('watched key changed')
+        self.redis.commands -= len(self.queued) - 1  # One round trip
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.queued]
+
+
+class DownRedis:
+    def pipeline(self, transaction=True):
+        raise ConnectionError('Redis is down')
+
+    def get(self, key):
+        raise ConnectionError('Redis is down')
+
+
+def workers(count=2, timeout=90):
+    clock = Clock()
+    redis = FakeRedis(clock)
+    return clock, redis, [RedisConnectionManager(client=redis, clock=clock, heartbeat_timeout=timeout)
+                          for _ in range(count)]
+
+
+def session(user_id, hostel_id):
+    return {'user_id': user_id, 'name': f'User {user_id}', 'role': 'manager', 'hostel_id': hostel_id}
+
+
+def test_presence_is_shared_across_workers():
+    clock, redis, (first, second) = workers()
+    first.add_user_session(1, 'a', session(1, 10))
+    second.add_user_session(1, 'b', session(1, 10))
+    second.add_user_session(2, 'c', session(2, 20))
+
+    for manager in (first, second):
+        assert manager.get_online_session_count() == 3
+        assert manager.get_online_user_count() == 2
+        assert manager.get_hostel_session_count(10) == 2
+        assert manager.get_user_sessions(1) == {'a', 'b'}
+    assert first.get_session_data('c') == session(2, 20)
+
+    # Closing one of two sessions keeps the user online
+    first.remove_user_session(1, 'b')
+    assert second.get_online_session_count() == 2 and second.get_online_user_count() == 2
+    assert second.get_hostel_session_count(10) == 1
+    second.remove_user_session(1, 'a')
+    assert first.get_online_user_count() == 1 and first.get_user_sessions(1) == set()
+    assert first.get_session_data('a') is None
+
+
+def test_a_session_added_while_the_last_one_closes_keeps_the_user_online():
+    clock, redis, (first, second) = workers()
+    first.add_user_session(1, 'a', session(1, 10))
+    # The last session closes on one worker while the user connects on another
+    redis.before_exec = lambda: second.add_user_session(1, 'b', session(1, 10))
+    first.remove_user_session(1, 'a')
+    assert first.get_online_user_count() == 1 and first.get_user_sessions(1) == {'b'}
+
+    second.remove_user_session(1, 'b')
+    assert first.get_online_user_count() == 0
+
+
+def test_writes_are_pipelined_and_counts_do_not_scan():
+    clock, redis, (manager,) = workers(count=1)
+    manager.add_user_session(1, 'a', session(1, 10))
+    assert redis.commands == 1
+
+    for number in range(200):
+        manager.add_user_session(number, f's{number}', session(number, number % 5 + 1))
+    redis.commands = 0
+    assert manager.get_online_session_count() == 201
+    assert manager.get_hostel_session_count(3) == 40
+    # Trim + ZCARD in one round trip each, whatever the number of sessions
+    assert redis.commands == 2
+
+
+def test_sessions_without_heartbeats_expire():
+    clock, redis, (first, second) = workers(timeout=90)
+    first.add_user_session(1, 'a', session(1, 10))
+    second.add_user_session(2, 'b', session(2, 10))
+
+    # Only the first worker keeps its client alive; the second one dies without a disconnect
+    for _ in range(4):
+        clock.now += 30
+        assert first.heartbeat('a', 1, 10)
+    assert first.get_online_session_count() == 1
+    assert first.get_online_user_count() == 1
+    assert first.get_hostel_session_count(10) == 1
+
+    assert first.cleanup_expired_sessions() == 0
+    clock.now += 200
+    assert first.cleanup_expired_sessions() == 1
+    assert not redis.keys('socketio:session:*')
+    # A lapsed session must register again
+    assert not first.heartbeat('a', 1, 10)
+
+
+def test_falls_back_to_memory_without_redis():
+    manager = RedisConnectionManager(client=DownRedis())
+    manager.add_user_session(1, 'a', session(1, 10))
+    manager.add_user_session(2, 'b', session(2, 20))
+
+    assert manager.get_online_session_count() == 2
+    assert manager.get_hostel_session_count(20) == 1
+    assert manager.get_session_data('a') == session(1, 10)
+    assert manager.stats()['backend'] == 'memory'
+    manager.remove_user_session(1, 'a')
+    assert manager.get_online_user_count() == 1
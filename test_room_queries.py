@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Room Query Tests
+Guards RoomModel.get_all_rooms against per-room (N+1) student queries
+"""
+import pytest
+
+from models import db
+from models.db import RoomModel, get_db_connection
+
+
+@pytest.fixture
+def room_db(models_db):
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North'), (2, 'South')")
+    for number in range(1, 61):
+        hostel_id = 1 if number <= 40 else 2
+        room_id = conn.execute(
+            'INSERT INTO rooms (room_number, capacity, current_occupancy, hostel_id) VALUES (?, 3, 2, ?)',
+            (f'R{number:03d}', hostel_id)
+        ).lastrowid
+        for bed in ('b', 'a'):  # Inserted out of order to check the name ordering
+            conn.execute(
+                'INSERT INTO students (name, email, room_id, hostel_id) VALUES (?, ?, ?, ?)',
+                (f'Student {number}{bed}', f's{number}{bed}@example.com', room_id, hostel_id)
+            )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def count_queries(func):
+    """Run func and return (result, number of SELECT statements it executed)."""
+    conn = get_db_connection()
+    raw = conn.raw_connection
+    statements = []
+    raw.set_trace_callback(statements.append)
+    conn.close()  # The model checks the same connection back out
+    try:
+        result = func()
+    finally:
+        raw.set_trace_callback(None)
+    return result, len([s for s in statements if s.lstrip().upper().startswith('SELECT')])
+
+
+def test_get_all_rooms_query_count_is_constant(room_db):
+    rooms, queries = count_queries(lambda: RoomModel.get_all_rooms())
+    assert len(rooms) == 60
+    assert queries == 2  # Rooms, then all occupants in one IN (...) query
+
+
+def test_get_all_rooms_attaches_students_in_name_order(room_db):
+    rooms = RoomModel.get_all_rooms(hostel_id=2)
+    assert len(rooms) == 20
+    first = rooms[0]
+    assert first['room_number'] == 'R041'
+    assert [s['name'] for s in first['students']] == ['Student 41a', 'Student 41b']
+    assert first['student_names'] == 'Student 41a, Student 41b'
+    assert 'room_id' not in first['students'][0]
+
+
+def test_occupant_lookup_is_chunked(room_db, monkeypatch):
+    monkeypatch.setattr(db, 'SQL_IN_CHUNK_SIZE', 25)
+    rooms, queries = count_queries(lambda: RoomModel.get_all_rooms())
+    assert queries == 1 + 3  # 60 rooms in chunks of 25
+    assert all(len(room['students']) == 2 for room in rooms)
+
+
+def test_students_can_be_skipped(room_db):
+    rooms, queries = count_queries(lambda: RoomModel.get_all_rooms(include_students=False))
+    assert queries == 1
+    assert rooms[0]['students'] == [] and rooms[0]['student_names'] == ''
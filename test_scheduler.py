@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Scheduler Tests
+Checks that scheduled jobs run once per interval across workers and record their run history
+"""
+import sqlite3
+
+from flask import Flask
+
+import utils.fee_utils
+from utils.scheduler import FAILED, OK, DatabaseLock, Scheduler, configure_scheduler, scheduler, sweep_overdue_fees
+
+
+def workers(count, lock, func, interval=3600):
+    pool = [Scheduler(lock=lock, tick=30) for _ in range(count)]
+    for worker in pool:
+        worker.add_job('sweep', func, interval)
+    return pool
+
+
+def test_job_runs_once_per_interval_across_workers(models_db):
+    calls = []
+    pool = workers(3, DatabaseLock(), lambda: calls.append(1) or len(calls))
+
+    assert sum(len(worker.run_pending(now=1000)) for worker in pool) == 1
+    # Workers that lost the lease keep trying each tick, but it is held for the interval
+    assert sum(len(worker.run_pending(now=1000 + 30 * n)) for n in range(1, 10) for worker in pool) == 0
+    assert sum(len(worker.run_pending(now=1000 + 3600)) for worker in pool) == 1
+    assert len(calls) == 2
+
+    locked = [worker for worker in pool if not worker.jobs()[0].runs]
+    assert locked and all(worker.jobs()[0].locked_skips > 0 for worker in locked)
+
+
+def test_runs_are_timed_and_failures_recorded(models_db):
+    def broken():
+        raise RuntimeError('mail server down')
+
+    worker = Scheduler(lock=DatabaseLock())
+    worker.add_job('ok', lambda: {'updated': 3}, 60)
+    worker.add_job('broken', broken, 60)
+    runs = {run['job']: run for run in worker.run_pending(now=1000)}
+
+    assert runs['ok']['status'] == OK and runs['ok']['result'] == {'updated': 3}
+    assert runs['broken']['status'] == FAILED and runs['broken']['error'] == 'mail server down'
+    assert all(run['duration_ms'] >= 0 for run in runs.values())
+    stats = worker.stats()['jobs']
+    assert stats['broken']['last_status'] == FAILED and len(stats['ok']['history']) == 1
+    # Not due again until the interval has passed
+    assert worker.run_pending(now=1030) == []
+
+
+def test_a_failing_overdue_sweep_is_a_failed_run(models_db, monkeypatch):
+    # A database without a fees table
+    monkeypatch.setattr(utils.fee_utils, 'get_db_connection', lambda: sqlite3.connect(':memory:'))
+    worker = Scheduler(lock=DatabaseLock())
+    worker.add_job('overdue_fees', sweep_overdue_fees, 60)
+    (run,) = worker.run_pending(now=1000)
+    assert run['status'] == FAILED and 'no such table: fees' in run['error']
+    # Callers that do not ask for errors keep getting 0
+    assert utils.fee_utils.update_overdue_fees() == 0
+
+
+def test_run_job_respects_the_lease(models_db):
+    lock = DatabaseLock()
+    first, second = workers(2, lock, lambda: 'done')
+    assert first.run_job('sweep')['result'] == 'done'
+    assert second.run_job('sweep') is None
+
+
+def test_configure_registers_jobs_from_settings(models_db):
+    app = Flask(__name__)
+    app.config.update(CACHE_TYPE='memory', SCHEDULER_OVERDUE_INTERVAL=0,
+                      SCHEDULER_REMINDER_INTERVAL=86400, SCHEDULER_STATS_INTERVAL=600)
+    configured = configure_scheduler(app, start=False)
+    try:
+        # Reminders need a mail account; an interval of 0 disables the sweep
+        assert [job.name for job in configured.jobs()] == ['hostel_stats']
+        assert configured.stats()['lock'] == 'database'
+        run = configured.run_job('hostel_stats')
+        assert run['status'] == OK and run['result'] == {'mismatches': 0}
+    finally:
+        scheduler.remove_job('hostel_stats')
+        scheduler.context = None
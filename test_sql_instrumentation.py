@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+SQL Instrumentation Tests
+Checks per-request query statistics, the slow/repeated query log and Server-Timing headers
+"""
+import logging
+
+import pytest
+from flask import Flask, g, jsonify
+
+from models.db import get_db_connection
+from utils.sql_instrumentation import InstrumentedConnection, configure_sql_instrumentation, fingerprint
+
+
+@pytest.fixture
+def app(models_db):
+    conn = get_db_connection()
+    conn.executemany('INSERT INTO rooms (room_number, capacity) VALUES (?, ?)',
+                     [(f'R{number}', 2) for number in range(30)])
+    conn.commit()
+    conn.close()
+
+    app = Flask(__name__)
+    app.config.update(SLOW_QUERY_MS=10_000, REPEATED_QUERY_THRESHOLD=20)
+    configure_sql_instrumentation(app)
+
+    @app.route('/rooms')
+    def rooms():
+        # One query for the list, then one per room: an N+1 pattern
+        conn = get_db_connection()
+        try:
+            ids = [row['id'] for row in conn.execute('SELECT id FROM rooms').fetchall()]
+            cursor = conn.cursor()
+            for room_id in ids:
+                cursor.execute('SELECT capacity FROM rooms WHERE id = ?', (room_id,)).fetchone()
+            stats = g.sql_stats.to_dict()
+        finally:
+            conn.close()
+        return jsonify(stats)
+
+    @app.route('/nothing')
+    def nothing():
+        return 'ok'
+
+    return app
+
+
+def test_fingerprints_ignore_literals_and_in_list_length():
+    assert fingerprint("SELECT * FROM fees WHERE id IN (?, ?, ?) AND status = 'Paid'") == \
+        fingerprint("SELECT *\n  FROM fees WHERE id IN (?,?) AND status = 'Overdue'") == \
+        'SELECT * FROM fees WHERE id IN (...) AND status = ?'
+    assert fingerprint('SELECT * FROM rooms WHERE hostel_id = 12 LIMIT 5') == \
+        'SELECT * FROM rooms WHERE hostel_id = ? LIMIT ?'
+    # psycopg2's placeholders, as in the db_utils routes
+    assert fingerprint('SELECT * FROM fees WHERE id IN (%s, %s)') == \
+        fingerprint('SELECT * FROM fees WHERE id IN (%s,%s,%s)') == 'SELECT * FROM fees WHERE id IN (...)'
+
+
+def test_request_statistics_and_server_timing(app):
+    response = app.test_client().get('/rooms')
+    stats = response.get_json()
+
+    assert stats['count'] == 31 and stats['distinct'] == 2
+    assert stats['slowest'] in ('SELECT id FROM rooms', 'SELECT capacity FROM rooms WHERE id = ?')
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=') and 'desc="31 queries"' in timing and 'db-slowest;dur=' in timing
+    # No queries, no header
+    assert 'Server-Timing' not in app.test_client().get('/nothing').headers
+
+
+def test_slow_and_repeated_queries_are_logged(app, caplog):
+    with caplog.at_level(logging.WARNING, logger='sql'):
+        app.test_client().get('/rooms')
+    messages = [record.getMessage() for record in caplog.records if record.name == 'sql']
+    assert messages == ['Query repeated 30 times on GET /rooms: SELECT capacity FROM rooms WHERE id = ?']
+
+    slow_app = Flask(__name__)
+    slow_app.config.update(SLOW_QUERY_MS=0.0001)
+    configure_sql_instrumentation(slow_app)
+    slow_app.add_url_rule('/rooms', view_func=app.view_functions['rooms'])
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='sql'):
+        slow_app.test_client().get('/rooms')
+    slow = [record.getMessage() for record in caplog.records if 'Slow query' in record.getMessage()]
+    assert len(slow) == 31 and all('on GET /rooms: SELECT' in message for message in slow)
+
+
+def test_connections_outside_requests_are_not_wrapped(app):
+    conn = get_db_connection()
+    try:
+        assert not isinstance(conn, InstrumentedConnection)
+    finally:
+        conn.close()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Student Search Tests
+Checks the student_search full-text index: trigger sync, prefix and typo-tolerant ranked queries, and list filters
+"""
+import pytest
+
+from models.db import StudentModel, get_db_connection
+from utils.search import closest_terms, edit_distance, match_expression, tokenize
+
+STUDENTS = [
+    # name, course, room, hostel
+    ('Alexander Grant', 'Computer Science', '101', 1),
+    ('Alexandra Stone', 'Civil Engineering', '102', 1),
+    ('Johnathan Reyes', 'Computer Science', '201', 1),
+    ('Priya Sharma', 'Electrical Engineering', '202', 2),
+    ('Alex Kim', 'Mathematics', '101', 1),
+    ('Mohammed Alexis', 'Physics', None, 2),
+]
+
+
+@pytest.fixture
+def search_db(models_db):
+    conn = get_db_connection()
+    conn.execute("INSERT INTO hostels (id, name) VALUES (1, 'North')")
+    conn.execute("INSERT INTO hostels (id, name) VALUES (2, 'South')")
+    rooms = {}
+    for number, name, course, room, hostel_id in [(n, *s) for n, s in enumerate(STUDENTS, 1)]:
+        if room and (room, hostel_id) not in rooms:
+            rooms[(room, hostel_id)] = conn.execute(
+                'INSERT INTO rooms (room_number, capacity, hostel_id) VALUES (?, 4, ?)', (room, hostel_id)
+            ).lastrowid
+        conn.execute(
+            'INSERT INTO students (name, student_id_number, email, course, room_id, hostel_id) VALUES (?, ?, ?, ?, ?, ?)',
+            (name, f'STU-{number:04d}', f's{number}@example.com', course, rooms.get((room, hostel_id)), hostel_id)
+        )
+    conn.commit()
+    conn.close()
+    return models_db
+
+
+def names(result):
+    return [student['name'] for student in result['results']]
+
+
+def test_prefix_search_ranks_name_matches_first(search_db):
+    result = StudentModel.search('alex')
+    assert set(names(result)) == {'Alexander Grant', 'Alexandra Stone', 'Alex Kim', 'Mohammed Alexis'}
+    assert not result['corrected']
+    assert StudentModel.search('alexand')['results'][0]['name'].startswith('Alexand')
+    # Every word must match, in any column
+    assert names(StudentModel.search('alex comp')) == ['Alexander Grant']
+    assert names(StudentModel.search('stu-0004')) == ['Priya Sharma']
+
+
+def test_typos_are_corrected(search_db):
+    result = StudentModel.search('jonathan')
+    assert names(result) == ['Johnathan Reyes'] and result['corrected']
+    assert names(StudentModel.search('prita sharma')) == ['Priya Sharma']
+    assert StudentModel.search('zzzzzz')['results'] == []
+
+
+def test_search_is_scoped_and_limited(search_db):
+    assert set(names(StudentModel.search('alex', hostel_id=2))) == {'Mohammed Alexis'}
+    assert len(StudentModel.search('alex', limit=2)['results']) == 2
+    assert StudentModel.search('  ')['results'] == []
+    # Quotes and FTS5 operators in the input are taken literally
+    assert StudentModel.search('"alex" OR NOT*')['results'] == []
+
+
+def test_triggers_follow_student_and_room_changes(search_db):
+    conn = get_db_connection()
+    conn.execute("UPDATE students SET name = 'Alexandria Stone' WHERE name = 'Alexandra Stone'")
+    conn.execute("UPDATE rooms SET room_number = '305' WHERE room_number = '201'")
+    conn.execute("DELETE FROM students WHERE name = 'Alex Kim'")
+    conn.commit()
+    conn.close()
+
+    assert names(StudentModel.search('alexandria')) == ['Alexandria Stone']
+    assert StudentModel.search('alexandra')['corrected']
+    assert names(StudentModel.search('305')) == ['Johnathan Reyes']
+    assert 'Alex Kim' not in names(StudentModel.search('kim'))
+
+
+def test_list_filters_use_the_index(search_db):
+    students = StudentModel.get_all_students({'name': 'alex', 'course': 'sci', 'room_number': '', 'filter_course': ''})
+    assert [s['name'] for s in students] == ['Alexander Grant']
+    page = StudentModel.get_students_page({'room_number': '101'}, hostel_id=1)
+    assert [s['name'] for s in page.items] == ['Alex Kim', 'Alexander Grant']
+
+    select, select_from, conditions, params = StudentModel._student_filters({'name': 'alex'}, use_search_index=True)
+    conn = get_db_connection()
+    try:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT {select} {select_from} WHERE {' AND '.join(conditions)}", params))
+    finally:
+        conn.close()
+    assert 'VIRTUAL TABLE INDEX' in plan and 'LIKE' not in ' '.join(conditions)
+
+
+def test_search_helpers():
+    assert tokenize('  Alex  O\'Brien-Smith ') == ['alex', 'o', 'brien', 'smith']
+    assert match_expression(['jo', ('ann', 'anne')], column='name') == \
+        'name : "jo"* AND (name : "ann"* OR name : "anne"*)'
+    assert edit_distance('jonh', 'john') == 1  # Transposition
+    assert edit_distance('kitten', 'sitting', limit=1) == 2
+    assert closest_terms('alexnder', [('alexander', 3), ('alexandra', 5), ('alexis', 9)]) == ['alexander', 'alexandra']
+    assert closest_terms('al', [('al', 1)]) == []
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+User Cache Tests
+Checks that logged-in users are served from a short-lived snapshot that user edits invalidate
+"""
+import pytest
+
+from models.db import get_db_connection
+from models.users import User
+from utils.invalidation import bus
+from utils.user_cache import UserCache, invalidate_user, user_cache
+
+
+@pytest.fixture
+def users_db(models_db):
+    conn = get_db_connection()
+    # Users live outside init_db's schema
+    conn.execute('''
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, password_hash TEXT, full_name TEXT,
+                            role TEXT, hostel_id INTEGER, email TEXT)
+    ''')
+    conn.commit()
+    conn.close()
+    user_cache.clear()
+    yield models_db
+    user_cache.clear()
+
+
+def counting_loader():
+    calls = []
+
+    def load(user_id):
+        calls.append(user_id)
+        conn = get_db_connection()
+        try:
+            return conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        finally:
+            conn.close()
+    return load, calls
+
+
+def test_snapshot_is_reused_and_hides_the_password_hash(users_db):
+    user_id = User.create_user('warden', 'secret', 'Wendy Warden', User.ROLE_MANAGER, hostel_id=2)
+    load, calls = counting_loader()
+
+    snapshots = [user_cache.get(user_id, load) for _ in range(5)]
+    assert calls == [user_id]
+    assert snapshots[0]['username'] == 'warden' and snapshots[0]['hostel_id'] == 2
+    assert 'password_hash' not in snapshots[0]
+    # Callers get copies; changing one does not change the cache
+    snapshots[0]['role'] = 'owner'
+    assert user_cache.get(user_id, load)['role'] == User.ROLE_MANAGER
+
+
+def test_user_edits_invalidate_the_snapshot(users_db):
+    user_id = User.create_user('warden', 'secret', 'Wendy Warden', User.ROLE_MANAGER, hostel_id=2)
+    load, calls = counting_loader()
+    user_cache.get(user_id, load)
+
+    User.get_by_id(user_id).update(full_name='Wendy W.', hostel_id=3)
+    snapshot = user_cache.get(user_id, load)
+    assert snapshot['full_name'] == 'Wendy W.' and snapshot['hostel_id'] == 3
+
+    User.get_by_id(user_id).change_password('new-secret')
+    user_cache.get(user_id, load)
+    assert len(calls) == 3
+
+
+def test_shared_cache_serves_other_workers(users_db):
+    user_id = User.create_user('owner', 'secret', 'Olive Owner', User.ROLE_OWNER)
+    load, calls = counting_loader()
+    user_cache.get(user_id, load)
+
+    other_worker = UserCache()  # Empty local LRU, same shared cache
+    assert other_worker.get(user_id, load)['username'] == 'owner'
+    assert calls == [user_id] and other_worker.stats()['shared_hits'] == 1
+
+    bus.subscribe(other_worker._on_invalidate)
+    try:
+        invalidate_user(user_id)
+        other_worker.get(user_id, load)
+    finally:
+        bus.unsubscribe(other_worker._on_invalidate)
+    assert len(calls) == 2
+
+
+def test_missing_users_and_disabled_cache_hit_the_database(users_db):
+    load, calls = counting_loader()
+    assert user_cache.get(99, load) is None
+    assert user_cache.get(99, load) is None
+    assert calls == [99, 99]
+
+    user_id = User.create_user('warden', 'secret', 'Wendy Warden', User.ROLE_MANAGER)
+    disabled = UserCache(ttl=0)
+    disabled.get(user_id, load)
+    disabled.get(user_id, load)
+    assert calls == [99, 99, user_id, user_id]
@@ -50,6 +50,8 @@ def apply_hostel_filters():
     
     # Filter Student methods
     filter_by_hostel(StudentModel, 'get_all_students', 'hostel_id')
+    filter_by_hostel(StudentModel, 'get_students_page', 'hostel_id')
+    filter_by_hostel(StudentModel, 'search', 'hostel_id')
     filter_by_hostel(StudentModel, 'get_student_by_id')
       # Filter Room methods
     filter_by_hostel(RoomModel, 'get_all_rooms', 'hostel_id')
@@ -2,93 +2,124 @@
 
 This module contains functions that handle batch processing operations
 like adding multiple fees at once.
+
+Fees are written set-based, a chunk of students per statement, and keyed on
+(student_id, fee_type, due_date) so running the same batch twice only adds
+the fees that are still missing. The key is the unique index
+uq_fees_student_type_due: init_db creates it on SQLite, and PostgreSQL
+databases need migrations/add_fee_uniqueness_postgres.sql.
 """
 
-import sqlite3
 from datetime import date, timedelta
 
-def process_batch_fees(conn, student_ids, fee_amount, due_date, fee_type="Monthly Fee"):
+from utils.invalidation import invalidate_hostel
+
+# Students per statement; stays below SQLite's bound-parameter limit
+BATCH_CHUNK_SIZE = 500
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def process_batch_fees(conn, student_ids, fee_amount, due_date, fee_type="Monthly Fee",
+                       hostel_id=None, chunk_size=BATCH_CHUNK_SIZE, progress=None):
     """Process batch fee assignments for multiple students.
-    
+
+    Each chunk of students is validated with one IN query and inserted with one
+    INSERT ... SELECT, then committed, so an interrupted run can simply be rerun.
+    Students that already have a fee of this type and due date are skipped.
+
     Args:
         conn: Database connection
         student_ids: List of student IDs to assign fees to
         fee_amount: Amount for each fee
         due_date: Due date for the fees
         fee_type: Type of fee (description)
-        
+        hostel_id: Only bill students of this hostel (or None for any hostel)
+        chunk_size: Number of students per statement
+        progress: Optional callable(processed, total, inserted) called after each chunk
+
     Returns:
         Tuple of (success_count, error_list)
     """
     success_count = 0
     errors = []
-    
+
+    ids = []
+    for student_id in dict.fromkeys(student_ids):  # De-duplicate, keeping order
+        try:
+            ids.append(int(student_id))
+        except (TypeError, ValueError):
+            errors.append(f"Invalid student ID {student_id!r}")
+
+    hostel_filter = ' AND hostel_id = ?' if hostel_id is not None else ''
+    hostel_params = [hostel_id] if hostel_id is not None else []
+    affected_hostels = set()
+    processed = 0
+
     try:
-        # Begin transaction for all operations
-        conn.execute('BEGIN TRANSACTION')
-        
-        for student_id in student_ids:
-            try:
-                # Check if student exists
-                student = conn.execute('SELECT name FROM students WHERE id = ?', (student_id,)).fetchone()
-                if not student:
-                    errors.append(f"Student ID {student_id} not found")
-                    continue
-                
-                # Insert fee record
-                conn.execute(
-                    'INSERT INTO fees (student_id, amount, due_date, status, description) VALUES (?, ?, ?, ?, ?)',
-                    (student_id, fee_amount, due_date, 'Pending', fee_type)
+        for chunk in _chunks(ids, chunk_size):
+            placeholders = ','.join(['?'] * len(chunk))
+            found = conn.execute(
+                f'SELECT id, hostel_id FROM students WHERE id IN ({placeholders}){hostel_filter}',
+                chunk + hostel_params
+            ).fetchall()
+            found_ids = {row['id'] for row in found}
+            errors.extend(f"Student ID {student_id} not found" for student_id in chunk if student_id not in found_ids)
+
+            if found_ids:
+                cursor = conn.execute(
+                    f'''INSERT INTO fees (student_id, amount, due_date, status, hostel_id, fee_type)
+                        SELECT id, ?, ?, 'Pending', hostel_id, ? FROM students
+                        WHERE id IN ({placeholders}){hostel_filter}
+                        ON CONFLICT (student_id, fee_type, due_date) DO NOTHING''',
+                    [fee_amount, due_date, fee_type] + chunk + hostel_params
                 )
-                success_count += 1
-                
-            except Exception as e:
-                errors.append(f"Error processing fee for student ID {student_id}: {e}")
-        
-        # If everything went well, commit the transaction
-        if not errors:
-            conn.commit()
-            return success_count, errors
-        
-        # If there were any errors but some succeeded, let caller decide
-        if success_count > 0:
-            conn.commit()
-            return success_count, errors
-            
-        # If nothing succeeded, roll back
-        conn.rollback()
-        return 0, errors
-            
+                conn.commit()
+                if cursor.rowcount > 0:
+                    success_count += cursor.rowcount
+                    affected_hostels.update(row['hostel_id'] for row in found)
+
+            processed += len(chunk)
+            if progress:
+                progress(processed, len(ids), success_count)
+
     except Exception as e:
-        # Handle any overall transaction errors
+        # Chunks already committed stay; rerunning the batch completes it
         conn.rollback()
         errors.append(f"Transaction error: {e}")
-        return 0, errors
 
-def generate_recurring_fees(conn, frequency="monthly", student_course=None, amount=None):
+    for affected_hostel_id in affected_hostels:
+        invalidate_hostel(affected_hostel_id, 'fees')
+    return success_count, errors
+
+def generate_recurring_fees(conn, frequency="monthly", student_course=None, amount=None, progress=None):
     """Generate recurring fees based on specified criteria.
-    
+
+    Safe to run repeatedly: students already billed for the period are skipped.
+
     Args:
         conn: Database connection
         frequency: 'monthly', 'quarterly', 'semester', or 'annual'
         student_course: Course filter (or None for all)
         amount: Fee amount (or None to use default)
-        
+        progress: Optional callable(processed, total, inserted) called after each chunk
+
     Returns:
         Tuple of (success_count, error_list)
     """
     # Get all active students, optionally filtered by course
-    query = "SELECT id, name, course FROM students"
+    query = "SELECT id FROM students"
     params = []
-    
+
     if student_course:
         query += " WHERE course = ?"
         params.append(student_course)
-    
+    query += " ORDER BY id"
+
     try:
-        students = conn.execute(query, params).fetchall()
-        student_ids = [s['id'] for s in students]
-        
+        student_ids = [s['id'] for s in conn.execute(query, params).fetchall()]
+
         # Set default amount based on frequency if not specified
         fee_amount = amount
         if not fee_amount:
@@ -100,7 +131,7 @@ def generate_recurring_fees(conn, frequency="monthly", student_course=None, amou
                 fee_amount = 5000.00
             elif frequency == "annual":
                 fee_amount = 9500.00
-        
+
         # Set due date based on frequency
         today = date.today()
         if frequency == "monthly":
@@ -125,9 +156,10 @@ def generate_recurring_fees(conn, frequency="monthly", student_course=None, amou
         else:
             due_date = today + timedelta(days=30)  # Default to 30 days from now
             fee_type = "Fee"
-        
+
         # Process the batch fees
-        return process_batch_fees(conn, student_ids, fee_amount, due_date.isoformat(), fee_type)
-        
+        return process_batch_fees(conn, student_ids, fee_amount, due_date.isoformat(), fee_type,
+                                  progress=progress)
+
     except Exception as e:
         return 0, [f"Error generating recurring fees: {e}"]
@@ -1,43 +1,215 @@
 """Cache utilities for the Hostel Management System.
 
 This module provides caching functionality to improve performance.
+
+Entries are keyed on the function, its (hashed) arguments and the hostel they
+belong to, expire after a per-entry TTL, are evicted least-recently-used once
+the cache is full, and can be dropped in groups by tag::
+
+    @cached(ttl_seconds=300, tags=('hostel:{hostel_id}:fees',))
+    def get_fee_statistics(hostel_id=None): ...
+
+    cache.invalidate('hostel:3:fees')
+
+Storage is pluggable (see utils.cache_backends); configure_cache() selects the
+in-memory or Redis backend from CACHE_TYPE / CACHE_REDIS_URL.
 """
 
-import time
+import hashlib
+import inspect
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
 from functools import wraps
 
-# Simple in-memory cache
-_cache = {}
+from utils.cache_backends import MemoryBackend, NullBackend, RedisBackend
+
+# Default bounds (overridable through the environment or app config)
+DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TIMEOUT') or 300)
+DEFAULT_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES') or 1024)
+
+# Tenant placeholder for results that are not scoped to a single hostel
+ALL_HOSTELS = 'all'
+
+
+class _Uncacheable(Exception):
+    """Raised when an argument cannot be turned into a stable cache key."""
+
+
+class Cache:
+    """Front end over a cache backend: TTL defaults, tags and hit/miss counters."""
+
+    def __init__(self, backend=None, default_ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.backend = backend or MemoryBackend(max_entries)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0, 'bypassed': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key):
+        """Return (True, value) for a live entry, otherwise (False, None)."""
+        hit, value = self.backend.get(key)
+        self._count('hits' if hit else 'misses')
+        return hit, value
+
+    def set(self, key, value, ttl=None, tags=()):
+        """Store a value for ``ttl`` seconds (the default TTL if None; not at all if <= 0)."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self.backend.set(key, value, ttl, tuple(tags))
+        self._count('sets')
+
+    def delete(self, key):
+        """Drop a single entry."""
+        self.backend.delete(key)
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags; returns the number dropped."""
+        removed = self.backend.invalidate(tags)
+        self._count('invalidations', removed)
+        return removed
+
+    def clear(self):
+        """Drop all entries."""
+        self.backend.clear()
+
+    def record_bypass(self):
+        self._count('bypassed')
+
+    def stats(self):
+        """Return a snapshot of the cache counters, including the backend's."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats.update(self.backend.stats())
+        return stats
+
+
+# Shared cache instance; configure_cache() swaps in the configured backend
+cache = Cache()
+
+
+def create_backend(config):
+    """Build the backend selected by CACHE_TYPE ('redis', 'memory' or 'null')."""
+    cache_type = (config.get('CACHE_TYPE') or 'memory').lower()
+    max_entries = int(config.get('CACHE_MAX_ENTRIES') or DEFAULT_MAX_ENTRIES)
+    if cache_type in ('redis', 'rediscache'):
+        return RedisBackend(
+            config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0',
+            prefix=config.get('CACHE_KEY_PREFIX') or 'hostel_cache:',
+            password=config.get('CACHE_REDIS_PASSWORD'),
+            fallback=MemoryBackend(max_entries)
+        )
+    if cache_type in ('memory', 'simple', 'simplecache'):
+        return MemoryBackend(max_entries)
+    if cache_type in ('null', 'nullcache', 'none'):
+        return NullBackend()
+    raise ValueError(f"Unknown CACHE_TYPE: {config.get('CACHE_TYPE')}")
+
+
+def configure_cache(config):
+    """Point the shared cache at the backend described by an app config mapping."""
+    cache.backend = create_backend(config)
+    if config.get('CACHE_DEFAULT_TIMEOUT') is not None:
+        cache.default_ttl = int(config.get('CACHE_DEFAULT_TIMEOUT'))
+    return cache
+
+
+def _freeze(value):
+    """Convert an argument into a hashable, stable representation."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(repr(_freeze(v)) for v in value))
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    raise _Uncacheable(type(value).__name__)
+
+
+def _current_hostel_id():
+    """The hostel of the logged-in manager, if called during a request."""
+    try:
+        from flask import has_request_context, session
+    except ImportError:
+        return None
+    if has_request_context() and session.get('role') == 'manager':
+        return session.get('hostel_id')
+    return None
+
+
+def make_key(func, bound_arguments, hostel_id):
+    """Build the cache key for a call: function, tenant and hashed arguments."""
+    digest = hashlib.blake2b(repr(_freeze(bound_arguments)).encode('utf-8'), digest_size=16).hexdigest()
+    tenant = ALL_HOSTELS if hostel_id is None else hostel_id
+    return f"hostel:{tenant}:{func.__module__}.{func.__qualname__}:{digest}"
+
+
+def cached(ttl_seconds=60, tags=(), ignore=(), tenant_arg='hostel_id'):
+    """Cache decorator keyed on the call's arguments and hostel.
 
-def cached(ttl_seconds=60):
-    """Cache decorator for functions with no arguments.
-    
     Args:
         ttl_seconds: Time to live in seconds for the cached result
-        
+        tags: Invalidation tags; '{hostel_id}' is replaced by the call's hostel
+              (or 'all' when the result is not scoped to one hostel)
+        ignore: Names of arguments left out of the key (e.g. database connections)
+        tenant_arg: Name of the argument holding the hostel id; functions without
+                    it are scoped to the logged-in manager's hostel
+
     Returns:
-        Decorated function with caching
+        Decorated function with caching. Calls with arguments that cannot be
+        hashed reliably bypass the cache.
     """
     def decorator(func):
+        signature = inspect.signature(func)
+        has_tenant_arg = tenant_arg in signature.parameters
+
+        def key_for(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in ignore}
+            hostel_id = arguments.get(tenant_arg) if has_tenant_arg else _current_hostel_id()
+            return make_key(func, arguments, hostel_id), ALL_HOSTELS if hostel_id is None else hostel_id
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            cache_key = func.__name__
-            
+            try:
+                cache_key, tenant = key_for(args, kwargs)
+            except (_Uncacheable, TypeError):
+                cache.record_bypass()
+                return func(*args, **kwargs)
+
             # Check if we have a valid cached result
-            if cache_key in _cache:
-                result, timestamp = _cache[cache_key]
-                if time.time() - timestamp < ttl_seconds:
-                    return result
-                    
+            hit, result = cache.get(cache_key)
+            if hit:
+                return result
+
             # Compute and cache new result
             result = func(*args, **kwargs)
-            _cache[cache_key] = (result, time.time())
+            cache.set(cache_key, result, ttl_seconds, [tag.format(hostel_id=tenant) for tag in tags])
             return result
-            
+
+        wrapper.cache_key = lambda *args, **kwargs: key_for(args, kwargs)[0]
         return wrapper
     return decorator
 
+
+def get_cache_stats():
+    """Return hit/miss/eviction counters for the shared cache."""
+    return cache.stats()
+
+
 def clear_cache():
     """Clear the entire cache."""
-    global _cache
-    _cache = {}
+    cache.clear()
@@ -0,0 +1,328 @@
+"""Cache storage backends for the Hostel Management System.
+
+MemoryBackend keeps entries in-process (LRU-bounded); RedisBackend shares them
+between workers and falls back to memory while Redis is unreachable;
+NullBackend disables caching.
+"""
+
+import pickle
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Values larger than this are zlib-compressed before going to Redis
+COMPRESS_THRESHOLD = 1024
+
+# Tag sets outlive any single entry so invalidation can always find members
+TAG_SET_TTL = 24 * 60 * 60
+
+
+class CacheBackend(ABC):
+    """Interface shared by all cache backends."""
+
+    name = 'base'
+
+    @abstractmethod
+    def get_many(self, keys):
+        """Return {key: value} for the keys that have live entries."""
+
+    def get(self, key):
+        """Return (True, value) for a live entry, otherwise (False, None)."""
+        found = self.get_many([key])
+        if key in found:
+            return True, found[key]
+        return False, None
+
+    @abstractmethod
+    def set(self, key, value, ttl, tags=()):
+        """Store a value for ttl seconds under the given invalidation tags."""
+
+    @abstractmethod
+    def delete(self, key):
+        """Drop one entry."""
+
+    @abstractmethod
+    def invalidate(self, tags):
+        """Drop every entry carrying any of the tags; returns the number dropped."""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry."""
+
+    def stats(self):
+        return {'backend': self.name}
+
+
+class MemoryBackend(CacheBackend):
+    """A thread-safe, size-bounded LRU store with per-entry TTL and tags."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at, tags)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.RLock()
+        self._evictions = 0
+        self._expirations = 0
+
+    def get_many(self, keys):
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    self._remove(key)
+                    self._expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[0]
+        return found
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate(self, tags):
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        removed += 1
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class NullBackend(CacheBackend):
+    """Stores nothing; every lookup misses (CACHE_TYPE='null')."""
+
+    name = 'null'
+
+    def get_many(self, keys):
+        return {}
+
+    def set(self, key, value, ttl, tags=()):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def invalidate(self, tags):
+        return 0
+
+    def clear(self):
+        pass
+
+
+def dumps(value):
+    """Serialize a value compactly: pickle, zlib-compressed when large."""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > COMPRESS_THRESHOLD:
+        return b'z' + zlib.compress(data)
+    return b'p' + data
+
+
+def loads(data):
+    """Inverse of dumps()."""
+    if data[:1] == b'z':
+        return pickle.loads(zlib.decompress(data[1:]))
+    return pickle.loads(data[1:])
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache in Redis, namespaced by prefix (keys already carry the hostel).
+
+    Entries are pickled, so only point this at a Redis instance the application
+    controls. While Redis is unreachable the backend serves from an in-process
+    MemoryBackend and retries the connection every ``retry_interval`` seconds.
+    Size bounds are left to Redis' maxmemory policy; every entry has a TTL.
+    """
+
+    name = 'redis'
+
+    def __init__(self, redis_url, prefix='hostel_cache:', password=None, fallback=None,
+                 retry_interval=30, client=None):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.password = password
+        self.fallback = fallback or MemoryBackend()
+        self.retry_interval = retry_interval
+        self._redis_client = client
+        self._retry_at = 0.0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def redis_client(self):
+        """Get Redis client with lazy initialization, or None while Redis is down."""
+        if self._redis_client is None and time.monotonic() >= self._retry_at:
+            with self._lock:
+                if self._redis_client is None and time.monotonic() >= self._retry_at:
+                    try:
+                        import redis
+                        client = redis.from_url(
+                            self.redis_url,
+                            password=self.password,
+                            socket_connect_timeout=2,
+                            socket_timeout=2,
+                            retry_on_timeout=True
+                        )
+                        client.ping()
+                        self._redis_client = client
+                        print("Redis cache connection established successfully")
+                    except Exception as e:
+                        print(f"Redis cache connection failed: {e}")
+                        print("Falling back to in-memory cache")
+                        self._retry_at = time.monotonic() + self.retry_interval
+        return self._redis_client
+
+    def _failed(self, error):
+        print(f"Redis cache error, falling back to in-memory cache: {error}")
+        with self._lock:
+            self._errors += 1
+            self._redis_client = None
+            self._retry_at = time.monotonic() + self.retry_interval
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag):
+        return f"{self.prefix}tag:{tag}"
+
+    def get_many(self, keys):
+        client = self.redis_client
+        if client is None:
+            return self.fallback.get_many(keys)
+        try:
+            values = client.mget([self._key(k) for k in keys])
+        except Exception as e:
+            self._failed(e)
+            return self.fallback.get_many(keys)
+        found = {}
+        for key, data in zip(keys, values):
+            if data is not None:
+                try:
+                    found[key] = loads(data)
+                except Exception:
+                    pass  # Written by an incompatible version; treat as a miss
+        return found
+
+    def set(self, key, value, ttl, tags=()):
+        client = self.redis_client
+        if client is None:
+            return self.fallback.set(key, value, ttl, tags)
+        try:
+            data = dumps(value)
+        except Exception:
+            return  # Not serializable (e.g. holds a DB row); leave it uncached
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(self._key(key), data, ex=max(1, int(round(ttl))))
+            for tag in tags:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), TAG_SET_TTL)
+            pipe.execute()
+        except Exception as e:
+            self._failed(e)
+            self.fallback.set(key, value, ttl, tags)
+
+    def delete(self, key):
+        self.fallback.delete(key)
+        client = self.redis_client
+        if client is None:
+            return
+        try:
+            client.delete(self._key(key))
+        except Exception as e:
+            self._failed(e)
+
+    def invalidate(self, tags):
+        # Entries cached in memory during an outage must go too
+        removed = self.fallback.invalidate(tags)
+        client = self.redis_client
+        if client is None or not tags:
+            return removed
+        try:
+            pipe = client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.smembers(self._tag_key(tag))
+            members = set()
+            for keys in pipe.execute():
+                members.update(k.decode('utf-8') if isinstance(k, bytes) else k for k in keys)
+            pipe = client.pipeline(transaction=False)
+            pipe.delete(*[self._tag_key(tag) for tag in tags])
+            if members:
+                pipe.delete(*[self._key(k) for k in members])
+            results = pipe.execute()
+            return removed + (results[1] if members else 0)
+        except Exception as e:
+            self._failed(e)
+            return removed
+
+    def clear(self):
+        self.fallback.clear()
+        client = self.redis_client
+        if client is None:
+            return
+        try:
+            batch = []
+            for key in client.scan_iter(match=f"{self.prefix}*", count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    client.delete(*batch)
+                    batch = []
+            if batch:
+                client.delete(*batch)
+        except Exception as e:
+            self._failed(e)
+
+    def stats(self):
+        return {
+            'backend': self.name,
+            'available': self.redis_client is not None,
+            'errors': self._errors,
+            'fallback': self.fallback.stats(),
+        }
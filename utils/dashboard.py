@@ -4,9 +4,12 @@ This module provides helper functions for the dashboard page.
 """
 
 from datetime import date
+from models.db import HostelStatsModel, table_exists
 from utils.cache import cached
+from utils.invalidation import global_reader_tags
 
-@cached(ttl_seconds=300)  # Cache dashboard stats for 5 minutes
+# Cached for 5 minutes; the figures cover every hostel, so any hostel's changes drop them
+@cached(ttl_seconds=300, tags=global_reader_tags('students', 'rooms', 'fees'), ignore=('connection',))
 def get_dashboard_stats(connection):
     """Get all statistics needed for the dashboard.
     
@@ -17,6 +20,9 @@ def get_dashboard_stats(connection):
         Dictionary containing all dashboard statistics
     """
     try:
+        if table_exists(connection, 'hostel_stats'):
+            return _dashboard_stats_from_summary(HostelStatsModel.summarize(connection))
+        
         # Basic stats
         num_students = connection.execute('SELECT COUNT(*) FROM students').fetchone()[0]
         num_rooms = connection.execute('SELECT COUNT(*) FROM rooms').fetchone()[0]
@@ -75,6 +81,28 @@ def get_dashboard_stats(connection):
             'error': str(e)
         }
 
+def _dashboard_stats_from_summary(summary):
+    """Shape HostelStatsModel figures like get_dashboard_stats' raw-table result."""
+    rooms_by_status = summary['rooms_by_status']
+    total_capacity = summary['total_capacity']
+    # Here occupancy counts students with a room, and occupied rooms are the full ones
+    current_occupancy = summary['housed_students']
+    return {
+        'students': summary['students'],
+        'rooms': summary['rooms'],
+        'occupied_rooms': rooms_by_status.get('Full', 0),
+        'available_rooms': rooms_by_status.get('Available', 0),
+        'maintenance_rooms': rooms_by_status.get('Maintenance', 0),
+        'pending_fees': summary['pending_fees'],
+        'overdue_fees': summary['overdue_fees'],
+        'pending_fees_amount': summary['pending_fees_amount'],
+        'overdue_fees_amount': summary['overdue_fees_amount'],
+        'paid_fees_amount': summary['paid_fees_amount'],
+        'total_capacity': total_capacity,
+        'current_occupancy': current_occupancy,
+        'occupancy_percentage': (current_occupancy / total_capacity * 100) if total_capacity > 0 else 0
+    }
+
 def get_recent_activity(connection, limit=5, hostel_id=None, include_hostel_names=False):
     """Get recent activity data for the dashboard.
     
@@ -187,6 +215,10 @@ def get_recent_activity(connection, limit=5, hostel_id=None, include_hostel_name
 def get_all_activities(connection, page=1, per_page=50, hostel_id=None):
     """Get all historical activities with pagination for detailed view.
     
+    The page is ordered and cut in SQL: from the activity_log table when it
+    exists, otherwise from a UNION ALL over students, paid fees and expenses
+    whose branches each read only as many rows as the requested page needs.
+    
     Args:
         connection: Database connection
         page: Page number (1-based)
@@ -197,104 +229,19 @@ def get_all_activities(connection, page=1, per_page=50, hostel_id=None):
         Dictionary with activities list, total count, and pagination info
     """
     try:
+        page = max(1, page)
         offset = (page - 1) * per_page
-        all_activities = []
-        
-        # Get student activities with timestamps
-        student_query = '''
-            SELECT s.id, s.name, s.admission_date as activity_date, h.name as hostel_name,
-                   'student' as activity_type, s.created_at
-            FROM students s
-            LEFT JOIN hostels h ON s.hostel_id = h.id        '''
-        student_params = []
-        
-        if hostel_id is not None:
-            student_query += ' WHERE s.hostel_id = ?'
-            student_params.append(hostel_id)
-        
-        students = connection.execute(student_query, student_params).fetchall()
-        
-        for student in students:
-            # Convert SQLite Row to dict for easier access
-            student_dict = dict(student)
-            all_activities.append({
-                'type': 'student',
-                'description': f"New student {student_dict['name']} was added to {student_dict['hostel_name'] or 'Unknown Hostel'}",
-                'time': student_dict['admission_date'],
-                'created_at': student_dict['created_at'] or student_dict['admission_date'],
-                'hostel_name': student_dict['hostel_name'],
-                'entity_id': student_dict['id']
-            })
-        
-        # Get fee payment activities
-        fee_query = '''
-            SELECT f.id, f.amount, f.paid_date as activity_date, s.name as student_name, 
-                   h.name as hostel_name, 'fee' as activity_type, f.updated_at
-            FROM fees f
-            JOIN students s ON f.student_id = s.id
-            LEFT JOIN hostels h ON s.hostel_id = h.id
-            WHERE f.status = 'Paid' AND f.paid_date IS NOT NULL        '''
-        fee_params = []
-        
-        if hostel_id is not None:
-            fee_query += ' AND s.hostel_id = ?'
-            fee_params.append(hostel_id)
-        
-        fees = connection.execute(fee_query, fee_params).fetchall()
-        
-        for fee in fees:
-            # Convert SQLite Row to dict for easier access
-            fee_dict = dict(fee)
-            all_activities.append({
-                'type': 'fee',
-                'description': f"Payment of ${fee_dict['amount']} received from {fee_dict['student_name']} at {fee_dict['hostel_name'] or 'Unknown Hostel'}",
-                'time': fee_dict['paid_date'],
-                'created_at': fee_dict['updated_at'] or fee_dict['paid_date'],
-                'hostel_name': fee_dict['hostel_name'],
-                'entity_id': fee_dict['id']
-            })
         
-        # Get expense activities (if expenses table exists)
-        try:
-            expense_query = '''
-                SELECT e.id, e.description, e.amount, e.expense_date as activity_date,
-                       h.name as hostel_name, 'expense' as activity_type, e.created_at
-                FROM expenses e
-                LEFT JOIN hostels h ON e.hostel_id = h.id            '''
-            expense_params = []
-            
-            if hostel_id is not None:
-                expense_query += ' WHERE e.hostel_id = ?'
-                expense_params.append(hostel_id)
-            
-            expenses = connection.execute(expense_query, expense_params).fetchall()
-            
-            for expense in expenses:
-                # Convert SQLite Row to dict for easier access
-                expense_dict = dict(expense)
-                all_activities.append({
-                    'type': 'expense',
-                    'description': f"Expense: {expense_dict['description']} - ${expense_dict['amount']} at {expense_dict['hostel_name'] or 'Unknown Hostel'}",
-                    'time': expense_dict['expense_date'],
-                    'created_at': expense_dict['created_at'] or expense_dict['expense_date'],
-                    'hostel_name': expense_dict['hostel_name'],
-                    'entity_id': expense_dict['id']
-                })
-        except Exception:
-            # Expenses table might not exist, skip
-            pass
-        
-        # Sort all activities by created_at/time in descending order
-        all_activities.sort(key=lambda x: x['created_at'] or x['time'], reverse=True)
-        
-        # Get total count
-        total_activities = len(all_activities)
+        if _has_activity_log(connection):
+            query, params, count_query, count_params = _activity_log_queries(hostel_id)
+        else:
+            query, params, count_query, count_params = _activity_union_queries(hostel_id, offset + per_page)
         
-        # Apply pagination
-        paginated_activities = all_activities[offset:offset + per_page]
+        rows = connection.execute(query, params + [per_page, offset]).fetchall()
+        total_activities = connection.execute(count_query, count_params).fetchone()[0]
         
         return {
-            'activities': paginated_activities,
+            'activities': [_format_activity(dict(row)) for row in rows],
             'total': total_activities,
             'page': page,
             'per_page': per_page,
@@ -314,3 +261,91 @@ def get_all_activities(connection, page=1, per_page=50, hostel_id=None):
             'has_prev': False,
             'has_next': False
         }
+
+
+def _has_activity_log(connection):
+    """Whether the optional activity_log table exists (see models.db.create_activity_log)."""
+    return table_exists(connection, 'activity_log')
+
+
+def _activity_log_queries(hostel_id=None):
+    """Page and count queries reading the activity_log table (an index range scan)."""
+    where, params = '', []
+    if hostel_id is not None:
+        where, params = 'WHERE a.hostel_id = ?', [hostel_id]
+    query = f'''
+        SELECT a.activity_type, a.entity_id, a.hostel_id, a.subject, a.amount, a.activity_date,
+               h.name AS hostel_name
+        FROM activity_log a
+        LEFT JOIN hostels h ON a.hostel_id = h.id
+        {where}
+        ORDER BY a.activity_date DESC, a.activity_type DESC, a.entity_id DESC
+        LIMIT ? OFFSET ?
+    '''
+    count_query = f'SELECT COUNT(*) FROM activity_log a {where}'
+    return query, params, count_query, list(params)
+
+
+def _activity_union_queries(hostel_id=None, branch_limit=None):
+    """Page and count queries over the source tables.
+    
+    Each branch is ordered and limited on its own index before the branches are
+    merged, so a page never reads more than ``branch_limit`` rows per table.
+    """
+    hostel_filter = ' AND {} = ?' if hostel_id is not None else ''
+    hostel_params = [hostel_id] if hostel_id is not None else []
+    branches = [
+        ('''SELECT 'student' AS activity_type, s.id AS entity_id, s.hostel_id, s.name AS subject,
+                  CAST(NULL AS REAL) AS amount, s.admission_date AS activity_date
+           FROM students s WHERE s.admission_date IS NOT NULL''' + hostel_filter.format('s.hostel_id'),
+         's.admission_date DESC, s.id DESC'),
+        ('''SELECT 'fee' AS activity_type, f.id AS entity_id, f.hostel_id, s.name AS subject,
+                  f.amount, f.paid_date AS activity_date
+           FROM fees f JOIN students s ON f.student_id = s.id
+           WHERE f.status = 'Paid' AND f.paid_date IS NOT NULL''' + hostel_filter.format('f.hostel_id'),
+         'f.paid_date DESC, f.id DESC'),
+        ('''SELECT 'expense' AS activity_type, e.id AS entity_id, e.hostel_id, e.description AS subject,
+                  e.amount, e.expense_date AS activity_date
+           FROM expenses e WHERE e.expense_date IS NOT NULL''' + hostel_filter.format('e.hostel_id'),
+         'e.expense_date DESC, e.id DESC'),
+    ]
+    
+    params = []
+    union = []
+    counts = []
+    count_params = []
+    for index, (select, order) in enumerate(branches):
+        union.append(f'SELECT * FROM ({select} ORDER BY {order} LIMIT ?) AS branch_{index}')
+        params.extend(hostel_params + [branch_limit])
+        counts.append(f'(SELECT COUNT(*) FROM ({select}) AS counted_{index})')
+        count_params.extend(hostel_params)
+    
+    query = f'''
+        SELECT feed.activity_type, feed.entity_id, feed.hostel_id, feed.subject, feed.amount,
+               feed.activity_date, h.name AS hostel_name
+        FROM ({' UNION ALL '.join(union)}) AS feed
+        LEFT JOIN hostels h ON feed.hostel_id = h.id
+        ORDER BY feed.activity_date DESC, feed.activity_type DESC, feed.entity_id DESC
+        LIMIT ? OFFSET ?
+    '''
+    count_query = f"SELECT {' + '.join(counts)}"
+    return query, params, count_query, count_params
+
+
+def _format_activity(row):
+    """Turn an activity row into the dict the activity report renders."""
+    hostel_name = row['hostel_name'] or 'Unknown Hostel'
+    if row['activity_type'] == 'student':
+        description = f"New student {row['subject']} was added to {hostel_name}"
+    elif row['activity_type'] == 'fee':
+        description = f"Payment of ${row['amount']} received from {row['subject']} at {hostel_name}"
+    else:
+        description = f"Expense: {row['subject']} - ${row['amount']} at {hostel_name}"
+    return {
+        'type': row['activity_type'],
+        'description': description,
+        'time': row['activity_date'],
+        'created_at': row['activity_date'],
+        'hostel_name': row['hostel_name'],
+        'entity_id': row['entity_id']
+    }
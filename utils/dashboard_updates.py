@@ -0,0 +1,257 @@
+"""Coalesced dashboard updates for the Hostel Management System.
+
+Mutation routes call ``emit_dashboard_update`` after every change. Rather than
+recomputing the dashboard statistics and broadcasting a full payload each
+time, the hostel is only marked dirty here. Once no change has arrived for
+DASHBOARD_UPDATE_WINDOW seconds (or DASHBOARD_UPDATE_MAX_DELAY seconds after
+the first one, so a steady stream still gets through) the statistics are
+computed once per dirty hostel and a single ``dashboard_stats_updated`` event
+is emitted, reporting how many changes it covers. A window of 0 emits
+immediately.
+
+Payloads are delta-encoded. ``DashboardState`` keeps the last statistics sent
+to each room with a sequence number; an update carries only the changed keys
+(``changes``), its ``seq`` and the ``base_seq`` it applies to. A room's first
+update, and the reply to ``request_dashboard_update``, are full snapshots
+(``full: true``). A client whose last seq is not ``base_seq`` (it missed an
+update, or reconnected) asks for a resync. Sequences are per worker
+(``stream``); with several workers a client resyncs when the stream changes.
+"""
+
+import os
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime
+
+from utils.metrics import socketio_events
+
+DEFAULT_WINDOW = 0.5  # seconds without changes before emitting
+DEFAULT_MAX_DELAY = 2.0  # seconds an update may be held back at most
+
+EVENT_NAME = 'dashboard_stats_updated'
+
+
+def dashboard_room(hostel_id):
+    """Socket.IO room shown a hostel's dashboard (system-wide figures go to owners)."""
+    return f'hostel_{hostel_id}' if hostel_id else 'owners'
+
+
+def _compute_statistics(hostel_id):
+    from routes.dashboard import get_dashboard_statistics
+    return get_dashboard_statistics(hostel_id)
+
+
+class DashboardState:
+    """The last statistics sent to each room, versioned by a per-room sequence number."""
+
+    def __init__(self):
+        self.stream = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._rooms = {}  # room -> (seq, snapshot)
+        self._lock = threading.Lock()
+
+    def update(self, room, stats):
+        """Record the room's new statistics and return the versioned payload fields to send.
+
+        Returns a full snapshot for a room seen for the first time, otherwise the
+        changed keys since the previous update, or None when nothing changed.
+        """
+        stats = dict(stats)
+        with self._lock:
+            previous = self._rooms.get(room)
+            if previous is None:
+                self._rooms[room] = (1, stats)
+                return {'stream': self.stream, 'seq': 1, 'full': True, 'stats': dict(stats)}
+            seq, snapshot = previous
+            changes = {key: value for key, value in stats.items() if key not in snapshot or snapshot[key] != value}
+            removed = [key for key in snapshot if key not in stats]
+            if not changes and not removed:
+                return None
+            self._rooms[room] = (seq + 1, stats)
+        payload = {'stream': self.stream, 'seq': seq + 1, 'base_seq': seq, 'full': False, 'changes': changes}
+        if removed:
+            payload['removed'] = removed
+        return payload
+
+    def snapshot(self, room):
+        """The full payload fields for the room's current version (None if nothing was sent yet)."""
+        with self._lock:
+            previous = self._rooms.get(room)
+        if previous is None:
+            return None
+        seq, snapshot = previous
+        return {'stream': self.stream, 'seq': seq, 'full': True, 'stats': dict(snapshot)}
+
+    def _after_fork(self):
+        # A child has sent nothing yet: new stream, empty state
+        self.stream = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def rooms(self):
+        with self._lock:
+            return len(self._rooms)
+
+
+class DashboardUpdateCoalescer:
+    """Collects dirty hostels and emits one dashboard update per hostel per window."""
+
+    def __init__(self, window=DEFAULT_WINDOW, max_delay=DEFAULT_MAX_DELAY,
+                 compute=None, socketio=None, context=None, state=None):
+        self.window = window
+        self.max_delay = max_delay
+        self.compute = compute or _compute_statistics
+        self.socketio = socketio
+        self.context = context  # Callable returning a context manager (e.g. app.app_context)
+        self.state = state or DashboardState()
+        self._pending = {}  # hostel id -> {'events': n, 'update_types': [...]}
+        self._first_marked = None
+        self._last_marked = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._stats = {'marked': 0, 'emitted': 0, 'merged': 0, 'unchanged': 0, 'full': 0, 'errors': 0}
+
+    def mark(self, hostel_id=None, update_type='general'):
+        """Record a change to ``hostel_id``'s figures; the update is emitted after the window."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pending.setdefault(hostel_id, {'events': 0, 'update_types': []})
+            entry['events'] += 1
+            if update_type not in entry['update_types']:
+                entry['update_types'].append(update_type)
+            self._stats['marked'] += 1
+            if self._first_marked is None:
+                self._first_marked = now
+            self._last_marked = now
+            immediate = self.window <= 0
+            if not immediate and self._timer is None:
+                self._schedule(self.window)
+        if immediate:
+            self.flush()
+
+    def _schedule(self, delay):
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            if self._first_marked is None:
+                self._timer = None
+                return
+            # Wait for a quiet window, but no longer than max_delay in total
+            due = min(self._last_marked + self.window, self._first_marked + self.max_delay)
+            remaining = due - time.monotonic()
+            if remaining > 0.001:
+                self._schedule(remaining)
+                return
+            self._timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Error flushing dashboard updates: {e}")
+
+    def flush(self):
+        """Emit the pending updates now; returns the payloads emitted."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._first_marked = self._last_marked = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        payloads = []
+        if not pending:
+            return payloads
+        with self.context() if self.context else nullcontext():
+            for hostel_id, entry in pending.items():
+                try:
+                    stats = self.compute(hostel_id)
+                    if not stats:
+                        raise ValueError('no statistics')
+                    room = dashboard_room(hostel_id)
+                    version = self.state.update(room, stats)
+                    if version is None:
+                        # Nothing a client shows has changed
+                        with self._lock:
+                            self._stats['unchanged'] += 1
+                        continue
+                    update_types = entry['update_types']
+                    payload = {
+                        'hostel_id': hostel_id,
+                        'update_type': update_types[0] if len(update_types) == 1 else 'batch',
+                        'update_types': update_types,
+                        'merged': entry['events'],
+                        'timestamp': datetime.now().isoformat(),
+                        **version
+                    }
+                    self._emit(payload, room)
+                except Exception as e:
+                    print(f"Error emitting dashboard update for hostel {hostel_id}: {e}")
+                    with self._lock:
+                        self._stats['errors'] += 1
+                    continue
+                payloads.append(payload)
+                with self._lock:
+                    self._stats['emitted'] += 1
+                    self._stats['merged'] += entry['events'] - 1
+                    self._stats['full'] += payload['full']
+        return payloads
+
+    def resync(self, hostel_id=None):
+        """Full snapshot of a hostel's dashboard for a client that lost track of the sequence.
+
+        The statistics are recomputed; if they changed, the room is sent the delta
+        as usual so its other clients stay current.
+        """
+        room = dashboard_room(hostel_id)
+        stats = self.compute(hostel_id)
+        if stats:
+            version = self.state.update(room, stats)
+            if version is not None and not version['full']:
+                self._emit(dict(version, hostel_id=hostel_id, update_type='resync', update_types=['resync'],
+                                merged=0, timestamp=datetime.now().isoformat()), room)
+        snapshot = self.state.snapshot(room) or {'stream': self.state.stream, 'seq': 0, 'full': True, 'stats': {}}
+        with self._lock:
+            self._stats['full'] += 1
+        return dict(snapshot, hostel_id=hostel_id, update_type='resync', timestamp=datetime.now().isoformat())
+
+    def _emit(self, payload, room):
+        socketio = self.socketio
+        if socketio is None:
+            from app import socketio
+        socketio.emit(EVENT_NAME, payload, to=room, namespace='/updates')
+        socketio_events.inc(event=EVENT_NAME)
+
+    def _after_fork(self):
+        # The timer thread does not survive fork(); changes marked in the parent are its to emit
+        self._lock = threading.Lock()
+        self._timer = None
+        self._pending = {}
+        self._first_marked = self._last_marked = None
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), window=self.window,
+                        max_delay=self.max_delay, rooms=self.state.rooms())
+
+
+# Shared coalescer; configure_dashboard_updates() applies the app settings
+dashboard_updates = DashboardUpdateCoalescer()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=dashboard_updates._after_fork)
+    os.register_at_fork(after_in_child=dashboard_updates.state._after_fork)
+
+
+def configure_dashboard_updates(app, socketio=None):
+    """Apply DASHBOARD_UPDATE_WINDOW / DASHBOARD_UPDATE_MAX_DELAY (seconds) from the app config."""
+    config = app.config
+    if config.get('DASHBOARD_UPDATE_WINDOW') is not None:
+        dashboard_updates.window = float(config.get('DASHBOARD_UPDATE_WINDOW'))
+    if config.get('DASHBOARD_UPDATE_MAX_DELAY') is not None:
+        dashboard_updates.max_delay = float(config.get('DASHBOARD_UPDATE_MAX_DELAY'))
+    dashboard_updates.socketio = socketio
+    dashboard_updates.context = app.app_context
+    return dashboard_updates
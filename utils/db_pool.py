@@ -0,0 +1,380 @@
+"""
+Database connection pooling for the Hostel Management System
+Bounded, thread-safe connection pools shared by db_utils and the model layer
+"""
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+# Project root, used to resolve relative SQLite paths the same way db_utils does
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pool defaults (overridable through the environment or app config)
+DEFAULT_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+DEFAULT_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 30)
+DEFAULT_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME') or 1800)
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL') or 30)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+class _ConnectionRecord:
+    """Bookkeeping for a single physical connection owned by a pool."""
+
+    __slots__ = ('connection', 'created_at', 'last_used')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """Connection proxy handed out by the pool.
+
+    Behaves like the underlying DB-API connection, except that close()
+    returns the connection to its pool instead of closing it.
+    """
+
+    def __init__(self, pool, record):
+        self._pool = pool
+        self._record = record
+
+    @property
+    def raw_connection(self):
+        """The underlying driver connection."""
+        if self._record is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a connection returned to the pool.')
+        return self._record.connection
+
+    @property
+    def closed(self):
+        """True once the connection has been returned to the pool."""
+        return self._record is None
+
+    def __getattr__(self, name):
+        return getattr(self.raw_connection, name)
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)."""
+        record, self._record = self._record, None
+        if record is not None:
+            self._pool._release(record)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Mirror sqlite3/psycopg2 semantics: end the transaction, keep the connection
+        if self._record is not None:
+            if exc_type is None:
+                self._record.connection.commit()
+            else:
+                self._record.connection.rollback()
+        return False
+
+    def __del__(self):
+        # Safety net for callers that never close their connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of DB-API connections.
+
+    Connections are validated with a ping when they have been idle longer than
+    ``health_check_interval`` seconds and are recycled once they are older than
+    ``max_lifetime`` seconds. Checkout blocks for at most ``timeout`` seconds.
+    """
+
+    def __init__(self, factory, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 max_lifetime=DEFAULT_MAX_LIFETIME, health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+                 ping_sql='SELECT 1', name='default'):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.ping_sql = ping_sql
+        self.name = name
+
+        self._lock = threading.Condition(threading.RLock())
+        self._idle = []  # LIFO stack of _ConnectionRecord, hottest connection last
+        self._size = 0
+        self._waiting = 0
+        self._pid = os.getpid()
+        self._disposed = False  # Set by dispose(); later releases close instead of pooling
+
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+        }
+
+    # Public API ---------------------------------------------------------
+
+    def connect(self, timeout=None):
+        """Check out a connection, waiting up to ``timeout`` seconds."""
+        self._check_fork()
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            record, create = self._acquire_slot(deadline)
+
+            if create:
+                try:
+                    record = _ConnectionRecord(self.factory())
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._stats['created'] += 1
+            elif not self._is_healthy(record):
+                self._discard(record)
+                continue
+
+            waited = time.monotonic() - started
+            with self._lock:
+                self._stats['checkouts'] += 1
+                self._stats['total_wait_time'] += waited
+                if waited > self._stats['max_wait_time']:
+                    self._stats['max_wait_time'] = waited
+            record.last_used = time.monotonic()
+            return PooledConnection(self, record)
+
+    def stats(self):
+        """Return a snapshot of pool usage metrics."""
+        with self._lock:
+            checkouts = self._stats['checkouts']
+            idle = len(self._idle)
+            return {
+                'name': self.name,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._size - idle,
+                'idle': idle,
+                'waiting': self._waiting,
+                'checkouts': checkouts,
+                'timeouts': self._stats['timeouts'],
+                'created': self._stats['created'],
+                'recycled': self._stats['recycled'],
+                'health_check_failures': self._stats['health_check_failures'],
+                'avg_wait_ms': round(self._stats['total_wait_time'] / checkouts * 1000, 3) if checkouts else 0.0,
+                'max_wait_ms': round(self._stats['max_wait_time'] * 1000, 3),
+            }
+
+    def dispose(self):
+        """Close all idle connections. Checked-out connections are closed on release."""
+        with self._lock:
+            self._disposed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for record in idle:
+            self._close_quietly(record.connection)
+
+    # Internals ----------------------------------------------------------
+
+    def _acquire_slot(self, deadline):
+        """Return (record, False) for an idle connection or (None, True) to create one."""
+        with self._lock:
+            while True:
+                while self._idle:
+                    record = self._idle.pop()
+                    if self._is_expired(record):
+                        self._size -= 1
+                        self._stats['recycled'] += 1
+                        self._close_quietly(record.connection)
+                        continue
+                    return record, False
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, True
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out waiting for a connection from pool '{self.name}' "
+                        f"({self.max_size} connections in use)"
+                    )
+                self._waiting += 1
+                try:
+                    self._lock.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _release(self, record):
+        """Return a checked-out connection to the pool."""
+        if os.getpid() != self._pid:
+            return
+
+        conn = record.connection
+        try:
+            # Never hand out a connection with an open transaction
+            if getattr(conn, 'in_transaction', True):
+                conn.rollback()
+        except Exception:
+            self._discard(record)
+            return
+
+        if self._is_expired(record):
+            with self._lock:
+                self._stats['recycled'] += 1
+            self._discard(record)
+            return
+
+        record.last_used = time.monotonic()
+        with self._lock:
+            if not self._disposed:
+                self._idle.append(record)
+                self._lock.notify()
+                return
+        self._discard(record)  # Nobody will check it out of a disposed pool again
+
+    def _discard(self, record):
+        self._close_quietly(record.connection)
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def _is_expired(self, record):
+        return self.max_lifetime and time.monotonic() - record.created_at > self.max_lifetime
+
+    def _is_healthy(self, record):
+        if time.monotonic() - record.last_used < self.health_check_interval:
+            return True
+        try:
+            cursor = record.connection.cursor()
+            cursor.execute(self.ping_sql)
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _check_fork(self):
+        # Connections must not be shared across forked workers (e.g. gunicorn --preload)
+        if os.getpid() != self._pid:
+            with self._lock:
+                self._idle = []
+                self._size = 0
+                self._waiting = 0
+                self._pid = os.getpid()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# Pool registry -----------------------------------------------------------
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def is_postgres_url(database_url):
+    """Return True if the URL points at a PostgreSQL database."""
+    return bool(database_url) and database_url.startswith(('postgres://', 'postgresql://'))
+
+
+def resolve_sqlite_path(database_url):
+    """Resolve a sqlite:/// URL (or bare path) to an absolute file path."""
+    if not database_url:
+        return os.path.join(BASE_DIR, 'hostel.db')
+    if database_url.startswith('sqlite:///'):
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        db_path = database_url[len('sqlite:///'):]
+    elif '://' in database_url:
+        db_path = urlparse(database_url).path
+    else:
+        db_path = database_url
+    if db_path in ('', ':memory:'):
+        return ':memory:'
+    if not os.path.isabs(db_path):
+        db_path = os.path.join(BASE_DIR, db_path)
+    return db_path
+
+
+def connection_factory(database_url):
+    """Build a zero-argument callable that opens a new connection for the URL."""
+    if is_postgres_url(database_url):
+        def postgres_factory():
+            # Wrapped so SQLite-style model code (conn.execute, '?', row['col']) runs unchanged
+            from utils.query_compiler import connect_postgres
+            return connect_postgres(database_url)
+        return postgres_factory
+
+    db_path = resolve_sqlite_path(database_url)
+
+    def connect_sqlite():
+        # Pooled connections move between threads, but only one thread uses them at a time
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        return conn
+    return connect_sqlite
+
+
+def _pool_name(database_url):
+    """A display name for the pool that never leaks credentials."""
+    if is_postgres_url(database_url):
+        parsed = urlparse(database_url)
+        return f"postgresql://{parsed.hostname or 'localhost'}{parsed.path}"
+    return f"sqlite:///{resolve_sqlite_path(database_url)}"
+
+
+def get_pool(database_url, **options):
+    """Return the shared pool for a database URL, creating it on first use.
+
+    Options (max_size, timeout, max_lifetime, health_check_interval) only take
+    effect when the pool is created.
+    """
+    key = database_url or ''
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = {k: v for k, v in options.items() if v is not None}
+            pool = ConnectionPool(connection_factory(database_url), name=_pool_name(database_url), **options)
+            _pools[key] = pool
+        return pool
+
+
+def dispose_pool(database_url):
+    """Close and forget the pool for a database URL (e.g. before deleting the file)."""
+    with _pools_lock:
+        pool = _pools.pop(database_url or '', None)
+    if pool is not None:
+        pool.dispose()
+
+
+def get_pool_stats():
+    """Return usage metrics for every active pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
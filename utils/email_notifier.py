@@ -8,6 +8,8 @@ from email.mime.multipart import MIMEMultipart
 from datetime import date, timedelta
 from dotenv import load_dotenv
 
+from utils.metrics import email_sends
+
 # Load environment variables
 load_dotenv()
 
@@ -39,6 +41,7 @@ class EmailNotifier:
         # Check if email configuration is available
         if not SMTP_USERNAME or not SMTP_PASSWORD:
             print("Email configuration is missing. Set SMTP_USERNAME and SMTP_PASSWORD in .env file.")
+            email_sends.inc(outcome='not_configured')
             return False
             
         from_email = from_email or DEFAULT_SENDER
@@ -65,9 +68,11 @@ class EmailNotifier:
             server.sendmail(from_email, to_email, msg.as_string())
             server.quit()
             
+            email_sends.inc(outcome='sent')
             return True
         except Exception as e:
             print(f"Failed to send email: {e}")
+            email_sends.inc(outcome='failed')
             return False
     
     @staticmethod
@@ -7,7 +7,7 @@ import os
 import tempfile
 from datetime import datetime
 import io
-from flask import make_response, send_file
+from flask import Response, make_response, send_file, stream_with_context
 
 # Check if reportlab is available for PDF generation
 try:
@@ -89,6 +89,43 @@ class ExportUtility:
         
         return response
     
+    @staticmethod
+    def stream_csv(batches, filename, headers, row_formatter=None):
+        """
+        Stream a CSV file to the client one batch of rows at a time
+        
+        Unlike export_to_csv, only the current batch is held in memory, so
+        exports of any size run in flat memory.
+        
+        Args:
+            batches: Iterable of lists of rows (e.g. from FeeModel.iter_fees_with_students)
+            filename: Name of the CSV file to create
+            headers: List of headers for the CSV columns
+            row_formatter: Optional function turning a row into a dict keyed by header
+            
+        Returns:
+            Streaming response with CSV file
+        """
+        def generate():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(headers)
+            for batch in batches:
+                for row in batch:
+                    if row_formatter:
+                        row = row_formatter(row)
+                    writer.writerow([row.get(key, "") for key in headers])
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+            # Header only, when there were no rows
+            if output.tell():
+                yield output.getvalue()
+        
+        response = Response(stream_with_context(generate()), mimetype="text/csv")
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return response
+    
     @staticmethod
     def export_to_pdf(data, filename, title="Report", description=None, headers=None):
         """
@@ -108,9 +145,34 @@ class ExportUtility:
             return None
             
         buffer = io.BytesIO()
+        ExportUtility.write_pdf(buffer, data, title, description, headers)
+        
+        # Create response
+        buffer.seek(0)
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=filename,
+            mimetype="application/pdf"
+        )
+    
+    @staticmethod
+    def write_pdf(output, data, title="Report", description=None, headers=None):
+        """
+        Render data as a PDF table into a file path or binary file object
+        
+        Args:
+            output: File path or binary file object to write to
+            data: List of dictionaries or list of lists with data to export
+            title: Title for the PDF document
+            description: Optional description text
+            headers: List of headers for the table columns
+        """
+        if not REPORTLAB_AVAILABLE:
+            raise RuntimeError("PDF export is not available. Please install reportlab package.")
         
         # Create PDF document
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        doc = SimpleDocTemplate(output, pagesize=A4)
         elements = []
         
         # Set up styles
@@ -172,15 +234,6 @@ class ExportUtility:
         
         # Build PDF
         doc.build(elements)
-        
-        # Create response
-        buffer.seek(0)
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype="application/pdf"
-        )
     
     @staticmethod
     def export_rooms_to_csv(rooms_data):
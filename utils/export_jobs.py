@@ -0,0 +1,278 @@
+"""Background export jobs for the Hostel Management System.
+
+Large CSV/PDF exports are rendered by a small worker pool into temporary
+artifact files instead of inside the request. Progress is pushed to the
+submitting users over the ``/updates`` Socket.IO namespace and the finished file
+is served from ``/exports/jobs/<job_id>/download``. Resubmitting an export with
+the same filters reuses the running or finished job rather than rendering the
+same artifact twice; whoever resubmits it is told about its progress too.
+
+Jobs are tracked in-process, so status and downloads must reach the worker
+that accepted the job (the default single Socket.IO worker does).
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.export import ExportUtility
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+DEFAULT_WORKERS = 2
+DEFAULT_ARTIFACT_TTL = 60 * 60  # Finished artifacts are kept (and reused) for an hour
+
+
+class ExportSource:
+    """What an export job renders: rows in batches and how to lay them out."""
+
+    def __init__(self, batches, headers, row_formatter=None, total=None, title="Report", description=None):
+        self.batches = batches
+        self.headers = headers
+        self.row_formatter = row_formatter
+        self.total = total
+        self.title = title
+        self.description = description
+
+
+class ExportJob:
+    """A submitted export and its progress."""
+
+    def __init__(self, kind, export_format, fingerprint, filename, user_id=None, hostel_id=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.format = export_format
+        self.fingerprint = fingerprint
+        self.filename = filename
+        self.user_id = user_id
+        self.subscribers = {user_id} if user_id is not None else set()  # Users told about progress
+        self.hostel_id = hostel_id
+        self.status = QUEUED
+        self.processed = 0
+        self.total = None
+        self.path = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def mimetype(self):
+        return FORMATS[self.format][0]
+
+    @property
+    def progress(self):
+        """Percentage complete, or None while the row count is unknown."""
+        if self.status == COMPLETED:
+            return 100
+        if not self.total:
+            return 0 if self.total == 0 else None
+        return min(99, int(self.processed * 100 / self.total))
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'format': self.format,
+            'status': self.status,
+            'processed': self.processed,
+            'total': self.total,
+            'progress': self.progress,
+            'filename': self.filename,
+            'error': self.error,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'finished_at': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+        }
+
+
+def job_fingerprint(kind, export_format, params, hostel_id):
+    """Identify an export by what it contains, so identical requests can share an artifact."""
+    payload = json.dumps([kind, export_format, hostel_id, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _emit_progress(event, job):
+    """Push job updates to the Socket.IO room of every user who submitted the job (none for anonymous jobs)."""
+    subscribers = sorted(job.subscribers)
+    if not subscribers:
+        return
+    from utils.socket_utils import emit_safe
+    data = job.to_dict()
+    for user_id in subscribers:
+        emit_safe(event, data, to=f'user_{user_id}')
+
+
+class ExportJobQueue:
+    """Runs export jobs on a thread pool and keeps their artifacts until they expire."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, artifact_dir=None, artifact_ttl=DEFAULT_ARTIFACT_TTL,
+                 notify=_emit_progress):
+        self.max_workers = max_workers
+        self.artifact_dir = artifact_dir or os.path.join(tempfile.gettempdir(), 'hostel_exports')
+        self.artifact_ttl = artifact_ttl
+        self.notify = notify
+        self._executor = None
+        self._jobs = {}  # job id -> ExportJob
+        self._by_fingerprint = {}  # fingerprint -> job id
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers=None, artifact_dir=None, artifact_ttl=None):
+        with self._lock:
+            if max_workers:
+                self.max_workers = int(max_workers)
+            if artifact_dir:
+                self.artifact_dir = artifact_dir
+            if artifact_ttl is not None:
+                self.artifact_ttl = int(artifact_ttl)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export')
+        return self._executor
+
+    def submit(self, kind, export_format, params, build, filename, user_id=None, hostel_id=None):
+        """Queue an export, or return the matching job if it is running or its artifact is still fresh.
+
+        Args:
+            kind: What is exported ('fees', 'rooms', ...)
+            export_format: 'csv' or 'pdf'
+            params: JSON-serializable filters; together with kind, format and
+                    hostel they decide whether two submissions are identical
+            build: Callable returning the ExportSource to render (runs on a worker)
+            filename: Download name of the artifact
+            user_id: Submitting user; progress is sent to their Socket.IO room, also
+                     when the submission reuses another user's job
+            hostel_id: Hostel the export is restricted to, if any
+
+        Returns:
+            (job, reused) where reused is True for a deduplicated submission
+        """
+        if export_format not in FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        fingerprint = job_fingerprint(kind, export_format, params, hostel_id)
+        self.prune()
+        with self._lock:
+            existing = self._jobs.get(self._by_fingerprint.get(fingerprint))
+            if existing is not None and existing.status != FAILED and \
+                    (existing.status != COMPLETED or os.path.exists(existing.path)):
+                if user_id is not None:
+                    existing.subscribers.add(user_id)
+                return existing, True
+            job = ExportJob(kind, export_format, fingerprint, filename, user_id, hostel_id)
+            self._jobs[job.id] = job
+            self._by_fingerprint[fingerprint] = job.id
+        self._get_executor().submit(self._run, job, build)
+        return job, False
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _notify(self, event, job):
+        if self.notify is None:
+            return
+        try:
+            self.notify(event, job)
+        except Exception as e:
+            print(f"Error reporting export job progress: {e}")
+
+    def _run(self, job, build):
+        job.status = RUNNING
+        self._notify('export_progress', job)
+        path = None
+        try:
+            source = build()
+            job.total = source.total
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix=f'{job.kind}_', suffix=f'.{FORMATS[job.format][1]}',
+                                        dir=self.artifact_dir)
+            os.close(fd)
+            if job.format == 'csv':
+                self._write_csv(job, source, path)
+            else:
+                self._write_pdf(job, source, path)
+            job.path = path
+            job.status = COMPLETED
+            job.finished_at = time.time()
+            self._notify('export_complete', job)
+        except Exception as e:
+            print(f"Error running export job {job.id}: {e}")
+            if path and os.path.exists(path):
+                os.remove(path)
+            job.status = FAILED
+            job.error = str(e)
+            job.finished_at = time.time()
+            self._notify('export_failed', job)
+
+    def _rows(self, job, source):
+        """Yield formatted rows batch by batch, reporting progress after each batch."""
+        for batch in source.batches:
+            for row in batch:
+                yield source.row_formatter(row) if source.row_formatter else row
+            job.processed += len(batch)
+            self._notify('export_progress', job)
+
+    def _write_csv(self, job, source, path):
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(source.headers)
+            for row in self._rows(job, source):
+                writer.writerow([row.get(key, "") for key in source.headers])
+
+    def _write_pdf(self, job, source, path):
+        # reportlab lays the table out as a whole, so the rows are gathered first
+        data = list(self._rows(job, source))
+        ExportUtility.write_pdf(path, data, source.title, source.description, source.headers)
+
+    def prune(self):
+        """Forget expired jobs and delete their artifacts."""
+        cutoff = time.time() - self.artifact_ttl
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished_at is not None and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+                if self._by_fingerprint.get(job.fingerprint) == job.id:
+                    del self._by_fingerprint[job.fingerprint]
+        for job in expired:
+            if job.path and os.path.exists(job.path):
+                try:
+                    os.remove(job.path)
+                except OSError as e:
+                    print(f"Error removing export artifact {job.path}: {e}")
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {'workers': self.max_workers, 'jobs': counts}
+
+
+# Shared queue; configure_export_jobs() applies the app settings
+export_jobs = ExportJobQueue()
+
+
+def configure_export_jobs(config):
+    """Apply EXPORT_WORKERS / EXPORT_ARTIFACT_DIR / EXPORT_ARTIFACT_TTL from an app config mapping."""
+    export_jobs.configure(
+        max_workers=config.get('EXPORT_WORKERS'),
+        artifact_dir=config.get('EXPORT_ARTIFACT_DIR'),
+        artifact_ttl=config.get('EXPORT_ARTIFACT_TTL')
+    )
+    return export_jobs
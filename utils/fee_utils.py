@@ -3,11 +3,13 @@ Utility functions for fee management in the Hostel Management System.
 """
 from datetime import date
 from db_utils import get_db_connection
+from utils.invalidation import invalidate_hostel
 
-def update_overdue_fees():
+def update_overdue_fees(raise_errors=False):
     """
     Update fee status to 'Overdue' for all pending fees past their due date.
-    Returns the number of fees updated.
+    Returns the number of fees updated. Errors are printed and 0 is returned,
+    unless raise_errors is set (the scheduler records them as failed runs).
     """
     conn = get_db_connection()
     today = date.today().isoformat()
@@ -23,9 +25,13 @@ def update_overdue_fees():
         
         count = cursor.rowcount
         conn.commit()
+        if count:
+            invalidate_hostel(None, 'fees')
         return count
     except Exception as e:
         conn.rollback()
+        if raise_errors:
+            raise
         print(f"Error updating overdue fees: {e}")
         return 0
     finally:
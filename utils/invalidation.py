@@ -0,0 +1,212 @@
+"""Cache invalidation bus for the Hostel Management System.
+
+Model mutations publish tags such as ``hostel:3:fees`` after they commit;
+cached readers carry matching tags (see ``reader_tags``) and are dropped. With
+Redis configured, invalidations are fanned out to every worker over pub/sub.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+
+from utils.cache import ALL_HOSTELS, cache
+
+# Data areas that cached readers depend on
+TOPICS = ('students', 'rooms', 'fees', 'expenses', 'complaints')
+
+
+def reader_tags(*topics):
+    """Tag templates for a cached reader that depends on the given topics.
+
+    Each reader is tagged per hostel and per topic, so a mutation in one
+    hostel only drops that hostel's entries (plus the all-hostels aggregate).
+    """
+    tags = []
+    for topic in topics:
+        tags.append(f'hostel:{{hostel_id}}:{topic}')
+        tags.append(f'topic:{topic}')
+    return tuple(tags)
+
+
+def global_reader_tags(*topics):
+    """Tags for a cached reader whose result covers every hostel, whoever calls it.
+
+    Such an entry is dropped by a mutation in any hostel, like the all-hostels
+    aggregate of reader_tags.
+    """
+    tags = []
+    for topic in topics:
+        tags.append(f'hostel:{ALL_HOSTELS}:{topic}')
+        tags.append(f'topic:{topic}')
+    return tuple(tags)
+
+
+def mutation_tags(hostel_id, *topics):
+    """Tags to publish after changing ``topics`` data in ``hostel_id``.
+
+    When the hostel is unknown every hostel's entries for the topics are dropped.
+    """
+    tags = []
+    for topic in topics:
+        if hostel_id is None:
+            tags.append(f'topic:{topic}')
+        else:
+            tags.append(f'hostel:{hostel_id}:{topic}')
+            tags.append(f'hostel:{ALL_HOSTELS}:{topic}')
+    return tags
+
+
+class InvalidationBus:
+    """Applies invalidations locally and relays them to other workers via Redis."""
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.redis_url = None
+        self.channel = None
+        self.retry_interval = 30
+        self._listeners = []
+        self._publisher = None
+        self._publisher_retry_at = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {'published': 0, 'received': 0, 'errors': 0}
+
+    def subscribe(self, callback):
+        """Call ``callback(tags)`` for every invalidation, local or remote."""
+        with self._lock:
+            self._listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def publish(self, tags):
+        """Invalidate ``tags`` in this process and announce them to the others."""
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return
+        self._apply(tags)
+        with self._lock:
+            self._stats['published'] += 1
+        client = self._get_publisher()
+        if client is None:
+            return
+        try:
+            client.publish(self.channel, json.dumps({'origin': self.origin, 'tags': tags}))
+        except Exception as e:
+            print(f"Error publishing cache invalidation: {e}")
+            with self._lock:
+                self._stats['errors'] += 1
+                self._publisher = None
+                self._publisher_retry_at = time.monotonic() + self.retry_interval
+
+    def _apply(self, tags):
+        cache.invalidate(*tags)
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(tags)
+            except Exception as e:
+                print(f"Error in cache invalidation listener: {e}")
+
+    def _connect(self):
+        import redis
+        return redis.from_url(self.redis_url, socket_connect_timeout=2, socket_timeout=2)
+
+    def _get_publisher(self):
+        if self.redis_url is None or time.monotonic() < self._publisher_retry_at:
+            return None
+        if self._publisher is None:
+            try:
+                self._publisher = self._connect()
+            except Exception as e:
+                print(f"Error connecting cache invalidation publisher: {e}")
+                self._publisher_retry_at = time.monotonic() + self.retry_interval
+                return None
+        return self._publisher
+
+    def start(self, redis_url, channel):
+        """Start relaying invalidations through ``channel`` on ``redis_url``."""
+        with self._lock:
+            self.redis_url = redis_url
+            self.channel = channel
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._listen, name='cache-invalidation', daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        announced_failure = False
+        while True:
+            try:
+                pubsub = self._connect().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                announced_failure = False
+                for message in pubsub.listen():
+                    self._handle(message)
+            except Exception as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                if not announced_failure:
+                    print(f"Cache invalidation listener disconnected ({e}); retrying every {self.retry_interval}s")
+                    announced_failure = True
+            time.sleep(self.retry_interval)
+
+    def _handle(self, message):
+        if message.get('type') != 'message':
+            return
+        try:
+            payload = json.loads(message['data'])
+        except (TypeError, ValueError):
+            return
+        if payload.get('origin') == self.origin:
+            return  # Already applied when it was published
+        with self._lock:
+            self._stats['received'] += 1
+        self._apply(payload.get('tags') or [])
+
+    def _after_fork(self):
+        # Threads and sockets do not survive fork(); each worker needs its own
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._publisher = None
+        self._publisher_retry_at = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+        if self.redis_url:
+            self.start(self.redis_url, self.channel)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, relayed=self.redis_url is not None,
+                        listening=self._thread is not None and self._thread.is_alive())
+
+
+bus = InvalidationBus()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=bus._after_fork)
+
+
+def invalidate_hostel(hostel_id, *topics):
+    """Drop cached readers of ``topics`` for a hostel (call after committing)."""
+    bus.publish(mutation_tags(hostel_id, *topics))
+
+
+def subscribe(callback):
+    """Register ``callback(tags)`` to run on every cache invalidation."""
+    return bus.subscribe(callback)
+
+
+def start_invalidation_listener(config):
+    """Relay invalidations between workers when the Redis cache backend is configured."""
+    if (config.get('CACHE_TYPE') or '').lower() not in ('redis', 'rediscache'):
+        return False
+    prefix = config.get('CACHE_KEY_PREFIX') or 'hostel_cache:'
+    channel = config.get('CACHE_INVALIDATION_CHANNEL') or f'{prefix}invalidate'
+    bus.start(config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0', channel)
+    return True
@@ -61,6 +61,15 @@ def setup_logging(app):
                 'backupCount': 5,
                 'encoding': 'utf8'
             },
+            'slow_query_file': {
+                'level': 'WARNING',
+                'class': 'logging.handlers.RotatingFileHandler',
+                'formatter': 'detailed',
+                'filename': os.path.join(logs_dir, 'slow_queries.log'),
+                'maxBytes': 10485760,  # 10MB
+                'backupCount': 5,
+                'encoding': 'utf8'
+            },
             'security_file': {
                 'level': 'WARNING',
                 'class': 'logging.handlers.RotatingFileHandler',
@@ -87,6 +96,11 @@ def setup_logging(app):
                 'handlers': ['console', 'security_file'],
                 'propagate': False
             },
+            'sql': {  # Slow and repeated queries (utils.sql_instrumentation)
+                'level': 'WARNING',
+                'handlers': ['slow_query_file'],
+                'propagate': False
+            },
             'socketio': {
                 'level': 'INFO',
                 'handlers': ['console', 'file'],
@@ -0,0 +1,481 @@
+"""Prometheus-compatible metrics for the Hostel Management System.
+
+A small registry of counters, gauges and fixed-bucket histograms, rendered in
+the Prometheus text exposition format at ``/metrics``. It records request
+latency per endpoint, database time per request, cache lookups, Socket.IO
+connections and emitted events, and email send outcomes.
+
+Each worker process counts in memory. With METRICS_MULTIPROC_DIR set (needed
+under gunicorn with several workers), every process also writes its values to
+``<dir>/metrics_<pid>.json`` from a background thread every FLUSH_INTERVAL
+seconds, whether or not it is serving requests, and ``/metrics`` merges the
+files of all workers:
+
+- counters and histograms are summed, including those of workers that have
+  exited (their files are folded into ``archive.json``), so totals survive
+  worker restarts;
+- gauges are summed (``livesum``) or maxed (``max``) over live workers only.
+
+Clear the directory when the server starts (start_production.py does).
+"""
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: dead workers' files are merged but never folded
+    fcntl = None
+
+# Request latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+FLUSH_INTERVAL = 1.0  # seconds between writes of a worker's values in multiprocess mode
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+LIVESUM = 'livesum'
+MAX = 'max'
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+class Metric:
+    """A named metric with a fixed set of label names."""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # label values -> value
+        self._lock = threading.Lock()
+
+    def describe(self):
+        return {'type': self.type, 'help': self.documentation, 'labelnames': list(self.labelnames)}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    """A value that only goes up (name it ``..._total``)."""
+
+    type = COUNTER
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Mirror a cumulative count kept by another component (e.g. the cache's hit counter)."""
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+
+class Gauge(Metric):
+    """A value that goes up and down; ``mode`` says how workers' values combine."""
+
+    type = GAUGE
+
+    def __init__(self, name, documentation, labelnames=(), mode=LIVESUM):
+        super().__init__(name, documentation, labelnames)
+        self.mode = mode
+
+    def describe(self):
+        return dict(super().describe(), mode=self.mode)
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets, with their sum and count."""
+
+    type = HISTOGRAM
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def describe(self):
+        return dict(super().describe(), buckets=list(self.buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            # Per-bucket (not cumulative) counts, then sum and count
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(state)] for key, state in self._values.items()]
+
+
+class Registry:
+    """The metrics of this process, plus callbacks that refresh mirrored values before reading."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.multiprocess_dir = None
+        self._last_flush = 0.0
+        self._flusher = None
+
+    def _register(self, cls, name, documentation, labelnames=(), **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **options)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered differently")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), mode=LIVESUM):
+        return self._register(Gauge, name, documentation, labelnames, mode=mode)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_callback(self, callback):
+        """Call ``callback()`` before every read, to update values mirrored from elsewhere."""
+        self._callbacks.append(callback)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def snapshot(self):
+        """This process's metrics as plain data (the multiprocess file format)."""
+        for callback in list(self._callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: dict(metric.describe(), values=metric.snapshot()) for metric in metrics}
+
+    # Multiprocess mode -------------------------------------------------
+
+    def flush(self):
+        """Write this process's values for the other workers' /metrics (multiprocess mode only)."""
+        directory = self.multiprocess_dir
+        if not directory:
+            return
+        self._last_flush = time.monotonic()
+        _write_json(os.path.join(directory, f'metrics_{os.getpid()}.json'),
+                    {'pid': os.getpid(), 'metrics': self.snapshot()})
+
+    def maybe_flush(self):
+        if self.multiprocess_dir and time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
+
+    def start_flusher(self):
+        """Flush every FLUSH_INTERVAL seconds from a daemon thread (multiprocess mode only)."""
+        if not self.multiprocess_dir or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        self._flusher = threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while self.multiprocess_dir:
+            time.sleep(FLUSH_INTERVAL)
+            self.maybe_flush()
+
+    def collect(self):
+        """Metrics of every worker merged (or just this process without a multiprocess directory)."""
+        if not self.multiprocess_dir:
+            return self.snapshot()
+        self.flush()
+        return merge_worker_files(self.multiprocess_dir)
+
+    def render(self):
+        return render_text(self.collect())
+
+    def reset(self):
+        """Zero every metric (for tests)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def _after_fork(self):
+        # A forked worker starts counting from zero in its own file, written by its own thread
+        self.reset()
+        self._last_flush = 0.0
+        self._flusher = None
+        self.start_flusher()
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(merged, metrics, live):
+    """Fold one worker's metrics into ``merged`` (both in snapshot format)."""
+    for name, metric in metrics.items():
+        target = merged.setdefault(name, dict(metric, values=[]))
+        values = {tuple(labels): value for labels, value in target['values']}
+        for labels, value in metric['values']:
+            key = tuple(labels)
+            if metric['type'] == GAUGE:
+                if not live:
+                    continue
+                if key in values and metric.get('mode') == MAX:
+                    values[key] = max(values[key], value)
+                else:
+                    values[key] = values.get(key, 0) + value
+            elif metric['type'] == HISTOGRAM:
+                current = values.get(key)
+                values[key] = value if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                values[key] = values.get(key, 0) + value
+        target['values'] = [[list(key), value] for key, value in values.items()]
+    return merged
+
+
+def _fold_dead_workers(directory, dead_files):
+    """Add exited workers' counters and histograms to archive.json and delete their files."""
+    lock_path = os.path.join(directory, 'archive.lock')
+    with open(lock_path, 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False  # Another worker is folding them right now
+        archive_path = os.path.join(directory, 'archive.json')
+        archive = (_read_json(archive_path) or {}).get('metrics', {})
+        for path in dead_files:
+            data = _read_json(path)
+            if data is None:
+                continue
+            archive = _merge(archive, data.get('metrics', {}), live=False)
+        _write_json(archive_path, {'metrics': archive})
+        for path in dead_files:
+            os.remove(path)
+        return True
+
+
+def clear_worker_files(directory):
+    """Delete the files this module writes in ``directory`` (workers' metrics, the archive and its lock).
+
+    Other files, and the directory itself, are left alone.
+    """
+    if not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        ours = filename in ('archive.json', 'archive.lock') or (
+            filename.startswith('metrics_') and filename.endswith('.json'))
+        # Temporary files from _write_json: '<our file>.<pid>.tmp'
+        if filename.endswith('.tmp') and filename.startswith(('metrics_', 'archive.json.')):
+            ours = True
+        if ours:
+            try:
+                os.remove(os.path.join(directory, filename))
+            except FileNotFoundError:
+                pass
+
+
+def merge_worker_files(directory):
+    """Merge the metrics files of all workers in ``directory``."""
+    live_files, dead_files = [], []
+    for filename in os.listdir(directory):
+        if filename.startswith('metrics_') and filename.endswith('.json'):
+            pid = int(filename[len('metrics_'):-len('.json')])
+            (live_files if _pid_alive(pid) else dead_files).append(os.path.join(directory, filename))
+
+    merged = {}
+    if dead_files and fcntl is not None and _fold_dead_workers(directory, dead_files):
+        dead_files = []
+    archive = _read_json(os.path.join(directory, 'archive.json'))
+    if archive:
+        merged = _merge(merged, archive.get('metrics', {}), live=False)
+    for path in dead_files + live_files:
+        data = _read_json(path)
+        if data is not None:
+            merged = _merge(merged, data.get('metrics', {}), live=path in live_files)
+    return merged
+
+
+# Text exposition -------------------------------------------------------
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render_text(metrics):
+    """Render merged metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name in sorted(metrics):
+        metric = metrics[name]
+        lines.append(f"# HELP {name} {_escape(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric['labelnames']
+        for labels, value in sorted(metric['values']):
+            if metric['type'] == HISTOGRAM:
+                cumulative = 0
+                for bound, count in zip(list(metric['buckets']) + [math.inf], value[:-2]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(names, labels, [('le', _format_value(float(bound)))])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, labels)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_labels(names, labels)} {value[-1]}")
+            else:
+                lines.append(f"{name}{_labels(names, labels)} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
+
+
+# Shared registry and the application's metrics --------------------------
+
+registry = Registry()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._after_fork)
+
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'Time spent handling requests', ('method', 'endpoint'))
+http_requests = registry.counter(
+    'http_requests_total', 'Requests handled', ('method', 'endpoint', 'status'))
+db_queries = registry.counter('db_queries_total', 'SQL statements run while handling requests')
+db_request_duration = registry.histogram(
+    'db_request_duration_seconds', 'Time spent in SQL per request', ('endpoint',))
+db_slow_queries = registry.counter('db_slow_queries_total', 'SQL statements slower than SLOW_QUERY_MS')
+cache_lookups = registry.counter('cache_lookups_total', 'Cache lookups by result', ('result',))
+socketio_connections = registry.counter(
+    'socketio_connections_total', 'Socket.IO connects and disconnects', ('event',))
+socketio_connected = registry.gauge('socketio_connected_sessions', 'Socket.IO sessions connected now')
+socketio_events = registry.counter('socketio_events_emitted_total', 'Socket.IO events emitted', ('event',))
+email_sends = registry.counter('email_sends_total', 'Email send attempts by outcome', ('outcome',))
+
+
+def _collect_cache():
+    from utils.cache import get_cache_stats
+    stats = get_cache_stats()
+    cache_lookups.set_total(stats['hits'], result='hit')
+    cache_lookups.set_total(stats['misses'], result='miss')
+
+
+registry.add_callback(_collect_cache)
+
+
+def exposition():
+    """The text served at /metrics: all workers' metrics plus the cache hit ratio."""
+    metrics = registry.collect()
+    lookups = {tuple(labels): value for labels, value in metrics.get(cache_lookups.name, {}).get('values', [])}
+    hits, misses = lookups.get(('hit',), 0), lookups.get(('miss',), 0)
+    metrics['cache_hit_ratio'] = {
+        'type': GAUGE, 'help': 'Share of cache lookups that were hits', 'labelnames': [],
+        'values': [[[], hits / (hits + misses) if hits + misses else 0.0]]
+    }
+    return render_text(metrics)
+
+
+def configure_metrics(app):
+    """Time every request and set up multiprocess mode from METRICS_MULTIPROC_DIR."""
+    directory = app.config.get('METRICS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        registry.multiprocess_dir = directory
+        registry.start_flusher()
+        atexit.register(registry.flush)
+
+    from flask import g, request
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None and request.endpoint != 'static':
+            endpoint = request.endpoint or 'unmatched'
+            http_request_duration.observe(time.perf_counter() - started, method=request.method, endpoint=endpoint)
+            http_requests.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+        registry.maybe_flush()
+        return response
+
+    return registry
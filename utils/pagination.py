@@ -0,0 +1,168 @@
+"""Keyset (seek) pagination for the list views.
+
+Instead of loading every matching row and slicing the list in Python, a page is
+fetched with ``WHERE (sort keys) > (last row's keys) ORDER BY sort keys LIMIT n``.
+With an index on the sort keys, any page costs the same as page 1, however
+large the hostel. Pages are addressed by opaque cursors carried in the URL
+(``?cursor=...``) rather than page numbers.
+"""
+
+import base64
+import json
+from collections import namedtuple
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+# Totals above this are reported as "at least COUNT_LIMIT" instead of counted
+COUNT_LIMIT = 1000
+
+NEXT = 'next'
+PREV = 'prev'
+
+# Stands in for a missing date in sort keys (COALESCE(col, NO_DATE)), so those rows sort first
+NO_DATE = '0001-01-01'
+
+
+class SortKey(namedtuple('SortKey', 'expression column default')):
+    """A pagination sort key: SQL expression, result column holding its value,
+    and the value the expression substitutes for NULL (None if NOT NULL)."""
+
+    def __new__(cls, expression, column, default=None):
+        return super().__new__(cls, expression, column, default)
+
+    def value(self, row):
+        value = row[self.column]
+        return self.default if value is None else value
+
+
+def encode_cursor(direction, values):
+    """Opaque URL-safe token for the page before/after the row with ``values``."""
+    # default=str stores PostgreSQL date/Decimal keys in their ISO/text form
+    payload = json.dumps({'d': direction, 'k': list(values)}, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, values), or (None, None) for a missing or malformed token."""
+    if not token:
+        return None, None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        direction, values = payload['d'], payload['k']
+    except (ValueError, KeyError, TypeError):
+        return None, None
+    if direction not in (NEXT, PREV) or not isinstance(values, list):
+        return None, None
+    return direction, values
+
+
+def clamp_per_page(per_page):
+    try:
+        per_page = int(per_page)
+    except (TypeError, ValueError):
+        return DEFAULT_PER_PAGE
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+class KeysetPage:
+    """One page of results with cursors for its neighbours."""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None, total=None, total_is_estimate=False):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.total_is_estimate = total_is_estimate
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def count_capped(conn, select_from, conditions, params, limit=COUNT_LIMIT):
+    """Count matching rows, stopping at ``limit``; returns (count, is_estimate)."""
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM (SELECT 1 {select_from}{where} LIMIT ?) AS capped_rows",
+        tuple(params) + (limit + 1,)
+    ).fetchone()
+    count = row[0]
+    if count > limit:
+        return limit, True
+    return count, False
+
+
+def fetch_page(conn, select, select_from, conditions, params, sort_keys, descending=False,
+               cursor=None, per_page=DEFAULT_PER_PAGE, with_total=False):
+    """Fetch one page of ``SELECT {select} {select_from} WHERE {conditions}``.
+
+    Args:
+        conn: Database connection (the caller closes it)
+        select: Column list of the query
+        select_from: FROM/JOIN part of the query
+        conditions: Filter conditions, ANDed together
+        params: Parameters for the conditions
+        sort_keys: SortKeys that order the rows; the last must be unique (e.g. id)
+        descending: Sort newest/largest first
+        cursor: Token from a previous page's next_cursor/prev_cursor (None for page 1)
+        per_page: Rows per page
+        with_total: Also count the matching rows (capped at COUNT_LIMIT)
+
+    Returns:
+        KeysetPage
+    """
+    per_page = clamp_per_page(per_page)
+    direction, values = decode_cursor(cursor)
+    if values is not None and len(values) != len(sort_keys):
+        direction, values = None, None
+
+    # Walking backwards reverses the sort, then the page is flipped back
+    backwards = direction == PREV
+    reverse = descending != backwards
+    page_conditions = list(conditions)
+    page_params = list(params)
+    if values is not None:
+        key_list = ', '.join(key.expression for key in sort_keys)
+        placeholders = ', '.join('?' * len(sort_keys))
+        page_conditions.append(f"({key_list}) {'<' if reverse else '>'} ({placeholders})")
+        page_params.extend(values)
+
+    where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+    order = ', '.join(f"{key.expression} {'DESC' if reverse else 'ASC'}" for key in sort_keys)
+    rows = conn.execute(
+        f"SELECT {select} {select_from}{where} ORDER BY {order} LIMIT ?",
+        tuple(page_params) + (per_page + 1,)
+    ).fetchall()
+
+    # One extra row tells whether there is anything beyond this page
+    has_more = len(rows) > per_page
+    rows = [dict(row) for row in rows[:per_page]]
+    if backwards:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first = [key.value(rows[0]) for key in sort_keys]
+        last = [key.value(rows[-1]) for key in sort_keys]
+        if has_more if not backwards else values is not None:
+            next_cursor = encode_cursor(NEXT, last)
+        if has_more if backwards else values is not None:
+            prev_cursor = encode_cursor(PREV, first)
+
+    total, total_is_estimate = None, False
+    if with_total:
+        total, total_is_estimate = count_capped(conn, select_from, conditions, params)
+    return KeysetPage(rows, per_page, next_cursor, prev_cursor, total, total_is_estimate)
@@ -0,0 +1,278 @@
+"""Sampling profiler for live requests in the Hostel Management System.
+
+When a page such as /fees/reports gets slow in production, an owner can start
+a profiling session (routes/profiler.py, PROFILER_ENABLED). A background thread
+then reads ``sys._current_frames()`` every ``interval`` seconds for at most
+``duration`` seconds and counts the call stack of every thread that is handling
+a request, keyed by the request's endpoint. The result is available as
+collapsed stacks (``frame;frame;frame count`` lines, as read by flamegraph.pl
+and speedscope) and as the top frames per endpoint.
+
+Overhead is bounded: the sampler measures the CPU time each sample takes and
+sleeps long enough to keep that time below ``max_overhead`` of the wall
+clock, and the measured overhead is part of the report. Outside a session the
+only cost is a dictionary write per request.
+
+Sessions are per process: with several workers, only the requests of the
+worker that received the start request are sampled. Under eventlet (the
+production worker class), the sampler still runs on a real OS thread and
+samples each request greenlet: the frame it is suspended in, or the live frame
+of its OS thread while it runs.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+DEFAULT_INTERVAL = 0.005  # seconds between samples
+DEFAULT_DURATION = 10  # seconds per session
+MAX_DURATION = 120
+DEFAULT_MAX_OVERHEAD = 0.02  # share of wall time the sampler may use
+MAX_STACK_DEPTH = 64
+MAX_STACKS = 20000  # distinct stacks kept per session; further new stacks are counted as truncated
+
+TRUNCATED = '[truncated]'
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _green_threads():
+    """Whether eventlet has monkey-patched threading in this process."""
+    patcher = sys.modules.get('eventlet.patcher')
+    return patcher is not None and patcher.is_monkey_patched('thread')
+
+
+def _os_threading():
+    """The threading module of real OS threads, also after eventlet's monkey-patching.
+
+    A green sampler would only ever see its own stack: the hub cannot run it while
+    a request greenlet is busy, and sys._current_frames() is keyed by OS thread.
+    """
+    if _green_threads():
+        return sys.modules['eventlet.patcher'].original('threading')
+    return threading
+
+
+@lru_cache(maxsize=8192)
+def frame_label(code):
+    """Readable, aggregatable name of a code object: ``function (path/to/file.py:first line)``."""
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = filename[len(_PROJECT_ROOT):]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+def collapse_stack(frame, limit=MAX_STACK_DEPTH):
+    """The call stack of ``frame`` as labels from the outermost call inwards."""
+    labels = []
+    while frame is not None and len(labels) < limit:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return tuple(labels)
+
+
+class SamplingProfiler:
+    """Samples the stacks of request threads on a background thread."""
+
+    def __init__(self, max_overhead=DEFAULT_MAX_OVERHEAD):
+        self.max_overhead = max_overhead
+        self._active_requests = {}  # thread (or greenlet) id -> endpoint
+        self._greenlets = {}  # greenlet id -> (greenlet, id of the OS thread it runs on), under eventlet
+        self._lock = _os_threading().Lock()
+        self._thread = None
+        self._stop = _os_threading().Event()
+        self._reset(DEFAULT_INTERVAL, 0, all_threads=False)
+
+    def _reset(self, interval, duration, all_threads):
+        self.interval = interval
+        self.duration = duration
+        self.all_threads = all_threads
+        self.started_at = None
+        self.finished_at = None
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self._stacks = defaultdict(Counter)  # endpoint -> Counter(stack tuple)
+        self._distinct = 0
+        self._truncated = 0
+
+    # Request tracking (called from the app's request hooks) ---------------
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def enter_request(self, endpoint):
+        key = threading.get_ident()
+        self._active_requests[key] = endpoint or 'unmatched'
+        if _green_threads():
+            import greenlet
+            self._greenlets[key] = (greenlet.getcurrent(), _os_threading().get_ident())
+
+    def exit_request(self):
+        key = threading.get_ident()
+        self._active_requests.pop(key, None)
+        self._greenlets.pop(key, None)
+
+    # Sessions --------------------------------------------------------------
+
+    def start(self, duration=DEFAULT_DURATION, interval=DEFAULT_INTERVAL, all_threads=False):
+        """Start a session of ``duration`` seconds; returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self._reset(max(interval, 0.001), min(duration, MAX_DURATION), all_threads)
+            os_threading = _os_threading()
+            self._stop = os_threading.Event()
+            self.started_at = time.time()
+            self._thread = os_threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, wait=True):
+        self._stop.set()
+        thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self):
+        own_id = _os_threading().get_ident()
+        deadline = time.monotonic() + self.duration
+        try:
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                # CPU time, not wall time: waiting for the GIL behind a busy request costs it nothing
+                start = time.thread_time()
+                self.sample(exclude=own_id)
+                cost = time.thread_time() - start
+                self.sampling_seconds += cost
+                # Keep sampling below max_overhead of the wall clock, but end on time
+                pause = max(self.interval, cost / self.max_overhead - cost)
+                self._stop.wait(max(0.0, min(pause, deadline - time.monotonic())))
+        finally:
+            self.finished_at = time.time()
+
+    def sample(self, exclude=None):
+        """Record one sample of every request thread's stack (every thread with ``all_threads``)."""
+        frames = sys._current_frames()
+        threads = dict.fromkeys(frames, 'background') if self.all_threads else {}
+        threads.update(self._active_requests)
+        greenlets = dict(self._greenlets)
+        sampled = []
+        for thread_id, endpoint in threads.items():
+            if thread_id == exclude:
+                continue
+            frame = self._frame_of(greenlets[thread_id], frames) if thread_id in greenlets else frames.get(thread_id)
+            if frame is not None:
+                sampled.append((endpoint, collapse_stack(frame)))
+        # Reports copy the stacks under the same lock
+        with self._lock:
+            for endpoint, stack in sampled:
+                stacks = self._stacks[endpoint]
+                if stack not in stacks:
+                    if self._distinct >= MAX_STACKS:
+                        self._truncated += 1
+                        stack = (TRUNCATED,)
+                    else:
+                        self._distinct += 1
+                stacks[stack] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _frame_of(green, frames):
+        """Current frame of a request greenlet: where it is suspended, or its OS thread's frame while it runs."""
+        glet, os_thread_id = green
+        frame = glet.gr_frame
+        if frame is None and not glet.dead:
+            frame = frames.get(os_thread_id)
+        return frame
+
+    # Reports ---------------------------------------------------------------
+
+    def _snapshot(self):
+        """A copy of the stacks per endpoint, safe to read while a session runs."""
+        with self._lock:
+            return {endpoint: Counter(stacks) for endpoint, stacks in self._stacks.items()}
+
+    def collapsed(self, endpoint=None):
+        """Collapsed-stack text (``endpoint;frame;...;frame count`` per line) for flamegraph tools."""
+        lines = []
+        for name, stacks in sorted(self._snapshot().items()):
+            if endpoint and name != endpoint:
+                continue
+            for stack, count in stacks.most_common():
+                lines.append(';'.join((name,) + stack) + f' {count}')
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def top_frames(self, limit=15):
+        """Per endpoint, the frames with the most samples on top of the stack (self) and anywhere (total)."""
+        report = {}
+        for endpoint, stacks in self._snapshot().items():
+            own, total = Counter(), Counter()
+            for stack, count in stacks.items():
+                own[stack[-1]] += count
+                for label in set(stack):
+                    total[label] += count
+            samples = sum(stacks.values())
+            report[endpoint] = {
+                'samples': samples,
+                'self': [{'frame': label, 'samples': count, 'percent': round(100 * count / samples, 1)}
+                         for label, count in own.most_common(limit)],
+                'total': [{'frame': label, 'samples': count, 'percent': round(100 * count / samples, 1)}
+                          for label, count in total.most_common(limit)],
+            }
+        return report
+
+    def status(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            'running': self.running,
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'interval': self.interval,
+            'all_threads': self.all_threads,
+            'samples': self.samples,
+            'elapsed_seconds': round(elapsed, 3),
+            'sampling_ms': round(self.sampling_seconds * 1000, 2),
+            'overhead_percent': round(100 * self.sampling_seconds / elapsed, 3) if elapsed else 0.0,
+            'distinct_stacks': self._distinct,
+            'truncated_samples': self._truncated,
+        }
+
+    def _after_fork(self):
+        # The sampling thread does not survive a fork, and neither do the parent's request threads
+        self._lock = _os_threading().Lock()
+        self._thread = None
+        self._stop = _os_threading().Event()
+        self._active_requests = {}
+        self._greenlets = {}
+
+
+# Shared profiler; configure_profiler() hooks it into the app's requests
+profiler = SamplingProfiler()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=profiler._after_fork)
+
+
+def configure_profiler(app):
+    """Track which endpoint each thread is handling, so sessions can attribute samples (PROFILER_ENABLED)."""
+    if not app.config.get('PROFILER_ENABLED'):
+        return None
+    profiler.max_overhead = app.config.get('PROFILER_MAX_OVERHEAD') or DEFAULT_MAX_OVERHEAD
+
+    from flask import request
+
+    @app.before_request
+    def profile_request():
+        profiler.enter_request(request.endpoint)
+
+    @app.teardown_request
+    def end_profiled_request(exception=None):
+        profiler.exit_request()
+
+    return profiler
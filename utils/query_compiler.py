@@ -0,0 +1,511 @@
+"""
+Dialect-neutral query layer for the Hostel Management System
+Compiles the SQLite-flavoured SQL used throughout the models for PostgreSQL and
+wraps psycopg2 connections so they behave like sqlite3 connections
+"""
+import re
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    import psycopg2.extras
+except ImportError:  # PostgreSQL support is optional for SQLite-only installs
+    psycopg2 = None
+
+SQLITE = 'sqlite'
+POSTGRESQL = 'postgresql'
+
+# Exceptions the models catch, whichever driver raised them
+if psycopg2 is not None:
+    IntegrityError = (sqlite3.IntegrityError, psycopg2.IntegrityError)
+    DatabaseError = (sqlite3.Error, psycopg2.Error)
+else:
+    IntegrityError = (sqlite3.IntegrityError,)
+    DatabaseError = (sqlite3.Error,)
+
+# Tables keyed by something other than an ``id`` column (no RETURNING id on insert)
+TABLES_WITHOUT_ID = {'student_details'}
+
+# Number of compiled statements kept in memory
+COMPILE_CACHE_SIZE = 1024
+
+
+class QueryCompileError(ValueError):
+    """Raised for SQLite constructs that have no PostgreSQL translation."""
+
+
+CompiledQuery = namedtuple('CompiledQuery', ['sql', 'action', 'returns_id'])
+CompiledQuery.__doc__ = """A translated statement.
+
+action is None for ordinary statements, or 'begin'/'commit'/'rollback' for
+transaction control that the connection wrapper handles itself.
+"""
+
+
+def is_unique_violation(error):
+    """Return True if a database error was caused by a UNIQUE constraint."""
+    message = str(error)
+    return 'UNIQUE constraint failed' in message or 'duplicate key value violates unique constraint' in message
+
+
+# SQL scanning -----------------------------------------------------------
+
+def _skip_quoted(sql, i):
+    """Return the index just past the literal, identifier or comment starting at i (or i)."""
+    ch = sql[i]
+    if ch in ("'", '"'):
+        j = i + 1
+        while j < len(sql):
+            if sql[j] == ch:
+                if j + 1 < len(sql) and sql[j + 1] == ch:  # Escaped quote
+                    j += 2
+                    continue
+                return j + 1
+            j += 1
+        return len(sql)
+    if sql.startswith('--', i):
+        end = sql.find('\n', i)
+        return len(sql) if end == -1 else end
+    if sql.startswith('/*', i):
+        end = sql.find('*/', i + 2)
+        return len(sql) if end == -1 else end + 2
+    return i
+
+
+def _find_call(sql, name):
+    """Find the first call to function ``name`` outside literals.
+
+    Returns (start, end, args) where args are the raw top-level argument strings,
+    or None if there is no such call.
+    """
+    pattern = re.compile(r'\b' + name + r'\s*\(', re.IGNORECASE)
+    i = 0
+    while i < len(sql):
+        skipped = _skip_quoted(sql, i)
+        if skipped != i:
+            i = skipped
+            continue
+        match = pattern.match(sql, i)
+        if match and (i == 0 or not (sql[i - 1].isalnum() or sql[i - 1] in '_.')):
+            args, depth, current, j = [], 1, match.end(), match.end()
+            while j < len(sql) and depth:
+                skipped = _skip_quoted(sql, j)
+                if skipped != j:
+                    j = skipped
+                    continue
+                if sql[j] == '(':
+                    depth += 1
+                elif sql[j] == ')':
+                    depth -= 1
+                    if depth == 0:
+                        args.append(sql[current:j].strip())
+                elif sql[j] == ',' and depth == 1:
+                    args.append(sql[current:j].strip())
+                    current = j + 1
+                j += 1
+            if depth:
+                raise QueryCompileError(f"Unbalanced parentheses in call to {name}()")
+            if args == ['']:
+                args = []
+            return i, j, args
+        i += 1
+    return None
+
+
+def _rewrite_calls(sql, name, rewrite):
+    """Replace every call to ``name`` with rewrite(args)."""
+    while True:
+        found = _find_call(sql, name)
+        if found is None:
+            return sql
+        start, end, args = found
+        sql = sql[:start] + rewrite(args) + sql[end:]
+
+
+def _literal(arg):
+    """Return the text of a quoted SQL literal argument, or None if it is not one."""
+    if len(arg) >= 2 and arg[0] == "'" and arg[-1] == "'":
+        return arg[1:-1].replace("''", "'")
+    return None
+
+
+# Date/time functions ----------------------------------------------------
+
+_STRFTIME_CODES = {
+    '%Y': 'YYYY', '%m': 'MM', '%d': 'DD', '%H': 'HH24', '%M': 'MI',
+    '%S': 'SS', '%j': 'DDD', '%W': 'WW', '%%': '%',
+}
+
+_MODIFIER = re.compile(r'^([+-])?\s*(\d+(?:\.\d+)?)\s+(year|month|day|hour|minute|second)s?$', re.IGNORECASE)
+_START_OF = re.compile(r'^start of (year|month|day)$', re.IGNORECASE)
+
+
+def _apply_modifiers(expr, modifiers):
+    """Translate SQLite date modifiers ('-12 months', 'start of month', ?) into interval arithmetic."""
+    for modifier in modifiers:
+        text = _literal(modifier)
+        if text is None:
+            # Bound parameter or expression; PostgreSQL parses '-30 days' as an interval too
+            expr = f"({expr} + CAST({modifier} AS INTERVAL))"
+            continue
+        text = text.strip()
+        start_of = _START_OF.match(text)
+        if start_of:
+            expr = f"date_trunc('{start_of.group(1).lower()}', {expr})"
+            continue
+        match = _MODIFIER.match(text)
+        if not match:
+            raise QueryCompileError(f"Unsupported date modifier: {text!r}")
+        sign, amount, unit = match.groups()
+        operator = '-' if sign == '-' else '+'
+        expr = f"({expr} {operator} INTERVAL '{amount} {unit.lower()}s')"
+    return expr
+
+
+def _time_value(arg):
+    """The PostgreSQL timestamp expression for a SQLite time-value argument."""
+    if (_literal(arg) or '').lower() == 'now':
+        return "(NOW() AT TIME ZONE 'UTC')"  # SQLite's 'now' is UTC
+    return f"CAST({arg} AS TIMESTAMP)"
+
+
+def _rewrite_date(args):
+    if not args:
+        raise QueryCompileError("date() needs a time value")
+    return f"CAST({_apply_modifiers(_time_value(args[0]), args[1:])} AS DATE)"
+
+
+def _rewrite_datetime(args):
+    if not args:
+        raise QueryCompileError("datetime() needs a time value")
+    return f"CAST({_apply_modifiers(_time_value(args[0]), args[1:])} AS TIMESTAMP(0))"
+
+
+def _rewrite_strftime(args):
+    if len(args) < 2 or _literal(args[0]) is None:
+        raise QueryCompileError("strftime() needs a literal format and a time value")
+    fmt = _literal(args[0])
+
+    def convert(match):
+        code = match.group(0)
+        if code not in _STRFTIME_CODES:
+            raise QueryCompileError(f"Unsupported strftime format code: {code}")
+        return _STRFTIME_CODES[code]
+
+    pg_format = re.sub(r'%.', convert, fmt).replace("'", "''")
+    value = _apply_modifiers(_time_value(args[1]), args[2:])
+    return f"to_char({value}, '{pg_format}')"
+
+
+def _rewrite_julianday(args):
+    if len(args) != 1:
+        raise QueryCompileError("julianday() takes exactly one time value")
+    return f"(EXTRACT(EPOCH FROM {_time_value(args[0])}) / 86400.0 + 2440587.5)"
+
+
+def _rewrite_group_concat(args):
+    if not args or len(args) > 2:
+        raise QueryCompileError("group_concat() takes one or two arguments")
+    separator = args[1] if len(args) == 2 else "','"
+    return f"string_agg(CAST({args[0]} AS TEXT), {separator})"
+
+
+def _rewrite_ifnull(args):
+    return f"COALESCE({', '.join(args)})"
+
+
+_FUNCTION_REWRITES = (
+    ('strftime', _rewrite_strftime),
+    ('datetime', _rewrite_datetime),
+    ('date', _rewrite_date),
+    ('julianday', _rewrite_julianday),
+    ('group_concat', _rewrite_group_concat),
+    ('ifnull', _rewrite_ifnull),
+)
+
+
+# Statement compilation --------------------------------------------------
+
+_TRANSACTION_CONTROL = {
+    'BEGIN': 'begin', 'BEGIN TRANSACTION': 'begin', 'BEGIN DEFERRED': 'begin',
+    'BEGIN IMMEDIATE': 'begin', 'BEGIN EXCLUSIVE': 'begin',
+    'COMMIT': 'commit', 'COMMIT TRANSACTION': 'commit', 'END': 'commit', 'END TRANSACTION': 'commit',
+    'ROLLBACK': 'rollback', 'ROLLBACK TRANSACTION': 'rollback',
+}
+
+_INSERT = re.compile(r'^\s*INSERT\s+(OR\s+(\w+)\s+)?INTO\s+([\w."]+)', re.IGNORECASE)
+_LIKE = re.compile(r'\bLIKE\b', re.IGNORECASE)
+
+
+def _rewrite_tokens(sql, escape_percent):
+    """Placeholder and operator rewriting outside literals: ? -> %s, LIKE -> ILIKE."""
+    out, i, code_start = [], 0, 0
+
+    def flush_code(end):
+        code = sql[code_start:end]
+        # SQLite's LIKE is case-insensitive for ASCII; ILIKE keeps searches behaving the same
+        code = _LIKE.sub('ILIKE', code)
+        if escape_percent:
+            code = code.replace('%', '%%')
+        out.append(code.replace('?', '%s'))
+
+    while i < len(sql):
+        skipped = _skip_quoted(sql, i)
+        if skipped != i:
+            flush_code(i)
+            quoted = sql[i:skipped]
+            out.append(quoted.replace('%', '%%') if escape_percent else quoted)
+            i = code_start = skipped
+        else:
+            i += 1
+    flush_code(len(sql))
+    return ''.join(out)
+
+
+def _compile_postgresql(sql, has_params):
+    statement = sql.strip().rstrip(';').strip()
+    action = _TRANSACTION_CONTROL.get(re.sub(r'\s+', ' ', statement).upper())
+    if action:
+        return CompiledQuery(None, action, False)
+
+    for name, rewrite in _FUNCTION_REWRITES:
+        statement = _rewrite_calls(statement, name, rewrite)
+
+    returns_id = False
+    insert = _INSERT.match(statement)
+    if insert:
+        conflict, table = insert.group(2), insert.group(3).strip('"').split('.')[-1]
+        if conflict:
+            if conflict.upper() != 'IGNORE':
+                raise QueryCompileError(f"INSERT OR {conflict.upper()} is not supported on PostgreSQL")
+            statement = statement[:insert.start(1)] + statement[insert.end(1):]
+            statement += ' ON CONFLICT DO NOTHING'
+        if table.lower() not in TABLES_WITHOUT_ID and not re.search(r'\bRETURNING\b', statement, re.IGNORECASE):
+            statement += ' RETURNING id'
+            returns_id = True
+
+    # psycopg2 only interprets % when parameters are passed
+    return CompiledQuery(_rewrite_tokens(statement, escape_percent=has_params), None, returns_id)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def compile_query(sql, dialect=POSTGRESQL, has_params=True):
+    """Translate a SQLite statement for ``dialect``, using a cache keyed by SQL text."""
+    if dialect == SQLITE:
+        return CompiledQuery(sql, None, False)
+
+    key = (dialect, sql, has_params)
+    with _cache_lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return compiled
+        _cache_stats['misses'] += 1
+
+    if dialect != POSTGRESQL:
+        raise QueryCompileError(f"Unknown SQL dialect: {dialect}")
+    compiled = _compile_postgresql(sql, has_params)
+
+    with _cache_lock:
+        _cache[key] = compiled
+        if len(_cache) > COMPILE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def get_compile_cache_stats():
+    """Return hit/miss counters for the compiled-statement cache."""
+    with _cache_lock:
+        return dict(_cache_stats, size=len(_cache), max_size=COMPILE_CACHE_SIZE)
+
+
+def clear_compile_cache():
+    """Drop all compiled statements."""
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats.update(hits=0, misses=0)
+
+
+# psycopg2 compatibility wrappers ----------------------------------------
+
+class PostgresCursor:
+    """A psycopg2 cursor that accepts SQLite-style SQL and exposes lastrowid."""
+
+    def __init__(self, connection, cursor):
+        self.connection = connection
+        self._cursor = cursor
+        self.lastrowid = None
+        self._pending_row = None  # Row consumed by RETURNING id, still owed to fetch*()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def execute(self, sql, params=None):
+        has_params = bool(params)
+        compiled = compile_query(sql, POSTGRESQL, has_params)
+        self.lastrowid = None
+        self._pending_row = None
+        if compiled.action:
+            self.connection._transaction_control(compiled.action)
+            return self
+        self._cursor.execute(compiled.sql, tuple(params) if has_params else None)
+        if compiled.returns_id:
+            row = self._cursor.fetchone()
+            if row is not None:
+                self.lastrowid = row[0]
+                self._pending_row = row
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        compiled = compile_query(sql, POSTGRESQL, True)
+        if compiled.action:
+            raise QueryCompileError("Transaction control cannot be used with executemany()")
+        statement = compiled.sql
+        if compiled.returns_id:
+            statement = statement[:-len(' RETURNING id')]
+        self.lastrowid = None
+        self._pending_row = None
+        psycopg2.extras.execute_batch(self._cursor, statement, [tuple(p) for p in seq_of_params])
+        return self
+
+    def fetchone(self):
+        if self._pending_row is not None:
+            row, self._pending_row = self._pending_row, None
+            return row
+        if self._cursor.description is None:
+            return None
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        rows = [self._pending_row] if self._pending_row is not None else []
+        self._pending_row = None
+        if self._cursor.description is not None:
+            rows.extend(self._cursor.fetchall())
+        return rows
+
+    def fetchmany(self, size=None):
+        size = size or self._cursor.arraysize
+        rows = [self._pending_row] if self._pending_row is not None else []
+        self._pending_row = None
+        if self._cursor.description is not None and len(rows) < size:
+            rows.extend(self._cursor.fetchmany(size - len(rows)))
+        return rows
+
+    def close(self):
+        self._cursor.close()
+
+
+class PostgresConnection:
+    """Wraps a psycopg2 connection with the sqlite3 API the models rely on.
+
+    Supports conn.execute(), '?' placeholders, rows addressable by index and
+    column name, and cursor.lastrowid after INSERT.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    @property
+    def raw_connection(self):
+        return self._connection
+
+    @property
+    def in_transaction(self):
+        return self._connection.status != psycopg2.extensions.STATUS_READY
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        if name == 'row_factory':
+            return  # Rows are always addressable by name and index
+        object.__setattr__(self, name, value)
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault('cursor_factory', psycopg2.extras.DictCursor)
+        return PostgresCursor(self, self._connection.cursor(*args, **kwargs))
+
+    def execute(self, sql, params=None):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    def iter_batches(self, sql, params=None, batch_size=1000):
+        """Yield the rows of a SELECT in batches from a server-side (named) cursor."""
+        has_params = bool(params)
+        compiled = compile_query(sql, POSTGRESQL, has_params)
+        cursor = self._connection.cursor(name=f"stream_{uuid.uuid4().hex}",
+                                         cursor_factory=psycopg2.extras.DictCursor)
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(compiled.sql, tuple(params) if has_params else None)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    def _transaction_control(self, action):
+        # psycopg2 opens transactions implicitly, so BEGIN is a no-op
+        if action == 'commit':
+            self._connection.commit()
+        elif action == 'rollback':
+            self._connection.rollback()
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+def _register_sqlite_types(connection):
+    """Return dates, timestamps and numerics the way sqlite3 does (ISO strings, floats)."""
+    extensions = psycopg2.extensions
+    as_text = extensions.new_type(
+        extensions.DATE.values + extensions.PYDATETIME.values + extensions.PYDATETIMETZ.values,
+        'SQLITE_TEXT_DATES', lambda value, cursor: value
+    )
+    as_float = extensions.new_type(
+        extensions.DECIMAL.values, 'SQLITE_FLOAT',
+        lambda value, cursor: float(value) if value is not None else None
+    )
+    extensions.register_type(as_text, connection)
+    extensions.register_type(as_float, connection)
+
+
+def connect_postgres(database_url):
+    """Open a psycopg2 connection wrapped for SQLite-compatible use."""
+    if psycopg2 is None:
+        raise RuntimeError("psycopg2 is required for PostgreSQL databases")
+    connection = psycopg2.connect(database_url)
+    _register_sqlite_types(connection)
+    return PostgresConnection(connection)
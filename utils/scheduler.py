@@ -0,0 +1,333 @@
+"""Background job scheduler for the Hostel Management System.
+
+Periodic maintenance (the overdue-fee sweep, fee reminder emails and the
+hostel_stats consistency check) runs on a scheduler thread instead of inside
+whichever request happens to arrive. Every worker runs the scheduler, but a
+job only runs where its lease is acquired: a Redis key (``SET NX PX``) when the
+Redis cache backend is configured, otherwise a row in the ``scheduler_locks``
+table. The lease lasts one interval, so a job runs once per interval across
+all workers, whichever of them gets there first.
+
+Run it in the web workers (SCHEDULER_ENABLED, the default) or on its own:
+python -m utils.scheduler [--once] [--job NAME]
+"""
+
+import argparse
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+# Run states
+OK = 'ok'
+FAILED = 'failed'
+
+DEFAULT_TICK = 30  # seconds between checks for due jobs
+DEFAULT_HISTORY = 20  # runs kept per job
+
+
+class DatabaseLock:
+    """Job leases stored in the scheduler_locks table of the model database."""
+
+    name = 'database'
+
+    def __init__(self, connect=None):
+        self._connect = connect
+        self._ready = False
+
+    def _connection(self):
+        if self._connect is not None:
+            return self._connect()
+        from models.db import get_db_connection
+        return get_db_connection()
+
+    def _ensure_table(self, conn):
+        if not self._ready:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scheduler_locks (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self._ready = True
+
+    def acquire(self, name, owner, ttl, now=None):
+        """Take the lease on ``name`` for ``ttl`` seconds unless another owner holds it."""
+        now = time.time() if now is None else now
+        conn = self._connection()
+        try:
+            self._ensure_table(conn)
+            cursor = conn.execute('''
+                INSERT INTO scheduler_locks (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE scheduler_locks.expires_at <= ?
+            ''', (name, owner, now + ttl, now))
+            conn.commit()
+            return cursor.rowcount == 1
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+class RedisLock:
+    """Job leases stored as expiring Redis keys; falls back to ``fallback`` while Redis is down."""
+
+    name = 'redis'
+
+    def __init__(self, redis_url, prefix='hostel_scheduler:', fallback=None):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.fallback = fallback
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.from_url(self.redis_url, socket_connect_timeout=2, socket_timeout=2)
+        return self._client
+
+    def acquire(self, name, owner, ttl, now=None):
+        try:
+            return bool(self._get_client().set(f'{self.prefix}{name}', owner, nx=True, px=int(ttl * 1000)))
+        except Exception as e:
+            self._client = None
+            if self.fallback is None:
+                raise
+            print(f"Scheduler lock unavailable in Redis ({e}); using the {self.fallback.name} lock")
+            return self.fallback.acquire(name, owner, ttl, now)
+
+
+class ScheduledJob:
+    """A periodic job and its recent runs."""
+
+    def __init__(self, name, func, interval, history=DEFAULT_HISTORY):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = 0.0
+        self.runs = deque(maxlen=history)
+        self.locked_skips = 0
+
+    def to_dict(self):
+        last = self.runs[-1] if self.runs else None
+        return {
+            'interval': self.interval,
+            'next_run': datetime.fromtimestamp(self.next_run).isoformat() if self.next_run else None,
+            'last_status': last['status'] if last else None,
+            'last_run': last['started_at'] if last else None,
+            'last_duration_ms': last['duration_ms'] if last else None,
+            'locked_skips': self.locked_skips,
+            'history': list(self.runs),
+        }
+
+
+class Scheduler:
+    """Runs registered jobs on a thread, each at most once per interval across workers."""
+
+    def __init__(self, lock=None, tick=DEFAULT_TICK, context=None):
+        self.lock = lock or DatabaseLock()
+        self.tick = tick
+        self.context = context  # Callable returning a context manager (e.g. app.app_context)
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.enabled = False
+        self._jobs = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_job(self, name, func, interval):
+        """Register ``func`` to run every ``interval`` seconds (replacing a job of the same name)."""
+        with self._lock:
+            self._jobs[name] = ScheduledJob(name, func, interval)
+
+    def remove_job(self, name):
+        with self._lock:
+            self._jobs.pop(name, None)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def run_pending(self, now=None):
+        """Run every due job whose lease this worker gets; returns the runs made."""
+        now = time.time() if now is None else now
+        runs = []
+        for job in self.jobs():
+            if now < job.next_run:
+                continue
+            try:
+                acquired = self.lock.acquire(job.name, self.owner, job.interval, now)
+            except Exception as e:
+                print(f"Error acquiring scheduler lock for {job.name}: {e}")
+                job.next_run = now + self.tick
+                continue
+            if not acquired:
+                # Another worker ran it this interval; check again on the next tick
+                job.locked_skips += 1
+                job.next_run = now + self.tick
+                continue
+            job.next_run = now + job.interval
+            runs.append(self._run(job))
+        return runs
+
+    def run_job(self, name, now=None):
+        """Run one job now if its lease is free; returns the run, or None when it is held elsewhere."""
+        job = self._jobs[name]
+        now = time.time() if now is None else now
+        if not self.lock.acquire(job.name, self.owner, job.interval, now):
+            job.locked_skips += 1
+            return None
+        job.next_run = now + job.interval
+        return self._run(job)
+
+    def _run(self, job):
+        started = time.time()
+        run = {'job': job.name, 'started_at': datetime.fromtimestamp(started).isoformat(),
+               'worker': self.owner}
+        start = time.perf_counter()
+        try:
+            with self.context() if self.context else nullcontext():
+                run['result'] = job.func()
+            run['status'] = OK
+        except Exception as e:
+            print(f"Error running scheduled job {job.name}: {e}")
+            run['status'] = FAILED
+            run['error'] = str(e)
+        run['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        job.runs.append(run)
+        return run
+
+    def start(self):
+        """Start the scheduler thread (once per process)."""
+        with self._lock:
+            self.enabled = True
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        # Wait one tick first so jobs stay out of worker start-up
+        while not self._stop.wait(self.tick):
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Error in scheduler loop: {e}")
+
+    def _after_fork(self):
+        # Threads do not survive fork(); each worker restarts its own
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if self.enabled:
+            self.start()
+
+    def stats(self):
+        return {
+            'lock': self.lock.name,
+            'worker': self.owner,
+            'running': self._thread is not None and self._thread.is_alive(),
+            'tick': self.tick,
+            'jobs': {job.name: job.to_dict() for job in self.jobs()},
+        }
+
+
+# Shared scheduler; configure_scheduler() registers the jobs and applies the app settings
+scheduler = Scheduler()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=scheduler._after_fork)
+
+
+def sweep_overdue_fees(socketio=None):
+    """Mark pending fees past their due date as overdue and tell connected clients."""
+    from utils.fee_utils import update_overdue_fees
+    updated = update_overdue_fees(raise_errors=True)  # A failed sweep must show as a failed run
+    if updated and socketio is not None:
+        socketio.emit('fees_updated', {'count': updated}, namespace='/updates')
+    return {'updated': updated}
+
+
+def send_fee_reminders(days_threshold=3):
+    from utils.email_notifier import EmailNotifier
+    return EmailNotifier.send_bulk_fee_reminders(days_threshold=days_threshold)
+
+
+def check_hostel_stats():
+    """Rebuild the hostel_stats summary table if it has drifted from the source tables."""
+    from models.db import HostelStatsModel
+    mismatches = HostelStatsModel.check()
+    if mismatches:
+        print(f"hostel_stats drifted in {len(mismatches)} rows; rebuilding")
+        return {'mismatches': len(mismatches), 'rows': HostelStatsModel.rebuild()}
+    return {'mismatches': 0}
+
+
+def configure_scheduler(app, socketio=None, start=None):
+    """Register the maintenance jobs from SCHEDULER_* settings and start the thread if enabled.
+
+    An interval of 0 disables a job; fee reminders also need MAIL_USERNAME.
+    """
+    config = app.config
+    if (config.get('CACHE_TYPE') or '').lower() in ('redis', 'rediscache'):
+        scheduler.lock = RedisLock(config.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0',
+                                   prefix=f"{config.get('CACHE_KEY_PREFIX') or 'hostel_cache:'}scheduler:",
+                                   fallback=DatabaseLock())
+    else:
+        scheduler.lock = DatabaseLock()
+    scheduler.tick = config.get('SCHEDULER_TICK') or DEFAULT_TICK
+    scheduler.context = app.app_context
+
+    jobs = {
+        'overdue_fees': (lambda: sweep_overdue_fees(socketio), config.get('SCHEDULER_OVERDUE_INTERVAL')),
+        'fee_reminders': (send_fee_reminders,
+                          config.get('SCHEDULER_REMINDER_INTERVAL') if config.get('MAIL_USERNAME') else 0),
+        'hostel_stats': (check_hostel_stats, config.get('SCHEDULER_STATS_INTERVAL')),
+    }
+    for name, (func, interval) in jobs.items():
+        if interval:
+            scheduler.add_job(name, func, interval)
+        else:
+            scheduler.remove_job(name)
+
+    if start if start is not None else config.get('SCHEDULER_ENABLED'):
+        scheduler.start()
+    return scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the maintenance jobs outside the web workers.')
+    parser.add_argument('--once', action='store_true', help='run the due jobs once and exit')
+    parser.add_argument('--job', help='run only this job now (if no other worker holds its lease)')
+    args = parser.parse_args()
+
+    # The app module would otherwise start a second, in-process scheduler
+    os.environ['SCHEDULER_ENABLED'] = 'false'
+    from app import app, socketio
+    configure_scheduler(app, socketio, start=False)
+
+    if args.job:
+        run = scheduler.run_job(args.job)
+        print(run or f"{args.job} is locked by another worker")
+        return
+    while True:
+        for run in scheduler.run_pending():
+            print(f"{run['job']}: {run['status']} in {run['duration_ms']} ms {run.get('result') or run.get('error')}")
+        if args.once:
+            return
+        time.sleep(scheduler.tick)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Full-text search helpers for the Hostel Management System.
+
+Student search runs on an SQLite FTS5 index (see ``models.db.create_student_search``)
+or, on PostgreSQL, on trigram indexes (migrations/add_student_search_postgres.sql).
+This module turns what the user typed into FTS5 queries: every word is matched
+as a prefix, so results narrow as the user types, and words that match nothing
+are swapped for the closest indexed terms to tolerate typos.
+"""
+
+import re
+
+# Words shorter than this are not corrected (too many near neighbours)
+MIN_FUZZY_LENGTH = 3
+# Corrections tried per misspelt word
+MAX_CORRECTIONS = 3
+# Words used from a query; the rest are ignored
+MAX_QUERY_TERMS = 6
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split search text into lowercase words (as the unicode61 tokenizer does)."""
+    return _WORD.findall((text or '').lower())[:MAX_QUERY_TERMS]
+
+
+def quote_term(term):
+    """Quote a word as an FTS5 string so punctuation and keywords are taken literally."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def match_expression(terms, column=None):
+    """Build an FTS5 MATCH expression requiring every term, each matched as a prefix ("jo" finds "john").
+
+    Args:
+        terms: Words, or tuples of alternative words (any one may match)
+        column: Restrict the match to one indexed column
+    """
+    scope = f'{column} : ' if column else ''
+    parts = []
+    for term in terms:
+        alternatives = term if isinstance(term, tuple) else (term,)
+        phrases = [f'{scope}{quote_term(word)}*' for word in alternatives]
+        parts.append(phrases[0] if len(phrases) == 1 else '(' + ' OR '.join(phrases) + ')')
+    return ' AND '.join(parts)
+
+
+def max_edits(term):
+    """Typos tolerated in a word: none for short words, one, or two for long ones."""
+    if len(term) < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a, b, limit=None):
+    """Damerau-Levenshtein (optimal string alignment) distance between two words.
+
+    Stops early and returns limit + 1 once the distance must exceed ``limit``.
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def closest_terms(word, candidates, limit=MAX_CORRECTIONS):
+    """Pick the indexed terms closest to a misspelt ``word``.
+
+    A candidate counts as close when the word is within ``max_edits`` of the
+    whole term or of its start (the user may still be typing).
+
+    Args:
+        word: The word as typed
+        candidates: (term, document count) pairs from the index vocabulary
+
+    Returns:
+        Up to ``limit`` terms, closest and most common first
+    """
+    allowed = max_edits(word)
+    if not allowed:
+        return []
+    scored = []
+    for term, documents in candidates:
+        distance = min(edit_distance(word, term, allowed), edit_distance(word, term[:len(word)], allowed))
+        if distance <= allowed:
+            scored.append((distance, -documents, term))
+    return [term for _, _, term in sorted(scored)[:limit]]
@@ -5,6 +5,8 @@ Centralized functions for emitting Socket.IO events across the application
 from datetime import datetime
 import json
 
+from utils.metrics import socketio_events
+
 
 def get_socketio():
     """Get the socketio instance safely"""
@@ -35,6 +37,7 @@ def emit_safe(event_type, data, **kwargs):
             kwargs['namespace'] = '/updates'
         
         socketio.emit(event_type, data, **kwargs)
+        socketio_events.inc(event=event_type)
         print(f"Emitted {event_type}: {data}")
         return True
         
@@ -136,20 +139,21 @@ def emit_expense_event(event_type, expense_data, hostel_id=None):
         return emit_to_all(f'expense_{event_type}', data)
 
 
-def emit_dashboard_update(hostel_id=None, stats=None):
-    """Emit dashboard statistics update"""
+def emit_dashboard_update(hostel_id=None, stats=None, update_type='dashboard'):
+    """Emit dashboard statistics update (coalesced unless ``stats`` are supplied)"""
     if not stats:
         try:
-            from routes.dashboard import get_dashboard_statistics
-            stats = get_dashboard_statistics(hostel_id)
+            from utils.dashboard_updates import dashboard_updates
+            dashboard_updates.mark(hostel_id, update_type)
+            return True
         except Exception as e:
-            print(f"Error getting dashboard stats: {e}")
+            print(f"Error queueing dashboard update: {e}")
             return False
     
     data = {
         'stats': stats,
         'hostel_id': hostel_id,
-        'update_type': 'dashboard'
+        'update_type': update_type
     }
     
     if hostel_id:
@@ -220,30 +224,20 @@ def emit_financial_alert(message, amount=None, hostel_id=None):
 # Connection status functions
 
 def get_connected_users_count():
-    """Get the number of connected users"""
-    socketio = get_socketio()
-    if not socketio:
-        return 0
-    
+    """Get the number of connected sessions (across workers when presence is in Redis)"""
     try:
-        # This is a simplified count - in production you might want to track this more precisely
-        # Using a placeholder since server.manager.rooms API changed
-        return 0  # Placeholder - would need proper connection tracking
+        import socket_events
+        return socket_events.connection_manager.get_online_session_count()
     except Exception as e:
         print(f"Error getting connected users count: {e}")
         return 0
 
 
 def get_hostel_connected_users(hostel_id):
-    """Get the number of users connected to a specific hostel room"""
-    socketio = get_socketio()
-    if not socketio:
-        return 0
-    
+    """Get the number of sessions connected to a specific hostel"""
     try:
-        # Using placeholder since server.manager.rooms API is not accessible in current Flask-SocketIO version
-        # In production, implement proper connection tracking
-        return 0  # Placeholder - would need proper connection tracking
+        import socket_events
+        return socket_events.connection_manager.get_hostel_session_count(hostel_id)
     except Exception as e:
         print(f"Error getting hostel connected users: {e}")
         return 0
@@ -0,0 +1,193 @@
+"""Request-level SQL instrumentation for the Hostel Management System.
+
+While a request is handled, connections from ``db_utils.get_db_connection``
+and ``models.db.get_db_connection`` are wrapped in a proxy that times every
+statement. Per request we keep the statement count, total time, the slowest
+statement and a count per SQL fingerprint (the statement with literals and
+IN lists normalized), so a query repeated once per row (an N+1 pattern) shows
+up as one fingerprint with a high count.
+
+Statements slower than SLOW_QUERY_MS, and fingerprints repeated more than
+REPEATED_QUERY_THRESHOLD times in one request, are logged to the ``sql``
+logger (logs/slow_queries.log). Only fingerprints are logged, never bound
+values. Responses carry a ``Server-Timing`` header with the database time.
+Outside a request, connections are returned unwrapped.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+
+from flask import g, has_app_context, request
+
+from utils.metrics import db_queries, db_request_duration, db_slow_queries
+
+DEFAULT_SLOW_QUERY_MS = 100
+DEFAULT_REPEATED_QUERY_THRESHOLD = 20
+
+slow_query_logger = logging.getLogger('sql')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+# Placeholder lists in either style: '?' (SQLite, the model layer) or '%s' (psycopg2, db_utils)
+_IN_LIST = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """Normalize a statement so executions that differ only in literals group together
+    ("... id IN (?, ?, ?) AND status = 'Paid'" becomes "... id IN (...) AND status = ?")."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()[:500]
+
+
+class QueryStats:
+    """Statements run while handling one request."""
+
+    def __init__(self, slow_query_ms=DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest = None
+        self.fingerprints = Counter()
+        self.slow = []  # (fingerprint, ms) of statements over the threshold
+
+    def record(self, sql, elapsed_ms):
+        statement = fingerprint(sql)
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.fingerprints[statement] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms, self.slowest = elapsed_ms, statement
+        if elapsed_ms >= self.slow_query_ms:
+            self.slow.append((statement, elapsed_ms))
+
+    def repeated(self, threshold):
+        """Fingerprints run more than ``threshold`` times, most frequent first."""
+        return [(statement, count) for statement, count in self.fingerprints.most_common() if count > threshold]
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'slowest_ms': round(self.slowest_ms, 2),
+            'slowest': self.slowest,
+            'distinct': len(self.fingerprints),
+        }
+
+    def server_timing(self):
+        """Server-Timing header value for the database time."""
+        value = f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+        if self.slowest is not None:
+            value += f', db-slowest;dur={self.slowest_ms:.2f}'
+        return value
+
+
+def _timed(stats, sql, call, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return call(*args, **kwargs)
+    finally:
+        stats.record(sql, (time.perf_counter() - start) * 1000)
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing execute() and executemany()."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def execute(self, sql, *args, **kwargs):
+        _timed(self._stats, sql, self._cursor.execute, sql, *args, **kwargs)
+        return self
+
+    def executemany(self, sql, *args, **kwargs):
+        _timed(self._stats, sql, self._cursor.executemany, sql, *args, **kwargs)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy recording every statement in a QueryStats."""
+
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    def execute(self, sql, *args, **kwargs):
+        return _timed(self._stats, sql, self._connection.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return _timed(self._stats, sql, self._connection.executemany, sql, *args, **kwargs)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._stats)
+
+    def __enter__(self):
+        self._connection.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._connection.__exit__(exc_type, exc_val, exc_tb)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def current_stats():
+    """The QueryStats of the request being handled, or None."""
+    if not has_app_context():
+        return None
+    return g.get('sql_stats')
+
+
+def instrument(connection):
+    """Wrap ``connection`` so its statements count towards the current request (if any)."""
+    stats = current_stats()
+    if stats is None or isinstance(connection, InstrumentedConnection):
+        return connection
+    return InstrumentedConnection(connection, stats)
+
+
+def configure_sql_instrumentation(app):
+    """Collect per-request SQL statistics (SQL_INSTRUMENTATION) and add Server-Timing headers.
+
+    Register before other before_request handlers so their queries are counted.
+    """
+    if not app.config.get('SQL_INSTRUMENTATION', True):
+        return
+    slow_query_ms = app.config.get('SLOW_QUERY_MS') or DEFAULT_SLOW_QUERY_MS
+    repeated_threshold = app.config.get('REPEATED_QUERY_THRESHOLD') or DEFAULT_REPEATED_QUERY_THRESHOLD
+
+    @app.before_request
+    def start_sql_stats():
+        if request.endpoint != 'static':
+            g.sql_stats = QueryStats(slow_query_ms)
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+        db_queries.inc(stats.count)
+        db_slow_queries.inc(len(stats.slow))
+        db_request_duration.observe(stats.total_ms / 1000, endpoint=request.endpoint or 'unmatched')
+        for statement, elapsed_ms in stats.slow:
+            slow_query_logger.warning(f"Slow query {elapsed_ms:.1f} ms on {request.method} {request.path}: {statement}")
+        for statement, count in stats.repeated(repeated_threshold):
+            slow_query_logger.warning(f"Query repeated {count} times on {request.method} {request.path}: {statement}")
+        if app.config.get('SERVER_TIMING', True) and stats.count:
+            response.headers.add('Server-Timing', stats.server_timing())
+        return response
@@ -0,0 +1,122 @@
+"""Cached user snapshots for the Hostel Management System.
+
+``app.load_user`` needs the logged-in user on every request. Instead of a
+``SELECT * FROM users`` each time, the row is kept for a short TTL in a small
+in-process LRU, backed by the shared cache (Redis when configured) so other
+workers can reuse it. Snapshots never include the password hash.
+
+User changes call ``invalidate_user`` after committing; the invalidation bus
+drops the snapshot in this process, in the shared cache and, with Redis, in
+every other worker. Without Redis other workers see a change once their
+snapshot expires (USER_CACHE_TTL).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from utils.cache import cache
+from utils.invalidation import bus
+
+DEFAULT_USER_TTL = 60
+DEFAULT_MAX_USERS = 512
+
+# Columns left out of cached snapshots
+PRIVATE_FIELDS = ('password_hash',)
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+class UserCache:
+    """In-process LRU of user snapshots in front of the shared cache."""
+
+    def __init__(self, ttl=DEFAULT_USER_TTL, max_entries=DEFAULT_MAX_USERS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user id -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _remember(self, user_id, snapshot):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, user_id, loader):
+        """Return the user's snapshot (a dict), calling ``loader(user_id)`` on a miss.
+
+        ``loader`` returns the user row as a mapping, or None when the user is gone;
+        missing users are not cached.
+        """
+        if self.ttl <= 0:
+            return self.snapshot(loader(user_id))
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self._stats['hits'] += 1
+                return dict(entry[1])
+
+        key = f'{user_tag(user_id)}:snapshot'
+        hit, snapshot = cache.get(key)
+        if hit:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            snapshot = self.snapshot(loader(user_id))
+            if snapshot is None:
+                return None
+            cache.set(key, snapshot, self.ttl, [user_tag(user_id)])
+        self._remember(user_id, snapshot)
+        return dict(snapshot)
+
+    @staticmethod
+    def snapshot(row):
+        if row is None:
+            return None
+        return {k: v for k, v in dict(row).items() if k not in PRIVATE_FIELDS}
+
+    def _on_invalidate(self, tags):
+        """Bus listener: drop local snapshots of invalidated users."""
+        user_ids = [tag.split(':', 1)[1] for tag in tags if tag.startswith('user:')]
+        if not user_ids:
+            return
+        with self._lock:
+            for user_id in list(self._entries):
+                if str(user_id) in user_ids:
+                    del self._entries[user_id]
+                    self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), ttl=self.ttl)
+
+
+# Shared user cache; configure_user_cache() applies the app settings
+user_cache = UserCache()
+bus.subscribe(user_cache._on_invalidate)
+
+
+def invalidate_user(user_id):
+    """Drop the cached snapshot of a user everywhere (call after committing a change)."""
+    bus.publish([user_tag(user_id)])
+
+
+def configure_user_cache(config):
+    """Apply USER_CACHE_TTL (seconds; 0 disables the cache) from an app config mapping."""
+    if config.get('USER_CACHE_TTL') is not None:
+        user_cache.ttl = int(config.get('USER_CACHE_TTL'))
+    return user_cache